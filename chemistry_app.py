@@ -3,9 +3,13 @@ import re
 import pandas as pd
 import numpy as np
 import math
+import os
 from datetime import datetime
 from typing import Dict, Tuple, List
+from contextlib import closing
 import json
+import sqlite3
+from statistics import NormalDist
 
 # Page configuration
 st.set_page_config(
@@ -20,8 +24,6 @@ if 'calculation_history' not in st.session_state:
     st.session_state.calculation_history = []
 if 'dark_mode' not in st.session_state:
     st.session_state.dark_mode = False
-if 'inventory' not in st.session_state:
-    st.session_state.inventory = []
 if 'protocols' not in st.session_state:
     st.session_state.protocols = []
 if 'favorites' not in st.session_state:
@@ -175,6 +177,40 @@ class AdvancedChemistryCalculators:
             'Tris': {'name': 'Tris(hydroxymethyl)aminomethane', 'mw': 121.14, 'use': 'Buffer'}
         }
     
+    @staticmethod
+    def _as_arrays(*values) -> List[np.ndarray]:
+        """Broadcast scalars/lists/Series to 1-D float arrays (None becomes NaN)"""
+        arrays = [np.atleast_1d(np.asarray(np.nan if v is None else v, dtype=float)).ravel() for v in values]
+        return [a.copy() for a in np.broadcast_arrays(*arrays)]
+
+    @staticmethod
+    def _validate(n: int, checks: List[Tuple[np.ndarray, str]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Combine (invalid mask, reason) checks into a validity mask and first-failing reason per element"""
+        valid = np.ones(n, dtype=bool)
+        issue = np.full(n, "", dtype=object)
+        for mask, reason in reversed(checks):
+            mask = np.broadcast_to(mask, (n,))
+            valid &= ~mask
+            issue[mask] = reason
+        return valid, issue
+
+    @staticmethod
+    def batch_molecular_weight(formulas) -> pd.DataFrame:
+        """Molecular weights for many formulas; each distinct formula is parsed once"""
+        formulas = pd.Series(formulas, dtype=object).fillna("").astype(str).str.strip()
+        unique = pd.unique(formulas)
+        weights, issues = {}, {}
+        for formula in unique:
+            try:
+                weights[formula] = AdvancedChemistryCalculators.compute_molecular_weight(formula)
+                issues[formula] = ""
+            except ValueError as e:
+                weights[formula] = np.nan
+                issues[formula] = str(e).replace("Error computing molecular weight: ", "")
+        issue = formulas.map(issues).to_numpy(dtype=object)
+        return pd.DataFrame({'formula': formulas.to_numpy(), 'mw': formulas.map(weights).to_numpy(dtype=float),
+                             'valid': issue == "", 'issue': issue})
+
     @staticmethod
     def compute_molecular_weight(formula: str) -> float:
         """Compute molecular weight from chemical formula"""
@@ -202,219 +238,4638 @@ class AdvancedChemistryCalculators:
             raise ValueError(f"Error computing molecular weight: {str(e)}")
     
     @staticmethod
-    def calculate_molarity(mass_g: float, mw: float, volume_L: float) -> float:
-        """Calculate molarity from mass, molecular weight, and volume"""
+    def batch_molarity(mass_g, mw, volume_L) -> pd.DataFrame:
+        """Vectorized molarity; invalid rows are NaN and flagged in `valid`/`issue`"""
+        mass, weight, volume = AdvancedChemistryCalculators._as_arrays(mass_g, mw, volume_L)
+        valid, issue = AdvancedChemistryCalculators._validate(len(mass), [
+            (~np.isfinite(mass) | ~np.isfinite(weight) | ~np.isfinite(volume), "Missing or non-numeric input"),
+            (mass < 0, "Mass must be non-negative"),
+            (weight <= 0, "Molecular weight must be positive"),
+            (volume <= 0, "Volume must be positive")
+        ])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            moles = np.where(valid, mass / weight, np.nan)
+            molarity = np.where(valid, moles / volume, np.nan)
+        return pd.DataFrame({'mass_g': mass, 'mw': weight, 'volume_L': volume, 'moles': moles,
+                             'molarity': molarity, 'valid': valid, 'issue': issue})
+
+    @staticmethod
+    def calculate_molarity(mass_g: float, mw: float, volume_L: float) -> float:
+        """Calculate molarity from mass, molecular weight, and volume"""
+        try:
+            result = AdvancedChemistryCalculators.batch_molarity(mass_g, mw, volume_L)
+            if not result['valid'].all():
+                raise ValueError(result.loc[~result['valid'], 'issue'].iloc[0])
+            return float(result['molarity'].iloc[0]) if len(result) == 1 else result['molarity'].to_numpy()
+        except Exception as e:
+            raise ValueError(f"Molarity calculation error: {str(e)}")
+
+    @staticmethod
+    def batch_solution_masses(formulas, molarity, volume_L, purity_percent=100.0) -> pd.DataFrame:
+        """Weigh-out mass for each (formula, molarity, volume, purity) row"""
+        weights = AdvancedChemistryCalculators.batch_molecular_weight(formulas)
+        molarity, volume, purity = AdvancedChemistryCalculators._as_arrays(molarity, volume_L, purity_percent)
+        valid, issue = AdvancedChemistryCalculators._validate(len(weights), [
+            (~weights['valid'].to_numpy(), "Invalid formula"),
+            (~np.isfinite(molarity) | (molarity <= 0), "Molarity must be positive"),
+            (~np.isfinite(volume) | (volume <= 0), "Volume must be positive"),
+            (~np.isfinite(purity) | (purity <= 0) | (purity > 100), "Purity must be between 0 and 100%")
+        ])
+        issue = np.where(weights['valid'], issue, weights['issue'])
+        theoretical = np.where(valid, weights['mw'] * molarity * volume, np.nan)
+        return pd.DataFrame({'formula': weights['formula'], 'mw': weights['mw'], 'molarity': molarity,
+                             'volume_L': volume, 'purity_percent': purity, 'theoretical_mass_g': theoretical,
+                             'mass_g': theoretical * 100 / purity, 'valid': valid, 'issue': issue})
+
+    @staticmethod
+    def batch_dilution(c1, v1=None, c2=None, v2=None) -> pd.DataFrame:
+        """Vectorized C1V1 = C2V2, solving each row for its missing (NaN) v1, v2 or c2"""
+        c1, v1, c2, v2 = AdvancedChemistryCalculators._as_arrays(c1, v1, c2, v2)
+        solve_v1 = np.isnan(v1)
+        solve_v2 = ~solve_v1 & np.isnan(v2)
+        solve_c2 = ~solve_v1 & ~solve_v2
+        valid, issue = AdvancedChemistryCalculators._validate(len(c1), [
+            (~np.isfinite(c1) | (solve_v1 & (np.isnan(c2) | np.isnan(v2))) | (solve_v2 & np.isnan(c2)),
+             "Exactly one of V1, C2 and V2 may be missing"),
+            (c1 <= 0, "Stock concentration must be positive"),
+            (~solve_c2 & (c2 <= 0), "Final concentration must be positive"),
+            (~solve_v1 & (v1 <= 0), "Stock volume must be positive"),
+            (~solve_v2 & (v2 <= 0), "Final volume must be positive")
+        ])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            v1 = np.where(solve_v1, c2 * v2 / c1, v1)
+            v2 = np.where(solve_v2, c1 * v1 / c2, v2)
+            c2 = np.where(solve_c2, c1 * v1 / v2, c2)
+            # Reported but not rejected, so the scalar calculator keeps its original behaviour
+            issue[valid & (c2 > c1)] = "Final concentration exceeds the stock"
+            table = pd.DataFrame({'c1': c1, 'v1': v1, 'c2': c2, 'v2': v2,
+                                  'dilution_factor': c1 / c2, 'volume_water': v2 - v1})
+        table.loc[~valid, ['v1', 'c2', 'v2', 'dilution_factor', 'volume_water']] = np.nan
+        table['valid'] = valid
+        table['issue'] = issue
+        return table
+
+    @staticmethod
+    def calculate_dilution(c1: float, v1: float, c2: float, v2: float = None) -> Dict:
+        """Calculate dilution using C1V1 = C2V2, solving for whichever of v1/v2/c2 is None"""
+        try:
+            if v1 is not None and v2 is not None:
+                c2 = None
+            result = AdvancedChemistryCalculators.batch_dilution(c1, v1, c2, v2)
+            if not result['valid'].all():
+                raise ValueError(result.loc[~result['valid'], 'issue'].iloc[0])
+            columns = ['c1', 'v1', 'c2', 'v2', 'dilution_factor', 'volume_water']
+            if len(result) == 1:
+                return {k: float(result[k].iloc[0]) for k in columns}
+            return {k: result[k].to_numpy() for k in columns}
+        except Exception as e:
+            raise ValueError(f"Dilution calculation error: {str(e)}")
+
+    @staticmethod
+    def batch_ph(concentration, is_acid=True) -> pd.DataFrame:
+        """Vectorized strong acid/base pH; `is_acid` may be a scalar or per-row boolean array"""
+        conc, = AdvancedChemistryCalculators._as_arrays(concentration)
+        acid = np.broadcast_to(np.asarray(is_acid, dtype=bool), conc.shape)
+        valid, issue = AdvancedChemistryCalculators._validate(len(conc), [
+            (~np.isfinite(conc), "Missing or non-numeric input"),
+            (conc <= 0, "Concentration must be positive")
+        ])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            p_value = np.where(valid, -np.log10(conc), np.nan)
+        return pd.DataFrame({'concentration': conc, 'is_acid': acid,
+                             'ph': np.where(acid, p_value, 14 - p_value), 'valid': valid, 'issue': issue})
+
+    @staticmethod
+    def ph_calculator(concentration: float, is_acid: bool = True) -> float:
+        """Calculate pH from concentration"""
+        try:
+            result = AdvancedChemistryCalculators.batch_ph(concentration, is_acid)
+            if not result['valid'].all():
+                raise ValueError(result.loc[~result['valid'], 'issue'].iloc[0])
+            return float(result['ph'].iloc[0]) if len(result) == 1 else result['ph'].to_numpy()
+        except Exception as e:
+            raise ValueError(f"pH calculation error: {str(e)}")
+
+    @staticmethod
+    def batch_buffer(weak_acid_conc, conjugate_base_conc, pka) -> pd.DataFrame:
+        """Vectorized Henderson-Hasselbalch"""
+        acid, base, pka = AdvancedChemistryCalculators._as_arrays(weak_acid_conc, conjugate_base_conc, pka)
+        valid, issue = AdvancedChemistryCalculators._validate(len(acid), [
+            (~np.isfinite(acid) | ~np.isfinite(base) | ~np.isfinite(pka), "Missing or non-numeric input"),
+            ((acid <= 0) | (base <= 0), "Concentrations must be positive")
+        ])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ph = np.where(valid, pka + np.log10(base / acid), np.nan)
+        return pd.DataFrame({'weak_acid_conc': acid, 'conjugate_base_conc': base, 'pka': pka,
+                             'ph': ph, 'valid': valid, 'issue': issue})
+
+    @staticmethod
+    def buffer_calculator(weak_acid_conc: float, conjugate_base_conc: float, pka: float) -> float:
+        """Henderson-Hasselbalch equation"""
+        try:
+            result = AdvancedChemistryCalculators.batch_buffer(weak_acid_conc, conjugate_base_conc, pka)
+            if not result['valid'].all():
+                raise ValueError(result.loc[~result['valid'], 'issue'].iloc[0])
+            return float(result['ph'].iloc[0]) if len(result) == 1 else result['ph'].to_numpy()
+        except Exception as e:
+            raise ValueError(f"Buffer calculation error: {str(e)}")
+
+    @staticmethod
+    def batch_beers_law(absorbance=None, concentration=None, extinction_coeff=None,
+                        path_length=1.0) -> pd.DataFrame:
+        """Vectorized Beer's Law; rows with a missing absorbance are solved for it, the rest for concentration"""
+        absorbance, concentration, epsilon, path = AdvancedChemistryCalculators._as_arrays(
+            absorbance, concentration, extinction_coeff, path_length)
+        solve_a = np.isnan(absorbance)
+        valid, issue = AdvancedChemistryCalculators._validate(len(absorbance), [
+            (~np.isfinite(epsilon) | ~np.isfinite(path) | (solve_a & ~np.isfinite(concentration)),
+             "Missing or non-numeric input"),
+            ((epsilon <= 0) | (path <= 0), "Extinction coefficient and path length must be positive")
+        ])
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            absorbance = np.where(solve_a, epsilon * concentration * path, absorbance)
+            concentration = np.where(solve_a, concentration, absorbance / (epsilon * path))
+            absorbance[~valid] = np.nan
+            concentration[~valid] = np.nan
+            return pd.DataFrame({
+                'absorbance': absorbance,
+                'transmittance': 10 ** (-absorbance) * 100,
+                'concentration': concentration,
+                'concentration_mM': concentration * 1000,
+                'concentration_μM': concentration * 1000000,
+                'solved_for': np.where(solve_a, 'absorbance', 'concentration'),
+                'valid': valid,
+                'issue': issue
+            })
+
+    @staticmethod
+    def beers_law_calculator(absorbance: float = None, concentration: float = None, 
+                           extinction_coeff: float = None, path_length: float = 1.0) -> Dict:
+        """Beer's Law: A = ε × c × l"""
+        try:
+            result = AdvancedChemistryCalculators.batch_beers_law(absorbance, concentration, extinction_coeff,
+                                                                  path_length)
+            if not result['valid'].all():
+                raise ValueError(result.loc[~result['valid'], 'issue'].iloc[0])
+            columns = ['absorbance', 'transmittance'] if absorbance is None else \
+                ['concentration', 'concentration_mM', 'concentration_μM']
+            if len(result) == 1:
+                return {k: float(result[k].iloc[0]) for k in columns}
+            return {k: result[k].to_numpy() for k in columns}
+        except Exception as e:
+            raise ValueError(f"Beer's Law calculation error: {str(e)}")
+
+class PCRCalculators:
+    """Real-time PCR and Copy Number Calculators"""
+    
+    @staticmethod
+    def batch_copy_number_absolute(ct_sample, ct_standard, standard_copies, efficiency=100.0) -> pd.DataFrame:
+        """Vectorized single-standard absolute quantification"""
+        ct, ct_std, std_copies, eff = AdvancedChemistryCalculators._as_arrays(
+            ct_sample, ct_standard, standard_copies, efficiency)
+        valid, issue = AdvancedChemistryCalculators._validate(len(ct), [
+            (~np.isfinite(ct) | ~np.isfinite(ct_std) | ~np.isfinite(std_copies) | ~np.isfinite(eff),
+             "Missing or non-numeric input"),
+            ((eff <= 0) | (eff > 200), "Efficiency must be between 0 and 200%"),
+            (std_copies < 0, "Standard copies must be non-negative")
+        ])
+        amp_factor = 1 + eff / 100.0
+        delta_ct = ct - ct_std
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            copy_number = np.where(valid, std_copies * amp_factor ** (-delta_ct), np.nan)
+            log_copy_number = np.where(copy_number > 0, np.log10(copy_number), np.where(valid, 0.0, np.nan))
+        return pd.DataFrame({
+            'copy_number': copy_number,
+            'log_copy_number': log_copy_number,
+            'delta_ct': delta_ct,
+            'efficiency_used': eff,
+            'amplification_factor': amp_factor,
+            'valid': valid,
+            'issue': issue
+        })
+
+    @staticmethod
+    def calculate_copy_number_absolute(ct_sample: float, ct_standard: float, 
+                                    standard_copies: float, efficiency: float = 100.0) -> Dict:
+        """Calculate absolute copy number using standard curve"""
+        try:
+            result = PCRCalculators.batch_copy_number_absolute(ct_sample, ct_standard, standard_copies, efficiency)
+            if not result['valid'].all():
+                raise ValueError(result.loc[~result['valid'], 'issue'].iloc[0])
+            result = result.drop(columns=['valid', 'issue'])
+            if len(result) == 1:
+                return {k: float(v) for k, v in result.iloc[0].items()}
+            return {k: result[k].to_numpy() for k in result.columns}
+        except Exception as e:
+            raise ValueError(f"Copy number calculation error: {str(e)}")
+
+    @staticmethod
+    def batch_copy_number_relative(ct_target, ct_reference, ct_control_target, ct_control_reference,
+                                   efficiency_target=100.0, efficiency_reference=100.0) -> pd.DataFrame:
+        """Vectorized ΔΔCt / Pfaffl ratio (identical to 2^(-ΔΔCt) when both efficiencies are 100%)"""
+        ct_t, ct_r, ctrl_t, ctrl_r, eff_t, eff_r = AdvancedChemistryCalculators._as_arrays(
+            ct_target, ct_reference, ct_control_target, ct_control_reference,
+            efficiency_target, efficiency_reference)
+        valid, issue = AdvancedChemistryCalculators._validate(len(ct_t), [
+            (~np.isfinite(ct_t) | ~np.isfinite(ct_r) | ~np.isfinite(ctrl_t) | ~np.isfinite(ctrl_r),
+             "Missing or non-numeric Ct"),
+            ((eff_t <= 0) | (eff_t > 200) | (eff_r <= 0) | (eff_r > 200), "Efficiency must be between 0 and 200%")
+        ])
+        delta_ct_sample = ct_t - ct_r
+        delta_ct_control = ctrl_t - ctrl_r
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            # ratio = E_target^ΔCt_target(control - sample) / E_ref^ΔCt_ref(control - sample)
+            relative_quantity = np.where(valid, (1 + eff_t / 100.0) ** (ctrl_t - ct_t)
+                                         / (1 + eff_r / 100.0) ** (ctrl_r - ct_r), np.nan)
+            log2_fold_change = np.where(relative_quantity > 0, np.log2(relative_quantity),
+                                        np.where(valid, 0.0, np.nan))
+        return pd.DataFrame({
+            'relative_quantity': relative_quantity,
+            'fold_change': relative_quantity,
+            'delta_ct_sample': delta_ct_sample,
+            'delta_ct_control': delta_ct_control,
+            'delta_delta_ct': delta_ct_sample - delta_ct_control,
+            'log2_fold_change': log2_fold_change,
+            'valid': valid,
+            'issue': issue
+        })
+
+    @staticmethod
+    def calculate_copy_number_relative(ct_target: float, ct_reference: float, 
+                                    ct_control_target: float, ct_control_reference: float,
+                                    efficiency_target: float = 100.0, efficiency_reference: float = 100.0) -> Dict:
+        """Calculate relative copy number using 2^(-ΔΔCt) method"""
+        try:
+            result = PCRCalculators.batch_copy_number_relative(ct_target, ct_reference, ct_control_target,
+                                                               ct_control_reference, efficiency_target,
+                                                               efficiency_reference)
+            if not result['valid'].all():
+                raise ValueError(result.loc[~result['valid'], 'issue'].iloc[0])
+            result = result.drop(columns=['valid', 'issue'])
+            if len(result) == 1:
+                return {k: float(v) for k, v in result.iloc[0].items()}
+            return {k: result[k].to_numpy() for k in result.columns}
+        except Exception as e:
+            raise ValueError(f"Relative quantification error: {str(e)}")
+
+    @staticmethod
+    def batch_pcr_efficiency(ct_values, concentrations) -> pd.DataFrame:
+        """Standard-curve regression for many curves at once
+
+        `ct_values` is (curves x points); NaN marks a missing point. `concentrations`
+        is either one row shared by all curves or a matching matrix.
+        """
+        ct = np.atleast_2d(np.asarray(ct_values, dtype=float))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_conc = np.log10(np.broadcast_to(np.atleast_2d(np.asarray(concentrations, dtype=float)), ct.shape))
+        used = np.isfinite(ct) & np.isfinite(log_conc)
+        x = np.where(used, log_conc, 0.0)
+        y = np.where(used, ct, 0.0)
+
+        # Ct = slope * log[conc] + intercept, from masked row sums
+        n = used.sum(axis=1)
+        sum_x, sum_y = x.sum(axis=1), y.sum(axis=1)
+        sum_xy, sum_x2 = (x * y).sum(axis=1), (x * x).sum(axis=1)
+        denominator = n * sum_x2 - sum_x ** 2
+        valid, issue = AdvancedChemistryCalculators._validate(len(ct), [
+            (n < 3, "Need at least 3 matching Ct and concentration values"),
+            (np.abs(denominator) < 1e-12, "Concentrations must differ")
+        ])
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            slope = np.where(valid, (n * sum_xy - sum_x * sum_y) / denominator, np.nan)
+            intercept = (sum_y - slope * sum_x) / n
+            residuals = np.where(used, ct - (slope[:, None] * log_conc + intercept[:, None]), 0.0)
+            centred = np.where(used, ct - (sum_y / n)[:, None], 0.0)
+            ss_tot = (centred ** 2).sum(axis=1)
+            r_squared = np.where(ss_tot != 0, 1 - (residuals ** 2).sum(axis=1) / ss_tot, 0.0)
+            efficiency = (10 ** (-1 / slope) - 1) * 100
+        return pd.DataFrame({'efficiency_percent': efficiency, 'slope': slope, 'intercept': intercept,
+                             'r_squared': np.where(valid, r_squared, np.nan), 'n_points': n,
+                             'valid': valid, 'issue': issue})
+
+    @staticmethod
+    def calculate_pcr_efficiency(ct_values: List[float], concentrations: List[float]) -> Dict:
+        """Calculate PCR efficiency from standard curve"""
+        try:
+            if len(ct_values) != len(concentrations) or len(ct_values) < 3:
+                raise ValueError("Need at least 3 matching Ct and concentration values")
+
+            result = PCRCalculators.batch_pcr_efficiency([ct_values], [concentrations]).iloc[0]
+            if not result['valid']:
+                raise ValueError(result['issue'])
+            
+            return {
+                'efficiency_percent': float(result['efficiency_percent']),
+                'slope': float(result['slope']),
+                'intercept': float(result['intercept']),
+                'r_squared': float(result['r_squared']),
+                'equation': f"Ct = {result['slope']:.3f} * log[conc] + {result['intercept']:.3f}"
+            }
+        except Exception as e:
+            raise ValueError(f"Efficiency calculation error: {str(e)}")
+    
+    @staticmethod
+    def calculate_gene_copy_number(genome_size_bp, target_gene_length_bp, dna_concentration_ng_ul, volume_ul,
+                                   copies_per_genome=1, template_type="genomic",
+                                   mass_per_bp: float = 650.0) -> Dict:
+        """Calculate gene copy number from DNA concentration
+
+        `template_type` selects what the measured DNA is: "genomic" (molecule =
+        whole genome of `genome_size_bp`, target present `copies_per_genome` times),
+        "amplicon" (linear dsDNA of `target_gene_length_bp`) or "plasmid" (circular
+        dsDNA of `genome_size_bp` total length carrying `copies_per_genome` inserts).
+        All numeric inputs broadcast, so arrays give one result per element.
+        """
+        try:
+            if template_type not in ("genomic", "amplicon", "plasmid"):
+                raise ValueError("Template type must be 'genomic', 'amplicon' or 'plasmid'")
+
+            genome_size, target_length, concentration, volume, per_genome, bp_mass = np.broadcast_arrays(
+                *(np.asarray(x, dtype=float) for x in (genome_size_bp, target_gene_length_bp,
+                                                       dna_concentration_ng_ul, volume_ul,
+                                                       copies_per_genome, mass_per_bp))
+            )
+            if np.any(concentration < 0) or np.any(volume <= 0) or np.any(per_genome < 0):
+                raise ValueError("Concentration and copies per genome must be non-negative and volume positive")
+
+            if template_type == "amplicon":
+                molecule_length = target_length
+                per_genome = np.ones_like(per_genome)
+            else:
+                molecule_length = genome_size
+            if np.any(molecule_length <= 0):
+                raise ValueError("Template length must be positive")
+            if template_type != "genomic" and np.any(target_length > molecule_length):
+                raise ValueError("Target length cannot exceed the template length")
+
+            # Linear molecules carry two 5'/3' end groups (~36 Da); circular plasmids have none
+            molecular_weight = molecule_length * bp_mass + (0.0 if template_type == "plasmid" else 36.04)
+
+            avogadro = 6.022e23
+            dna_mass_ng = concentration * volume
+            molecule_copies = dna_mass_ng / 1e9 / molecular_weight * avogadro
+            gene_copies = molecule_copies * per_genome
+
+            result = {
+                'template_type': template_type,
+                'total_dna_mass_ng': dna_mass_ng,
+                'genome_molecular_weight': molecular_weight,
+                'genome_copies': molecule_copies,
+                'copies_per_genome': per_genome,
+                'gene_copies': gene_copies,
+                'copies_per_ul': gene_copies / volume,
+                'copies_per_ng': np.divide(gene_copies, dna_mass_ng, out=np.zeros_like(gene_copies),
+                                           where=dna_mass_ng > 0),
+                'target_mass_fraction': np.minimum(target_length * per_genome / molecule_length, 1.0),
+                'molarity_pm': gene_copies / volume / avogadro * 1e18
+            }
+            if np.ndim(result['gene_copies']) == 0:
+                result = {k: (float(v) if k != 'template_type' else v) for k, v in result.items()}
+            return result
+        except Exception as e:
+            raise ValueError(f"Gene copy number calculation error: {str(e)}")
+
+    @staticmethod
+    def calculate_standard_dilution_series(targets: pd.DataFrame, top_copies_per_ul: float = 1e7,
+                                           dilution_factor: float = 10.0, n_points: int = 6,
+                                           final_volume_ul: float = 100.0,
+                                           template_ul_per_reaction: float = 2.0) -> pd.DataFrame:
+        """Serial-dilution tables for many standards in one call
+
+        `targets` has one row per standard with `target`, `concentration_ng_ul`,
+        `template_type` and the length columns used by `calculate_gene_copy_number`
+        (`genome_size_bp`, `target_gene_length_bp`, optional `copies_per_genome`).
+        Returns one row per target and dilution point.
+        """
+        try:
+            if n_points < 1 or dilution_factor <= 1:
+                raise ValueError("Need at least one point and a dilution factor above 1")
+
+            targets = targets.reset_index(drop=True).copy()
+            for column, default in (('template_type', 'amplicon'), ('copies_per_genome', 1),
+                                    ('genome_size_bp', np.nan), ('target_gene_length_bp', np.nan)):
+                if column not in targets.columns:
+                    targets[column] = default
+            targets['template_type'] = targets['template_type'].fillna('amplicon').str.lower().str.strip()
+
+            stock_copies = np.full(len(targets), np.nan)
+            for template_type, group in targets.groupby('template_type'):
+                stock = PCRCalculators.calculate_gene_copy_number(
+                    group['genome_size_bp'].fillna(group['target_gene_length_bp']).to_numpy(),
+                    group['target_gene_length_bp'].fillna(0).to_numpy(),
+                    group['concentration_ng_ul'].to_numpy(),
+                    1.0,
+                    group['copies_per_genome'].fillna(1).to_numpy(),
+                    template_type
+                )
+                stock_copies[group.index.to_numpy()] = stock['copies_per_ul']
+
+            if np.any(stock_copies < top_copies_per_ul):
+                short = targets.loc[stock_copies < top_copies_per_ul, 'target'].astype(str).tolist()
+                raise ValueError(f"Stock is below the top standard for: {', '.join(short[:10])}")
+
+            # (targets x points) grid of nominal concentrations
+            points = np.arange(n_points)
+            copies_per_ul = top_copies_per_ul / dilution_factor ** points[None, :] * np.ones((len(targets), 1))
+            transfer_ul = np.full_like(copies_per_ul, final_volume_ul / dilution_factor)
+            # First point is made from stock (pre-diluted by powers of ten so the
+            # transfer is at least 1 µL); the rest serially from the previous point
+            first_transfer = final_volume_ul * top_copies_per_ul / stock_copies
+            predilution = np.where(first_transfer < 1.0, 10.0 ** np.ceil(-np.log10(first_transfer)), 1.0)
+            transfer_ul[:, 0] = first_transfer * predilution
+
+            table = pd.DataFrame({
+                'target': np.repeat(targets['target'].to_numpy(), n_points),
+                'template_type': np.repeat(targets['template_type'].to_numpy(), n_points),
+                'stock_copies_per_ul': np.repeat(stock_copies, n_points),
+                'stock_predilution': np.repeat(predilution, n_points),
+                'point': np.tile(points + 1, len(targets)),
+                'source': np.tile(['stock'] + [f'point {i}' for i in points[:-1] + 1], len(targets)),
+                'transfer_ul': transfer_ul.ravel(),
+                'diluent_ul': (final_volume_ul - transfer_ul).ravel(),
+                'copies_per_ul': copies_per_ul.ravel(),
+                'copies_per_reaction': copies_per_ul.ravel() * template_ul_per_reaction,
+                'log10_copies_per_reaction': np.log10(copies_per_ul.ravel() * template_ul_per_reaction)
+            })
+            return table
+        except Exception as e:
+            raise ValueError(f"Dilution series error: {str(e)}")
+
+    @staticmethod
+    def calculate_dpcr_concentration(positive_partitions, total_partitions,
+                                     partition_volume_nl: float = 0.85, dilution_factor: float = 1.0,
+                                     ci_method: str = "wilson", confidence: float = 0.95) -> pd.DataFrame:
+        """Digital PCR absolute quantification with Poisson correction
+
+        Works on scalars or arrays of positive/total partition counts (one entry per
+        well or sample). CIs are computed on the positive fraction (Wilson score or
+        exact Clopper-Pearson) and transformed through λ = -ln(1 - p).
+        """
+        try:
+            k = np.atleast_1d(np.asarray(positive_partitions, dtype=float))
+            n = np.atleast_1d(np.asarray(total_partitions, dtype=float))
+            if np.any(n <= 0) or np.any(k < 0) or np.any(k > n):
+                raise ValueError("Positive partitions must be between 0 and the total partition count")
+            if partition_volume_nl <= 0:
+                raise ValueError("Partition volume must be positive")
+
+            alpha = 1 - confidence
+            p = k / n
+
+            if ci_method == "wilson":
+                z = NormalDist().inv_cdf(1 - alpha / 2)
+                centre = (p + z ** 2 / (2 * n)) / (1 + z ** 2 / n)
+                half_width = z * np.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2)) / (1 + z ** 2 / n)
+                p_low = np.clip(centre - half_width, 0.0, 1.0)
+                p_high = np.clip(centre + half_width, 0.0, 1.0)
+            elif ci_method == "exact":
+                from scipy import stats
+                p_low = np.where(k > 0, stats.beta.ppf(alpha / 2, k, n - k + 1), 0.0)
+                p_high = np.where(k < n, stats.beta.ppf(1 - alpha / 2, k + 1, n - k), 1.0)
+            else:
+                raise ValueError(f"Unknown CI method '{ci_method}'")
+
+            saturated = k >= n
+            with np.errstate(divide='ignore'):
+                lam = -np.log1p(-p)
+                lam_low = -np.log1p(-p_low)
+                lam_high = -np.log1p(-p_high)
+
+            # copies per partition → copies/μL of reaction → copies/μL of sample
+            to_conc = dilution_factor / (partition_volume_nl * 1e-3)
+
+            return pd.DataFrame({
+                'positive_partitions': k,
+                'total_partitions': n,
+                'positive_fraction': p,
+                'copies_per_partition': lam,
+                'copies_per_ul': lam * to_conc,
+                'ci_low_copies_per_ul': lam_low * to_conc,
+                'ci_high_copies_per_ul': lam_high * to_conc,
+                'total_copies': lam * n,
+                'saturated': saturated
+            })
+        except Exception as e:
+            raise ValueError(f"Digital PCR calculation error: {str(e)}")
+
+    @staticmethod
+    def calculate_dpcr_multiplex(double_negative, channel1_only, channel2_only, double_positive,
+                                 partition_volume_nl: float = 0.85, dilution_factor: float = 1.0) -> pd.DataFrame:
+        """Two-channel dPCR occupancy: per-channel λ, expected co-occupancy and linkage"""
+        try:
+            nn = np.atleast_1d(np.asarray(double_negative, dtype=float))
+            pn = np.atleast_1d(np.asarray(channel1_only, dtype=float))
+            np_ = np.atleast_1d(np.asarray(channel2_only, dtype=float))
+            pp = np.atleast_1d(np.asarray(double_positive, dtype=float))
+            total = nn + pn + np_ + pp
+            if np.any(total <= 0):
+                raise ValueError("Each sample needs at least one partition")
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                log_neg1 = np.log((nn + np_) / total)
+                log_neg2 = np.log((nn + pn) / total)
+                log_neg_both = np.log(nn / total)
+
+                lambda1 = -log_neg1
+                lambda2 = -log_neg2
+                # Linked copies: P(--) = P(ch1-)·P(ch2-)·exp(λ_linked)
+                lambda_linked = np.maximum(log_neg_both - log_neg1 - log_neg2, 0.0)
+
+            expected_double = total * (1 - np.exp(-lambda1)) * (1 - np.exp(-lambda2))
+            to_conc = dilution_factor / (partition_volume_nl * 1e-3)
+
+            return pd.DataFrame({
+                'total_partitions': total,
+                'ch1_copies_per_partition': lambda1,
+                'ch2_copies_per_partition': lambda2,
+                'ch1_copies_per_ul': lambda1 * to_conc,
+                'ch2_copies_per_ul': lambda2 * to_conc,
+                'observed_double_positive': pp,
+                'expected_double_positive': expected_double,
+                'excess_double_positive': pp - expected_double,
+                'linked_copies_per_ul': lambda_linked * to_conc,
+                'linked_fraction_ch1': np.where(lambda1 > 0, lambda_linked / lambda1, np.nan)
+            })
+        except Exception as e:
+            raise ValueError(f"Multiplex dPCR calculation error: {str(e)}")
+
+class DigitalPCRImporter:
+    """Chunked import and positive/negative classification of partition-level amplitude files"""
+
+    @staticmethod
+    def iter_chunks(source, columns: List[str], chunksize: int = 1_000_000):
+        """Yield DataFrame chunks with only the needed columns (rewinds file-like sources)"""
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        yield from pd.read_csv(source, usecols=columns, chunksize=chunksize)
+
+    @staticmethod
+    def otsu_threshold(counts: np.ndarray, edges: np.ndarray) -> float:
+        """Otsu's between-class-variance threshold on a 1-D histogram"""
+        centres = 0.5 * (edges[:-1] + edges[1:])
+        weight_low = np.cumsum(counts)
+        weight_high = weight_low[-1] - weight_low
+        mass_low = np.cumsum(counts * centres)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean_low = mass_low / weight_low
+            mean_high = (mass_low[-1] - mass_low) / weight_high
+            between = weight_low * weight_high * (mean_low - mean_high) ** 2
+        best = int(np.nanargmax(np.where(np.isfinite(between), between, np.nan)))
+        return float(edges[best + 1])
+
+    @staticmethod
+    def estimate_thresholds(source, channels: List[str], bins: int = 2048,
+                            chunksize: int = 1_000_000) -> Dict[str, float]:
+        """Stream per-channel histograms over the whole file and pick Otsu thresholds
+
+        A first pass takes the histogram range from every chunk's 0.01/99.99
+        percentiles, so files sorted by well (NTCs or negatives first) still get
+        a range that covers the positive cluster.
+        """
+        try:
+            low = {channel: np.inf for channel in channels}
+            high = {channel: -np.inf for channel in channels}
+            for chunk in DigitalPCRImporter.iter_chunks(source, channels, chunksize):
+                for channel in channels:
+                    values = chunk[channel].to_numpy(dtype=float)
+                    values = values[np.isfinite(values)]
+                    if len(values):
+                        chunk_low, chunk_high = np.percentile(values, [0.01, 99.99])
+                        low[channel] = min(low[channel], chunk_low)
+                        high[channel] = max(high[channel], chunk_high)
+
+            edges = {}
+            histograms = {}
+            for channel in channels:
+                if not np.isfinite(low[channel]):
+                    raise ValueError(f"Channel '{channel}' has no numeric amplitudes")
+                margin = 0.1 * (high[channel] - low[channel])
+                edges[channel] = np.linspace(low[channel] - margin, high[channel] + margin, bins + 1)
+                histograms[channel] = np.zeros(bins)
+
+            for chunk in DigitalPCRImporter.iter_chunks(source, channels, chunksize):
+                for channel in channels:
+                    values = chunk[channel].to_numpy(dtype=float)
+                    values = values[np.isfinite(values)]
+                    # Values beyond every chunk's 0.01/99.99 percentiles go to the end bins
+                    clipped = np.clip(values, edges[channel][0], edges[channel][-1])
+                    histograms[channel] += np.histogram(clipped, bins=edges[channel])[0]
+
+            return {channel: DigitalPCRImporter.otsu_threshold(histograms[channel], edges[channel])
+                    for channel in channels}
+        except Exception as e:
+            raise ValueError(f"Threshold estimation error: {str(e)}")
+
+    @staticmethod
+    def count_partitions(source, well_column: str, channels: List[str], thresholds: Dict[str, float],
+                         chunksize: int = 1_000_000) -> pd.DataFrame:
+        """Count positive/negative partitions per well (and 2-D quadrants for two channels)"""
+        try:
+            if not 1 <= len(channels) <= 2:
+                raise ValueError("Select one or two amplitude channels")
+
+            totals = None
+            for chunk in DigitalPCRImporter.iter_chunks(source, [well_column] + channels, chunksize):
+                positive = [chunk[c].to_numpy(dtype=float) >= thresholds[c] for c in channels]
+                flags = pd.DataFrame({'well': chunk[well_column].astype(str).to_numpy(),
+                                      'total_partitions': 1})
+                if len(channels) == 1:
+                    flags['positive_partitions'] = positive[0]
+                else:
+                    flags['double_negative'] = ~positive[0] & ~positive[1]
+                    flags['channel1_only'] = positive[0] & ~positive[1]
+                    flags['channel2_only'] = ~positive[0] & positive[1]
+                    flags['double_positive'] = positive[0] & positive[1]
+
+                counts = flags.groupby('well', sort=False).sum()
+                totals = counts if totals is None else totals.add(counts, fill_value=0)
+
+            if totals is None:
+                raise ValueError("File contains no partitions")
+
+            return totals.astype(np.int64).reset_index()
+        except Exception as e:
+            raise ValueError(f"Partition counting error: {str(e)}")
+
+class AmplificationCurveAnalyzer:
+    """Raw qPCR amplification curve processing on (wells × cycles) fluorescence arrays"""
+
+    @staticmethod
+    def load_fluorescence_table(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Convert an instrument export to (wells, cycles, fluorescence matrix)
+
+        Accepts either wide format (first column = well, remaining columns = cycles)
+        or long format with 'well', 'cycle' and 'fluorescence' columns.
+        """
+        try:
+            columns = {str(c).strip().lower(): c for c in df.columns}
+            if {'well', 'cycle', 'fluorescence'} <= set(columns):
+                wide = df.pivot_table(index=columns['well'], columns=columns['cycle'],
+                                      values=columns['fluorescence'], aggfunc='mean', sort=False)
+                wide = wide.reindex(columns=sorted(wide.columns))
+                wells = wide.index.astype(str).to_numpy()
+                cycles = wide.columns.to_numpy(dtype=float)
+                fluorescence = wide.to_numpy(dtype=float)
+            else:
+                wells = df.iloc[:, 0].astype(str).to_numpy()
+                cycle_labels = [re.sub(r'[^0-9.]', '', str(c)) for c in df.columns[1:]]
+                cycles = np.array([float(c) if c else i + 1 for i, c in enumerate(cycle_labels)])
+                fluorescence = df.iloc[:, 1:].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+
+            if fluorescence.ndim != 2 or fluorescence.shape[1] < 10:
+                raise ValueError("Need at least 10 cycles per well")
+
+            return wells, cycles, fluorescence
+        except Exception as e:
+            raise ValueError(f"Fluorescence import error: {str(e)}")
+
+    @staticmethod
+    def baseline_correct(fluorescence: np.ndarray, start_cycle: int = 3, end_cycle: int = 15) -> Dict:
+        """Subtract a per-well linear baseline fitted over cycles start_cycle..end_cycle (1-based)"""
+        try:
+            F = np.asarray(fluorescence, dtype=float)
+            n_cycles = F.shape[1]
+            start = max(int(start_cycle), 1) - 1
+            end = min(int(end_cycle), n_cycles)
+            if end - start < 3:
+                raise ValueError("Baseline window must span at least 3 cycles")
+
+            x = np.arange(n_cycles, dtype=float)
+            xw = x[start:end]
+            yw = F[:, start:end]
+
+            # Closed-form least squares for every well at once
+            x_mean = xw.mean()
+            y_mean = np.nanmean(yw, axis=1)
+            x_dev = xw - x_mean
+            slope = np.nansum((yw - y_mean[:, None]) * x_dev, axis=1) / np.sum(x_dev ** 2)
+            intercept = y_mean - slope * x_mean
+
+            baseline = intercept[:, None] + slope[:, None] * x[None, :]
+            corrected = F - baseline
+            residual_sd = np.nanstd(corrected[:, start:end], axis=1, ddof=2)
+
+            return {
+                'corrected': corrected,
+                'baseline_slope': slope,
+                'baseline_intercept': intercept,
+                'baseline_sd': residual_sd
+            }
+        except Exception as e:
+            raise ValueError(f"Baseline correction error: {str(e)}")
+
+    @staticmethod
+    def threshold_ct(corrected: np.ndarray, cycles: np.ndarray, threshold: float) -> np.ndarray:
+        """Fractional cycle where each curve crosses the threshold and stays above it"""
+        F = np.asarray(corrected, dtype=float)
+        above = np.nan_to_num(F, nan=-np.inf) >= threshold
+
+        # A cycle counts only if every later cycle is also above threshold,
+        # which ignores isolated noise spikes in the baseline region
+        stays_above = np.flip(np.logical_and.accumulate(np.flip(above, axis=1), axis=1), axis=1)
+        idx = np.argmax(stays_above, axis=1)
+        valid = stays_above.any(axis=1) & (idx > 0)
+
+        idx_safe = np.where(valid, idx, 1)
+        rows = np.arange(F.shape[0])
+        f_hi = F[rows, idx_safe]
+        f_lo = F[rows, idx_safe - 1]
+        c_hi = cycles[idx_safe]
+        c_lo = cycles[idx_safe - 1]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            frac = np.clip((threshold - f_lo) / (f_hi - f_lo), 0.0, 1.0)
+        ct = c_lo + frac * (c_hi - c_lo)
+
+        return np.where(valid, ct, np.nan)
+
+    @staticmethod
+    def second_derivative_max_ct(corrected: np.ndarray, cycles: np.ndarray, smoothing: int = 3) -> np.ndarray:
+        """Ct at the maximum of the second derivative, refined by parabolic interpolation"""
+        F = np.nan_to_num(np.asarray(corrected, dtype=float))
+
+        if smoothing > 1:
+            kernel = np.ones(smoothing) / smoothing
+            padded = np.pad(F, ((0, 0), (smoothing // 2, smoothing - 1 - smoothing // 2)), mode='edge')
+            windows = np.lib.stride_tricks.sliding_window_view(padded, smoothing, axis=1)
+            F = windows @ kernel
+
+        d2 = F[:, 2:] - 2 * F[:, 1:-1] + F[:, :-2]
+        idx = np.argmax(d2, axis=1)
+        rows = np.arange(F.shape[0])
+
+        # Parabolic vertex through the peak and its neighbours (sub-cycle resolution)
+        left = d2[rows, np.clip(idx - 1, 0, d2.shape[1] - 1)]
+        centre = d2[rows, idx]
+        right = d2[rows, np.clip(idx + 1, 0, d2.shape[1] - 1)]
+        denom = left - 2 * centre + right
+        with np.errstate(divide='ignore', invalid='ignore'):
+            offset = np.where((denom < 0) & (idx > 0) & (idx < d2.shape[1] - 1),
+                              0.5 * (left - right) / denom, 0.0)
+
+        # d2[i] is centred on cycle i + 1
+        position = idx + 1 + offset
+        step = np.median(np.diff(cycles)) if len(cycles) > 1 else 1.0
+        ct = cycles[0] + position * step
+
+        return np.where(centre > 0, ct, np.nan)
+
+    @staticmethod
+    def exponential_phase_efficiency(corrected: np.ndarray, cycles: np.ndarray, baseline_sd: np.ndarray,
+                                     window: int = 5, min_r_squared: float = 0.99,
+                                     noise_multiple: float = 5.0, plateau_fraction: float = 0.3) -> pd.DataFrame:
+        """Per-well efficiency from the window of linearity on log fluorescence (LinRegPCR-style)
+
+        Every window of `window` consecutive cycles is regressed at once using prefix
+        sums; the window with the steepest slope (and R² ≥ min_r_squared) that lies
+        between the noise floor and the plateau onset is kept for each well.
+        """
+        F = np.asarray(corrected, dtype=float)
+        n_wells, n_cycles = F.shape
+        if window < 3 or window > n_cycles:
+            raise ValueError("Window must be between 3 and the number of cycles")
+
+        amplitude = np.nanmax(F, axis=1)
+        lower = noise_multiple * np.asarray(baseline_sd, dtype=float)
+        upper = plateau_fraction * amplitude
+        in_phase = np.isfinite(F) & (F > lower[:, None]) & (F < upper[:, None]) & (F > 0)
+
+        x = np.broadcast_to(np.asarray(cycles, dtype=float), F.shape)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            y = np.where(in_phase, np.log10(F), 0.0)
+        xv = np.where(in_phase, x, 0.0)
+
+        def windowed(values):
+            prefix = np.zeros((n_wells, n_cycles + 1))
+            np.cumsum(values, axis=1, out=prefix[:, 1:])
+            return prefix[:, window:] - prefix[:, :-window]
+
+        n = windowed(in_phase.astype(float))
+        sx, sy = windowed(xv), windowed(y)
+        sxx, sxy, syy = windowed(xv * xv), windowed(xv * y), windowed(y * y)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cov = n * sxy - sx * sy
+            var_x = n * sxx - sx * sx
+            var_y = n * syy - sy * sy
+            slope = cov / var_x
+            r_squared = cov * cov / (var_x * var_y)
+
+        candidate = (n == window) & (r_squared >= min_r_squared) & (slope > 0)
+        score = np.where(candidate, slope, -np.inf)
+        best = np.argmax(score, axis=1)
+        rows = np.arange(n_wells)
+        found = candidate[rows, best]
+
+        best_slope = np.where(found, slope[rows, best], np.nan)
+        amplification_factor = 10 ** best_slope
+        cycles = np.asarray(cycles, dtype=float)
+
+        return pd.DataFrame({
+            'efficiency_percent': (amplification_factor - 1) * 100,
+            'amplification_factor': amplification_factor,
+            'efficiency_r_squared': np.where(found, r_squared[rows, best], np.nan),
+            'window_start_cycle': np.where(found, cycles[best], np.nan),
+            'window_end_cycle': np.where(found, cycles[np.minimum(best + window - 1, n_cycles - 1)], np.nan)
+        })
+
+    @staticmethod
+    def mean_efficiency(results: pd.DataFrame, wells: List[str]) -> float:
+        """Mean per-well efficiency (%) over the wells of one gene"""
+        values = results.loc[results['well'].isin(wells), 'efficiency_percent'].dropna()
+        if values.empty:
+            raise ValueError("Selected wells have no valid efficiency estimates")
+        return float(values.mean())
+
+    @staticmethod
+    def analyze_plate(wells: np.ndarray, cycles: np.ndarray, fluorescence: np.ndarray,
+                      method: str = "threshold", threshold: float = None,
+                      baseline_start: int = 3, baseline_end: int = 15,
+                      min_snr: float = 10.0, efficiency_window: int = 5) -> Dict:
+        """Baseline-correct a whole plate, call Ct values and run plateau/noise QC"""
+        try:
+            cycles = np.asarray(cycles, dtype=float)
+            base = AmplificationCurveAnalyzer.baseline_correct(fluorescence, baseline_start, baseline_end)
+            corrected = base['corrected']
+            baseline_sd = base['baseline_sd']
+
+            # Default threshold: 10× the median baseline noise of the plate
+            if threshold is None:
+                threshold = 10 * float(np.nanmedian(baseline_sd))
+                if not np.isfinite(threshold) or threshold <= 0:
+                    threshold = 0.1 * float(np.nanmax(corrected))
+
+            if method == "threshold":
+                ct = AmplificationCurveAnalyzer.threshold_ct(corrected, cycles, threshold)
+            elif method == "second_derivative":
+                ct = AmplificationCurveAnalyzer.second_derivative_max_ct(corrected, cycles)
+            else:
+                raise ValueError(f"Unknown Ct method '{method}'")
+
+            # QC metrics on the whole array
+            amplitude = np.nanmax(corrected, axis=1)
+            increments = np.diff(np.nan_to_num(corrected), axis=1)
+            max_increment = increments.max(axis=1)
+            tail_increment = increments[:, -3:].mean(axis=1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                snr = amplitude / baseline_sd
+                plateau_ratio = tail_increment / max_increment
+
+            amplified = amplitude > threshold
+            plateau_reached = amplified & (plateau_ratio < 0.1)
+            noisy = snr < min_snr
+
+            ct = np.where(amplified, ct, np.nan)
+
+            flags = np.full(len(wells), "OK", dtype=object)
+            flags[amplified & ~plateau_reached] = "No plateau"
+            flags[noisy & amplified] = "Noisy"
+            flags[~amplified] = "No amplification"
+
+            results = pd.DataFrame({
+                'well': np.asarray(wells).astype(str),
+                'ct': ct,
+                'amplitude': amplitude,
+                'baseline_sd': baseline_sd,
+                'snr': snr,
+                'plateau_ratio': plateau_ratio,
+                'plateau_reached': plateau_reached,
+                'qc_flag': flags
+            })
+            
+            efficiency = AmplificationCurveAnalyzer.exponential_phase_efficiency(
+                corrected, cycles, baseline_sd, window=efficiency_window
+            )
+            efficiency.loc[~amplified] = np.nan
+            results = pd.concat([results, efficiency], axis=1)
+
+            return {
+                'results': results,
+                'corrected': corrected,
+                'threshold': threshold,
+                'method': method
+            }
+        except Exception as e:
+            raise ValueError(f"Amplification curve analysis error: {str(e)}")
+
+    @staticmethod
+    def mean_ct(results: pd.DataFrame, wells: List[str]) -> float:
+        """Mean Ct over a set of wells, ignoring wells without a Ct"""
+        values = results.loc[results['well'].isin(wells), 'ct'].dropna()
+        if values.empty:
+            raise ValueError("Selected wells have no valid Ct values")
+        return float(values.mean())
+
+class MeltCurveAnalyzer:
+    """Melt-curve (−dF/dT) analysis on (wells × temperatures) fluorescence arrays"""
+
+    @staticmethod
+    def load_melt_table(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Convert a melt export to (wells, temperatures, fluorescence matrix)
+
+        Accepts wide format (first column = well, remaining columns = temperatures)
+        or long format with 'well', 'temperature' and 'fluorescence' columns.
+        """
+        try:
+            columns = {str(c).strip().lower(): c for c in df.columns}
+            if {'well', 'temperature', 'fluorescence'} <= set(columns):
+                wide = df.pivot_table(index=columns['well'], columns=columns['temperature'],
+                                      values=columns['fluorescence'], aggfunc='mean', sort=False)
+                wide = wide.reindex(columns=sorted(wide.columns))
+                wells = wide.index.astype(str).to_numpy()
+                temperatures = wide.columns.to_numpy(dtype=float)
+                fluorescence = wide.to_numpy(dtype=float)
+            else:
+                wells = df.iloc[:, 0].astype(str).to_numpy()
+                temperatures = np.array([float(re.sub(r'[^0-9.\-]', '', str(c))) for c in df.columns[1:]])
+                fluorescence = df.iloc[:, 1:].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+                order = np.argsort(temperatures)
+                temperatures = temperatures[order]
+                fluorescence = fluorescence[:, order]
+
+            if fluorescence.shape[1] < 10:
+                raise ValueError("Need at least 10 temperature points per well")
+
+            return wells, temperatures, fluorescence
+        except Exception as e:
+            raise ValueError(f"Melt curve import error: {str(e)}")
+
+    @staticmethod
+    def smooth(values: np.ndarray, window: int) -> np.ndarray:
+        """Centred moving average along the last axis (edge-padded, same shape)"""
+        if window <= 1:
+            return values
+        pad_left = window // 2
+        padded = np.pad(values, ((0, 0), (pad_left, window - 1 - pad_left)), mode='edge')
+        prefix = np.cumsum(padded, axis=1)
+        prefix = np.concatenate([np.zeros((values.shape[0], 1)), prefix], axis=1)
+        return (prefix[:, window:] - prefix[:, :-window]) / window
+
+    @staticmethod
+    def negative_derivative(fluorescence: np.ndarray, temperatures: np.ndarray,
+                            smoothing_c: float = 0.5) -> np.ndarray:
+        """Smoothed −dF/dT for every well at once (smoothing width given in °C)"""
+        F = np.asarray(fluorescence, dtype=float)
+        T = np.asarray(temperatures, dtype=float)
+        F = np.where(np.isfinite(F), F, np.nanmean(F, axis=1, keepdims=True))
+        # An even window would centre each average half a step off and shift every Tm by one step
+        window = int(round(smoothing_c / np.median(np.diff(T)))) // 2 * 2 + 1
+        smoothed = MeltCurveAnalyzer.smooth(F, window)
+        derivative = -np.gradient(smoothed, T, axis=1)
+        return MeltCurveAnalyzer.smooth(derivative, window)
+
+    @staticmethod
+    def detect_peaks(neg_derivative: np.ndarray, temperatures: np.ndarray,
+                     min_height_fraction: float = 0.1, min_separation: float = 1.5,
+                     noise_multiple: float = 5.0) -> Dict:
+        """Locate the two highest −dF/dT peaks per well with sub-step Tm interpolation
+
+        A point is a peak if it is the maximum within ±min_separation °C, exceeds
+        min_height_fraction of the well's tallest peak and rises noise_multiple
+        robust standard deviations above the well's derivative baseline.
+        """
+        D = np.asarray(neg_derivative, dtype=float)
+        T = np.asarray(temperatures, dtype=float)
+        n_wells, n_points = D.shape
+
+        step = float(np.median(np.diff(T)))
+        half_window = max(int(round(min_separation / step)), 1)
+        padded = np.pad(D, ((0, 0), (half_window, half_window)), mode='constant', constant_values=-np.inf)
+        local_max = np.lib.stride_tricks.sliding_window_view(padded, 2 * half_window + 1, axis=1).max(axis=2)
+
+        centre = np.median(D, axis=1, keepdims=True)
+        noise = 1.4826 * np.median(np.abs(D - centre), axis=1, keepdims=True)
+        well_max = D.max(axis=1, keepdims=True)
+
+        is_peak = (D >= local_max) & (D - centre > noise_multiple * noise) & (D >= min_height_fraction * well_max)
+        is_peak[:, [0, -1]] = False
+        # A flat-topped peak has several equal maxima; keep only the first point of the plateau
+        is_peak[:, 1:] &= ~(is_peak[:, :-1] & (D[:, 1:] == D[:, :-1]))
+
+        heights = np.where(is_peak, D, -np.inf)
+        n_peaks = is_peak.sum(axis=1)
+
+        # Two tallest peaks per well without sorting the whole row
+        top = np.argpartition(-heights, 1, axis=1)[:, :2]
+        top_heights = np.take_along_axis(heights, top, axis=1)
+        top = np.take_along_axis(top, np.argsort(-top_heights, axis=1), axis=1)
+
+        rows = np.arange(n_wells)[:, None]
+        idx = np.clip(top, 1, n_points - 2)
+        left = D[rows, idx - 1]
+        mid = D[rows, idx]
+        right = D[rows, idx + 1]
+        denom = left - 2 * mid + right
+        with np.errstate(divide='ignore', invalid='ignore'):
+            offset = np.where(denom < 0, 0.5 * (left - right) / denom, 0.0)
+        tm = T[idx] + offset * step
+
+        primary_found = n_peaks >= 1
+        secondary_found = n_peaks >= 2
+
+        return {
+            'n_peaks': n_peaks,
+            'tm_primary': np.where(primary_found, tm[:, 0], np.nan),
+            'height_primary': np.where(primary_found, mid[:, 0], np.nan),
+            'tm_secondary': np.where(secondary_found, tm[:, 1], np.nan),
+            'height_secondary': np.where(secondary_found, mid[:, 1], np.nan)
+        }
+
+    @staticmethod
+    def analyze_plate(wells: np.ndarray, temperatures: np.ndarray, fluorescence: np.ndarray,
+                      smoothing_c: float = 0.5, min_height_fraction: float = 0.1,
+                      dimer_tm_gap: float = 5.0, expected_tm: float = None,
+                      tm_tolerance: float = 1.5) -> Dict:
+        """Full melt analysis: derivative, Tm calling and specificity flags per well"""
+        try:
+            temperatures = np.asarray(temperatures, dtype=float)
+            neg_derivative = MeltCurveAnalyzer.negative_derivative(fluorescence, temperatures, smoothing_c)
+
+            peaks = MeltCurveAnalyzer.detect_peaks(neg_derivative, temperatures, min_height_fraction)
+
+            tm_primary = peaks['tm_primary']
+            tm_secondary = peaks['tm_secondary']
+            height_primary = peaks['height_primary']
+            height_secondary = peaks['height_secondary']
+            has_secondary = np.isfinite(tm_secondary)
+
+            # A dimer peak is the lower-Tm one and can be the taller peak (low-template wells, NTCs),
+            # so classify on the Tm gap and report the higher-Tm peak as the product
+            primer_dimer = has_secondary & (np.abs(tm_primary - tm_secondary) > dimer_tm_gap)
+            multiple_products = has_secondary & ~primer_dimer
+            swap = primer_dimer & (tm_secondary > tm_primary)
+            tm_primary, tm_secondary = np.where(swap, tm_secondary, tm_primary), np.where(swap, tm_primary, tm_secondary)
+            height_primary, height_secondary = (np.where(swap, height_secondary, height_primary),
+                                                np.where(swap, height_primary, height_secondary))
+
+            flags = np.full(len(wells), "Single product", dtype=object)
+            flags[multiple_products] = "Multiple products"
+            flags[primer_dimer] = "Primer dimer"
+            if expected_tm is not None:
+                off_target = np.isfinite(tm_primary) & (np.abs(tm_primary - expected_tm) > tm_tolerance)
+                flags[off_target & ~has_secondary] = "Unexpected Tm"
+            flags[peaks['n_peaks'] == 0] = "No peak"
+
+            results = pd.DataFrame({
+                'well': np.asarray(wells).astype(str),
+                'tm': tm_primary,
+                'peak_height': height_primary,
+                'tm_secondary': tm_secondary,
+                'secondary_height': height_secondary,
+                'n_peaks': peaks['n_peaks'],
+                'melt_flag': flags
+            })
+
+            return {'results': results, 'neg_derivative': neg_derivative}
+        except Exception as e:
+            raise ValueError(f"Melt curve analysis error: {str(e)}")
+
+    @staticmethod
+    def join_with_ct(melt_results: pd.DataFrame, ct_results: pd.DataFrame) -> pd.DataFrame:
+        """Attach melt calls to a Ct table by well"""
+        return ct_results.merge(melt_results, on='well', how='outer')
+
+class PrimerThermodynamics:
+    """SantaLucia (1998) nearest-neighbor thermodynamics with Owczarzy salt/Mg²⁺ corrections"""
+
+    BASES = "ACGT"
+    PAD = 4  # code for padding / unknown bases
+
+    # Unified NN parameters indexed [5' base][3' base] (A, C, G, T): ΔH kcal/mol, ΔS cal/(K·mol)
+    NN_DH = np.array([
+        [-7.9, -8.4, -7.8, -7.2],
+        [-8.5, -8.0, -10.6, -7.8],
+        [-8.2, -9.8, -8.0, -8.4],
+        [-7.2, -8.2, -8.5, -7.9],
+    ])
+    NN_DS = np.array([
+        [-22.2, -22.4, -21.0, -20.4],
+        [-22.7, -19.9, -27.2, -21.0],
+        [-22.2, -24.4, -19.9, -22.4],
+        [-21.3, -22.2, -22.7, -22.2],
+    ])
+
+    # Terminal initiation per helix end, indexed by base code
+    INIT_DH = np.array([2.3, 0.1, 0.1, 2.3, 0.0])
+    INIT_DS = np.array([4.1, -2.8, -2.8, 4.1, 0.0])
+    SYMMETRY_DS = -1.4
+
+    GAS_CONSTANT = 1.9872  # cal/(K·mol)
+
+    # 25-entry lookup tables over (code_i * 5 + code_j); pairs involving padding add nothing
+    _PAIR_DH = np.zeros(25)
+    _PAIR_DS = np.zeros(25)
+    _PAIR_DH.reshape(5, 5)[:4, :4] = NN_DH
+    _PAIR_DS.reshape(5, 5)[:4, :4] = NN_DS
+
+    _ENCODE = np.full(256, PAD, dtype=np.uint8)
+    for _code, _base in enumerate(BASES):
+        _ENCODE[ord(_base)] = _code
+        _ENCODE[ord(_base.lower())] = _code
+    _ENCODE[ord('U')] = _ENCODE[ord('u')] = 3
+    del _code, _base
+
+    _cache: Dict[Tuple, Dict] = {}
+    _CACHE_LIMIT = 200_000
+
+    @staticmethod
+    def clean_sequence(seq: str) -> str:
+        """Upper-case and strip whitespace/non-letters from a sequence"""
+        return re.sub(r'[^A-Za-z]', '', seq).upper().replace('U', 'T')
+
+    @staticmethod
+    def clean_sequences(sequences: List[str]) -> List[str]:
+        """Cleaned sequences; raises ValueError for bases other than A, C, G, T/U or sequences under 2 nt"""
+        cleaned = [PrimerThermodynamics.clean_sequence(seq) for seq in sequences]
+        for seq in cleaned:
+            if len(seq) < 2:
+                raise ValueError("Sequences must be at least 2 nt long")
+            if not re.fullmatch(r'[ACGT]+', seq):
+                raise ValueError(f"Sequences may only contain A, C, G, T/U (got '{seq}')")
+        return cleaned
+
+    @staticmethod
+    def encode(sequences: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Encode sequences into a padded uint8 matrix (A=0, C=1, G=2, T=3, pad=4) and lengths"""
+        lengths = np.array([len(seq) for seq in sequences], dtype=np.int64)
+        width = int(lengths.max()) if len(lengths) else 0
+        joined = "".join(seq.ljust(width, "N") for seq in sequences).encode("ascii", "replace")
+        codes = PrimerThermodynamics._ENCODE[np.frombuffer(joined, dtype=np.uint8)]
+        return codes.reshape(len(sequences), width), lengths
+
+    @staticmethod
+    def salt_corrected_tm(tm_1m_kelvin: np.ndarray, gc_fraction: np.ndarray, n_bp: np.ndarray,
+                          monovalent_mm: float, mg_mm: float, dntp_mm: float) -> np.ndarray:
+        """Owczarzy 2004 (Na⁺/K⁺) and 2008 (Mg²⁺) corrections applied to 1/Tm"""
+        mon = max(monovalent_mm, 0.0) / 1000.0
+        mg = max(mg_mm - dntp_mm, 0.0) / 1000.0  # dNTPs chelate Mg²⁺ roughly 1:1
+
+        inv_tm = 1.0 / tm_1m_kelvin
+
+        if mg <= 0:
+            if mon <= 0:
+                raise ValueError("Need a non-zero monovalent or Mg²⁺ concentration")
+            ln_mon = math.log(mon)
+            return 1.0 / (inv_tm + (4.29 * gc_fraction - 3.95) * 1e-5 * ln_mon + 9.40e-6 * ln_mon ** 2)
+
+        ratio = math.sqrt(mg) / mon if mon > 0 else float('inf')
+        if ratio < 0.22:
+            ln_mon = math.log(mon)
+            return 1.0 / (inv_tm + (4.29 * gc_fraction - 3.95) * 1e-5 * ln_mon + 9.40e-6 * ln_mon ** 2)
+
+        a, b, c, d = 3.92e-5, -9.11e-6, 6.26e-5, 1.42e-5
+        e, f, g = -4.82e-4, 5.25e-4, 8.31e-5
+        if ratio < 6.0:
+            ln_mon = math.log(mon)
+            a = 3.92e-5 * (0.843 - 0.352 * math.sqrt(mon) * ln_mon)
+            d = 1.42e-5 * (1.279 - 4.03e-3 * ln_mon - 8.03e-3 * ln_mon ** 2)
+            g = 8.31e-5 * (0.486 - 0.258 * ln_mon + 5.25e-3 * ln_mon ** 3)
+
+        ln_mg = math.log(mg)
+        correction = (a + b * ln_mg + gc_fraction * (c + d * ln_mg)
+                      + (e + f * ln_mg + g * ln_mg ** 2) / (2.0 * (n_bp - 1)))
+        return 1.0 / (inv_tm + correction)
+
+    @staticmethod
+    def batch_tm(sequences: List[str], monovalent_mm: float = 50.0, mg_mm: float = 1.5,
+                 dntp_mm: float = 0.2, primer_nm: float = 250.0) -> pd.DataFrame:
+        """Nearest-neighbor Tm, ΔH, ΔS, ΔG37 and GC% for many sequences at once
+
+        Sequences are encoded once into a uint8 matrix; all dinucleotide stacks are
+        summed with a single gather into the 25-entry ΔH/ΔS tables. Results are
+        cached per (sequence, conditions), so repeated sequences cost nothing.
+        """
+        try:
+            cleaned = [PrimerThermodynamics.clean_sequence(seq) for seq in sequences]
+            conditions = (monovalent_mm, mg_mm, dntp_mm, primer_nm)
+            cache = PrimerThermodynamics._cache
+
+            found = {seq: cache[(seq, conditions)] for seq in cleaned if (seq, conditions) in cache}
+            todo = list(dict.fromkeys(seq for seq in cleaned if seq not in found))
+            if todo:
+                if min(len(seq) for seq in todo) < 2:
+                    raise ValueError("Sequences must be at least 2 nt long")
+
+                codes, lengths = PrimerThermodynamics.encode(todo)
+                if np.any((codes == PrimerThermodynamics.PAD)
+                          & (np.arange(codes.shape[1])[None, :] < lengths[:, None])):
+                    raise ValueError("Sequences may only contain A, C, G, T/U")
+
+                pair_index = codes[:, :-1].astype(np.int64) * 5 + codes[:, 1:]
+                dh = PrimerThermodynamics._PAIR_DH[pair_index].sum(axis=1)
+                ds = PrimerThermodynamics._PAIR_DS[pair_index].sum(axis=1)
+
+                rows = np.arange(len(todo))
+                first = codes[:, 0]
+                last = codes[rows, lengths - 1]
+                dh += PrimerThermodynamics.INIT_DH[first] + PrimerThermodynamics.INIT_DH[last]
+                ds += PrimerThermodynamics.INIT_DS[first] + PrimerThermodynamics.INIT_DS[last]
+
+                # Self-complementary: sequence equals its own reverse complement
+                rev_index = np.clip(lengths[:, None] - 1 - np.arange(codes.shape[1])[None, :], 0, None)
+                rev_comp = 3 - np.take_along_axis(codes, rev_index, axis=1).astype(np.int64)
+                inside = np.arange(codes.shape[1])[None, :] < lengths[:, None]
+                self_comp = np.all((rev_comp == codes) | ~inside, axis=1)
+                ds += np.where(self_comp, PrimerThermodynamics.SYMMETRY_DS, 0.0)
+
+                ct = primer_nm * 1e-9
+                effective_ct = np.where(self_comp, ct, ct / 4)
+                tm_1m = dh * 1000.0 / (ds + PrimerThermodynamics.GAS_CONSTANT * np.log(effective_ct))
+
+                gc_count = ((codes == 1) | (codes == 2)).sum(axis=1)
+                gc_fraction = gc_count / lengths
+                tm = PrimerThermodynamics.salt_corrected_tm(tm_1m, gc_fraction, lengths,
+                                                            monovalent_mm, mg_mm, dntp_mm)
+
+                for i, seq in enumerate(todo):
+                    found[seq] = {
+                        'length': int(lengths[i]),
+                        'gc_content': float(gc_fraction[i] * 100),
+                        'tm': float(tm[i] - 273.15),
+                        'tm_1m_na': float(tm_1m[i] - 273.15),
+                        'delta_h': float(dh[i]),
+                        'delta_s': float(ds[i]),
+                        'delta_g_37': float(dh[i] - 310.15 * ds[i] / 1000.0),
+                        'self_complementary': bool(self_comp[i])
+                    }
+
+                # Evict only after the result rows are assembled from `found`
+                if len(cache) + len(todo) > PrimerThermodynamics._CACHE_LIMIT:
+                    cache.clear()
+                cache.update({(seq, conditions): found[seq] for seq in todo})
+
+            results = pd.DataFrame([found[seq] for seq in cleaned])
+            results.insert(0, 'sequence', cleaned)
+            return results
+        except Exception as e:
+            raise ValueError(f"Tm calculation error: {str(e)}")
+
+    @staticmethod
+    def analyze_primer(seq: str, monovalent_mm: float = 50.0, mg_mm: float = 1.5,
+                       dntp_mm: float = 0.2, primer_nm: float = 250.0) -> Dict:
+        """Length, GC% and nearest-neighbor Tm for a single primer"""
+        result = PrimerThermodynamics.batch_tm([seq], monovalent_mm, mg_mm, dntp_mm, primer_nm)
+        return result.iloc[0].to_dict()
+
+    @staticmethod
+    def parse_primer_file(text: str) -> pd.DataFrame:
+        """Read primers from FASTA or CSV/TSV text into a (name, sequence) table"""
+        try:
+            text = text.strip()
+            if text.startswith('>'):
+                names, sequences = [], []
+                for record in text.split('>')[1:]:
+                    header, _, body = record.partition('\n')
+                    names.append(header.strip())
+                    sequences.append(re.sub(r'\s', '', body))
+                return pd.DataFrame({'name': names, 'sequence': sequences})
+
+            lines = [line.strip() for line in text.splitlines() if line.strip()]
+            if all(re.fullmatch(r'[ACGTUacgtu]+', line) for line in lines):
+                return pd.DataFrame({'name': [f"Primer {i + 1}" for i in range(len(lines))],
+                                     'sequence': lines})
+
+            from io import StringIO
+            df = pd.read_csv(StringIO(text), sep=None, engine='python')
+            columns = {str(c).strip().lower(): c for c in df.columns}
+            seq_col = columns.get('sequence', columns.get('seq', df.columns[-1]))
+            name_col = columns.get('name', columns.get('id', df.columns[0]))
+            return pd.DataFrame({
+                'name': df[name_col].astype(str) if name_col != seq_col else [f"Primer {i + 1}" for i in range(len(df))],
+                'sequence': df[seq_col].astype(str)
+            })
+        except Exception as e:
+            raise ValueError(f"Primer file error: {str(e)}")
+
+class PrimerDimerAnalyzer:
+    """Self-dimer, cross-dimer and hairpin ΔG estimates from a banded nearest-neighbor DP"""
+
+    DUPLEX_INIT_DG = 1.96       # kcal/mol, bimolecular initiation
+    TERMINAL_AT_DG = 0.05       # kcal/mol per terminal A·T pair
+    MAX_LOOP = 3                # band width: largest bulge/internal-loop side considered
+
+    # Loop initiation ΔG37 (kcal/mol, SantaLucia & Hicks 2004), indexed by loop length
+    BULGE_DG = {1: 4.0, 2: 2.9, 3: 3.1, 4: 3.2, 5: 3.3, 6: 3.5}
+    INTERNAL_LOOP_DG = {2: 0.5, 3: 1.6, 4: 1.1, 5: 2.0, 6: 2.0}
+    HAIRPIN_DG = {3: 3.5, 4: 3.5, 5: 3.3, 6: 4.0, 7: 4.2, 8: 4.3, 9: 4.5}
+
+    _cache: Dict[str, Dict] = {}
+    _CACHE_LIMIT = 500_000
+
+    @staticmethod
+    def loop_penalties(max_loop: int) -> np.ndarray:
+        """(max_loop + 1)² table of bulge/internal-loop penalties for a (top, bottom) gap"""
+        table = np.zeros((max_loop + 1, max_loop + 1))
+        for a in range(max_loop + 1):
+            for b in range(max_loop + 1):
+                if a == 0 and b == 0:
+                    continue
+                if a == 0 or b == 0:
+                    table[a, b] = PrimerDimerAnalyzer.BULGE_DG.get(a + b, 3.5)
+                else:
+                    table[a, b] = PrimerDimerAnalyzer.INTERNAL_LOOP_DG.get(a + b, 2.0) + 0.3 * abs(a - b)
+        return table
+
+    @staticmethod
+    def hairpin_penalty(loop_length: np.ndarray, temperature_c: float = 37.0) -> np.ndarray:
+        """Hairpin loop initiation ΔG with Jacobson-Stockmayer extrapolation beyond 9 nt"""
+        n = np.asarray(loop_length, dtype=float)
+        table = np.array([np.inf, np.inf, np.inf] + [PrimerDimerAnalyzer.HAIRPIN_DG[k] for k in range(3, 10)])
+        base = table[np.clip(n, 0, 9).astype(int)]
+        rt = PrimerThermodynamics.GAS_CONSTANT * (temperature_c + 273.15) / 1000.0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            extended = PrimerDimerAnalyzer.HAIRPIN_DG[9] + 2.44 * rt * np.log(np.maximum(n, 9) / 9)
+        return np.where(n > 9, extended, base)
+
+    @staticmethod
+    def stack_dg(temperature_c: float = 37.0, monovalent_mm: float = 50.0,
+                 mg_mm: float = 1.5, dntp_mm: float = 0.2) -> np.ndarray:
+        """5×5 table of salt-corrected stacking ΔG(T) indexed by top-strand dinucleotide codes"""
+        kelvin = temperature_c + 273.15
+        # Na⁺-equivalent concentration (von Ahsen et al. 2001) for the per-phosphate ΔS correction
+        na_eq = (monovalent_mm + 120 * math.sqrt(max(mg_mm - dntp_mm, 0.0))) / 1000.0
+        ds = PrimerThermodynamics.NN_DS + 0.368 * math.log(max(na_eq, 1e-4))
+        table = np.full((5, 5), np.inf)
+        table[:4, :4] = PrimerThermodynamics.NN_DH - kelvin * ds / 1000.0
+        return table
+
+    @staticmethod
+    def _duplex_dp(top: np.ndarray, bottom: np.ndarray, stack: np.ndarray, max_loop: int) -> np.ndarray:
+        """Banded DP: best ΔG of a duplex whose last (3'-most on top) pair is (i, k)
+
+        top holds 5'→3' codes, bottom holds the partner strand 3'→5'; both are
+        padded (B, L) uint8 arrays and every batch row is solved simultaneously.
+        """
+        n_batch, len_top = top.shape
+        len_bottom = bottom.shape[1]
+        loops = PrimerDimerAnalyzer.loop_penalties(max_loop)
+
+        paired = ((top[:, :, None].astype(np.int16) + bottom[:, None, :]) == 3) \
+            & (top[:, :, None] < 4) & (bottom[:, None, :] < 4)
+        at_pair = paired & ((top[:, :, None] == 0) | (top[:, :, None] == 3))
+        start = np.where(paired, np.where(at_pair, PrimerDimerAnalyzer.TERMINAL_AT_DG, 0.0), np.inf)
+
+        G = np.full((n_batch, len_top, len_bottom), np.inf)
+        G[:, 0, :] = start[:, 0, :]
+
+        for i in range(1, len_top):
+            best = start[:, i, :].copy()
+            step = stack[top[:, i - 1], top[:, i]][:, None]
+            for a in range(0, min(max_loop, i - 1) + 1):
+                previous = G[:, i - 1 - a, :]
+                for b in range(0, max_loop + 1):
+                    if b + 1 >= len_bottom:
+                        break
+                    cost = step if (a == 0 and b == 0) else loops[a, b]
+                    candidate = np.full((n_batch, len_bottom), np.inf)
+                    candidate[:, b + 1:] = previous[:, :len_bottom - b - 1] + cost
+                    np.minimum(best, candidate, out=best)
+            G[:, i, :] = np.where(paired[:, i, :], best, np.inf)
+
+        return G + np.where(at_pair, PrimerDimerAnalyzer.TERMINAL_AT_DG, 0.0)
+
+    @staticmethod
+    def _reverse_rows(codes: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+        """Reverse each padded row within its own length (padding stays at the end)"""
+        positions = np.arange(codes.shape[1])[None, :]
+        index = np.clip(lengths[:, None] - 1 - positions, 0, None)
+        reversed_codes = np.take_along_axis(codes, index, axis=1)
+        return np.where(positions < lengths[:, None], reversed_codes, PrimerThermodynamics.PAD).astype(np.uint8)
+
+    @staticmethod
+    def batch_dimer_dg(first: List[str], second: List[str], temperature_c: float = 37.0,
+                       monovalent_mm: float = 50.0, mg_mm: float = 1.5, dntp_mm: float = 0.2,
+                       max_loop: int = MAX_LOOP) -> pd.DataFrame:
+        """Most stable dimer ΔG and 3'-end dimer ΔG for aligned lists of primer pairs"""
+        first = PrimerThermodynamics.clean_sequences(first)
+        second = PrimerThermodynamics.clean_sequences(second)
+        stack = PrimerDimerAnalyzer.stack_dg(temperature_c, monovalent_mm, mg_mm, dntp_mm)
+        codes1, len1 = PrimerThermodynamics.encode(first)
+        codes2, len2 = PrimerThermodynamics.encode(second)
+
+        rows = np.arange(len(first))
+        g12 = PrimerDimerAnalyzer._duplex_dp(codes1, PrimerDimerAnalyzer._reverse_rows(codes2, len2), stack, max_loop)
+        g21 = PrimerDimerAnalyzer._duplex_dp(codes2, PrimerDimerAnalyzer._reverse_rows(codes1, len1), stack, max_loop)
+
+        any_dg = g12.reshape(len(first), -1).min(axis=1)
+        # Duplexes whose last pair is the 3'-terminal base of either primer are extendable
+        three_prime_dg = np.minimum(g12[rows, len1 - 1, :].min(axis=1), g21[rows, len2 - 1, :].min(axis=1))
+
+        init = PrimerDimerAnalyzer.DUPLEX_INIT_DG
+        return pd.DataFrame({
+            'dimer_dg': np.where(np.isfinite(any_dg), np.minimum(any_dg + init, 0.0), 0.0),
+            'three_prime_dimer_dg': np.where(np.isfinite(three_prime_dg), np.minimum(three_prime_dg + init, 0.0), 0.0)
+        })
+
+    @staticmethod
+    def batch_hairpin_dg(sequences: List[str], temperature_c: float = 37.0, monovalent_mm: float = 50.0,
+                         mg_mm: float = 1.5, dntp_mm: float = 0.2, max_loop: int = MAX_LOOP) -> np.ndarray:
+        """Most stable hairpin ΔG per sequence (0 if no stem with a ≥3 nt loop forms)"""
+        sequences = PrimerThermodynamics.clean_sequences(sequences)
+        stack = PrimerDimerAnalyzer.stack_dg(temperature_c, monovalent_mm, mg_mm, dntp_mm)
+        codes, lengths = PrimerThermodynamics.encode(sequences)
+        G = PrimerDimerAnalyzer._duplex_dp(codes, PrimerDimerAnalyzer._reverse_rows(codes, lengths), stack, max_loop)
+
+        # Pair (i, k) on the reversed strand is position j = L - 1 - k; loop = j - i - 1
+        i = np.arange(codes.shape[1])[None, :, None]
+        k = np.arange(codes.shape[1])[None, None, :]
+        loop = (lengths[:, None, None] - 1 - k) - i - 1
+        penalty = PrimerDimerAnalyzer.hairpin_penalty(np.where(loop >= 3, loop, 0), temperature_c)
+        hairpin = (G + penalty).reshape(len(sequences), -1).min(axis=1)
+        return np.where(np.isfinite(hairpin), np.minimum(hairpin, 0.0), 0.0)
+
+    @staticmethod
+    def _pair_key(seq1: str, seq2: str, settings: Tuple) -> str:
+        """Order-independent cache key for a primer pair under given conditions"""
+        import hashlib
+        low, high = sorted((seq1, seq2))
+        return hashlib.sha1(f"{low}|{high}|{settings}".encode()).hexdigest()
+
+    @staticmethod
+    def screen_pool(names: List[str], sequences: List[str], temperature_c: float = 37.0,
+                    monovalent_mm: float = 50.0, mg_mm: float = 1.5, dntp_mm: float = 0.2,
+                    max_workers: int = None, batch_size: int = 256) -> Dict:
+        """All self- and cross-dimer checks for a primer pool plus per-primer hairpins
+
+        Uncached pairs are split into batches that are solved in a process pool
+        (falling back to in-process evaluation if workers are unavailable).
+        """
+        try:
+            import pickle
+            from concurrent.futures import ProcessPoolExecutor
+            from concurrent.futures.process import BrokenProcessPool
+
+            cleaned = PrimerThermodynamics.clean_sequences(sequences)
+            settings = (temperature_c, monovalent_mm, mg_mm, dntp_mm)
+            cache = PrimerDimerAnalyzer._cache
+
+            pairs = [(i, j) for i in range(len(cleaned)) for j in range(i, len(cleaned))]
+            keys = [PrimerDimerAnalyzer._pair_key(cleaned[i], cleaned[j], settings) for i, j in pairs]
+            todo = list({key: (cleaned[i], cleaned[j]) for (i, j), key in zip(pairs, keys)
+                         if key not in cache}.items())
+
+            batches = [todo[start:start + batch_size] for start in range(0, len(todo), batch_size)]
+            args = [([p[1][0] for p in batch], [p[1][1] for p in batch], *settings) for batch in batches]
+
+            results = None
+            if len(batches) > 1:
+                try:
+                    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                        results = list(pool.map(PrimerDimerAnalyzer.batch_dimer_dg, *zip(*args)))
+                except (BrokenProcessPool, pickle.PicklingError, OSError):
+                    # Workers unavailable (sandboxed or spawn-restricted hosts): solve in-process
+                    results = None
+            if results is None:
+                results = [PrimerDimerAnalyzer.batch_dimer_dg(*a) for a in args]
+
+            new = {}
+            for batch, frame in zip(batches, results):
+                for (key, _), row in zip(batch, frame.itertuples(index=False)):
+                    new[key] = {'dimer_dg': row.dimer_dg, 'three_prime_dimer_dg': row.three_prime_dimer_dg}
+            found = {**{key: cache[key] for key in keys if key not in new}, **new}
+
+            dimers = pd.DataFrame({
+                'primer_1': [names[i] for i, _ in pairs],
+                'primer_2': [names[j] for _, j in pairs],
+                'type': ['Self-dimer' if i == j else 'Cross-dimer' for i, j in pairs],
+                'dimer_dg': [found[key]['dimer_dg'] for key in keys],
+                'three_prime_dimer_dg': [found[key]['three_prime_dimer_dg'] for key in keys]
+            }).sort_values('dimer_dg').reset_index(drop=True)
+
+            # Evict only after the output is assembled from `found`
+            if len(cache) + len(new) > PrimerDimerAnalyzer._CACHE_LIMIT:
+                cache.clear()
+            cache.update(new)
+
+            hairpins = pd.DataFrame({
+                'primer': names,
+                'hairpin_dg': PrimerDimerAnalyzer.batch_hairpin_dg(cleaned, *settings)
+            })
+
+            return {'dimers': dimers, 'hairpins': hairpins, 'pairs_evaluated': len(todo)}
+        except Exception as e:
+            raise ValueError(f"Dimer screening error: {str(e)}")
+
+class PrimerDesigner:
+    """Sliding-window primer-pair design over long templates using prefix sums"""
+
+    @staticmethod
+    def candidate_windows(codes: np.ndarray, length: int, monovalent_mm: float, mg_mm: float,
+                          dntp_mm: float, primer_nm: float) -> pd.DataFrame:
+        """GC, nearest-neighbor Tm and 3'-end stability of every window of one length"""
+        n = len(codes)
+        n_windows = n - length + 1
+        if n_windows <= 0:
+            return pd.DataFrame()
+
+        def prefix(values):
+            out = np.zeros(len(values) + 1)
+            np.cumsum(values, out=out[1:])
+            return out
+
+        starts = np.arange(n_windows)
+        ends = starts + length
+
+        gc = prefix((codes == 1) | (codes == 2))
+        ambiguous = prefix(codes >= 4)
+        pair_index = codes[:-1].astype(np.int64) * 5 + codes[1:]
+        pair_dh = prefix(PrimerThermodynamics._PAIR_DH[pair_index])
+        pair_ds = prefix(PrimerThermodynamics._PAIR_DS[pair_index])
+        pair_dg = prefix(PrimerThermodynamics._PAIR_DH[pair_index]
+                         - 310.15 * PrimerThermodynamics._PAIR_DS[pair_index] / 1000.0)
+
+        first = codes[starts]
+        last = codes[ends - 1]
+        dh = pair_dh[ends - 1] - pair_dh[starts] + PrimerThermodynamics.INIT_DH[first] + PrimerThermodynamics.INIT_DH[last]
+        ds = pair_ds[ends - 1] - pair_ds[starts] + PrimerThermodynamics.INIT_DS[first] + PrimerThermodynamics.INIT_DS[last]
+        tm_1m = dh * 1000.0 / (ds + PrimerThermodynamics.GAS_CONSTANT * np.log(primer_nm * 1e-9 / 4))
+        gc_fraction = (gc[ends] - gc[starts]) / length
+        tm = PrimerThermodynamics.salt_corrected_tm(tm_1m, gc_fraction, np.full(n_windows, length),
+                                                    monovalent_mm, mg_mm, dntp_mm) - 273.15
+
+        # Homopolymer run length ending at each base; the j-th base of a window only counts
+        # the j + 1 bases of its run that lie inside the window
+        boundary = np.r_[True, codes[1:] != codes[:-1]]
+        run = np.arange(n) - np.maximum.accumulate(np.where(boundary, np.arange(n), 0)) + 1
+        max_run = np.ones(n_windows, dtype=np.int64)
+        for j in range(length):
+            np.maximum(max_run, np.minimum(run[j:j + n_windows], j + 1), out=max_run)
+
+        # 3'-terminal pentamer stability; forward 3' end is the window end, reverse 3' end its start
+        forward_end_dg = pair_dg[ends - 1] - pair_dg[ends - 5]
+        reverse_end_dg = pair_dg[starts + 4] - pair_dg[starts]
+
+        return pd.DataFrame({
+            'start': starts,
+            'length': length,
+            'tm': tm,
+            'gc_content': gc_fraction * 100,
+            'has_ambiguous': (ambiguous[ends] - ambiguous[starts]) > 0,
+            'max_run': max_run,
+            'forward_gc_clamp': (last == 1) | (last == 2),
+            'reverse_gc_clamp': (first == 1) | (first == 2),
+            'forward_end_dg': forward_end_dg,
+            'reverse_end_dg': reverse_end_dg
+        })
+
+    @staticmethod
+    def design(template: str, num_pairs: int = 10, length_range: Tuple[int, int] = (18, 25),
+               tm_range: Tuple[float, float] = (57.0, 63.0), tm_optimum: float = 60.0,
+               gc_range: Tuple[float, float] = (40.0, 60.0), amplicon_range: Tuple[int, int] = (80, 250),
+               amplicon_optimum: int = None, max_tm_difference: float = 3.0, max_run: int = 4,
+               require_gc_clamp: bool = True, max_end_stability: float = 9.0, target: Tuple[int, int] = None,
+               monovalent_mm: float = 50.0, mg_mm: float = 1.5, dntp_mm: float = 0.2,
+               primer_nm: float = 250.0, candidates_per_side: int = 4000) -> pd.DataFrame:
+        """Top-N primer pairs for a template sequence
+
+        All windows of every allowed length are scored with prefix sums; the best
+        candidates on each strand are then paired via binary search over sorted
+        reverse-primer end positions inside the amplicon size range.
+        """
+        try:
+            template = PrimerThermodynamics.clean_sequence(template)
+            if len(template) < amplicon_range[0]:
+                raise ValueError("Template is shorter than the minimum amplicon size")
+            codes = PrimerThermodynamics._ENCODE[np.frombuffer(template.encode('ascii'), dtype=np.uint8)]
+            amplicon_optimum = amplicon_optimum or int(np.mean(amplicon_range))
+
+            # With a target only windows within one maximum amplicon of it can pair, so score just that region
+            region_start = max(0, target[1] - amplicon_range[1]) if target is not None else 0
+            region_end = min(len(codes), target[0] + amplicon_range[1]) if target is not None else len(codes)
+            windows = pd.concat([
+                PrimerDesigner.candidate_windows(codes[region_start:region_end], length, monovalent_mm, mg_mm,
+                                                 dntp_mm, primer_nm)
+                for length in range(length_range[0], length_range[1] + 1)
+            ], ignore_index=True)
+            windows['start'] += region_start
+
+            passes = (~windows['has_ambiguous']
+                      & windows['tm'].between(*tm_range)
+                      & windows['gc_content'].between(*gc_range)
+                      & (windows['max_run'] <= max_run))
+            penalty = (np.abs(windows['tm'] - tm_optimum)
+                       + 0.5 * np.abs(windows['length'] - np.mean(length_range)))
+
+            forward_ok = passes & (-windows['forward_end_dg'] <= max_end_stability)
+            reverse_ok = passes & (-windows['reverse_end_dg'] <= max_end_stability)
+            if require_gc_clamp:
+                forward_ok &= windows['forward_gc_clamp']
+                reverse_ok &= windows['reverse_gc_clamp']
+            if target is not None:
+                # Flanking and close enough that an amplicon spanning the target fits the size limit
+                forward_ok &= ((windows['start'] + windows['length']) <= target[0]) & \
+                    (windows['start'] >= target[1] - amplicon_range[1])
+                reverse_ok &= (windows['start'] >= target[1]) & \
+                    ((windows['start'] + windows['length']) <= target[0] + amplicon_range[1])
+
+            forward = windows[forward_ok].assign(penalty=penalty[forward_ok]).nsmallest(candidates_per_side, 'penalty')
+            reverse = windows[reverse_ok].assign(penalty=penalty[reverse_ok]).nsmallest(candidates_per_side, 'penalty')
+            if forward.empty or reverse.empty:
+                raise ValueError("No primer candidates pass the constraints - try relaxing Tm/GC limits")
+
+            reverse_end = (reverse['start'] + reverse['length']).to_numpy()
+            order = np.argsort(reverse_end, kind='stable')
+            reverse = reverse.iloc[order]
+            reverse_end = reverse_end[order]
+
+            forward_start = forward['start'].to_numpy()
+            lo = np.searchsorted(reverse_end, forward_start + amplicon_range[0], side='left')
+            hi = np.searchsorted(reverse_end, forward_start + amplicon_range[1], side='right')
+            n_pairs = hi - lo
+            if n_pairs.sum() == 0:
+                raise ValueError("No forward/reverse candidates fall within the amplicon size range")
+
+            f_idx = np.repeat(np.arange(len(forward)), n_pairs)
+            r_idx = np.repeat(lo, n_pairs) + (np.arange(n_pairs.sum()) - np.repeat(np.cumsum(n_pairs) - n_pairs, n_pairs))
+
+            f_tm = forward['tm'].to_numpy()[f_idx]
+            r_tm = reverse['tm'].to_numpy()[r_idx]
+            size = reverse_end[r_idx] - forward_start[f_idx]
+            # Forward and reverse must not overlap
+            valid = (np.abs(f_tm - r_tm) <= max_tm_difference) & \
+                (reverse['start'].to_numpy()[r_idx] >= forward_start[f_idx] + forward['length'].to_numpy()[f_idx])
+
+            pair_penalty = (forward['penalty'].to_numpy()[f_idx] + reverse['penalty'].to_numpy()[r_idx]
+                            + np.abs(f_tm - r_tm) + 0.05 * np.abs(size - amplicon_optimum))
+            pair_penalty = np.where(valid, pair_penalty, np.inf)
+
+            top = min(num_pairs, int(valid.sum()))
+            if top == 0:
+                raise ValueError("No primer pairs satisfy the Tm-difference constraint")
+            best = np.argpartition(pair_penalty, top - 1)[:top]
+            best = best[np.argsort(pair_penalty[best])]
+
+            f_rows = forward.iloc[f_idx[best]]
+            r_rows = reverse.iloc[r_idx[best]]
+            complement = str.maketrans("ACGT", "TGCA")
+            f_seqs = [template[s:s + l] for s, l in zip(f_rows['start'], f_rows['length'])]
+            r_seqs = [template[s:s + l].translate(complement)[::-1] for s, l in zip(r_rows['start'], r_rows['length'])]
+
+            cross = PrimerDimerAnalyzer.batch_dimer_dg(f_seqs, r_seqs, monovalent_mm=monovalent_mm,
+                                                       mg_mm=mg_mm, dntp_mm=dntp_mm)
+
+            return pd.DataFrame({
+                'rank': np.arange(1, top + 1),
+                'forward': f_seqs,
+                'forward_start': f_rows['start'].to_numpy() + 1,
+                'forward_tm': f_rows['tm'].to_numpy(),
+                'forward_gc': f_rows['gc_content'].to_numpy(),
+                'reverse': r_seqs,
+                'reverse_start': r_rows['start'].to_numpy() + r_rows['length'].to_numpy(),
+                'reverse_tm': r_rows['tm'].to_numpy(),
+                'reverse_gc': r_rows['gc_content'].to_numpy(),
+                'amplicon_bp': size[best],
+                'penalty': pair_penalty[best],
+                'cross_dimer_dg': cross['dimer_dg'].to_numpy(),
+                'three_prime_dimer_dg': cross['three_prime_dimer_dg'].to_numpy()
+            })
+        except Exception as e:
+            raise ValueError(f"Primer design error: {str(e)}")
+
+class GenomeIndex:
+    """On-disk, memory-mapped k-mer index of a local genome FASTA for offline in-silico PCR"""
+
+    SEPARATOR = 64  # padding (code 4) written between contigs so matches never span them
+
+    @staticmethod
+    def iter_fasta(path: str, chunk_size: int = 8_000_000):
+        """Stream (name, sequence_chunk, is_new_record) from a plain or gzip-compressed FASTA file
+
+        Each record starts with an empty chunk flagged as new; its sequence follows in pieces of about
+        chunk_size bases, so a whole chromosome is never held in memory.
+        """
+        import gzip
+        opener = gzip.open if str(path).endswith('.gz') else open
+        name, pieces, size = None, [], 0
+        with opener(path, 'rt') as handle:
+            for line in handle:
+                if line.startswith('>'):
+                    if pieces:
+                        yield name, "".join(pieces), False
+                    name, pieces, size = line[1:].strip().split()[0] if line[1:].strip() else "unnamed", [], 0
+                    yield name, "", True
+                elif name is not None:
+                    line = line.strip()
+                    pieces.append(line)
+                    size += len(line)
+                    if size >= chunk_size:
+                        yield name, "".join(pieces), False
+                        pieces, size = [], 0
+        if pieces:
+            yield name, "".join(pieces), False
+
+    @staticmethod
+    def default_index_dir(fasta_path: str) -> str:
+        """Index directory stored next to the FASTA file"""
+        return str(fasta_path) + ".kidx"
+
+    @staticmethod
+    def is_current(fasta_path: str, index_dir: str) -> bool:
+        """True if an index exists and was built from the FASTA's current size/mtime"""
+        meta_path = os.path.join(index_dir, "index.json")
+        if not os.path.exists(meta_path):
+            return False
+        with open(meta_path) as handle:
+            meta = json.load(handle)
+        stat = os.stat(fasta_path)
+        return meta.get('source_size') == stat.st_size and meta.get('source_mtime') == stat.st_mtime
+
+    @staticmethod
+    def _kmer_codes(codes: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Integer codes and start positions of every N-free k-mer in a code array
+
+        Codes are rolled in two bits at a time over k shifted slices and k-mers with an
+        N are found from a running count of N bases, so memory stays a few bytes per base
+        instead of a (bases × k) window matrix.
+        """
+        n = len(codes) - k + 1
+        if n <= 0:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int64)
+        kmers = np.zeros(n, dtype=np.int32)  # 2k ≤ 24 bits for k ≤ 12
+        for j in range(k):
+            kmers <<= 2
+            kmers |= codes[j:j + n] & 3
+        n_count = np.zeros(len(codes) + 1, dtype=np.int32)
+        np.cumsum(codes >= 4, out=n_count[1:])
+        valid = n_count[k:] == n_count[:n]
+        return kmers[valid], np.flatnonzero(valid)
+
+    @staticmethod
+    def build(fasta_path: str, index_dir: str = None, k: int = 11, chunk_size: int = 1_000_000) -> Dict:
+        """Encode the genome to disk and build a CSR k-mer → positions index (two passes)
+
+        Heap use is one 4**k int64 table (128 MB at k=12) plus roughly 75 bytes per base
+        of the current chunk (about 75 MB at the default 1 Mb). Pages of the memory-mapped
+        output also count toward RSS: a 20 Mb genome at k=12 peaked at about 590 MB RSS,
+        130 MB of it the interpreter and imports.
+        """
+        try:
+            if not 8 <= k <= 12:
+                raise ValueError("k must be between 8 and 12")
+            index_dir = index_dir or GenomeIndex.default_index_dir(fasta_path)
+            os.makedirs(index_dir, exist_ok=True)
+
+            # Pass 1: write encoded sequence and count k-mers chunk by chunk
+            contigs = []
+            counts = np.zeros(4 ** k, dtype=np.int64)
+            offset = 0
+            separator = np.full(GenomeIndex.SEPARATOR, PrimerThermodynamics.PAD, dtype=np.uint8).tobytes()
+            tail = np.empty(0, dtype=np.uint8)
+            with open(os.path.join(index_dir, "sequence.u8"), "wb") as seq_out:
+                for name, seq, is_new_record in GenomeIndex.iter_fasta(fasta_path, chunk_size):
+                    if is_new_record:
+                        if contigs:
+                            seq_out.write(separator)
+                            offset += GenomeIndex.SEPARATOR
+                        contigs.append({'name': name, 'offset': offset, 'length': 0})
+                        tail = np.empty(0, dtype=np.uint8)
+                        continue
+                    codes = PrimerThermodynamics._ENCODE[np.frombuffer(seq.encode('ascii', 'replace'), dtype=np.uint8)]
+                    seq_out.write(codes.tobytes())
+                    contigs[-1]['length'] += len(codes)
+                    offset += len(codes)
+                    # Carry the previous chunk's last k-1 bases so k-mers spanning the boundary are counted
+                    window = np.concatenate([tail, codes])
+                    kmers, _ = GenomeIndex._kmer_codes(window, k)
+                    unique, unique_counts = np.unique(kmers, return_counts=True)
+                    counts[unique] += unique_counts
+                    tail = window[-(k - 1):]
+                if contigs:
+                    seq_out.write(separator)
+                    offset += GenomeIndex.SEPARATOR
+
+            if not contigs:
+                raise ValueError("No FASTA records found")
+
+            position_dtype = np.uint32 if offset < 2 ** 32 else np.uint64
+            offsets = np.lib.format.open_memmap(os.path.join(index_dir, "kmer_offsets.npy"), mode='w+',
+                                                dtype=np.int64, shape=(4 ** k + 1,))
+            offsets[0] = 0
+            np.cumsum(counts, out=offsets[1:])
+            offsets.flush()
+            del counts
+
+            # Pass 2: counting-sort scatter of positions into the memory-mapped table
+            positions = np.lib.format.open_memmap(os.path.join(index_dir, "kmer_positions.npy"), mode='w+',
+                                                  dtype=position_dtype, shape=(max(int(offsets[-1]), 1),))
+            cursor = np.array(offsets[:-1])
+            sequence = np.memmap(os.path.join(index_dir, "sequence.u8"), dtype=np.uint8, mode='r')
+            for contig in contigs:
+                codes = sequence[contig['offset']:contig['offset'] + contig['length']]
+                for start in range(0, contig['length'], chunk_size):
+                    kmers, starts = GenomeIndex._kmer_codes(np.asarray(codes[start:start + chunk_size + k - 1]), k)
+                    starts = starts[starts < chunk_size]
+                    kmers = kmers[:len(starts)]
+                    order = np.argsort(kmers, kind='stable')
+                    kmers = kmers[order]
+                    # kmers is sorted, so each group starts where the code changes
+                    first = np.flatnonzero(np.diff(kmers, prepend=-1))
+                    group_counts = np.diff(first, append=len(kmers))
+                    unique = kmers[first]
+                    rank = np.arange(len(kmers)) - np.repeat(first, group_counts)
+                    positions[cursor[kmers] + rank] = contig['offset'] + start + starts[order]
+                    cursor[unique] += group_counts
+            positions.flush()
+
+            stat = os.stat(fasta_path)
+            meta = {
+                'k': k,
+                'contigs': contigs,
+                'total_length': int(sum(c['length'] for c in contigs)),
+                'source': str(fasta_path),
+                'source_size': stat.st_size,
+                'source_mtime': stat.st_mtime
+            }
+            with open(os.path.join(index_dir, "index.json"), "w") as handle:
+                json.dump(meta, handle)
+
+            return meta
+        except Exception as e:
+            raise ValueError(f"Genome index build error: {str(e)}")
+
+    @staticmethod
+    def load(index_dir: str) -> Dict:
+        """Open an index read-only; arrays are memory-mapped, not read into RAM"""
+        try:
+            with open(os.path.join(index_dir, "index.json")) as handle:
+                meta = json.load(handle)
+            meta['sequence'] = np.memmap(os.path.join(index_dir, "sequence.u8"), dtype=np.uint8, mode='r')
+            meta['offsets'] = np.load(os.path.join(index_dir, "kmer_offsets.npy"), mmap_mode='r')
+            meta['positions'] = np.load(os.path.join(index_dir, "kmer_positions.npy"), mmap_mode='r')
+            meta['contig_starts'] = np.array([c['offset'] for c in meta['contigs']], dtype=np.int64)
+            meta['index_dir'] = index_dir
+            return meta
+        except Exception as e:
+            raise ValueError(f"Genome index load error: {str(e)}")
+
+    @staticmethod
+    def _seed_hits(index: Dict, codes: np.ndarray, seed_start: int, seed_length: int) -> np.ndarray:
+        """Genome positions of a seed; seeds shorter than k use a contiguous prefix range"""
+        k = index['k']
+        seed = codes[seed_start:seed_start + seed_length]
+        if np.any(seed >= 4):
+            return np.empty(0, dtype=np.int64)
+        length = min(seed_length, k)
+        prefix = int(seed[:length].astype(np.int64) @ (4 ** np.arange(length - 1, -1, -1)))
+        low = prefix << (2 * (k - length))
+        high = (prefix + 1) << (2 * (k - length))
+        hits = np.asarray(index['positions'][index['offsets'][low]:index['offsets'][high]], dtype=np.int64)
+        return hits - seed_start
+
+    @staticmethod
+    def find_sites(index: Dict, primer: str, max_mismatches: int = 2, three_prime_exact: int = 3) -> pd.DataFrame:
+        """All binding sites on both strands with ≤ max_mismatches (3'-terminal bases exact)"""
+        primer = PrimerThermodynamics.clean_sequence(primer)
+        length = len(primer)
+        k = index['k']
+        n_seeds = max_mismatches + 1
+        seed_length = min(k, length // n_seeds)
+        if seed_length < 6:
+            raise ValueError(f"Primer too short for {max_mismatches} mismatches")
+
+        sequence = index['sequence']
+        frames = []
+        for strand in ('+', '-'):
+            codes, _ = PrimerThermodynamics.encode([primer])
+            codes = codes[0]
+            if strand == '-':
+                codes = (3 - codes[::-1]).astype(np.uint8)
+
+            # Pigeonhole: with ≤ m mismatches one of m+1 disjoint seeds matches exactly
+            candidates = np.unique(np.concatenate([
+                GenomeIndex._seed_hits(index, codes, start, seed_length)
+                for start in range(0, n_seeds * seed_length, seed_length)
+            ]))
+            candidates = candidates[(candidates >= 0) & (candidates + length <= len(sequence))]
+            if len(candidates) == 0:
+                continue
+
+            windows = np.asarray(sequence[candidates[:, None] + np.arange(length)[None, :]])
+            mismatch = windows != codes[None, :]
+            n_mismatch = mismatch.sum(axis=1)
+            # Mismatches at the 3' end block extension: + strand 3' end is the right, − strand the left
+            tail = mismatch[:, -three_prime_exact:] if strand == '+' else mismatch[:, :three_prime_exact]
+            keep = (n_mismatch <= max_mismatches) & ~tail.any(axis=1) if three_prime_exact else \
+                n_mismatch <= max_mismatches
+            hits = candidates[keep]
+
+            contig_idx = np.searchsorted(index['contig_starts'], hits, side='right') - 1
+            frames.append(pd.DataFrame({
+                'strand': strand,
+                'global_start': hits,
+                'contig': np.array([c['name'] for c in index['contigs']], dtype=object)[contig_idx],
+                'start': hits - index['contig_starts'][contig_idx] + 1,
+                'end': hits - index['contig_starts'][contig_idx] + length,
+                'mismatches': n_mismatch[keep]
+            }))
+
+        if not frames:
+            return pd.DataFrame(columns=['strand', 'global_start', 'contig', 'start', 'end', 'mismatches'])
+        return pd.concat(frames, ignore_index=True)
+
+    @staticmethod
+    def in_silico_pcr(index: Dict, forward: str, reverse: str, max_mismatches: int = 2,
+                      min_size: int = 50, max_size: int = 3000, three_prime_exact: int = 3) -> Dict:
+        """Predicted amplicons: a + strand site followed by a − strand site within the size window"""
+        try:
+            sites = {
+                'F': GenomeIndex.find_sites(index, forward, max_mismatches, three_prime_exact),
+                'R': GenomeIndex.find_sites(index, reverse, max_mismatches, three_prime_exact)
+            }
+            lengths = {'F': len(PrimerThermodynamics.clean_sequence(forward)),
+                       'R': len(PrimerThermodynamics.clean_sequence(reverse))}
+
+            products = []
+            for left_name in ('F', 'R'):
+                for right_name in ('F', 'R'):
+                    left = sites[left_name][sites[left_name]['strand'] == '+'].sort_values('global_start')
+                    right = sites[right_name][sites[right_name]['strand'] == '-']
+                    if left.empty or right.empty:
+                        continue
+                    left_starts = left['global_start'].to_numpy()
+                    right_ends = right['global_start'].to_numpy() + lengths[right_name]
+
+                    # Sorted starts + binary search: all left sites within [end - max, end - min]
+                    lo = np.searchsorted(left_starts, right_ends - max_size, side='left')
+                    hi = np.searchsorted(left_starts, right_ends - min_size, side='right')
+                    n_pairs = np.maximum(hi - lo, 0)
+                    if n_pairs.sum() == 0:
+                        continue
+                    right_idx = np.repeat(np.arange(len(right)), n_pairs)
+                    left_idx = np.repeat(lo, n_pairs) + (np.arange(n_pairs.sum()) - np.repeat(np.cumsum(n_pairs) - n_pairs, n_pairs))
+
+                    l_rows = left.iloc[left_idx]
+                    r_rows = right.iloc[right_idx]
+                    same_contig = l_rows['contig'].to_numpy() == r_rows['contig'].to_numpy()
+                    products.append(pd.DataFrame({
+                        'contig': l_rows['contig'].to_numpy()[same_contig],
+                        'start': l_rows['start'].to_numpy()[same_contig],
+                        'end': r_rows['end'].to_numpy()[same_contig],
+                        'size_bp': (right_ends[right_idx] - left_starts[left_idx])[same_contig],
+                        'primers': f"{left_name}+/{right_name}-",
+                        'mismatches': (l_rows['mismatches'].to_numpy() + r_rows['mismatches'].to_numpy())[same_contig]
+                    }))
+
+            amplicons = (pd.concat(products, ignore_index=True).sort_values(['mismatches', 'size_bp'])
+                         if products else pd.DataFrame(columns=['contig', 'start', 'end', 'size_bp',
+                                                                'primers', 'mismatches']))
+            return {'forward_sites': sites['F'], 'reverse_sites': sites['R'], 'amplicons': amplicons}
+        except Exception as e:
+            raise ValueError(f"In-silico PCR error: {str(e)}")
+
+    @staticmethod
+    def _run_pair(index_dir: str, name: str, forward: str, reverse: str, max_mismatches: int,
+                  min_size: int, max_size: int) -> Dict:
+        """Worker entry point: each process maps the index itself (only the path is pickled)"""
+        index = GenomeIndex.load(index_dir)
+        result = GenomeIndex.in_silico_pcr(index, forward, reverse, max_mismatches, min_size, max_size)
+        amplicons = result['amplicons'].assign(pair=name)
+        return {
+            'pair': name,
+            'forward_sites': len(result['forward_sites']),
+            'reverse_sites': len(result['reverse_sites']),
+            'amplicons': amplicons
+        }
+
+    @staticmethod
+    def run_pairs(index_dir: str, pairs: pd.DataFrame, max_mismatches: int = 2,
+                  min_size: int = 50, max_size: int = 3000, max_workers: int = None) -> Dict:
+        """In-silico PCR for many (name, forward, reverse) primer pairs in a process pool"""
+        try:
+            import pickle
+            from concurrent.futures import ProcessPoolExecutor
+            from concurrent.futures.process import BrokenProcessPool
+            args = [(index_dir, row.name, row.forward, row.reverse, max_mismatches, min_size, max_size)
+                    for row in pairs.itertuples(index=False)]
+
+            results = None
+            if len(args) > 1:
+                try:
+                    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                        results = list(pool.map(GenomeIndex._run_pair, *zip(*args)))
+                except (BrokenProcessPool, pickle.PicklingError, OSError):
+                    results = None
+            if results is None:
+                results = [GenomeIndex._run_pair(*a) for a in args]
+
+            summary = pd.DataFrame([{
+                'pair': r['pair'],
+                'forward_sites': r['forward_sites'],
+                'reverse_sites': r['reverse_sites'],
+                'amplicons': len(r['amplicons']),
+                'specific': len(r['amplicons']) == 1
+            } for r in results])
+            amplicons = pd.concat([r['amplicons'] for r in results], ignore_index=True)
+            return {'summary': summary, 'amplicons': amplicons}
+        except Exception as e:
+            raise ValueError(f"In-silico PCR batch error: {str(e)}")
+
+class GenomeReference:
+    """Exact genome length and composition-based mass from local FASTA references"""
+
+    # Anhydrous nucleotide monophosphate masses (Da) and per-strand end correction
+    BASE_MASS = {'A': 313.21, 'C': 289.18, 'G': 329.21, 'T': 304.2}
+    STRAND_END_MASS = -61.96
+    AVOGADRO = 6.02214076e23
+
+    FASTA_SUFFIXES = ('.fasta', '.fa', '.fna', '.fas', '.ffn', '.seq')
+    COMPRESSION_SUFFIXES = ('.gz', '.bgz')
+
+    _cache: Dict[Tuple, Dict] = {}
+    _CACHE_LIMIT = 64
+
+    @staticmethod
+    def reference_name(fasta_path: str) -> str:
+        """File name without FASTA/compression suffixes ('hg38.p14.fa.gz' → 'hg38.p14')"""
+        name = os.path.basename(str(fasta_path))
+        for suffixes in (GenomeReference.COMPRESSION_SUFFIXES, GenomeReference.FASTA_SUFFIXES):
+            for suffix in suffixes:
+                if name.lower().endswith(suffix) and len(name) > len(suffix):
+                    name = name[:-len(suffix)]
+                    break
+        return name
+
+    @staticmethod
+    def _count_bases(path: str, chunk_bytes: int = 8_000_000) -> Dict:
+        """Per-contig base counts, streamed line by line (gzip-aware)"""
+        import gzip
+        opener = gzip.open if str(path).endswith('.gz') else open
+        contigs = []
+        current = None
+        buffer, buffered = [], 0
+
+        def flush():
+            nonlocal buffer, buffered
+            if buffer and current is not None:
+                counts = np.bincount(np.frombuffer(b"".join(buffer).upper(), dtype=np.uint8), minlength=256)
+                for base in "ACGT":
+                    current[base] += int(counts[ord(base)])
+                current['length'] += buffered
+            buffer, buffered = [], 0
+
+        with opener(path, 'rb') as handle:
+            for line in handle:
+                if line.startswith(b'>'):
+                    flush()
+                    header = line[1:].decode('utf-8', 'replace').strip()
+                    current = {'contig': header.split()[0] if header else "unnamed", 'length': 0,
+                               'A': 0, 'C': 0, 'G': 0, 'T': 0}
+                    contigs.append(current)
+                else:
+                    line = line.strip()
+                    buffer.append(line)
+                    buffered += len(line)
+                    if buffered >= chunk_bytes:
+                        flush()
+            flush()
+
+        if not contigs:
+            raise ValueError(f"No FASTA records found in {path}")
+        return contigs
+
+    @staticmethod
+    def summarize(fasta_path: str) -> Dict:
+        """Genome length, GC content and double-stranded molecular weight of a FASTA
+
+        Results are cached per file path and invalidated when the file's size or
+        modification time changes. Ambiguous bases (N etc.) count toward length and
+        are weighted with the mean mass of the observed bases.
+        """
+        try:
+            stat = os.stat(fasta_path)
+            key = (os.path.abspath(fasta_path), stat.st_size, stat.st_mtime)
+            cache = GenomeReference._cache
+            if key in cache:
+                return cache[key]
+
+            contigs = pd.DataFrame(GenomeReference._count_bases(fasta_path))
+            contigs['N'] = contigs['length'] - contigs[list("ACGT")].sum(axis=1)
+
+            totals = contigs[list("ACGTN")].sum()
+            called = totals[list("ACGT")].sum()
+            gc_fraction = (totals['G'] + totals['C']) / called if called else 0.0
+
+            # Each base pairs with its complement; N takes the composition-weighted mean pair mass
+            mass = GenomeReference.BASE_MASS
+            pair_mass = {'A': mass['A'] + mass['T'], 'T': mass['A'] + mass['T'],
+                         'C': mass['C'] + mass['G'], 'G': mass['C'] + mass['G']}
+            mean_pair = (sum(totals[b] * pair_mass[b] for b in "ACGT") / called) if called else 617.9
+            contigs['molecular_weight'] = (sum(contigs[b] * pair_mass[b] for b in "ACGT")
+                                           + contigs['N'] * mean_pair
+                                           + 2 * GenomeReference.STRAND_END_MASS)
+
+            total_length = int(contigs['length'].sum())
+            summary = {
+                'name': GenomeReference.reference_name(fasta_path),
+                'path': fasta_path,
+                'contigs': contigs,
+                'n_contigs': len(contigs),
+                'genome_size_bp': total_length,
+                'gc_content': float(gc_fraction * 100),
+                'n_fraction': float(totals['N'] / total_length) if total_length else 0.0,
+                'genome_molecular_weight': float(contigs['molecular_weight'].sum()),
+                'mass_per_bp': float(contigs['molecular_weight'].sum()) / total_length if total_length else 0.0
+            }
+
+            if len(cache) >= GenomeReference._CACHE_LIMIT:
+                cache.clear()
+            cache[key] = summary
+            return summary
+        except Exception as e:
+            raise ValueError(f"Genome reference error: {str(e)}")
+
+    @staticmethod
+    def batch_copy_numbers(sample_sheet: pd.DataFrame, references: Dict[str, Dict]) -> pd.DataFrame:
+        """Genome copies for every row of a sample sheet in one vectorized pass
+
+        `sample_sheet` needs a `concentration_ng_ul` column; `volume_ul` defaults to 1 µL,
+        `copies_per_genome` to 1, and `reference` may name one of `references` (the
+        first reference is used when the column is absent or blank).
+        """
+        try:
+            if 'concentration_ng_ul' not in sample_sheet.columns:
+                raise ValueError("Sample sheet needs a 'concentration_ng_ul' column")
+            if not references:
+                raise ValueError("At least one reference genome is required")
+
+            sheet = sample_sheet.copy()
+            default = next(iter(references))
+            if 'reference' not in sheet.columns:
+                sheet['reference'] = default
+            sheet['reference'] = sheet['reference'].fillna(default).astype(str).str.strip().replace('', default)
+            unknown = set(sheet['reference']) - set(references)
+            if unknown:
+                raise ValueError(f"Unknown reference(s) in sample sheet: {', '.join(sorted(unknown))}")
+            if 'volume_ul' not in sheet.columns:
+                sheet['volume_ul'] = 1.0
+
+            if 'copies_per_genome' not in sheet.columns:
+                sheet['copies_per_genome'] = 1
+
+            genome_size = sheet['reference'].map({k: v['genome_size_bp'] for k, v in references.items()})
+            mass_per_bp = sheet['reference'].map({k: v['mass_per_bp'] for k, v in references.items()})
+            result = PCRCalculators.calculate_gene_copy_number(
+                genome_size.to_numpy(dtype=float),
+                0,
+                pd.to_numeric(sheet['concentration_ng_ul'], errors='coerce').to_numpy(dtype=float),
+                pd.to_numeric(sheet['volume_ul'], errors='coerce').fillna(1.0).to_numpy(dtype=float),
+                copies_per_genome=pd.to_numeric(sheet['copies_per_genome'], errors='coerce').fillna(1).to_numpy(),
+                mass_per_bp=mass_per_bp.to_numpy(dtype=float)
+            )
+
+            sheet['genome_size_bp'] = genome_size
+            sheet['genome_molecular_weight'] = result['genome_molecular_weight']
+            sheet['total_dna_mass_ng'] = result['total_dna_mass_ng']
+            sheet['genome_copies'] = result['genome_copies']
+            sheet['gene_copies'] = result['gene_copies']
+            sheet['gene_copies_per_ul'] = result['copies_per_ul']
+            return sheet
+        except Exception as e:
+            raise ValueError(f"Batch copy number error: {str(e)}")
+
+class PCRPlatePlanner:
+    """Multi-assay, multi-plate PCR layout, master-mix and worklist planning"""
+
+    PLATE_FORMATS = {96: (8, 12), 384: (16, 24)}
+
+    # Per-reaction components (stock and final in the same unit); water makes up the rest
+    DEFAULT_COMPONENTS = pd.DataFrame({
+        'assay': ["*"] * 5,
+        'component': ["Buffer", "dNTPs", "Forward Primer", "Reverse Primer", "Polymerase"],
+        'stock': [10.0, 10.0, 10.0, 10.0, 5.0],
+        'final': [1.0, 0.2, 0.5, 0.5, 0.05],
+        'unit': ["×", "mM", "μM", "μM", "U/μL"]
+    })
+
+    @staticmethod
+    def build_layout(samples: List[str], assays: List[str], replicates=3, plate_format: int = 96,
+                     include_ntc: bool = True) -> Dict:
+        """Assign every assay × sample × replicate reaction to a plate well
+
+        Returns compact NumPy arrays (one entry per reaction). Reactions are laid
+        out assay by assay, column-wise, so each master mix goes into a contiguous
+        block of wells. `replicates` may be a single int or one value per assay.
+        """
+        try:
+            if plate_format not in PCRPlatePlanner.PLATE_FORMATS:
+                raise ValueError("Plate format must be 96 or 384")
+            if not samples or not assays:
+                raise ValueError("At least one sample and one assay are required")
+
+            n_rows, n_cols = PCRPlatePlanner.PLATE_FORMATS[plate_format]
+            sample_names = list(samples) + (["NTC"] if include_ntc else [])
+            replicates = np.broadcast_to(np.asarray(replicates, dtype=np.int64), (len(assays),))
+            if np.any(replicates < 1):
+                raise ValueError("Replicates must be at least 1")
+
+            per_assay = len(sample_names) * replicates
+            assay = np.repeat(np.arange(len(assays), dtype=np.int16), per_assay)
+            # Within an assay: sample-major, replicate-minor
+            offset = np.arange(len(assay)) - np.repeat(np.cumsum(per_assay) - per_assay, per_assay)
+            reps = replicates[assay]
+            sample = (offset // reps).astype(np.int32)
+            replicate = (offset % reps + 1).astype(np.int16)
+            if include_ntc:
+                sample[sample == len(sample_names) - 1] = -1
+
+            index = np.arange(len(assay))
+            position = index % plate_format
+            return {
+                'plate': (index // plate_format + 1).astype(np.int16),
+                'row': (position % n_rows).astype(np.int8),
+                'col': (position // n_rows).astype(np.int8),
+                'assay': assay,
+                'sample': sample,
+                'replicate': replicate,
+                'assays': list(assays),
+                'samples': list(samples),
+                'plate_format': plate_format,
+                'n_plates': int(np.ceil(len(assay) / plate_format))
+            }
+        except Exception as e:
+            raise ValueError(f"Plate layout error: {str(e)}")
+
+    @staticmethod
+    def component_matrix(assays: List[str], components: pd.DataFrame = None) -> pd.DataFrame:
+        """Per-assay stock/final table; rows with assay "*" apply to every assay unless overridden"""
+        components = (PCRPlatePlanner.DEFAULT_COMPONENTS if components is None else components).copy()
+        components['assay'] = components['assay'].fillna("*").astype(str).str.strip().replace("", "*")
+        if 'unit' not in components.columns:
+            components['unit'] = ""
+
+        defaults = components[components['assay'] == "*"]
+        overrides = components[components['assay'] != "*"]
+        unknown = set(overrides['assay']) - set(assays)
+        if unknown:
+            raise ValueError(f"Components reference unknown assay(s): {', '.join(sorted(unknown))}")
+
+        expanded = defaults.drop(columns='assay').merge(pd.DataFrame({'assay': assays}), how='cross')
+        table = pd.concat([overrides, expanded], ignore_index=True) \
+            .drop_duplicates(subset=['assay', 'component'], keep='first')
+        listed = {name: i for i, name in enumerate(dict.fromkeys(components['component']))}
+        table['listed'] = table['component'].map(listed)
+        if np.any(table['stock'] <= 0) or np.any(table['final'] < 0) or np.any(table['final'] > table['stock']):
+            raise ValueError("Each component needs 0 ≤ final ≤ stock and a positive stock")
+        return table
+
+    @staticmethod
+    def master_mixes(layout: Dict, reaction_volume_ul: float = 20.0, template_volume_ul: float = 2.0,
+                     overage_percent: float = 10.0, dead_volume_ul: float = 0.0,
+                     components: pd.DataFrame = None) -> pd.DataFrame:
+        """Per-assay master-mix recipes with overage and reservoir dead volume"""
+        try:
+            if template_volume_ul >= reaction_volume_ul:
+                raise ValueError("Template volume must be smaller than the reaction volume")
+
+            assays = layout['assays']
+            table = PCRPlatePlanner.component_matrix(assays, components)
+            reactions = np.bincount(layout['assay'], minlength=len(assays))
+            mix_per_reaction = reaction_volume_ul - template_volume_ul
+            planned = reactions * (1 + overage_percent / 100) + dead_volume_ul / mix_per_reaction
+
+            assay_index = {name: i for i, name in enumerate(assays)}
+            idx = table['assay'].map(assay_index).to_numpy()
+            table['reactions'] = reactions[idx]
+            table['planned_reactions'] = planned[idx]
+            table['per_reaction_ul'] = table['final'] / table['stock'] * reaction_volume_ul
+            table['total_ul'] = table['per_reaction_ul'] * table['planned_reactions']
+
+            additive = np.bincount(idx, weights=table['per_reaction_ul'].to_numpy(), minlength=len(assays))
+            water = mix_per_reaction - additive
+            if np.any(water < 0):
+                over = [assays[i] for i in np.flatnonzero(water < 0)]
+                raise ValueError(f"Components exceed the master-mix volume for: {', '.join(over)}")
+
+            water_rows = pd.DataFrame({
+                'assay': assays, 'component': "Water", 'stock': np.nan, 'final': np.nan, 'unit': "",
+                'reactions': reactions, 'planned_reactions': planned,
+                'per_reaction_ul': water, 'total_ul': water * planned
+            })
+            mixes = pd.concat([water_rows, table], ignore_index=True)
+            # Water first, enzyme last, everything else in the order it was listed
+            is_enzyme = mixes['component'].str.contains("polymerase|enzyme|taq|transcriptase", case=False)
+            rank = np.where(is_enzyme, np.inf, mixes['listed'].fillna(-1))
+            mixes['assay'] = pd.Categorical(mixes['assay'], categories=assays, ordered=True)
+            mixes = mixes.assign(listed=rank).sort_values(['assay', 'listed'], kind='stable').drop(columns='listed')
+            mixes['add_order'] = mixes.groupby('assay', observed=True).cumcount() + 1
+            return mixes.reset_index(drop=True)
+        except Exception as e:
+            raise ValueError(f"Master mix error: {str(e)}")
+
+    @staticmethod
+    def worklists(layout: Dict, reaction_volume_ul: float = 20.0, template_volume_ul: float = 2.0) -> pd.DataFrame:
+        """Pipetting steps for every plate, ordered for minimal tip travel
+
+        Master mix is dispensed assay by assay along a serpentine path through the
+        columns (one tip per assay); templates follow sample by sample so each
+        sample tube is opened once per plate.
+        """
+        try:
+            plate, row, col = layout['plate'], layout['row'], layout['col']
+            assay, sample = layout['assay'], layout['sample']
+            n_rows = PCRPlatePlanner.PLATE_FORMATS[layout['plate_format']][0]
+            row_letters = np.array([chr(ord('A') + i) for i in range(n_rows)])
+            wells = np.char.add(row_letters[row], (col.astype(np.int64) + 1).astype(str))
+
+            assay_names = np.array(layout['assays'], dtype=object)
+            sample_names = np.array(layout['samples'] + ["NTC"], dtype=object)
+
+            # Serpentine: odd columns run bottom-to-top
+            serpentine_row = np.where(col % 2 == 1, n_rows - 1 - row, row)
+            mix_order = np.lexsort((serpentine_row, col, assay, plate))
+            template_order = np.lexsort((serpentine_row, col, np.where(sample < 0, np.iinfo(np.int32).max, sample), plate))
+
+            def steps(order, step, source, volume):
+                return pd.DataFrame({
+                    'plate': plate[order], 'step': step, 'source': source[order],
+                    'well': wells[order], 'volume_ul': volume,
+                    'assay': assay_names[assay[order]], 'sample': sample_names[sample[order]],
+                    'replicate': layout['replicate'][order]
+                })
+
+            mix_steps = steps(mix_order, "Master Mix", np.char.add("MM: ", assay_names[assay].astype(str)),
+                              reaction_volume_ul - template_volume_ul)
+            template_steps = steps(template_order, "Template", sample_names[sample].astype(object),
+                                   template_volume_ul)
+            # NTC wells receive water instead of template
+            template_steps.loc[template_steps['sample'] == "NTC", 'source'] = "Water (NTC)"
+
+            worklist = pd.concat([mix_steps, template_steps], ignore_index=True)
+            worklist['step_rank'] = (worklist['step'] == "Template").astype(int)
+            worklist = worklist.sort_values(['plate', 'step_rank'], kind='stable').drop(columns='step_rank')
+            worklist.insert(1, 'order', worklist.groupby('plate').cumcount() + 1)
+            return worklist.reset_index(drop=True)
+        except Exception as e:
+            raise ValueError(f"Worklist error: {str(e)}")
+
+class OutlierDetector:
+    """Vectorized outlier tests applied to every group of a DataFrame in one pass"""
+
+    METHODS = {
+        "gesd": "Generalized ESD (Rosner)",
+        "grubbs": "Grubbs (single outlier)",
+        "dixon": "Dixon Q (n = 3-10)",
+        "mad": "Median absolute deviation",
+        "iqr": "Tukey IQR fences"
+    }
+
+    # Two-sided Dixon r10 critical values for n = 3..10 (Rorabacher 1991)
+    DIXON_Q = {
+        0.10: [0.941, 0.765, 0.642, 0.560, 0.507, 0.468, 0.437, 0.412],
+        0.05: [0.970, 0.829, 0.710, 0.625, 0.568, 0.526, 0.493, 0.466],
+        0.01: [0.994, 0.926, 0.821, 0.740, 0.680, 0.634, 0.598, 0.568]
+    }
+
+    @staticmethod
+    def _sorted_groups(values: np.ndarray, group_codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Group-major, value-sorted matrix padded with NaN, plus the original row of each cell"""
+        finite = np.isfinite(values)
+        rows = np.flatnonzero(finite)
+        order = rows[np.lexsort((values[rows], group_codes[rows]))]
+        codes = group_codes[order]
+        n_groups = int(group_codes.max()) + 1 if len(group_codes) else 0
+        counts = np.bincount(codes, minlength=n_groups)
+        starts = np.cumsum(counts) - counts
+        column = np.arange(len(order)) - starts[codes]
+
+        width = int(counts.max()) if len(counts) else 0
+        matrix = np.full((n_groups, width), np.nan)
+        index = np.full((n_groups, width), -1, dtype=np.int64)
+        matrix[codes, column] = values[order]
+        index[codes, column] = order
+        return matrix, index, counts
+
+    @staticmethod
+    def _gesd(matrix: np.ndarray, counts: np.ndarray, max_outliers: np.ndarray, alpha: float):
+        """Rosner's generalized ESD on sorted rows; removals move the row's low/high pointer
+
+        Running sums (of values shifted by the row median for numerical stability)
+        are updated in O(1) per removal instead of recomputing mean and SD.
+        """
+        from scipy import stats
+
+        n_groups, width = matrix.shape
+        rows = np.arange(n_groups)
+        shift = np.nanmedian(matrix, axis=1) if width else np.zeros(n_groups)
+        shifted = matrix - shift[:, None]
+        total = np.nansum(shifted, axis=1)
+        total_sq = np.nansum(shifted ** 2, axis=1)
+        lo = np.zeros(n_groups, dtype=np.int64)
+        hi = counts.astype(np.int64) - 1
+        n = counts.astype(float)
+
+        steps = int(max_outliers.max()) if len(max_outliers) else 0
+        removed = np.full((n_groups, max(steps, 1)), -1, dtype=np.int64)
+        statistic = np.full((n_groups, max(steps, 1)), np.nan)
+        exceeds = np.zeros((n_groups, max(steps, 1)), dtype=bool)
+
+        for i in range(steps):
+            active = (i < max_outliers) & (n >= 3)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean = total / n
+                sd = np.sqrt(np.maximum(total_sq - n * mean ** 2, 0) / (n - 1))
+                low_value = shifted[rows, np.clip(lo, 0, width - 1)]
+                high_value = shifted[rows, np.clip(hi, 0, width - 1)]
+                take_high = np.abs(high_value - mean) >= np.abs(low_value - mean)
+                extreme = np.where(take_high, high_value, low_value)
+                r_stat = np.abs(extreme - mean) / sd
+                p = 1 - alpha / (2 * n)
+                t = stats.t.ppf(p, n - 2)
+                critical = (n - 1) * t / np.sqrt((n - 2 + t ** 2) * n)
+
+            statistic[active, i] = r_stat[active]
+            exceeds[:, i] = active & (r_stat > critical)
+            removed[active, i] = np.where(take_high, hi, lo)[active]
+
+            total = np.where(active, total - extreme, total)
+            total_sq = np.where(active, total_sq - extreme ** 2, total_sq)
+            hi = np.where(active & take_high, hi - 1, hi)
+            lo = np.where(active & ~take_high, lo + 1, lo)
+            n = np.where(active, n - 1, n)
+
+        # Number of outliers = largest step whose statistic exceeded its critical value
+        step_index = np.arange(1, exceeds.shape[1] + 1)
+        n_outliers = np.max(np.where(exceeds, step_index, 0), axis=1)
+        return removed, statistic, n_outliers
+
+    @staticmethod
+    def _score_sorted(matrix: np.ndarray, counts: np.ndarray, method: str, alpha: float,
+                      max_outliers: int, mad_threshold: float, iqr_k: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Outlier score and flag for every cell of a group-major sorted matrix"""
+        score = np.full(matrix.shape, np.nan)
+        flagged = np.zeros(matrix.shape, dtype=bool)
+
+        if method == "mad":
+            median = np.nanmedian(matrix, axis=1, keepdims=True)
+            mad = np.nanmedian(np.abs(matrix - median), axis=1, keepdims=True)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                score = 0.6745 * (matrix - median) / mad
+            flagged = np.abs(score) > mad_threshold
+
+        elif method == "iqr":
+            q1, q3 = np.nanpercentile(matrix, [25, 75], axis=1, keepdims=True)
+            iqr = q3 - q1
+            with np.errstate(invalid='ignore', divide='ignore'):
+                score = np.where(matrix > q3, (matrix - q3) / iqr, np.where(matrix < q1, (matrix - q1) / iqr, 0.0))
+            flagged = (matrix < q1 - iqr_k * iqr) | (matrix > q3 + iqr_k * iqr)
+
+        elif method == "dixon" and matrix.shape[1] >= 3:
+            critical = np.r_[np.nan, np.nan, np.nan, OutlierDetector.DIXON_Q[alpha]]
+            rows = np.arange(matrix.shape[0])
+            last = np.maximum(counts - 1, 0)
+            applicable = (counts >= 3) & (counts <= 10)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                spread = matrix[rows, last] - matrix[:, 0]
+                q_low = (matrix[:, 1] - matrix[:, 0]) / spread
+                q_high = (matrix[rows, last] - matrix[rows, np.maximum(last - 1, 0)]) / spread
+            q_crit = critical[np.minimum(counts, 10)]
+            score[applicable, 0] = q_low[applicable]
+            score[rows[applicable], last[applicable]] = q_high[applicable]
+            flagged[applicable, 0] = q_low[applicable] > q_crit[applicable]
+            flagged[rows[applicable], last[applicable]] = q_high[applicable] > q_crit[applicable]
+
+        else:
+            if method == "grubbs":
+                limit = np.ones(len(counts), dtype=np.int64)
+            elif max_outliers is None:
+                limit = np.maximum(counts // 10, 1)
+            else:
+                limit = np.full(len(counts), int(max_outliers))
+            limit = np.minimum(limit, np.maximum(counts - 2, 0))
+            removed, statistic, n_outliers = OutlierDetector._gesd(matrix, counts, limit, alpha)
+            rows, steps = np.nonzero(removed >= 0)
+            score[rows, removed[rows, steps]] = statistic[rows, steps]
+            flagged[rows, removed[rows, steps]] = steps < n_outliers[rows]
+        return score, flagged
+
+    @staticmethod
+    def detect(data: pd.DataFrame, value_column: str, group_columns: List[str] = None, method: str = "gesd",
+               alpha: float = 0.05, max_outliers: int = None, mad_threshold: float = 3.5,
+               iqr_k: float = 1.5) -> pd.DataFrame:
+        """Flag outliers in `value_column` within each group defined by `group_columns`
+
+        Returns a copy of `data` with `outlier_score` (the method's test statistic;
+        for GESD/Grubbs only set on tested extremes) and boolean `is_outlier`.
+        `max_outliers` bounds generalized ESD per group (default: 10% of n, at least 1).
+        """
+        try:
+            if method not in OutlierDetector.METHODS:
+                raise ValueError(f"Method must be one of: {', '.join(OutlierDetector.METHODS)}")
+
+            result = data.copy()
+            values = pd.to_numeric(result[value_column], errors='coerce').to_numpy(dtype=float)
+            if group_columns:
+                group_codes = result.groupby(list(group_columns), sort=False, dropna=False).ngroup().to_numpy()
+            else:
+                group_codes = np.zeros(len(result), dtype=np.int64)
+
+            if method == "dixon" and alpha not in OutlierDetector.DIXON_Q:
+                raise ValueError("Dixon Q critical values are tabulated for alpha 0.10, 0.05 and 0.01")
+
+            # Groups are padded to a common width per bucket of similar sizes ((2^(b-1), 2^b] values),
+            # so one large group never forces thousands of small ones to its width
+            finite = np.isfinite(values)
+            counts = np.bincount(group_codes[finite], minlength=int(group_codes.max()) + 1 if len(group_codes) else 0)
+            bucket = np.ceil(np.log2(np.maximum(counts, 1))).astype(np.int64)
+            scores = np.full(len(values), np.nan)
+            flags = np.zeros(len(values), dtype=bool)
+            for size_class in np.unique(bucket[counts > 0]):
+                in_bucket = (bucket == size_class) & (counts > 0)
+                rows = np.flatnonzero(finite & in_bucket[group_codes])
+                local_codes = (np.cumsum(in_bucket) - 1)[group_codes[rows]]
+                matrix, index, bucket_counts = OutlierDetector._sorted_groups(values[rows], local_codes)
+                score, flagged = OutlierDetector._score_sorted(matrix, bucket_counts, method, alpha,
+                                                               max_outliers, mad_threshold, iqr_k)
+                valid = index >= 0
+                scores[rows[index[valid]]] = score[valid]
+                flags[rows[index[valid]]] = flagged[valid]
+
+            result['outlier_score'] = scores
+            result['is_outlier'] = flags
+            return result
+        except Exception as e:
+            raise ValueError(f"Outlier detection error: {str(e)}")
+
+class StandardCurveQC:
+    """Per-plate standard-curve fitting, replicate QC and absolute quantification"""
+
+    _cache: Dict[Tuple, Dict] = {}
+    _CACHE_LIMIT = 256
+
+    @staticmethod
+    def flag_outliers(values, groups, method: str = "grubbs", alpha: float = 0.05,
+                      mad_threshold: float = 3.5) -> np.ndarray:
+        """Boolean mask of replicate outliers within each group (see OutlierDetector)"""
+        if method not in ("grubbs", "mad"):
+            raise ValueError("Outlier method must be 'grubbs' or 'mad'")
+        frame = pd.DataFrame({'value': np.asarray(values, dtype=float), 'group': np.asarray(groups)})
+        flagged = OutlierDetector.detect(frame, 'value', ['group'], method=method, alpha=alpha,
+                                         mad_threshold=mad_threshold)
+        return flagged['is_outlier'].to_numpy(dtype=bool)
+
+    @staticmethod
+    def fit(standards: pd.DataFrame, plate_id: str = "plate", outlier_method: str = "grubbs",
+            alpha: float = 0.05, lod_detection_rate: float = 0.95, loq_max_cv: float = 35.0) -> Dict:
+        """Fit Ct = slope·log10(copies) + intercept for one plate's standards
+
+        `standards` has `ct` and `copies` columns (undetected replicates as NaN Ct).
+        Outlier replicates are removed per standard level before fitting. LOD is the
+        lowest level detected in at least `lod_detection_rate` of replicates; LOQ the
+        lowest detected level whose back-calculated copies have CV ≤ `loq_max_cv` %.
+        Fits are cached by plate ID and the content of the standards.
+        """
+        try:
+            import hashlib
+            from scipy import stats
+
+            ct = pd.to_numeric(standards['ct'], errors='coerce').to_numpy(dtype=float)
+            copies = pd.to_numeric(standards['copies'], errors='coerce').to_numpy(dtype=float)
+            if np.any(~np.isfinite(copies)) or np.any(copies <= 0):
+                raise ValueError("Standard copy numbers must be positive")
+
+            digest = hashlib.sha1(np.concatenate([ct, copies]).tobytes()).hexdigest()
+            key = (str(plate_id), digest, outlier_method, alpha, lod_detection_rate, loq_max_cv)
+            cache = StandardCurveQC._cache
+            if key in cache:
+                return cache[key]
+
+            log_copies = np.log10(copies)
+            detected = np.isfinite(ct)
+            outlier = np.zeros(len(ct), dtype=bool)
+            outlier[detected] = StandardCurveQC.flag_outliers(ct[detected], log_copies[detected],
+                                                              outlier_method, alpha)
+            used = detected & ~outlier
+
+            x, y = log_copies[used], ct[used]
+            n = len(x)
+            if n < 3 or len(np.unique(x)) < 2:
+                raise ValueError("Need at least 3 detected standards over 2 or more levels")
+
+            x_mean, y_mean = x.mean(), y.mean()
+            sxx = np.sum((x - x_mean) ** 2)
+            slope = np.sum((x - x_mean) * (y - y_mean)) / sxx
+            intercept = y_mean - slope * x_mean
+            residuals = y - (slope * x + intercept)
+            ss_tot = np.sum((y - y_mean) ** 2)
+            df = n - 2
+            residual_sd = np.sqrt(np.sum(residuals ** 2) / df) if df > 0 else 0.0
+
+            # Per-level detection and precision for LOD/LOQ
+            levels = pd.DataFrame({'log_copies': log_copies, 'detected': detected, 'used': used,
+                                   'back_calc': np.where(used, 10 ** ((ct - intercept) / slope), np.nan)})
+            level_stats = levels.groupby('log_copies').agg(
+                replicates=('detected', 'size'), detected=('detected', 'sum'), used=('used', 'sum'),
+                mean_back_calc=('back_calc', 'mean'), sd_back_calc=('back_calc', 'std')
+            ).reset_index()
+            level_stats['copies'] = 10 ** level_stats['log_copies']
+            level_stats['detection_rate'] = level_stats['detected'] / level_stats['replicates']
+            level_stats['cv_percent'] = level_stats['sd_back_calc'] / level_stats['mean_back_calc'] * 100
+
+            detectable = level_stats[level_stats['detection_rate'] >= lod_detection_rate]
+            quantifiable = detectable[detectable['cv_percent'].fillna(np.inf) <= loq_max_cv]
+
+            efficiency = (10 ** (-1 / slope) - 1) * 100
+            curve = {
+                'plate_id': str(plate_id),
+                'slope': slope,
+                'intercept': intercept,
+                'r_squared': 1 - np.sum(residuals ** 2) / ss_tot if ss_tot > 0 else 0.0,
+                'efficiency_percent': efficiency,
+                'residual_sd': residual_sd,
+                'n': n,
+                'df': df,
+                'x_mean': x_mean,
+                'y_mean': y_mean,
+                'sxx': sxx,
+                't_crit': stats.t.ppf(0.975, df) if df > 0 else np.nan,
+                'lod_copies': detectable['copies'].min() if not detectable.empty else np.nan,
+                'loq_copies': quantifiable['copies'].min() if not quantifiable.empty else np.nan,
+                'range_copies': (10 ** x.min(), 10 ** x.max()),
+                'n_outliers': int(outlier.sum()),
+                'outlier_mask': outlier,
+                'levels': level_stats,
+                'qc_pass': bool(90 <= efficiency <= 110 and (1 - np.sum(residuals ** 2) / ss_tot) >= 0.98),
+                'equation': f"Ct = {slope:.3f} * log[copies] + {intercept:.3f}"
+            }
+
+            if len(cache) >= StandardCurveQC._CACHE_LIMIT:
+                cache.clear()
+            cache[key] = curve
+            return curve
+        except Exception as e:
+            raise ValueError(f"Standard curve error: {str(e)}")
+
+    @staticmethod
+    def fit_plates(standards: pd.DataFrame, pool: bool = True, **kwargs) -> Dict[str, Dict]:
+        """Fit one curve per `plate` plus a pooled curve from all plates' standards"""
+        if 'plate' not in standards.columns:
+            standards = standards.assign(plate="plate")
+        curves = {str(plate): StandardCurveQC.fit(group, plate, **kwargs)
+                  for plate, group in standards.groupby('plate')}
+        if pool and len(curves) > 1:
+            curves['pooled'] = StandardCurveQC.fit(standards, "pooled", **kwargs)
+        return curves
+
+    @staticmethod
+    def quantify(curves: Dict[str, Dict], unknowns: pd.DataFrame, confidence: float = 0.95,
+                 fallback: str = "pooled") -> pd.DataFrame:
+        """Back-calculate copies with prediction intervals for all unknowns at once
+
+        Each unknown uses its plate's curve (or `fallback` when its plate has no
+        standards). The interval is the classical inverse-prediction interval for a
+        single new Ct on the fitted line.
+        """
+        try:
+            from scipy import stats
+
+            unknowns = unknowns.copy()
+            if 'plate' not in unknowns.columns:
+                unknowns['plate'] = next(iter(curves))
+            plate = unknowns['plate'].astype(str)
+            if fallback not in curves:
+                fallback = next(iter(curves))
+            curve_id = plate.where(plate.isin(list(curves)), fallback)
+
+            def per_row(field):
+                return curve_id.map({k: c[field] for k, c in curves.items()}).to_numpy(dtype=float)
+
+            slope, intercept, sd = per_row('slope'), per_row('intercept'), per_row('residual_sd')
+            n, sxx, y_mean = per_row('n'), per_row('sxx'), per_row('y_mean')
+            lod, loq = per_row('lod_copies'), per_row('loq_copies')
+            low = curve_id.map({k: c['range_copies'][0] for k, c in curves.items()}).to_numpy(dtype=float)
+            high = curve_id.map({k: c['range_copies'][1] for k, c in curves.items()}).to_numpy(dtype=float)
+
+            ct = pd.to_numeric(unknowns['ct'], errors='coerce').to_numpy(dtype=float)
+            log_copies = (ct - intercept) / slope
+            with np.errstate(invalid='ignore'):
+                t = stats.t.ppf(0.5 + confidence / 2, np.maximum(n - 2, 1))
+            se_log = sd / np.abs(slope) * np.sqrt(1 + 1 / n + (ct - y_mean) ** 2 / (slope ** 2 * sxx))
+
+            copies = 10 ** log_copies
+            flag = np.select(
+                [~np.isfinite(ct), copies < lod, copies < loq, (copies < low) | (copies > high)],
+                ["Undetected", "Below LOD", "Below LOQ", "Outside standard range"],
+                default="OK"
+            )
+
+            unknowns['curve'] = curve_id.to_numpy()
+            unknowns['log10_copies'] = log_copies
+            unknowns['copies'] = copies
+            unknowns['copies_lower'] = 10 ** (log_copies - t * se_log)
+            unknowns['copies_upper'] = 10 ** (log_copies + t * se_log)
+            unknowns['qc_flag'] = flag
+            return unknowns
+        except Exception as e:
+            raise ValueError(f"Absolute quantification error: {str(e)}")
+
+class DifferentialExpression:
+    """Gene-panel ΔCt statistics vectorized across genes, with FDR control"""
+
+    @staticmethod
+    def benjamini_hochberg(p_values) -> np.ndarray:
+        """Benjamini-Hochberg adjusted p-values (q-values); NaNs are ignored and kept"""
+        p = np.asarray(p_values, dtype=float)
+        q = np.full(p.shape, np.nan)
+        valid = np.flatnonzero(np.isfinite(p))
+        m = len(valid)
+        if m == 0:
+            return q
+        order = valid[np.argsort(p[valid])]
+        ranked = p[order] * m / np.arange(1, m + 1)
+        q[order] = np.minimum(np.minimum.accumulate(ranked[::-1])[::-1], 1.0)
+        return q
+
+    @staticmethod
+    def delta_ct_matrix(data: pd.DataFrame, reference_genes: List[str]) -> pd.DataFrame:
+        """Genes × samples matrix of ΔCt (target Ct minus mean reference Ct per sample)
+
+        `data` is long format with `sample`, `gene` and `ct` columns; technical
+        replicates are averaged first.
+        """
+        if not reference_genes:
+            raise ValueError("Select at least one reference gene")
+        ct = data.pivot_table(index='gene', columns='sample', values='ct', aggfunc='mean')
+        missing = set(reference_genes) - set(ct.index)
+        if missing:
+            raise ValueError(f"Reference gene(s) not in data: {', '.join(sorted(missing))}")
+        reference = ct.loc[reference_genes].mean(axis=0)
+        return ct.drop(index=reference_genes) - reference
+
+    @staticmethod
+    def test_genes(data: pd.DataFrame, reference_genes: List[str], control: str, treatment: str,
+                   method: str = "welch", alpha: float = 0.05, min_fold_change: float = 2.0) -> pd.DataFrame:
+        """Per-gene control vs treatment test on ΔCt across biological replicates
+
+        `data` needs `sample`, `group`, `gene` and `ct` columns. `method` is "welch"
+        (unequal variances), "student" (pooled variance) or "lm" (ordinary least
+        squares with group and, when a `batch` column is present, batch terms;
+        genes with missing ΔCt are left untested). All genes are solved together
+        as matrix operations; log2 fold change assumes 100% efficiency
+        (2^-ΔΔCt). Returns a volcano-ready table.
+        """
+        try:
+            from scipy import stats
+
+            delta_ct = DifferentialExpression.delta_ct_matrix(data, reference_genes)
+            sample_info = data.drop_duplicates('sample').set_index('sample').reindex(delta_ct.columns)
+            groups = sample_info['group'].astype(str)
+            Y = delta_ct.to_numpy(dtype=float)
+
+            in_control = (groups == control).to_numpy()
+            in_treatment = (groups == treatment).to_numpy()
+            if in_control.sum() < 2 or in_treatment.sum() < 2:
+                raise ValueError("Each group needs at least 2 biological replicates")
+
+            a, b = Y[:, in_control], Y[:, in_treatment]
+            n_a, n_b = np.sum(np.isfinite(a), axis=1), np.sum(np.isfinite(b), axis=1)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean_a, mean_b = np.nanmean(a, axis=1), np.nanmean(b, axis=1)
+                var_a, var_b = np.nanvar(a, axis=1, ddof=1), np.nanvar(b, axis=1, ddof=1)
+            delta_delta_ct = mean_b - mean_a
+
+            with np.errstate(invalid='ignore', divide='ignore'):
+                if method == "welch":
+                    se = np.sqrt(var_a / n_a + var_b / n_b)
+                    df = se ** 4 / ((var_a / n_a) ** 2 / (n_a - 1) + (var_b / n_b) ** 2 / (n_b - 1))
+                    estimate = delta_delta_ct
+                elif method == "student":
+                    df = n_a + n_b - 2.0
+                    pooled = ((n_a - 1) * var_a + (n_b - 1) * var_b) / df
+                    se = np.sqrt(pooled * (1 / n_a + 1 / n_b))
+                    estimate = delta_delta_ct
+                elif method == "lm":
+                    keep = in_control | in_treatment
+                    design = pd.DataFrame({'intercept': 1.0, 'treatment': in_treatment[keep].astype(float)})
+                    if 'batch' in sample_info.columns and sample_info['batch'][keep].nunique() > 1:
+                        batch = pd.get_dummies(sample_info['batch'][keep].astype(str), prefix='batch',
+                                               drop_first=True, dtype=float)
+                        design = pd.concat([design, batch.reset_index(drop=True)], axis=1)
+                    X = design.to_numpy()
+                    Yk = Y[:, keep]
+                    complete = np.all(np.isfinite(Yk), axis=1)
+                    xtx_inv = np.linalg.pinv(X.T @ X)
+                    beta = np.where(complete[:, None], np.nan_to_num(Yk) @ X @ xtx_inv, np.nan)
+                    resid = Yk - beta @ X.T
+                    df = np.full(len(Y), float(X.shape[0] - np.linalg.matrix_rank(X)))
+                    sigma2 = np.sum(resid ** 2, axis=1) / df
+                    se = np.sqrt(sigma2 * xtx_inv[1, 1])
+                    estimate = beta[:, 1]
+                else:
+                    raise ValueError("Method must be 'welch', 'student' or 'lm'")
+
+                t_stat = estimate / se
+                p_value = 2 * stats.t.sf(np.abs(t_stat), df)
+                t_crit = stats.t.ppf(1 - alpha / 2, df)
+
+            log2_fc = -estimate
+            q_value = DifferentialExpression.benjamini_hochberg(p_value)
+            significant = (q_value <= alpha) & (np.abs(log2_fc) >= np.log2(min_fold_change))
+
+            result = pd.DataFrame({
+                'gene': delta_ct.index,
+                'n_control': n_a,
+                'n_treatment': n_b,
+                'mean_dct_control': mean_a,
+                'mean_dct_treatment': mean_b,
+                'delta_delta_ct': estimate,
+                'log2_fold_change': log2_fc,
+                'fold_change': 2.0 ** log2_fc,
+                'log2_fc_lower': log2_fc - t_crit * se,
+                'log2_fc_upper': log2_fc + t_crit * se,
+                't_statistic': -t_stat,
+                'df': df,
+                'p_value': p_value,
+                'q_value': q_value,
+                'neg_log10_p': -np.log10(p_value),
+                'significant': significant,
+                'direction': np.where(~significant, "NS", np.where(log2_fc > 0, "Up", "Down"))
+            })
+            return result.sort_values('p_value', na_position='last').reset_index(drop=True)
+        except Exception as e:
+            raise ValueError(f"Differential expression error: {str(e)}")
+
+class TDigest:
+    """Mergeable, bounded-memory quantile sketch (merging t-digest with the k1 scale function)"""
+
+    def __init__(self, compression: float = 200.0):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.minimum = np.inf
+        self.maximum = -np.inf
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray):
+        """Sort centroids and fold neighbours sharing a k-scale bucket into one centroid"""
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        left_q = (np.cumsum(weights) - weights) / total
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * left_q - 1)
+        bucket = np.floor(k - k[0]).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+        merged_weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / merged_weights
+        self.weights = merged_weights
+
+    def update(self, values):
+        """Add a batch of values (NaNs ignored)"""
+        values = np.asarray(values, dtype=float)
+        values = values[np.isfinite(values)]
+        if values.size == 0:
+            return
+        self.minimum = min(self.minimum, values.min())
+        self.maximum = max(self.maximum, values.max())
+        self._compress(np.concatenate([self.means, values]),
+                       np.concatenate([self.weights, np.ones(values.size)]))
+
+    def merge(self, other: "TDigest"):
+        """Fold another digest into this one"""
+        if other.weights.size:
+            self.minimum = min(self.minimum, other.minimum)
+            self.maximum = max(self.maximum, other.maximum)
+            self._compress(np.concatenate([self.means, other.means]),
+                           np.concatenate([self.weights, other.weights]))
+
+    def quantile(self, q):
+        """Approximate quantile(s) by interpolating between centroid midpoints"""
+        q = np.asarray(q, dtype=float)
+        if self.weights.size == 0:
+            return np.full(q.shape, np.nan)
+        total = self.weights.sum()
+        centre_q = (np.cumsum(self.weights) - self.weights / 2) / total
+        return np.interp(q, np.r_[0.0, centre_q, 1.0], np.r_[self.minimum, self.means, self.maximum])
+
+
+class StreamingStatistics:
+    """Single-pass, chunked descriptive statistics for CSV/Parquet files of any size"""
+
+    @staticmethod
+    def iter_chunks(source, columns: List[str] = None, chunksize: int = 250_000):
+        """Yield DataFrame chunks from a CSV or Parquet path or file-like object"""
+        name = str(getattr(source, 'name', source)).lower()
+        if hasattr(source, 'seek'):
+            source.seek(0)
+            magic = source.read(4)
+            source.seek(0)
+            is_parquet = magic == b'PAR1'
+            compression = 'gzip' if magic[:2] == b'\x1f\x8b' else None
+        else:
+            is_parquet = name.endswith(('.parquet', '.pq'))
+            compression = 'infer'
+
+        if is_parquet:
+            try:
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise ValueError("Reading Parquet files requires the 'pyarrow' package")
+            for batch in pq.ParquetFile(source).iter_batches(batch_size=chunksize, columns=columns):
+                yield batch.to_pandas()
+        else:
+            for chunk in pd.read_csv(source, usecols=columns, chunksize=chunksize, compression=compression):
+                yield chunk
+
+    @staticmethod
+    def chunk_moments(X: np.ndarray) -> Dict[str, np.ndarray]:
+        """Count, mean, central moment sums M2-M4, min and max per column of one chunk"""
+        with np.errstate(invalid='ignore'):
+            n = np.sum(np.isfinite(X), axis=0).astype(float)
+            mean = np.nansum(X, axis=0) / np.where(n > 0, n, 1)
+            d = X - mean
+            return {
+                'n': n,
+                'mean': mean,
+                'm2': np.nansum(d ** 2, axis=0),
+                'm3': np.nansum(d ** 3, axis=0),
+                'm4': np.nansum(d ** 4, axis=0),
+                'min': np.where(n > 0, np.nanmin(np.where(np.isfinite(X), X, np.inf), axis=0), np.nan),
+                'max': np.where(n > 0, np.nanmax(np.where(np.isfinite(X), X, -np.inf), axis=0), np.nan)
+            }
+
+    @staticmethod
+    def merge_moments(a: Dict[str, np.ndarray], b: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Combine two moment summaries (Chan et al. / Pébay pairwise update)"""
+        n = a['n'] + b['n']
+        safe_n = np.where(n > 0, n, 1)
+        delta = b['mean'] - a['mean']
+        na, nb = a['n'], b['n']
+        mean = a['mean'] + delta * nb / safe_n
+        m2 = a['m2'] + b['m2'] + delta ** 2 * na * nb / safe_n
+        m3 = (a['m3'] + b['m3'] + delta ** 3 * na * nb * (na - nb) / safe_n ** 2
+              + 3 * delta * (na * b['m2'] - nb * a['m2']) / safe_n)
+        m4 = (a['m4'] + b['m4']
+              + delta ** 4 * na * nb * (na ** 2 - na * nb + nb ** 2) / safe_n ** 3
+              + 6 * delta ** 2 * (na ** 2 * b['m2'] + nb ** 2 * a['m2']) / safe_n ** 2
+              + 4 * delta * (na * b['m3'] - nb * a['m3']) / safe_n)
+        return {'n': n, 'mean': mean, 'm2': m2, 'm3': m3, 'm4': m4,
+                'min': np.fmin(a['min'], b['min']), 'max': np.fmax(a['max'], b['max'])}
+
+    @staticmethod
+    def summarize(source, columns: List[str] = None, chunksize: int = 250_000, compression: float = 200.0,
+                  quantiles: Tuple[float, ...] = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99),
+                  progress_callback=None) -> pd.DataFrame:
+        """Per-column summary of a file read once in chunks
+
+        Memory is bounded by the chunk size plus one t-digest per column, so files
+        far larger than RAM can be summarized. Quantiles are approximate (t-digest);
+        all moments are exact.
+        """
+        try:
+            from scipy import stats
+
+            names, moments, digests, rows, missing = None, None, None, 0, None
+            for chunk in StreamingStatistics.iter_chunks(source, columns, chunksize):
+                if names is None:
+                    names = list(columns or chunk.select_dtypes(include='number').columns)
+                    if not names:
+                        raise ValueError("No numeric columns found")
+                    digests = [TDigest(compression) for _ in names]
+                    missing = np.zeros(len(names))
+                # Columns typed from the first chunk; stray text later on counts as missing
+                X = chunk.reindex(columns=names).apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+                current = StreamingStatistics.chunk_moments(X)
+                moments = current if moments is None else StreamingStatistics.merge_moments(moments, current)
+                missing += len(X) - current['n']
+                for j, digest in enumerate(digests):
+                    digest.update(X[:, j])
+                rows += len(X)
+                if progress_callback:
+                    progress_callback(rows)
+
+            if names is None:
+                raise ValueError("File contains no data")
+
+            n = moments['n']
+            with np.errstate(invalid='ignore', divide='ignore'):
+                variance = moments['m2'] / (n - 1)
+                std = np.sqrt(variance)
+                sem = std / np.sqrt(n)
+                t = stats.t.ppf(0.975, np.maximum(n - 1, 1))
+                skewness = np.sqrt(n) * moments['m3'] / moments['m2'] ** 1.5
+                excess_kurtosis = n * moments['m4'] / moments['m2'] ** 2 - 3
+
+            summary = pd.DataFrame({
+                'column': names,
+                'count': n.astype(np.int64),
+                'missing': missing.astype(np.int64),
+                'mean': moments['mean'],
+                'std': std,
+                'variance': variance,
+                'sem': sem,
+                'cv_percent': std / np.abs(moments['mean']) * 100,
+                'ci95_lower': moments['mean'] - t * sem,
+                'ci95_upper': moments['mean'] + t * sem,
+                'min': moments['min'],
+                'max': moments['max'],
+                'skewness': skewness,
+                'excess_kurtosis': excess_kurtosis
+            })
+            quantile_values = np.array([digest.quantile(quantiles) for digest in digests])
+            for i, q in enumerate(quantiles):
+                label = 'median' if q == 0.5 else f"p{q * 100:g}"
+                summary[label] = quantile_values[:, i]
+            return summary
+        except Exception as e:
+            raise ValueError(f"Streaming statistics error: {str(e)}")
+
+class MethodValidation:
+    """Method-validation statistics (precision, linearity, recovery, LOD/LOQ) on long-format study data"""
+
+    @staticmethod
+    def nested_anova(data: pd.DataFrame, value_column: str, factors: List[str]) -> Tuple[pd.DataFrame, Dict]:
+        """Fully nested random-effects ANOVA with method-of-moments variance components
+
+        `factors` are listed outermost first (e.g. instrument, analyst, day); each
+        is nested in the ones before it. Unbalanced designs use the exact
+        expected-mean-square coefficients, computed from group sizes with
+        `np.bincount`, so the cost is a few passes over the rows regardless of the
+        number of groups.
+        """
+        if not factors:
+            raise ValueError("Select at least one factor")
+        frame = data[factors + [value_column]].copy()
+        frame[value_column] = pd.to_numeric(frame[value_column], errors='coerce')
+        frame = frame.dropna()
+        values = frame[value_column].to_numpy(dtype=float)
+        n_obs = len(values)
+        if n_obs < 3:
+            raise ValueError("Need at least 3 measurements")
+
+        # Group ids per level: 0 = grand mean, 1..m = factors, m+1 = individual measurements
+        ids = [np.zeros(n_obs, dtype=np.int64)]
+        ids += [frame.groupby(factors[:i + 1], sort=False).ngroup().to_numpy() for i in range(len(factors))]
+        ids.append(np.arange(n_obs))
+        counts = [np.bincount(g).astype(float) for g in ids]
+        means = [np.bincount(g, weights=values) / c for g, c in zip(ids, counts)]
+        n_groups = np.array([len(c) for c in counts])
+        if np.any(np.diff(n_groups) == 0):
+            raise ValueError("Each factor needs more than one level within its parent, and replicates are required")
+        # Index of the first measurement in every group (reversed assignment keeps the first)
+        first = []
+        for g, n in zip(ids, n_groups):
+            index = np.empty(n, dtype=np.int64)
+            index[g[::-1]] = np.arange(n_obs)[::-1]
+            first.append(index)
+
+        levels = len(ids)
+        df = np.diff(n_groups).astype(float)
+        ss = np.array([np.sum(counts[i] * (means[i] - means[i - 1][ids[i - 1][first[i]]]) ** 2)
+                       for i in range(1, levels)])
+        ms = ss / df
+
+        # E[MS_i] = Σ_j k_ij σ_j²,  k_ij = (Σ_h n_h²/n_anc_i(h) − Σ_h n_h²/n_anc_(i-1)(h)) / df_i
+        k = np.zeros((levels - 1, levels - 1))
+        for i in range(1, levels):
+            for j in range(i, levels):
+                n_sq = counts[j] ** 2
+                k[i - 1, j - 1] = (np.sum(n_sq / counts[i][ids[i][first[j]]])
+                                   - np.sum(n_sq / counts[i - 1][ids[i - 1][first[j]]])) / df[i - 1]
+        components = np.zeros(levels - 1)
+        for i in range(levels - 2, -1, -1):
+            components[i] = max((ms[i] - k[i, i + 1:] @ components[i + 1:]) / k[i, i], 0.0)
+
+        from scipy import stats
+        f_value = np.append(ms[:-1] / ms[1:], np.nan)
+        p_value = np.append(stats.f.sf(f_value[:-1], df[:-1], df[1:]), np.nan)
+        grand_mean = float(means[0][0])
+        total = components.sum()
+        table = pd.DataFrame({
+            'source': factors + ['Residual (repeatability)'],
+            'df': df,
+            'sum_sq': ss,
+            'mean_sq': ms,
+            'f_value': f_value,
+            'p_value': p_value,
+            'variance_component': components,
+            'sd': np.sqrt(components),
+            'cv_percent': np.sqrt(components) / abs(grand_mean) * 100 if grand_mean else np.nan,
+            'percent_of_total': components / total * 100 if total > 0 else 0.0
+        })
+        repeatability_sd = float(np.sqrt(components[-1]))
+        intermediate_sd = float(np.sqrt(total))
+        summary = {
+            'n': n_obs,
+            'mean': grand_mean,
+            'repeatability_sd': repeatability_sd,
+            'repeatability_cv_percent': repeatability_sd / abs(grand_mean) * 100 if grand_mean else np.nan,
+            'intermediate_precision_sd': intermediate_sd,
+            'intermediate_precision_cv_percent': intermediate_sd / abs(grand_mean) * 100 if grand_mean else np.nan,
+            # ISO 5725: 95% of differences between two results fall within 2.8 s
+            'repeatability_limit': 2.8 * repeatability_sd,
+            'intermediate_precision_limit': 2.8 * intermediate_sd
+        }
+        return table, summary
+
+    @staticmethod
+    def precision(data: pd.DataFrame, value_column: str, factors: List[str],
+                  level_column: str = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Nested-ANOVA precision per concentration level (or for the whole set)
+
+        Levels whose design cannot support the model (e.g. blanks run on a single
+        day) are listed with the reason in `note` instead of failing the study.
+        """
+        groups = data.groupby(level_column, sort=True) if level_column else [("all", data)]
+        summaries, tables = [], []
+        for level, group in groups:
+            try:
+                table, summary = MethodValidation.nested_anova(group, value_column, factors)
+            except ValueError as e:
+                summaries.append({'level': level, 'n': len(group), 'note': str(e)})
+                continue
+            summaries.append({'level': level, **summary, 'note': ""})
+            tables.append(table.assign(level=level))
+        if not tables:
+            raise ValueError(summaries[0]['note'])
+        components = pd.concat(tables, ignore_index=True)
+        return pd.DataFrame(summaries), components[['level'] + [c for c in components.columns if c != 'level']]
+
+    @staticmethod
+    def _level_moments(nominal: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Levels, counts, means and sample variances of `values` grouped by nominal level"""
+        levels, inverse = np.unique(nominal, return_inverse=True)
+        n = np.bincount(inverse).astype(float)
+        mean = np.bincount(inverse, weights=values) / n
+        ss = np.bincount(inverse, weights=(values - mean[inverse]) ** 2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            variance = np.where(n > 1, ss / (n - 1), np.nan)
+        return levels, n, mean, variance
+
+    @staticmethod
+    def linearity(nominal, measured, confidence: float = 0.95) -> Dict:
+        """Least-squares calibration line with confidence intervals and a lack-of-fit F-test"""
+        from scipy import stats
+        x = np.asarray(nominal, dtype=float)
+        y = np.asarray(measured, dtype=float)
+        keep = np.isfinite(x) & np.isfinite(y)
+        x, y = x[keep], y[keep]
+        n = len(x)
+        levels, n_level, mean_level, var_level = MethodValidation._level_moments(x, y)
+        if len(levels) < 3:
+            raise ValueError("Linearity needs at least 3 concentration levels")
+
+        x_mean, y_mean = x.mean(), y.mean()
+        sxx = np.sum((x - x_mean) ** 2)
+        slope = np.sum((x - x_mean) * (y - y_mean)) / sxx
+        intercept = y_mean - slope * x_mean
+        residual_ss = np.sum((y - intercept - slope * x) ** 2)
+        residual_df = n - 2
+        residual_sd = np.sqrt(residual_ss / residual_df) if residual_df > 0 else np.nan
+        t_crit = stats.t.ppf(0.5 + confidence / 2, residual_df) if residual_df > 0 else np.nan
+        slope_se = residual_sd / np.sqrt(sxx)
+        intercept_se = residual_sd * np.sqrt(1 / n + x_mean ** 2 / sxx)
+
+        # Lack of fit: residual SS split into pure error (replicates) and level means vs line
+        pure_error_ss = np.nansum(var_level * (n_level - 1))
+        pure_error_df = n - len(levels)
+        lack_of_fit_df = len(levels) - 2
+        if pure_error_df > 0 and pure_error_ss > 0:
+            lof_f = ((residual_ss - pure_error_ss) / lack_of_fit_df) / (pure_error_ss / pure_error_df)
+            lof_p = float(stats.f.sf(lof_f, lack_of_fit_df, pure_error_df))
+        else:
+            lof_f, lof_p = np.nan, np.nan
+
+        predicted = intercept + slope * levels
+        with np.errstate(divide='ignore', invalid='ignore'):
+            deviation = np.where(predicted != 0, (mean_level - predicted) / predicted * 100, np.nan)
+        return {
+            'slope': float(slope),
+            'intercept': float(intercept),
+            'slope_ci': (float(slope - t_crit * slope_se), float(slope + t_crit * slope_se)),
+            'intercept_ci': (float(intercept - t_crit * intercept_se), float(intercept + t_crit * intercept_se)),
+            'r_squared': float(1 - residual_ss / np.sum((y - y_mean) ** 2)),
+            'residual_sd': float(residual_sd),
+            'n': n,
+            'n_levels': len(levels),
+            'lack_of_fit_f': float(lof_f),
+            'lack_of_fit_p': lof_p,
+            'levels': pd.DataFrame({'nominal': levels, 'n': n_level.astype(int), 'mean_measured': mean_level,
+                                    'predicted': predicted, 'deviation_percent': deviation}),
+            'equation': f"y = {slope:.4f}x + {intercept:.4f}"
+        }
+
+    @staticmethod
+    def recovery(nominal, measured, confidence: float = 0.95) -> pd.DataFrame:
+        """Mean recovery per spiked level with a t-interval and a test against 100%"""
+        from scipy import stats
+        x = np.asarray(nominal, dtype=float)
+        y = np.asarray(measured, dtype=float)
+        keep = np.isfinite(x) & np.isfinite(y) & (x != 0)
+        levels, n, mean, variance = MethodValidation._level_moments(x[keep], y[keep] / x[keep] * 100)
+        sd = np.sqrt(variance)
+        se = sd / np.sqrt(n)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t_crit = stats.t.ppf(0.5 + confidence / 2, n - 1)
+            p_value = 2 * stats.t.sf(np.abs(mean - 100) / se, n - 1)
+        return pd.DataFrame({
+            'nominal': levels,
+            'n': n.astype(int),
+            'mean_recovery_percent': mean,
+            'sd_percent': sd,
+            'ci_low_percent': mean - t_crit * se,
+            'ci_high_percent': mean + t_crit * se,
+            'bias_percent': mean - 100,
+            'p_value_vs_100': p_value
+        })
+
+    @staticmethod
+    def detection_limits(nominal, measured) -> Dict:
+        """ICH Q2 LOD = 3.3σ/S and LOQ = 10σ/S
+
+        σ is the residual SD of the calibration line; when blanks (nominal 0) are
+        replicated, limits from the blank SD are also reported.
+        """
+        fit = MethodValidation.linearity(nominal, measured)
+        slope = abs(fit['slope'])
+        x = np.asarray(nominal, dtype=float)
+        y = np.asarray(measured, dtype=float)
+        blanks = y[(x == 0) & np.isfinite(y)]
+        blank_sd = float(np.std(blanks, ddof=1)) if len(blanks) > 1 else np.nan
+        return {
+            'slope': fit['slope'],
+            'residual_sd': fit['residual_sd'],
+            'lod': 3.3 * fit['residual_sd'] / slope,
+            'loq': 10 * fit['residual_sd'] / slope,
+            'n_blanks': len(blanks),
+            'blank_sd': blank_sd,
+            'lod_blank': 3.3 * blank_sd / slope,
+            'loq_blank': 10 * blank_sd / slope
+        }
+
+class HypothesisTests:
+    """Group comparisons for many features at once (one test per feature/analyte)"""
+
+    CORRECTIONS = ("bh", "holm", "bonferroni", "none")
+
+    # (groups, df, q_max) -> tabulated studentized-range log survival function
+    _cache: Dict[Tuple, Tuple[np.ndarray, np.ndarray]] = {}
+    _CACHE_LIMIT = 256
+
+    @staticmethod
+    def adjust_p(p_values, method: str = "bh") -> np.ndarray:
+        """Multiple-testing adjusted p-values; NaNs are ignored and kept"""
+        p = np.asarray(p_values, dtype=float)
+        if method == "bh":
+            return DifferentialExpression.benjamini_hochberg(p)
+        if method == "none":
+            return p.copy()
+        adjusted = np.full(p.shape, np.nan)
+        valid = np.flatnonzero(np.isfinite(p))
+        m = len(valid)
+        if method == "bonferroni":
+            adjusted[valid] = np.minimum(p[valid] * m, 1.0)
+        elif method == "holm":
+            order = valid[np.argsort(p[valid])]
+            adjusted[order] = np.minimum(np.maximum.accumulate(p[order] * (m - np.arange(m))), 1.0)
+        else:
+            raise ValueError(f"Unknown correction '{method}'")
+        return adjusted
+
+    @staticmethod
+    def group_moments(data: pd.DataFrame, feature_column: str, group_column: str,
+                      value_column: str) -> Dict:
+        """Features × groups matrices of count, mean and sample variance from one bincount pass"""
+        frame = data[[feature_column, group_column, value_column]].copy()
+        frame[value_column] = pd.to_numeric(frame[value_column], errors='coerce')
+        frame = frame.dropna()
+        feature_codes, features = pd.factorize(frame[feature_column], sort=True)
+        group_codes, groups = pd.factorize(frame[group_column].astype(str), sort=True)
+        values = frame[value_column].to_numpy(dtype=float)
+        shape = (len(features), len(groups))
+        cell = feature_codes * len(groups) + group_codes
+
+        n = np.bincount(cell, minlength=shape[0] * shape[1]).astype(float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = np.bincount(cell, weights=values, minlength=n.size) / n
+            ss = np.bincount(cell, weights=(values - mean[cell]) ** 2, minlength=n.size)
+            variance = np.where(n > 1, ss / (n - 1), np.nan)
+        return {'features': np.asarray(features), 'groups': np.asarray(groups),
+                'n': n.reshape(shape), 'mean': mean.reshape(shape), 'variance': variance.reshape(shape),
+                'frame': frame, 'feature_codes': feature_codes, 'group_codes': group_codes}
+
+    @staticmethod
+    def two_group(data: pd.DataFrame, feature_column: str, group_column: str, value_column: str,
+                  group_a: str, group_b: str, method: str = "welch", correction: str = "bh",
+                  alpha: float = 0.05) -> pd.DataFrame:
+        """Group A vs group B for every feature: "student", "welch" or "mannwhitney"
+
+        Mann-Whitney uses the tie-corrected normal approximation with continuity
+        correction, ranking all features in one grouped pass.
+        """
+        from scipy import stats
+        moments = HypothesisTests.group_moments(data, feature_column, group_column, value_column)
+        groups = list(moments['groups'])
+        if str(group_a) not in groups or str(group_b) not in groups:
+            raise ValueError("Both groups must be present in the data")
+        a, b = groups.index(str(group_a)), groups.index(str(group_b))
+        n_a, n_b = moments['n'][:, a], moments['n'][:, b]
+        mean_a, mean_b = moments['mean'][:, a], moments['mean'][:, b]
+        var_a, var_b = moments['variance'][:, a], moments['variance'][:, b]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if method in ("student", "welch"):
+                if method == "student":
+                    df = n_a + n_b - 2
+                    pooled = ((n_a - 1) * var_a + (n_b - 1) * var_b) / df
+                    se = np.sqrt(pooled * (1 / n_a + 1 / n_b))
+                else:
+                    se_a, se_b = var_a / n_a, var_b / n_b
+                    se = np.sqrt(se_a + se_b)
+                    df = (se_a + se_b) ** 2 / (se_a ** 2 / (n_a - 1) + se_b ** 2 / (n_b - 1))
+                statistic = (mean_b - mean_a) / se
+                p_value = 2 * stats.t.sf(np.abs(statistic), df)
+            elif method == "mannwhitney":
+                frame = moments['frame']
+                in_pair = np.isin(moments['group_codes'], [a, b])
+                pair = frame[in_pair]
+                codes = moments['feature_codes'][in_pair]
+                ranks = pair.groupby(feature_column, sort=False)[value_column].rank().to_numpy()
+                is_a = moments['group_codes'][in_pair] == a
+                n_feat = len(moments['features'])
+                rank_sum_a = np.bincount(codes[is_a], weights=ranks[is_a], minlength=n_feat)
+                u_a = rank_sum_a - n_a * (n_a + 1) / 2
+                ties = pair.groupby([feature_column, value_column], sort=False).size()
+                tie_term = np.bincount(pd.Index(moments['features']).get_indexer(ties.index.get_level_values(0)),
+                                       weights=ties.to_numpy(dtype=float) ** 3 - ties.to_numpy(dtype=float),
+                                       minlength=n_feat)
+                total = n_a + n_b
+                sigma = np.sqrt(n_a * n_b / 12 * ((total + 1) - tie_term / (total * (total - 1))))
+                u_max = np.maximum(u_a, n_a * n_b - u_a)
+                statistic = u_a
+                df = np.full(n_feat, np.nan)
+                p_value = np.minimum(2 * stats.norm.sf((u_max - n_a * n_b / 2 - 0.5) / sigma), 1.0)
+            else:
+                raise ValueError(f"Unknown method '{method}'")
+
+        p_value = np.where((n_a >= 2) & (n_b >= 2), p_value, np.nan)
+        p_adjusted = HypothesisTests.adjust_p(p_value, correction)
+        return pd.DataFrame({
+            'feature': moments['features'],
+            'n_a': n_a.astype(int),
+            'n_b': n_b.astype(int),
+            'mean_a': mean_a,
+            'mean_b': mean_b,
+            'difference': mean_b - mean_a,
+            'statistic': statistic,
+            'df': df,
+            'p_value': p_value,
+            'p_adjusted': p_adjusted,
+            'significant': p_adjusted <= alpha
+        })
+
+    @staticmethod
+    def anova(data: pd.DataFrame, feature_column: str, group_column: str, value_column: str,
+              correction: str = "bh", alpha: float = 0.05) -> pd.DataFrame:
+        """One-way ANOVA across all groups for every feature"""
+        from scipy import stats
+        moments = HypothesisTests.group_moments(data, feature_column, group_column, value_column)
+        n, mean, variance = moments['n'], moments['mean'], moments['variance']
+        present = n > 0
+        k = present.sum(axis=1)
+        total = n.sum(axis=1)
+        grand_mean = np.nansum(n * mean, axis=1) / total
+        ss_between = np.nansum(n * (mean - grand_mean[:, None]) ** 2, axis=1)
+        ss_within = np.nansum((n - 1) * variance, axis=1)
+        df_between, df_within = k - 1, total - k
+        with np.errstate(divide='ignore', invalid='ignore'):
+            f_value = (ss_between / df_between) / (ss_within / df_within)
+            p_value = np.where((k >= 2) & (df_within > 0), stats.f.sf(f_value, df_between, df_within), np.nan)
+            eta_squared = ss_between / (ss_between + ss_within)
+        p_adjusted = HypothesisTests.adjust_p(p_value, correction)
+        return pd.DataFrame({
+            'feature': moments['features'],
+            'n_groups': k,
+            'n': total.astype(int),
+            'f_value': f_value,
+            'df_between': df_between,
+            'df_within': df_within,
+            'eta_squared': eta_squared,
+            'p_value': p_value,
+            'p_adjusted': p_adjusted,
+            'significant': p_adjusted <= alpha
+        })
+
+    @staticmethod
+    def _studentized_range_sf(q: np.ndarray, k: int, df: float, nodes: int = 64) -> np.ndarray:
+        """Survival function of the studentized range, by Gauss-Legendre quadrature over z and s"""
+        from scipy import special, stats
+        q = np.atleast_1d(np.asarray(q, dtype=float))
+        z, z_weights = np.polynomial.legendre.leggauss(nodes)
+        z, z_weights = z * 8, z_weights * 8
+        phi = np.exp(-z ** 2 / 2) / np.sqrt(2 * np.pi) * z_weights
+        cdf_z = special.ndtr(z)
+        # s = sqrt(χ²_df / df), integrated in log s between extreme quantiles
+        lo = 0.5 * np.log(stats.chi2.ppf(1e-12, df) / df)
+        hi = 0.5 * np.log(stats.chi2.isf(1e-12, df) / df)
+        u, u_weights = np.polynomial.legendre.leggauss(nodes)
+        log_s = (hi - lo) / 2 * u + (hi + lo) / 2
+        s = np.exp(log_s)
+        log_density = (np.log(2) + df / 2 * np.log(df / 2) - special.gammaln(df / 2)
+                       + (df - 1) * log_s - df * s ** 2 / 2)
+        s_weights = u_weights * (hi - lo) / 2 * np.exp(log_density) * s
+
+        sf = np.empty(q.shape)
+        for start in range(0, len(q), 256):
+            w = q[start:start + 256, None, None] * s[None, :, None]
+            range_cdf = k * np.sum(phi * (cdf_z - special.ndtr(z - w)) ** (k - 1), axis=2)
+            sf[start:start + 256] = np.clip((1 - range_cdf) @ s_weights, 0.0, 1.0)
+        return sf
+
+    @staticmethod
+    def tukey_hsd(data: pd.DataFrame, feature_column: str, group_column: str, value_column: str,
+                  confidence: float = 0.95, correction: str = "none") -> pd.DataFrame:
+        """Tukey-Kramer pairwise comparisons for every feature
+
+        p-values are family-wise within each feature. The studentized-range
+        distribution is tabulated once per (groups, df) combination and
+        interpolated, so thousands of comparisons share a few quadratures.
+        `correction` optionally adjusts across all features as well.
+        """
+        moments = HypothesisTests.group_moments(data, feature_column, group_column, value_column)
+        n, mean, variance = moments['n'], moments['mean'], moments['variance']
+        n_groups = len(moments['groups'])
+        if n_groups < 2:
+            raise ValueError("Need at least two groups")
+        k = (n > 0).sum(axis=1)
+        df_within = n.sum(axis=1) - k
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ms_within = np.nansum((n - 1) * variance, axis=1) / df_within
+
+        first, second = np.triu_indices(n_groups, 1)
+        n1, n2 = n[:, first], n[:, second]
+        difference = mean[:, second] - mean[:, first]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            se = np.sqrt(ms_within[:, None] / 2 * (1 / n1 + 1 / n2))
+            q = np.abs(difference) / se
+        testable = (n1 > 0) & (n2 > 0) & (df_within[:, None] > 0) & np.isfinite(q)
+
+        k_pairs = np.broadcast_to(k[:, None], q.shape)
+        df_pairs = np.broadcast_to(df_within[:, None], q.shape)
+        p_value = np.full(q.shape, np.nan)
+        q_crit = np.full(q.shape, np.nan)
+        for k_value, df_value in set(zip(k_pairs[testable].tolist(), df_pairs[testable].tolist())):
+            members = testable & (k_pairs == k_value) & (df_pairs == df_value)
+            q_max = max(float(np.ceil(q[members].max())), 10.0)
+            key = (k_value, df_value, q_max)
+            if key not in HypothesisTests._cache:
+                if len(HypothesisTests._cache) >= HypothesisTests._CACHE_LIMIT:
+                    HypothesisTests._cache.clear()
+                grid = np.linspace(0.0, q_max, 256)
+                HypothesisTests._cache[key] = (grid, np.log(np.maximum(
+                    HypothesisTests._studentized_range_sf(grid, k_value, df_value), 1e-300)))
+            grid, log_sf = HypothesisTests._cache[key]
+            p_value[members] = np.exp(np.interp(q[members], grid, log_sf))
+            q_crit[members] = np.interp(np.log(1 - confidence), log_sf[::-1], grid[::-1])
+
+        half_width = q_crit * se
+        table = pd.DataFrame({
+            'feature': np.repeat(moments['features'], len(first)),
+            'group_1': np.tile(moments['groups'][first], len(n)),
+            'group_2': np.tile(moments['groups'][second], len(n)),
+            'mean_difference': difference.ravel(),
+            'ci_low': (difference - half_width).ravel(),
+            'ci_high': (difference + half_width).ravel(),
+            'q_value': q.ravel(),
+            'p_tukey': p_value.ravel()
+        })
+        table['p_adjusted'] = HypothesisTests.adjust_p(table['p_tukey'].to_numpy(), correction)
+        table['significant'] = table['p_adjusted'] <= 1 - confidence
+        return table[testable.ravel()].reset_index(drop=True)
+
+class DoseResponseFitter:
+    """4PL/5PL logistic fits (ELISA standards, dose-response) by batched Levenberg-Marquardt
+
+    y = D + (A - D) / (1 + (x / C)^B)^E, with E fixed at 1 for 4PL. A is the
+    response at zero dose, D at infinite dose, C the inflection point and B the
+    Hill slope. Many curves are fitted at once on padded (curves x points)
+    arrays; NaN marks an unused point.
+    """
+
+    MODELS = {"4PL": 4, "5PL": 5}
+
+    @staticmethod
+    def _log_dose(x: np.ndarray) -> np.ndarray:
+        """ln(dose); zero doses map far below the lowest positive dose"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_x = np.log(np.where(x > 0, x, np.nan))
+        floor = np.nanmin(log_x, axis=1, keepdims=True) - 20
+        return np.where(x > 0, log_x, np.where(np.isnan(floor), -50.0, floor))
+
+    @staticmethod
+    def evaluate(params: np.ndarray, log_x: np.ndarray, jacobian: bool = False):
+        """Model values (and analytic Jacobian, curves x points x parameters) for (curves x 5) params"""
+        a, b, log_c, d, e = (params[:, i:i + 1] for i in range(5))
+        log_u = np.clip(b * (log_x - log_c), -700, 700)
+        u = np.exp(log_u)
+        g = 1 + u
+        g_pow = np.exp(-e * np.log(g))
+        y = d + (a - d) * g_pow
+        if not jacobian:
+            return y
+        common = -(a - d) * e * g_pow * u / g
+        jac = np.stack([
+            g_pow,                                  # ∂y/∂A
+            common * (log_x - log_c),               # ∂y/∂B
+            -common * b,                            # ∂y/∂lnC
+            1 - g_pow,                              # ∂y/∂D
+            -(a - d) * g_pow * np.log(g)            # ∂y/∂E
+        ], axis=2)
+        return y, jac
+
+    @staticmethod
+    def initial_guess(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Per-curve starting values from the dose extremes, the mid-response crossing and a logit slope"""
+        used = np.isfinite(x) & np.isfinite(y)
+        x = np.where(used, x, np.nan)
+        log_x = DoseResponseFitter._log_dose(x)
+        at_min = used & (x == np.nanmin(x, axis=1, keepdims=True))
+        at_max = used & (x == np.nanmax(x, axis=1, keepdims=True))
+        a = np.nansum(np.where(at_min, y, 0), axis=1) / at_min.sum(axis=1)
+        d = np.nansum(np.where(at_max, y, 0), axis=1) / at_max.sum(axis=1)
+        span = np.where(np.abs(d - a) > 0, d - a, 1.0)
+        # Pad the plateaus slightly so every point has a finite logit
+        a0, d0 = a - 0.05 * span, d + 0.05 * span
+
+        fraction = (np.where(used, y, np.nan) - a0[:, None]) / (d0 - a0)[:, None]
+        mid = np.nanargmin(np.where(used, np.abs(fraction - 0.5), np.inf), axis=1)
+        log_c = np.take_along_axis(np.where(used, log_x, 0.0), mid[:, None], axis=1)[:, 0]
+
+        # ln(f / (1 - f)) = B (ln x − ln C) on the informative part of the curve
+        fit = used & (fraction > 0.02) & (fraction < 0.98) & (x > 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            logit = np.log(fraction / (1 - fraction))
+        lx = np.where(fit, log_x, 0.0)
+        ly = np.where(fit, logit, 0.0)
+        n = fit.sum(axis=1)
+        sxx = (lx ** 2).sum(axis=1) - lx.sum(axis=1) ** 2 / np.maximum(n, 1)
+        sxy = (lx * ly).sum(axis=1) - lx.sum(axis=1) * ly.sum(axis=1) / np.maximum(n, 1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slope = np.where((n >= 2) & (sxx > 0), sxy / sxx, 1.0)
+        slope = np.clip(np.where(np.isfinite(slope) & (slope > 0), slope, 1.0), 0.2, 10.0)
+        return np.column_stack([a0, slope, log_c, d0, np.ones(len(a))])
+
+    @staticmethod
+    def fit_batch(doses: np.ndarray, responses: np.ndarray, model: str = "4PL", max_iter: int = 200,
+                  confidence: float = 0.95) -> pd.DataFrame:
+        """Fit every row of padded dose/response matrices; returns one row of results per curve"""
+        from scipy import stats
+        x = np.atleast_2d(np.asarray(doses, dtype=float))
+        y = np.atleast_2d(np.asarray(responses, dtype=float))
+        n_params = DoseResponseFitter.MODELS[model]
+        used = np.isfinite(x) & np.isfinite(y) & (x >= 0)
+        weight = used.astype(float)
+        log_x = DoseResponseFitter._log_dose(np.where(used, x, np.nan))
+        y_obs = np.where(used, y, 0.0)
+
+        params = DoseResponseFitter.initial_guess(np.where(used, x, np.nan), np.where(used, y, np.nan))
+        free = slice(0, n_params)
+
+        def sse_of(p):
+            return np.sum(weight * (y_obs - DoseResponseFitter.evaluate(p, log_x)) ** 2, axis=1)
+
+        sse = sse_of(params)
+        damping = np.full(len(x), 1e-3)
+        active = np.isfinite(sse) & (used.sum(axis=1) > n_params)
+        iterations = np.zeros(len(x), dtype=int)
+        for _ in range(max_iter):
+            if not active.any():
+                break
+            idx = np.flatnonzero(active)
+            fitted, jac = DoseResponseFitter.evaluate(params[idx], log_x[idx], jacobian=True)
+            jac = jac[:, :, free] * weight[idx][:, :, None]
+            residual = (y_obs[idx] - fitted) * weight[idx]
+            jtj = np.einsum('npi,npj->nij', jac, jac)
+            gradient = np.einsum('npi,np->ni', jac, residual)
+            diagonal = np.einsum('nii->ni', jtj)
+            system = jtj + damping[idx][:, None, None] * np.eye(n_params) * np.maximum(diagonal, 1e-12)[:, :, None]
+            try:
+                step = np.linalg.solve(system, gradient[:, :, None])[:, :, 0]
+            except np.linalg.LinAlgError:
+                step = np.stack([np.linalg.lstsq(s, g, rcond=None)[0] for s, g in zip(system, gradient)])
+
+            trial = params[idx].copy()
+            trial[:, free] += step
+            trial_sse = np.sum(weight[idx] * (y_obs[idx] - DoseResponseFitter.evaluate(trial, log_x[idx])) ** 2, axis=1)
+            better = np.isfinite(trial_sse) & (trial_sse <= sse[idx])
+            improvement = np.where(better, sse[idx] - trial_sse, 0.0)
+
+            accepted = idx[better]
+            params[accepted] = trial[better]
+            sse[accepted] = trial_sse[better]
+            damping[idx] = np.where(better, np.maximum(damping[idx] / 10, 1e-12), damping[idx] * 10)
+            iterations[idx] += 1
+
+            converged = (better & (improvement <= 1e-10 * (sse[idx] + 1e-30))) | (damping[idx] > 1e10)
+            active[idx[converged]] = False
+
+        if n_params == 4:
+            # A negative slope is the same 4PL curve with the asymptotes swapped
+            flip = params[:, 1] < 0
+            params[flip] = params[flip][:, [3, 1, 2, 0, 4]] * np.array([1, -1, 1, 1, 1])
+        n_used = used.sum(axis=1)
+        dof = n_used - n_params
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sigma2 = sse / dof
+            _, jac = DoseResponseFitter.evaluate(params, log_x, jacobian=True)
+            jac = jac[:, :, free] * weight[:, :, None]
+            covariance = np.linalg.pinv(np.einsum('npi,npj->nij', jac, jac)) * sigma2[:, None, None]
+
+            a, b, log_c, d, e = params.T
+            # Dose at half-maximal response: C·(2^(1/E) − 1)^(1/B); equals C for 4PL
+            log_ec50 = log_c + np.log(2 ** (1 / e) - 1) / b
+            grad = np.zeros((len(x), n_params))
+            grad[:, 1] = -np.log(2 ** (1 / e) - 1) / b ** 2
+            grad[:, 2] = 1.0
+            if n_params == 5:
+                grad[:, 4] = -(2 ** (1 / e) * np.log(2) / e ** 2) / ((2 ** (1 / e) - 1) * b)
+            se_log_ec50 = np.sqrt(np.einsum('ni,nij,nj->n', grad, covariance, grad))
+            t_crit = stats.t.ppf(0.5 + confidence / 2, np.maximum(dof, 1))
+
+            y_mean = np.sum(weight * y_obs, axis=1) / n_used
+            ss_tot = np.sum(weight * (y_obs - y_mean[:, None]) ** 2, axis=1)
+            param_se = np.sqrt(np.einsum('nii->ni', covariance))
+
+        valid = (dof > 0) & np.isfinite(log_ec50) & (b > 0)
+        return pd.DataFrame({
+            'model': model,
+            'n_points': n_used,
+            'bottom_a': a,
+            'top_d': d,
+            'hill_slope': b,
+            'asymmetry': e,
+            'c': np.exp(log_c),
+            'ec50': np.exp(log_ec50),
+            'ec50_ci_low': np.exp(log_ec50 - t_crit * se_log_ec50),
+            'ec50_ci_high': np.exp(log_ec50 + t_crit * se_log_ec50),
+            'direction': np.where(d > a, 'increasing', 'decreasing'),
+            'hill_slope_se': param_se[:, 1],
+            'r_squared': np.where(ss_tot > 0, 1 - sse / ss_tot, np.nan),
+            'residual_sd': np.sqrt(sigma2),
+            'iterations': iterations,
+            'converged': valid & ~active,
+        })
+
+    @staticmethod
+    def pad_curves(data: pd.DataFrame, curve_column: str, dose_column: str,
+                   response_column: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Long-format data → (curve ids, doses, responses) padded with NaN to the longest curve"""
+        frame = data[[curve_column, dose_column, response_column]].dropna()
+        codes, curves = pd.factorize(frame[curve_column], sort=True)
+        order = np.argsort(codes, kind='stable')
+        codes = codes[order]
+        counts = np.bincount(codes, minlength=len(curves))
+        position = np.arange(len(codes)) - np.repeat(np.cumsum(counts) - counts, counts)
+        doses = np.full((len(curves), counts.max() if len(counts) else 0), np.nan)
+        responses = np.full_like(doses, np.nan)
+        doses[codes, position] = frame[dose_column].to_numpy(dtype=float)[order]
+        responses[codes, position] = frame[response_column].to_numpy(dtype=float)[order]
+        return np.asarray(curves), doses, responses
+
+    @staticmethod
+    def fit_curves(data: pd.DataFrame, curve_column: str, dose_column: str, response_column: str,
+                   model: str = "4PL", confidence: float = 0.95, batch_size: int = 500,
+                   max_workers: int = None, progress_callback=None) -> pd.DataFrame:
+        """Fit every curve in long-format data; batches go to a process pool when there are several
+
+        `progress_callback(curves_done, curves_total)` is called as batches finish.
+        """
         try:
-            moles = mass_g / mw
-            molarity = moles / volume_L
-            return molarity
+            import pickle
+            from concurrent.futures import ProcessPoolExecutor, as_completed
+            from concurrent.futures.process import BrokenProcessPool
+            if model not in DoseResponseFitter.MODELS:
+                raise ValueError(f"Unknown model '{model}'")
+            curves, doses, responses = DoseResponseFitter.pad_curves(data, curve_column, dose_column,
+                                                                     response_column)
+            if len(curves) == 0:
+                raise ValueError("No complete dose/response rows")
+
+            starts = list(range(0, len(curves), batch_size))
+            results = {}
+            if len(starts) > 1:
+                try:
+                    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                        futures = {pool.submit(DoseResponseFitter.fit_batch, doses[s:s + batch_size],
+                                               responses[s:s + batch_size], model, 200, confidence): s
+                                   for s in starts}
+                        for future in as_completed(futures):
+                            results[futures[future]] = future.result()
+                            if progress_callback:
+                                progress_callback(sum(len(r) for r in results.values()), len(curves))
+                except (BrokenProcessPool, pickle.PicklingError, OSError):
+                    # Workers unavailable: fit the batches that did not come back in-process
+                    pass
+            for s in starts:
+                if s not in results:
+                    results[s] = DoseResponseFitter.fit_batch(doses[s:s + batch_size], responses[s:s + batch_size],
+                                                              model, 200, confidence)
+                    if progress_callback:
+                        progress_callback(sum(len(r) for r in results.values()), len(curves))
+
+            fits = pd.concat([results[s] for s in starts], ignore_index=True)
+            fits.insert(0, 'curve', curves)
+            return fits
         except Exception as e:
-            raise ValueError(f"Molarity calculation error: {str(e)}")
-    
+            raise ValueError(f"Dose-response fitting error: {str(e)}")
+
     @staticmethod
-    def calculate_dilution(c1: float, v1: float, c2: float, v2: float = None) -> Dict:
-        """Calculate dilution using C1V1 = C2V2"""
-        try:
-            if v2 is None:
-                v2 = (c1 * v1) / c2
-            else:
-                c2 = (c1 * v1) / v2
-            
+    def back_calculate(fits: pd.DataFrame, unknowns: pd.DataFrame, curve_column: str = 'curve',
+                       response_column: str = 'response', dilution_column: str = None) -> pd.DataFrame:
+        """Dose for each unknown response from its curve: x = C·(((A−D)/(y−D))^(1/E) − 1)^(1/B)
+
+        Responses outside the fitted asymptotes give NaN and `in_range` False.
+        """
+        params = fits.set_index('curve')
+        missing = set(unknowns[curve_column]) - set(params.index)
+        if missing:
+            raise ValueError(f"No fitted curve for: {', '.join(map(str, sorted(missing)[:10]))}")
+        p = params.loc[unknowns[curve_column].to_numpy()]
+        a, d, b = p['bottom_a'].to_numpy(), p['top_d'].to_numpy(), p['hill_slope'].to_numpy()
+        c, e = p['c'].to_numpy(), p['asymmetry'].to_numpy()
+        y = unknowns[response_column].to_numpy(dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            inner = ((a - d) / (y - d)) ** (1 / e) - 1
+            dose = c * inner ** (1 / b)
+        in_range = np.isfinite(dose) & (dose > 0)
+        dose = np.where(in_range, dose, np.nan)
+        result = unknowns.copy()
+        result['calculated_dose'] = dose
+        result['in_range'] = in_range
+        if dilution_column:
+            result['final_concentration'] = dose * result[dilution_column].to_numpy(dtype=float)
+        return result
+
+class ChartAggregator:
+    """Server-side binning and downsampling so charts stay responsive for millions of points
+
+    Aggregates are cached by a hash of the data. Pass a persistent dict (e.g.
+    one kept in `st.session_state`) as `cache` so re-binning on a rerun starts
+    from the cached sorted array instead of the raw values.
+    """
+
+    _cache: Dict[str, Dict] = {}
+    _CACHE_LIMIT = 16
+
+    @staticmethod
+    def dataset_key(*arrays) -> str:
+        """Content hash of one or more arrays"""
+        import hashlib
+        digest = hashlib.sha1()
+        for array in arrays:
+            array = np.ascontiguousarray(array)
+            digest.update(f"{array.dtype}{array.shape}".encode())
+            digest.update(array.view(np.uint8) if array.dtype != object else str(array.tolist()).encode())
+        return digest.hexdigest()
+
+    @staticmethod
+    def _cached(cache: Dict, key: Tuple, build):
+        if cache is None:
+            cache = ChartAggregator._cache
+        if key not in cache:
+            if len(cache) >= ChartAggregator._CACHE_LIMIT:
+                cache.clear()
+            cache[key] = build()
+        return cache[key]
+
+    @staticmethod
+    def prepare(values, cache: Dict = None) -> Dict:
+        """Sorted finite values plus summary statistics, computed once per dataset"""
+        values = np.asarray(values, dtype=float)
+        key = ChartAggregator.dataset_key(values)
+
+        def build():
+            finite = np.sort(values[np.isfinite(values)])
             return {
-                'c1': c1, 'v1': v1, 'c2': c2, 'v2': v2,
-                'dilution_factor': c1/c2,
-                'volume_water': v2 - v1
+                'key': key,
+                'sorted': finite,
+                'count': len(finite),
+                'missing': len(values) - len(finite),
+                'mean': float(finite.mean()) if len(finite) else np.nan,
+                'std': float(finite.std(ddof=1)) if len(finite) > 1 else np.nan,
+                'min': float(finite[0]) if len(finite) else np.nan,
+                'max': float(finite[-1]) if len(finite) else np.nan,
+                'quartiles': np.quantile(finite, [0.25, 0.5, 0.75]) if len(finite) else np.full(3, np.nan)
             }
-        except Exception as e:
-            raise ValueError(f"Dilution calculation error: {str(e)}")
-    
+        return ChartAggregator._cached(cache, ('prepared', key), build)
+
     @staticmethod
-    def ph_calculator(concentration: float, is_acid: bool = True) -> float:
-        """Calculate pH from concentration"""
-        try:
-            if concentration <= 0:
-                raise ValueError("Concentration must be positive")
-            
-            if is_acid:
-                return -math.log10(concentration)
-            else:
-                poh = -math.log10(concentration)
-                return 14 - poh
-        except Exception as e:
-            raise ValueError(f"pH calculation error: {str(e)}")
-    
+    def histogram(prepared: Dict, bins: int = 50, value_range: Tuple[float, float] = None) -> pd.DataFrame:
+        """Histogram from a prepared dataset: O(bins · log n) via searchsorted on the sorted values"""
+        data = prepared['sorted']
+        low, high = value_range if value_range else (prepared['min'], prepared['max'])
+        if not np.isfinite(low) or not np.isfinite(high):
+            return pd.DataFrame(columns=['bin_start', 'bin_end', 'bin_center', 'count'])
+        if high <= low:
+            high = low + 1.0
+        edges = np.linspace(low, high, int(bins) + 1)
+        positions = np.searchsorted(data, edges, side='left')
+        # Last bin is closed on the right, as in np.histogram
+        positions[-1] = np.searchsorted(data, high, side='right')
+        return pd.DataFrame({'bin_start': edges[:-1], 'bin_end': edges[1:],
+                             'bin_center': (edges[:-1] + edges[1:]) / 2, 'count': np.diff(positions)})
+
     @staticmethod
-    def buffer_calculator(weak_acid_conc: float, conjugate_base_conc: float, pka: float) -> float:
-        """Henderson-Hasselbalch equation"""
-        try:
-            if weak_acid_conc <= 0 or conjugate_base_conc <= 0:
-                raise ValueError("Concentrations must be positive")
-            
-            return pka + math.log10(conjugate_base_conc / weak_acid_conc)
-        except Exception as e:
-            raise ValueError(f"Buffer calculation error: {str(e)}")
-    
+    def histogram2d(x, y, bins: int = 100, cache: Dict = None) -> pd.DataFrame:
+        """Non-empty cells of a 2-D histogram (cell centre and count) for density scatter plots"""
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        key = ('histogram2d', ChartAggregator.dataset_key(x, y), int(bins))
+
+        def build():
+            finite = np.isfinite(x) & np.isfinite(y)
+            counts, x_edges, y_edges = np.histogram2d(x[finite], y[finite], bins=int(bins))
+            ix, iy = np.nonzero(counts)
+            return pd.DataFrame({'x': (x_edges[ix] + x_edges[ix + 1]) / 2,
+                                 'y': (y_edges[iy] + y_edges[iy + 1]) / 2,
+                                 'count': counts[ix, iy].astype(int)})
+        return ChartAggregator._cached(cache, key, build)
+
     @staticmethod
-    def beers_law_calculator(absorbance: float = None, concentration: float = None, 
-                           extinction_coeff: float = None, path_length: float = 1.0) -> Dict:
-        """Beer's Law: A = ε × c × l"""
-        try:
-            if absorbance is None:
-                absorbance = extinction_coeff * concentration * path_length
-                return {'absorbance': absorbance, 'transmittance': 10**(-absorbance) * 100}
-            else:
-                concentration = absorbance / (extinction_coeff * path_length)
-                return {'concentration': concentration, 'concentration_mM': concentration * 1000,
-                       'concentration_μM': concentration * 1000000}
-        except Exception as e:
-            raise ValueError(f"Beer's Law calculation error: {str(e)}")
+    def lttb(x, y, threshold: int = 2000, cache: Dict = None) -> np.ndarray:
+        """Indices of the Largest-Triangle-Three-Buckets downsample of a line series (x sorted)"""
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        n = len(x)
+        if threshold >= n or threshold < 3:
+            return np.arange(n)
+        key = ('lttb', ChartAggregator.dataset_key(x, y), int(threshold))
+
+        def build():
+            # Interior points split into threshold-2 buckets; each keeps the point forming the
+            # largest triangle with the last kept point and the mean of the next bucket
+            bounds = (np.floor(np.arange(threshold - 1) * (n - 2) / (threshold - 2)) + 1).astype(int)
+            bounds = np.append(bounds, n)
+            selected = np.empty(threshold, dtype=np.int64)
+            selected[0], selected[-1] = 0, n - 1
+            previous = 0
+            for bucket in range(threshold - 2):
+                start, end = bounds[bucket], bounds[bucket + 1]
+                next_end = min(bounds[bucket + 2], n)
+                avg_x = x[end:next_end].mean()
+                avg_y = y[end:next_end].mean()
+                area = np.abs((x[previous] - avg_x) * (y[start:end] - y[previous])
+                              - (x[previous] - x[start:end]) * (avg_y - y[previous]))
+                previous = start + int(np.argmax(area))
+                selected[bucket + 1] = previous
+            return selected
+        return ChartAggregator._cached(cache, key, build)
+
+class MonteCarloUncertainty:
+    """GUM Supplement 1 Monte Carlo propagation through the calculator functions"""
+
+    DISTRIBUTIONS = ("Normal", "Rectangular", "Triangular", "Student-t")
+
+    # name: (function of sampled inputs, [(input, label, default value, default standard uncertainty)])
+    MODELS = {
+        "Molarity (mass / MW / volume)": (
+            lambda x: AdvancedChemistryCalculators.batch_molarity(x['mass_g'], x['mw'], x['volume_L'])['molarity'],
+            [('mass_g', "Mass (g)", 0.5844, 0.0002), ('mw', "Molecular Weight (g/mol)", 58.44, 0.002),
+             ('volume_L', "Volume (L)", 0.1, 0.00008)]
+        ),
+        "Dilution (stock volume V₁)": (
+            lambda x: AdvancedChemistryCalculators.batch_dilution(x['c1'], None, x['c2'], x['v2'])['v1'],
+            [('c1', "Stock Concentration C₁", 1.0, 0.005), ('c2', "Target Concentration C₂", 0.1, 0.0),
+             ('v2', "Final Volume V₂ (mL)", 10.0, 0.02)]
+        ),
+        "Beer's Law (concentration from A)": (
+            lambda x: AdvancedChemistryCalculators.batch_beers_law(
+                absorbance=x['absorbance'], extinction_coeff=x['epsilon'], path_length=x['path_cm'])['concentration'],
+            [('absorbance', "Absorbance", 0.5, 0.003), ('epsilon', "ε (M⁻¹cm⁻¹)", 6220.0, 60.0),
+             ('path_cm', "Path Length (cm)", 1.0, 0.005)]
+        )
+    }
 
-class PCRCalculators:
-    """Real-time PCR and Copy Number Calculators"""
-    
     @staticmethod
-    def calculate_copy_number_absolute(ct_sample: float, ct_standard: float, 
-                                    standard_copies: float, efficiency: float = 100.0) -> Dict:
-        """Calculate absolute copy number using standard curve"""
+    def sample(value: float, uncertainty: float, distribution: str, n: int, rng: np.random.Generator,
+               dof: float = 10.0) -> np.ndarray:
+        """Draws with the given mean and standard uncertainty for a GUM S1 input distribution"""
+        if uncertainty <= 0:
+            return np.full(n, float(value))
+        if distribution == "Normal":
+            return rng.normal(value, uncertainty, n)
+        if distribution == "Rectangular":
+            half_width = uncertainty * np.sqrt(3)
+            return rng.uniform(value - half_width, value + half_width, n)
+        if distribution == "Triangular":
+            half_width = uncertainty * np.sqrt(6)
+            return rng.triangular(value - half_width, value, value + half_width, n)
+        if distribution == "Student-t":
+            if dof <= 2:
+                raise ValueError("Student-t inputs need more than 2 degrees of freedom")
+            # Scaled so the standard deviation equals the stated standard uncertainty
+            return value + uncertainty * np.sqrt((dof - 2) / dof) * rng.standard_t(dof, n)
+        raise ValueError(f"Unknown distribution '{distribution}'")
+
+    @staticmethod
+    def propagate(model, inputs: Dict[str, Dict], n_draws: int = 1_000_000, coverage: float = 0.95,
+                  seed: int = None) -> Dict:
+        """Evaluate `model` once on vectors of draws for every input
+
+        `inputs` maps each input name to {'value', 'uncertainty', 'distribution'
+        and optional 'dof'}. Returns the output estimate and standard uncertainty,
+        probabilistically symmetric and shortest coverage intervals, and a
+        per-input budget with sensitivity coefficients (central finite
+        differences at the estimates, as in the GUM law of propagation) and each
+        input's share of the output variance.
+        """
         try:
-            if efficiency <= 0 or efficiency > 200:
-                raise ValueError("Efficiency must be between 0 and 200%")
-            
-            # Convert efficiency percentage to decimal
-            eff_decimal = efficiency / 100.0
-            
-            # Calculate amplification factor
-            amp_factor = 1 + eff_decimal
-            
-            # Calculate copy number
-            delta_ct = ct_sample - ct_standard
-            copy_number = standard_copies * (amp_factor ** (-delta_ct))
-            
-            # Additional calculations
-            log_copy_number = math.log10(copy_number) if copy_number > 0 else 0
-            
+            rng = np.random.default_rng(seed)
+            draws = {name: MonteCarloUncertainty.sample(spec['value'], spec['uncertainty'],
+                                                        spec.get('distribution', "Normal"), n_draws, rng,
+                                                        spec.get('dof', 10.0))
+                     for name, spec in inputs.items()}
+            y = np.asarray(model(draws), dtype=float)
+            valid = np.isfinite(y)
+            if valid.sum() < 0.99 * n_draws:
+                raise ValueError(f"{n_draws - valid.sum():,} draws gave invalid results - check the inputs")
+            y = np.sort(y[valid])
+
+            # Probabilistically symmetric and shortest coverage intervals
+            tail = (1 - coverage) / 2
+            symmetric = tuple(float(v) for v in np.quantile(y, [tail, 1 - tail]))
+            span = int(np.ceil(coverage * len(y)))
+            widths = y[span - 1:] - y[:len(y) - span + 1]
+            start = int(np.argmin(widths))
+            shortest = (float(y[start]), float(y[start + span - 1]))
+
+            estimates = {name: np.array([float(spec['value'])]) for name, spec in inputs.items()}
+            y0 = float(np.asarray(model(estimates), dtype=float)[0])
+            budget = []
+            for name, spec in inputs.items():
+                u = float(spec['uncertainty'])
+                step = u if u > 0 else max(abs(float(spec['value'])) * 1e-6, 1e-12)
+                shifted_up = {**estimates, name: estimates[name] + step}
+                shifted_down = {**estimates, name: estimates[name] - step}
+                c = (float(np.asarray(model(shifted_up))[0]) - float(np.asarray(model(shifted_down))[0])) / (2 * step)
+                budget.append({'input': name, 'value': spec['value'], 'standard_uncertainty': u,
+                               'distribution': spec.get('distribution', "Normal"),
+                               'sensitivity_coefficient': c, 'contribution': abs(c) * u})
+            budget = pd.DataFrame(budget)
+            u_lpu = float(np.sqrt(np.sum(budget['contribution'] ** 2)))
+            budget['variance_share_percent'] = (budget['contribution'] ** 2 / u_lpu ** 2 * 100) if u_lpu > 0 else 0.0
+
+            mean, std = float(y.mean()), float(y.std(ddof=1))
             return {
-                'copy_number': copy_number,
-                'log_copy_number': log_copy_number,
-                'delta_ct': delta_ct,
-                'efficiency_used': efficiency,
-                'amplification_factor': amp_factor
+                'estimate': y0,
+                'mean': mean,
+                'standard_uncertainty': std,
+                'relative_uncertainty_percent': std / abs(mean) * 100 if mean else np.nan,
+                'coverage': coverage,
+                'symmetric_interval': symmetric,
+                'shortest_interval': shortest,
+                'lpu_standard_uncertainty': u_lpu,
+                'lpu_interval': (y0 - NormalDist().inv_cdf(1 - tail) * u_lpu, y0 + NormalDist().inv_cdf(1 - tail) * u_lpu),
+                'budget': budget,
+                'histogram': np.histogram(y, bins=60),
+                'n_valid': int(valid.sum())
             }
         except Exception as e:
-            raise ValueError(f"Copy number calculation error: {str(e)}")
-    
+            raise ValueError(f"Monte Carlo uncertainty error: {str(e)}")
+
+class WestgardRules:
+    """Westgard multi-rule evaluation with O(1) carried state per control series"""
+
+    # rule: (description, is_rejection)
+    RULES = {
+        "1-2s": ("One point beyond ±2 SD (warning)", False),
+        "1-3s": ("One point beyond ±3 SD", True),
+        "2-2s": ("Two consecutive points beyond the same 2 SD limit", True),
+        "R-4s": ("Consecutive points on opposite sides, each beyond 2 SD", True),
+        "3-1s": ("Three consecutive points beyond the same 1 SD limit", True),
+        "4-1s": ("Four consecutive points beyond the same 1 SD limit", True),
+        "7-T": ("Seven points trending in one direction", True),
+        "8-x": ("Eight consecutive points on one side of the mean", True),
+        "10-x": ("Ten consecutive points on one side of the mean", True),
+        "12-x": ("Twelve consecutive points on one side of the mean", True)
+    }
+    DEFAULT_RULES = ("1-2s", "1-3s", "2-2s", "R-4s", "4-1s", "10-x")
+
+    COUNTERS = ("above_mean", "below_mean", "above_1s", "below_1s", "above_2s", "below_2s",
+                "trend_up", "trend_down")
+
     @staticmethod
-    def calculate_copy_number_relative(ct_target: float, ct_reference: float, 
-                                    ct_control_target: float, ct_control_reference: float,
-                                    efficiency_target: float = 100.0, efficiency_reference: float = 100.0) -> Dict:
-        """Calculate relative copy number using 2^(-ΔΔCt) method"""
-        try:
-            # Calculate ΔCt values
-            delta_ct_sample = ct_target - ct_reference
-            delta_ct_control = ct_control_target - ct_control_reference
-            
-            # Calculate ΔΔCt
-            delta_delta_ct = delta_ct_sample - delta_ct_control
-            
-            # Calculate relative quantity (2^(-ΔΔCt) for 100% efficiency)
-            if efficiency_target == 100.0 and efficiency_reference == 100.0:
-                relative_quantity = 2 ** (-delta_delta_ct)
+    def initial_state(mean: float, sd: float) -> Dict:
+        """Empty rolling state for a control series with established mean and SD"""
+        if sd <= 0:
+            raise ValueError("Control SD must be positive")
+        state = {'mean': float(mean), 'sd': float(sd), 'n': 0, 'last_value': None, 'last_z': None}
+        state.update({name: 0 for name in WestgardRules.COUNTERS})
+        return state
+
+    @staticmethod
+    def _runs(condition: np.ndarray, carry: int) -> np.ndarray:
+        """Length of the run of True ending at each point, continuing a carried-in run"""
+        index = np.arange(len(condition))
+        last_false = np.maximum.accumulate(np.where(condition, -1, index))
+        runs = index - last_false
+        runs[last_false == -1] += carry
+        return np.where(condition, runs, 0)
+
+    @staticmethod
+    def evaluate_series(values, state: Dict, rules=DEFAULT_RULES) -> Tuple[pd.DataFrame, Dict]:
+        """Evaluate a batch of new points against the rules, continuing from `state`
+
+        Every rule reduces to a run-length counter, so the whole batch is scored
+        with vectorized cumulative operations and only the final counters are
+        carried forward - evaluating one point or a million gives the same result
+        as replaying history.
+        """
+        values = np.asarray(values, dtype=float)
+        z = (values - state['mean']) / state['sd']
+
+        runs = {
+            'above_mean': WestgardRules._runs(z > 0, state['above_mean']),
+            'below_mean': WestgardRules._runs(z < 0, state['below_mean']),
+            'above_1s': WestgardRules._runs(z > 1, state['above_1s']),
+            'below_1s': WestgardRules._runs(z < -1, state['below_1s']),
+            'above_2s': WestgardRules._runs(z > 2, state['above_2s']),
+            'below_2s': WestgardRules._runs(z < -2, state['below_2s'])
+        }
+        previous_value = np.r_[np.nan if state['last_value'] is None else state['last_value'], values[:-1]]
+        previous_z = np.r_[np.nan if state['last_z'] is None else state['last_z'], z[:-1]]
+        runs['trend_up'] = WestgardRules._runs(values > previous_value, state['trend_up'])
+        runs['trend_down'] = WestgardRules._runs(values < previous_value, state['trend_down'])
+
+        checks = {
+            "1-2s": np.abs(z) > 2,
+            "1-3s": np.abs(z) > 3,
+            "2-2s": (runs['above_2s'] >= 2) | (runs['below_2s'] >= 2),
+            "R-4s": ((z > 2) & (previous_z < -2)) | ((z < -2) & (previous_z > 2)),
+            "3-1s": (runs['above_1s'] >= 3) | (runs['below_1s'] >= 3),
+            "4-1s": (runs['above_1s'] >= 4) | (runs['below_1s'] >= 4),
+            "7-T": (runs['trend_up'] >= 6) | (runs['trend_down'] >= 6),
+            "8-x": (runs['above_mean'] >= 8) | (runs['below_mean'] >= 8),
+            "10-x": (runs['above_mean'] >= 10) | (runs['below_mean'] >= 10),
+            "12-x": (runs['above_mean'] >= 12) | (runs['below_mean'] >= 12)
+        }
+        unknown = set(rules) - set(checks)
+        if unknown:
+            raise ValueError(f"Unknown Westgard rule(s): {', '.join(sorted(unknown))}")
+
+        rules = [rule for rule in WestgardRules.RULES if rule in rules]
+        violations = np.full(len(values), "", dtype=object)
+        reject = np.zeros(len(values), dtype=bool)
+        warn = np.zeros(len(values), dtype=bool)
+        for rule in rules:
+            hit = checks[rule]
+            violations = np.where(hit, np.where(violations == "", rule, violations + ", " + rule), violations)
+            if WestgardRules.RULES[rule][1]:
+                reject |= hit
             else:
-                # Pfaffl method for different efficiencies
-                eff_target = efficiency_target / 100.0 + 1
-                eff_reference = efficiency_reference / 100.0 + 1
-                
-                relative_quantity = ((eff_target ** (-delta_ct_sample)) / 
-                                   (eff_reference ** (-delta_ct_control)))
-            
-            # Calculate fold change
-            fold_change = relative_quantity
-            
-            return {
-                'relative_quantity': relative_quantity,
-                'fold_change': fold_change,
-                'delta_ct_sample': delta_ct_sample,
-                'delta_ct_control': delta_ct_control,
-                'delta_delta_ct': delta_delta_ct,
-                'log2_fold_change': math.log2(fold_change) if fold_change > 0 else 0
-            }
-        except Exception as e:
-            raise ValueError(f"Relative quantification error: {str(e)}")
-    
+                warn |= hit
+
+        result = pd.DataFrame({
+            'value': values,
+            'z_score': z,
+            'violations': violations,
+            'status': np.where(reject, "Reject", np.where(warn, "Warning", "In Control"))
+        })
+
+        new_state = dict(state)
+        if len(values):
+            new_state['n'] = state['n'] + len(values)
+            new_state['last_value'] = float(values[-1])
+            new_state['last_z'] = float(z[-1])
+            new_state.update({name: int(runs[name][-1]) for name in WestgardRules.COUNTERS})
+        return result, new_state
+
+
+class DriftMonitor:
+    """Tabular CUSUM and EWMA monitors for slow instrument drift, batch or online"""
+
     @staticmethod
-    def calculate_pcr_efficiency(ct_values: List[float], concentrations: List[float]) -> Dict:
-        """Calculate PCR efficiency from standard curve"""
+    def initial_state(target: float, sigma: float) -> Dict:
+        """Monitor state before any points: zero CUSUMs, EWMA at target"""
+        if sigma <= 0:
+            raise ValueError("Sigma must be positive")
+        return {'target': float(target), 'sigma': float(sigma), 'n': 0,
+                'cusum_pos': 0.0, 'cusum_neg': 0.0, 'ewma': float(target), 'alerting': False}
+
+    @staticmethod
+    def estimate_sigma(values) -> float:
+        """Short-term sigma from the average moving range (MR̄ / 1.128), robust to drift"""
+        values = np.asarray(values, dtype=float)
+        values = values[np.isfinite(values)]
+        if len(values) < 2:
+            raise ValueError("Need at least 2 points to estimate sigma")
+        return float(np.mean(np.abs(np.diff(values))) / 1.128)
+
+    @staticmethod
+    def _reflected_walk(steps: np.ndarray, start: float) -> np.ndarray:
+        """C_i = max(0, C_{i-1} + step_i) for all i at once (Lindley recursion)"""
+        walk = start + np.cumsum(steps)
+        return walk - np.minimum(np.minimum.accumulate(walk), 0)
+
+    @staticmethod
+    def evaluate(values, state: Dict, k: float = 0.5, h: float = 5.0, lam: float = 0.2,
+                 L: float = 3.0) -> Tuple[pd.DataFrame, Dict]:
+        """Run CUSUM (reference k, decision h, in sigma units) and EWMA (λ, L) over new points
+
+        Continues from `state`, so a million historical points or one new reading
+        use the same code path; only the final CUSUMs, EWMA, count and alert flag
+        are carried.
+        """
         try:
-            if len(ct_values) != len(concentrations) or len(ct_values) < 3:
-                raise ValueError("Need at least 3 matching Ct and concentration values")
-            
-            # Convert concentrations to log scale
-            log_conc = [math.log10(c) for c in concentrations]
-            
-            # Calculate linear regression (Ct = m * log[conc] + b)
-            n = len(ct_values)
-            sum_x = sum(log_conc)
-            sum_y = sum(ct_values)
-            sum_xy = sum(x * y for x, y in zip(log_conc, ct_values))
-            sum_x2 = sum(x * x for x in log_conc)
-            
-            # Slope and intercept
-            slope = (n * sum_xy - sum_x * sum_y) / (n * sum_x2 - sum_x * sum_x)
-            intercept = (sum_y - slope * sum_x) / n
-            
-            # Calculate R²
-            y_mean = sum_y / n
-            ss_tot = sum((y - y_mean) ** 2 for y in ct_values)
-            ss_res = sum((y - (slope * x + intercept)) ** 2 for x, y in zip(log_conc, ct_values))
-            r_squared = 1 - (ss_res / ss_tot) if ss_tot != 0 else 0
-            
-            # Calculate efficiency
-            efficiency = (10 ** (-1/slope) - 1) * 100
-            
-            return {
-                'efficiency_percent': efficiency,
-                'slope': slope,
-                'intercept': intercept,
-                'r_squared': r_squared,
-                'equation': f"Ct = {slope:.3f} * log[conc] + {intercept:.3f}"
-            }
+            from scipy.signal import lfilter
+
+            if not 0 < lam <= 1:
+                raise ValueError("EWMA λ must be in (0, 1]")
+            values = np.asarray(values, dtype=float)
+            target, sigma = state['target'], state['sigma']
+            z = (values - target) / sigma
+
+            cusum_pos = DriftMonitor._reflected_walk(z - k, state['cusum_pos'])
+            cusum_neg = DriftMonitor._reflected_walk(-z - k, state['cusum_neg'])
+
+            # z_i = λx_i + (1-λ)z_{i-1} as a first-order IIR filter seeded with the carried EWMA
+            ewma, _ = lfilter([lam], [1, -(1 - lam)], values, zi=[(1 - lam) * state['ewma']])
+            index = state['n'] + np.arange(1, len(values) + 1)
+            half_width = L * sigma * np.sqrt(lam / (2 - lam) * (1 - (1 - lam) ** (2 * index)))
+
+            cusum_alert = (cusum_pos > h) | (cusum_neg > h)
+            ewma_alert = np.abs(ewma - target) > half_width
+            previous_alert = np.r_[state.get('alerting', False), (cusum_alert | ewma_alert)[:-1]]
+            result = pd.DataFrame({
+                'point': index,
+                'value': values,
+                'z_score': z,
+                'cusum_pos': cusum_pos,
+                'cusum_neg': cusum_neg,
+                'ewma': ewma,
+                'ewma_lcl': target - half_width,
+                'ewma_ucl': target + half_width,
+                'cusum_alert': cusum_alert,
+                'ewma_alert': ewma_alert,
+                'alert_onset': (cusum_alert | ewma_alert) & ~previous_alert,
+                'direction': np.where(cusum_pos > h, "Upward", np.where(cusum_neg > h, "Downward",
+                                      np.where(ewma_alert, np.where(ewma > target, "Upward", "Downward"), "")))
+            })
+
+            new_state = dict(state)
+            if len(values):
+                new_state.update({'n': int(index[-1]), 'cusum_pos': float(cusum_pos[-1]),
+                                  'cusum_neg': float(cusum_neg[-1]), 'ewma': float(ewma[-1]),
+                                  'alerting': bool(cusum_alert[-1] or ewma_alert[-1])})
+            return result, new_state
         except Exception as e:
-            raise ValueError(f"Efficiency calculation error: {str(e)}")
-    
+            raise ValueError(f"Drift monitor error: {str(e)}")
+
+    @staticmethod
+    def drift_onset(result: pd.DataFrame) -> pd.DataFrame:
+        """For each CUSUM alarm, the last point where that side's CUSUM was zero (estimated change point)"""
+        alarms = []
+        for side in ('cusum_pos', 'cusum_neg'):
+            values = result[side].to_numpy()
+            points = result['point'].to_numpy()
+            zero_at = np.maximum.accumulate(np.where(values == 0, np.arange(len(values)), -1))
+            alarm = result['cusum_alert'].to_numpy() & (values > 0)
+            onsets = np.flatnonzero(alarm & ~np.r_[False, alarm[:-1]])
+            for i in onsets:
+                alarms.append({'side': "Upward" if side == 'cusum_pos' else "Downward",
+                               'alarm_point': int(points[i]),
+                               'estimated_change_point': int(points[zero_at[i] + 1]) if zero_at[i] + 1 <= i else int(points[0])})
+        return pd.DataFrame(alarms, columns=['side', 'alarm_point', 'estimated_change_point'])
+
+class QCStore:
+    """SQLite-backed QC history with the current Westgard state per analyte/level"""
+
+    DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lab_data.sqlite")
+
+    def __init__(self, path: str = None):
+        self.path = path or QCStore.DEFAULT_PATH
+        with closing(self._connect()) as conn, conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS qc_series (
+                    analyte TEXT NOT NULL,
+                    level TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    rules TEXT NOT NULL,
+                    updated TEXT NOT NULL,
+                    PRIMARY KEY (analyte, level)
+                );
+                CREATE TABLE IF NOT EXISTS qc_points (
+                    id INTEGER PRIMARY KEY,
+                    analyte TEXT NOT NULL,
+                    level TEXT NOT NULL,
+                    measured_at TEXT NOT NULL,
+                    value REAL NOT NULL,
+                    z_score REAL NOT NULL,
+                    violations TEXT NOT NULL,
+                    status TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_qc_points_series ON qc_points (analyte, level, measured_at);
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        """New connection; callers use `with closing(self._connect()) as conn, conn:` so it is committed and closed"""
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def set_target(self, analyte: str, level: str, mean: float, sd: float, rules=WestgardRules.DEFAULT_RULES):
+        """Create or reset a control series with a new target mean/SD (history is kept)"""
+        state = WestgardRules.initial_state(mean, sd)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO qc_series (analyte, level, state, rules, updated) VALUES (?, ?, ?, ?, ?)",
+                (analyte, level, json.dumps(state), json.dumps(list(rules)), datetime.now().isoformat())
+            )
+
+    def series(self) -> pd.DataFrame:
+        """Current state of every control series (one row each)"""
+        with closing(self._connect()) as conn, conn:
+            rows = conn.execute("SELECT analyte, level, state, rules, updated FROM qc_series "
+                                "ORDER BY analyte, level").fetchall()
+        records = []
+        for analyte, level, state, rules, updated in rows:
+            state = json.loads(state)
+            records.append({'analyte': analyte, 'level': level, 'mean': state['mean'], 'sd': state['sd'],
+                            'points': state['n'], 'last_value': state['last_value'],
+                            'rules': ", ".join(json.loads(rules)), 'updated': updated})
+        return pd.DataFrame(records, columns=['analyte', 'level', 'mean', 'sd', 'points', 'last_value',
+                                              'rules', 'updated'])
+
+    def add_points(self, analyte: str, level: str, values, measured_at=None) -> pd.DataFrame:
+        """Evaluate and persist new QC results for one series using only its stored state"""
+        values = np.atleast_1d(np.asarray(values, dtype=float))
+        if measured_at is None:
+            measured_at = [datetime.now().isoformat()] * len(values)
+        measured_at = [str(t) for t in np.atleast_1d(measured_at)]
+
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute("SELECT state, rules FROM qc_series WHERE analyte = ? AND level = ?",
+                               (analyte, level)).fetchone()
+            if row is None:
+                raise ValueError(f"No target set for {analyte} / {level}")
+            state, rules = json.loads(row[0]), json.loads(row[1])
+
+            result, state = WestgardRules.evaluate_series(values, state, rules)
+            result.insert(0, 'measured_at', measured_at)
+
+            conn.executemany(
+                "INSERT INTO qc_points (analyte, level, measured_at, value, z_score, violations, status) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(analyte, level, t, v, z, viol, status) for t, v, z, viol, status in
+                 result[['measured_at', 'value', 'z_score', 'violations', 'status']].itertuples(index=False)]
+            )
+            conn.execute("UPDATE qc_series SET state = ?, updated = ? WHERE analyte = ? AND level = ?",
+                         (json.dumps(state), datetime.now().isoformat(), analyte, level))
+        return result
+
+    def history(self, analyte: str, level: str, limit: int = 500) -> pd.DataFrame:
+        """Most recent points of a series, oldest first"""
+        with closing(self._connect()) as conn, conn:
+            return pd.read_sql_query(
+                "SELECT measured_at, value, z_score, violations, status FROM "
+                "(SELECT id, measured_at, value, z_score, violations, status FROM qc_points "
+                "WHERE analyte = ? AND level = ? ORDER BY measured_at DESC, id DESC LIMIT ?) "
+                "ORDER BY measured_at, id",
+                conn, params=(analyte, level, int(limit))
+            )
+
+class InventoryStore:
+    """Persistent chemical inventory in SQLite (WAL) with indexed, paginated queries and an FTS5 trigram search index"""
+
+    DEFAULT_PATH = QCStore.DEFAULT_PATH
+    COLUMNS = ['name', 'formula', 'cas_number', 'synonyms', 'supplier', 'quantity', 'unit', 'location',
+               'hazard_class', 'lot_number', 'expiry_date', 'cost', 'notes', 'added_date', 'last_updated']
+    SORTABLE = {'name': "chemicals.name COLLATE NOCASE", 'formula': "chemicals.formula",
+                'location': "chemicals.location", 'hazard_class': "chemicals.hazard_class",
+                'expiry_date': "chemicals.expiry_date = '', chemicals.expiry_date",
+                'quantity': "chemicals.quantity", 'last_updated': "chemicals.last_updated"}
+    SEARCH_COLUMNS = ['name', 'formula', 'cas_number', 'synonyms', 'supplier', 'lot_number']
+    SEARCH_HIT_LIMIT = 500
+    FUZZY_CANDIDATES = 200
+
+    def __init__(self, path: str = None):
+        self.path = path or InventoryStore.DEFAULT_PATH
+        with closing(self._connect()) as conn, conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS chemicals (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    formula TEXT NOT NULL DEFAULT '',
+                    cas_number TEXT NOT NULL DEFAULT '',
+                    synonyms TEXT NOT NULL DEFAULT '',
+                    supplier TEXT NOT NULL DEFAULT '',
+                    quantity REAL NOT NULL DEFAULT 0,
+                    unit TEXT NOT NULL DEFAULT '',
+                    location TEXT NOT NULL DEFAULT '',
+                    hazard_class TEXT NOT NULL DEFAULT 'Non-hazardous',
+                    lot_number TEXT NOT NULL DEFAULT '',
+                    expiry_date TEXT NOT NULL DEFAULT '',
+                    cost REAL NOT NULL DEFAULT 0,
+                    notes TEXT NOT NULL DEFAULT '',
+                    added_date TEXT NOT NULL,
+                    last_updated TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_chemicals_name ON chemicals (name COLLATE NOCASE);
+                CREATE INDEX IF NOT EXISTS idx_chemicals_formula ON chemicals (formula);
+                CREATE INDEX IF NOT EXISTS idx_chemicals_hazard ON chemicals (hazard_class, name COLLATE NOCASE);
+                CREATE INDEX IF NOT EXISTS idx_chemicals_location ON chemicals (location, name COLLATE NOCASE);
+                CREATE INDEX IF NOT EXISTS idx_chemicals_expiry ON chemicals (expiry_date);
+            """)
+            if 'synonyms' not in [row[1] for row in conn.execute("PRAGMA table_info(chemicals)")]:
+                conn.execute("ALTER TABLE chemicals ADD COLUMN synonyms TEXT NOT NULL DEFAULT ''")
+            self.fts = self._create_search_index(conn)
+
     @staticmethod
-    def calculate_gene_copy_number(genome_size_bp: int, target_gene_length_bp: int, 
-                                 dna_concentration_ng_ul: float, volume_ul: float) -> Dict:
-        """Calculate gene copy number from DNA concentration"""
+    def _create_search_index(conn: sqlite3.Connection) -> bool:
+        """External-content FTS5 trigram index kept in sync by triggers; False if this SQLite lacks FTS5/trigram"""
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'chemicals_fts'").fetchone():
+            return True
+        columns = ", ".join(InventoryStore.SEARCH_COLUMNS)
+        new_values = ", ".join(f"new.{c}" for c in InventoryStore.SEARCH_COLUMNS)
+        old_values = ", ".join(f"old.{c}" for c in InventoryStore.SEARCH_COLUMNS)
         try:
-            # Average molecular weight of a nucleotide pair
-            avg_bp_weight = 650  # Daltons
-            
-            # Calculate genome molecular weight
-            genome_mw = genome_size_bp * avg_bp_weight
-            
-            # Convert ng to g
-            dna_mass_g = (dna_concentration_ng_ul * volume_ul) / 1e9
-            
-            # Calculate moles of genome
-            avogadro = 6.022e23
-            genome_moles = dna_mass_g / genome_mw
-            
-            # Calculate number of genomes
-            genome_copies = genome_moles * avogadro
-            
-            # If target gene length is provided, calculate specific gene copies
-            gene_copies_per_genome = 1  # Assuming single copy gene
-            total_gene_copies = genome_copies * gene_copies_per_genome
-            
-            return {
-                'total_dna_mass_ng': dna_concentration_ng_ul * volume_ul,
-                'genome_molecular_weight': genome_mw,
-                'genome_copies': genome_copies,
-                'gene_copies': total_gene_copies,
-                'copies_per_ul': total_gene_copies / volume_ul if volume_ul > 0 else 0
-            }
-        except Exception as e:
-            raise ValueError(f"Gene copy number calculation error: {str(e)}")
+            conn.executescript(f"""
+                CREATE VIRTUAL TABLE chemicals_fts USING fts5(
+                    {columns}, content='chemicals', content_rowid='id', tokenize='trigram'
+                );
+                CREATE TRIGGER chemicals_fts_insert AFTER INSERT ON chemicals BEGIN
+                    INSERT INTO chemicals_fts (rowid, {columns}) VALUES (new.id, {new_values});
+                END;
+                CREATE TRIGGER chemicals_fts_delete AFTER DELETE ON chemicals BEGIN
+                    INSERT INTO chemicals_fts (chemicals_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+                END;
+                CREATE TRIGGER chemicals_fts_update AFTER UPDATE ON chemicals BEGIN
+                    INSERT INTO chemicals_fts (chemicals_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+                    INSERT INTO chemicals_fts (rowid, {columns}) VALUES (new.id, {new_values});
+                END;
+                INSERT INTO chemicals_fts (chemicals_fts) VALUES ('rebuild');
+            """)
+        except sqlite3.OperationalError:
+            return False
+        return True
+
+    def _connect(self) -> sqlite3.Connection:
+        """New connection; callers use `with closing(self._connect()) as conn, conn:` so it is committed and closed"""
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @staticmethod
+    def _record(item: Dict) -> Tuple:
+        """Row tuple in COLUMNS order with defaults and timestamps filled in"""
+        now = datetime.now()
+        values = {
+            'formula': "", 'cas_number': "", 'synonyms': "", 'supplier': "", 'quantity': 0.0, 'unit': "",
+            'location': "", 'hazard_class': "Non-hazardous", 'lot_number': "", 'expiry_date': "", 'cost': 0.0,
+            'notes': "",
+            'added_date': now.strftime("%Y-%m-%d"), 'last_updated': now.strftime("%Y-%m-%d %H:%M")
+        }
+        values.update({k: v for k, v in item.items() if k in InventoryStore.COLUMNS and not pd.isna(v)})
+        if not str(values.get('name', "")).strip():
+            raise ValueError("Chemical name is required")
+        values['expiry_date'] = str(values['expiry_date'])[:10]
+        return tuple(float(values[c]) if c in ('quantity', 'cost') else str(values[c]).strip()
+                     for c in InventoryStore.COLUMNS)
+
+    def add(self, item: Dict) -> int:
+        """Insert one chemical; returns its id"""
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                f"INSERT INTO chemicals ({', '.join(InventoryStore.COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(InventoryStore.COLUMNS))})",
+                InventoryStore._record(item)
+            )
+            return cursor.lastrowid
+
+    def add_many(self, items) -> int:
+        """Bulk insert from a DataFrame or list of dicts in one transaction; returns the row count"""
+        records = items.to_dict('records') if isinstance(items, pd.DataFrame) else list(items)
+        rows = [InventoryStore._record(item) for item in records]
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                f"INSERT INTO chemicals ({', '.join(InventoryStore.COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(InventoryStore.COLUMNS))})",
+                rows
+            )
+        return len(rows)
+
+    def update(self, item_id: int, changes: Dict):
+        """Change selected fields of one chemical"""
+        changes = {k: v for k, v in changes.items() if k in InventoryStore.COLUMNS and k != 'added_date'}
+        changes['last_updated'] = datetime.now().strftime("%Y-%m-%d %H:%M")
+        assignments = ", ".join(f"{column} = ?" for column in changes)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(f"UPDATE chemicals SET {assignments} WHERE id = ?", (*changes.values(), int(item_id)))
+
+    def delete(self, item_ids: List[int]):
+        with closing(self._connect()) as conn, conn:
+            conn.executemany("DELETE FROM chemicals WHERE id = ?", [(int(i),) for i in item_ids])
+
+    def clear(self):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM chemicals")
+            if self.fts:
+                conn.execute("INSERT INTO chemicals_fts (chemicals_fts) VALUES ('rebuild')")
+
+    @staticmethod
+    def _phrase(text: str) -> str:
+        return '"' + text.replace('"', '""') + '"'
+
+    @staticmethod
+    def _match_expression(search: str) -> str:
+        """FTS5 query requiring every search term (3+ characters) as a case-insensitive substring"""
+        return " AND ".join(InventoryStore._phrase(term) for term in search.split() if len(term) >= 3)
+
+    @staticmethod
+    def _fuzzy_expression(search: str) -> str:
+        """FTS5 query tolerating one typo per term.
+
+        A term with one substituted, missing, extra or transposed character still has the text either side of
+        the typo as exact substrings of the intended word, so each term becomes an OR over those fragment pairs
+        (fragments shorter than a trigram are dropped)."""
+        terms = []
+        for term in search.lower().split():
+            if len(term) < 4:
+                if len(term) == 3:
+                    terms.append(InventoryStore._phrase(term))
+                continue
+            alternatives = set()
+            for i in range(len(term)):
+                for head, tail in ((term[:i], term[i:]), (term[:i], term[i + 1:]), (term[:i], term[i + 2:])):
+                    fragments = tuple(f for f in (head, tail) if len(f) >= 3)
+                    if fragments:
+                        alternatives.add(fragments)
+            terms.append("(" + " OR ".join(" AND ".join(InventoryStore._phrase(f) for f in fragments)
+                                           for fragments in sorted(alternatives)) + ")")
+        return " AND ".join(terms)
+
+    def _where(self, search: str = "", hazard_class: str = None, location: str = None,
+               expiring_before: str = None) -> Tuple[List[str], List]:
+        """Parameterized WHERE clauses for the inventory filters (search terms covered by the index excluded)"""
+        clauses, params = [], []
+        # Terms of 3+ characters go through the trigram index; shorter ones (e.g. "Na") fall back to LIKE
+        for term in search.split():
+            if self.fts and len(term) >= 3:
+                continue
+            pattern = "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            clauses.append("(" + " OR ".join(f"chemicals.{c} LIKE ? ESCAPE '\\'"
+                                             for c in InventoryStore.SEARCH_COLUMNS) + ")")
+            params += [pattern] * len(InventoryStore.SEARCH_COLUMNS)
+        if hazard_class:
+            clauses.append("chemicals.hazard_class = ?")
+            params.append(hazard_class)
+        if location:
+            clauses.append("chemicals.location = ?")
+            params.append(location)
+        if expiring_before:
+            clauses.append("chemicals.expiry_date != '' AND chemicals.expiry_date <= ?")
+            params.append(str(expiring_before))
+        return clauses, params
+
+    def _source(self, filters: Dict, match: str = None, max_hits: int = None) -> Tuple[str, List]:
+        """FROM clause for the filters.
+
+        Without max_hits every match is selected (the index search becomes an id IN (...) constraint), so
+        counts and column sorts cover all of them. With max_hits a search yields at most that many rows: names
+        starting with the query first (from the name index), then the remaining matches streamed from the
+        trigram index in id order, which bounds the cost of relevance ranking however common the terms are."""
+        search = " ".join(filters.get('search', "").lower().split())
+        clauses, params = self._where(**filters)
+        if match is None:
+            match = self._match_expression(search) if self.fts else ""
+        if max_hits is None or not (match or search):
+            if match:
+                clauses = ["chemicals.id IN (SELECT rowid FROM chemicals_fts WHERE chemicals_fts MATCH ?)"] + clauses
+                params = [match, *params]
+            return "chemicals" + (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+        max_hits = int(max_hits)
+        members, hit_params = [], []
+        if search:
+            prefix = ["chemicals.name COLLATE NOCASE >= ?", "chemicals.name COLLATE NOCASE < ?"]
+            members.append(f"SELECT chemicals.id AS hit_id FROM chemicals WHERE {' AND '.join(prefix + clauses)} "
+                           f"LIMIT ?")
+            hit_params += [search, search[:-1] + chr(ord(search[-1]) + 1), *params, max_hits]
+        if match:
+            # CROSS JOIN keeps the index driving the join instead of probing it once per filtered row
+            members.append("SELECT chemicals_fts.rowid AS hit_id FROM chemicals_fts CROSS JOIN chemicals "
+                           f"ON chemicals.id = chemicals_fts.rowid "
+                           f"WHERE {' AND '.join(['chemicals_fts MATCH ?'] + clauses)} LIMIT ?")
+            hit_params += [match, *params, max_hits]
+        else:
+            members.append(f"SELECT chemicals.id AS hit_id FROM chemicals WHERE {' AND '.join(clauses)} LIMIT ?")
+            hit_params += [*params, max_hits]
+        hits = " UNION ALL ".join(f"SELECT hit_id FROM ({member})" for member in members)
+        return (f"(SELECT DISTINCT hit_id FROM ({hits}) LIMIT ?) AS hits JOIN chemicals ON chemicals.id = hits.hit_id",
+                [*hit_params, max_hits])
+
+    def count(self, **filters) -> int:
+        """Number of matching chemicals"""
+        source, params = self._source(filters)
+        with closing(self._connect()) as conn, conn:
+            return conn.execute(f"SELECT COUNT(*) FROM {source}", params).fetchone()[0]
+
+    def page(self, offset: int = 0, limit: int = 50, order_by: str = "name", **filters) -> pd.DataFrame:
+        """One page of matching chemicals; filtering, ordering and paging all happen in SQL.
+
+        order_by='relevance' ranks the best SEARCH_HIT_LIMIT search matches (falls back to name without a
+        search); column sorts order every match."""
+        search = filters.get('search', "")
+        if order_by == 'relevance' and search.strip():
+            source, params = self._source(filters, max_hits=InventoryStore.SEARCH_HIT_LIMIT)
+            order, order_params = InventoryStore._relevance(search)
+        else:
+            source, params = self._source(filters)
+            order = InventoryStore.SORTABLE.get(order_by, InventoryStore.SORTABLE['name'])
+            order_params = []
+        with closing(self._connect()) as conn, conn:
+            return pd.read_sql_query(
+                f"SELECT chemicals.id, {', '.join('chemicals.' + c for c in InventoryStore.COLUMNS)} "
+                f"FROM {source} ORDER BY {order}, chemicals.id LIMIT ? OFFSET ?",
+                conn, params=(*params, *order_params, int(limit), int(offset))
+            )
+
+    @staticmethod
+    def _relevance(search: str) -> Tuple[str, List]:
+        """ORDER BY terms ranking matches: an identifier equal to the query, then names starting with it, names
+        containing every term, synonyms containing every term, any other field; shorter names first within a tier.
+
+        Cheaper than BM25 on the trigram index, which has to decode positions for every trigram of every hit."""
+        query = " ".join(search.lower().split())
+        terms = query.split()
+
+        def contains_all(column):
+            return " AND ".join(f"instr(lower(chemicals.{column}), ?) > 0" for _ in terms)
+
+        exact = " OR ".join(f"lower(chemicals.{c}) = ?" for c in ('name', 'synonyms', 'formula', 'cas_number',
+                                                                  'lot_number'))
+        order = (f"CASE WHEN {exact} THEN 0 WHEN substr(lower(chemicals.name), 1, ?) = ? THEN 1 "
+                 f"WHEN {contains_all('name')} THEN 2 WHEN {contains_all('synonyms')} THEN 3 ELSE 4 END, "
+                 f"length(chemicals.name)")
+        return order, [query] * 5 + [len(query), query] + terms + terms
+
+    @staticmethod
+    def _trigrams(text: str) -> set:
+        text = " ".join(str(text).lower().split())
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    def fuzzy_search(self, search: str, limit: int = 10, min_similarity: float = 0.5, **filters) -> pd.DataFrame:
+        """Typo-tolerant matches that the exact search misses, best first.
+
+        Up to FUZZY_CANDIDATES rows matching the one-typo expression are scored by the fraction of the query's
+        trigrams found in their best-matching searchable field."""
+        columns = ['id'] + InventoryStore.COLUMNS + ['similarity']
+        query_trigrams = InventoryStore._trigrams(search)
+        match = self._fuzzy_expression(search) if self.fts else ""
+        if not match or len(query_trigrams) < 2:
+            return pd.DataFrame(columns=columns)
+        exact = self._match_expression(search)
+        if exact:
+            # Leave out rows the exact search already returns
+            match = f"({match}) NOT ({exact})"
+        source, params = self._source(filters, match=match, max_hits=InventoryStore.FUZZY_CANDIDATES)
+        with closing(self._connect()) as conn, conn:
+            candidates = pd.read_sql_query(
+                f"SELECT chemicals.id, {', '.join('chemicals.' + c for c in InventoryStore.COLUMNS)} FROM {source}",
+                conn, params=params
+            )
+        if candidates.empty:
+            return pd.DataFrame(columns=columns)
+        candidates['similarity'] = [
+            max(len(query_trigrams & InventoryStore._trigrams(value)) for value in row) / len(query_trigrams)
+            for row in candidates[InventoryStore.SEARCH_COLUMNS].itertuples(index=False)
+        ]
+        candidates = candidates[candidates['similarity'] >= min_similarity]
+        return candidates.sort_values('similarity', ascending=False, kind='stable').head(limit)[columns]
+
+    def export(self, **filters) -> pd.DataFrame:
+        """Every matching chemical (for CSV/JSON export)"""
+        return self.page(offset=0, limit=-1, **filters)
+
+    def distinct(self, column: str) -> List[str]:
+        """Sorted non-empty values of a filter column (uses its index)"""
+        if column not in ('hazard_class', 'location', 'unit', 'supplier'):
+            raise ValueError(f"Cannot list values of '{column}'")
+        with closing(self._connect()) as conn, conn:
+            return [row[0] for row in conn.execute(
+                f"SELECT DISTINCT {column} FROM chemicals WHERE {column} != '' ORDER BY {column}")]
+
+    def summary(self) -> Dict:
+        """Totals, counts per hazard class and per location"""
+        with closing(self._connect()) as conn, conn:
+            by_hazard = dict(conn.execute(
+                "SELECT hazard_class, COUNT(*) FROM chemicals GROUP BY hazard_class ORDER BY hazard_class"))
+            by_location = dict(conn.execute(
+                "SELECT location, COUNT(*) FROM chemicals WHERE location != '' GROUP BY location ORDER BY location"))
+            expired = conn.execute("SELECT COUNT(*) FROM chemicals WHERE expiry_date != '' AND expiry_date < ?",
+                                   (datetime.now().strftime("%Y-%m-%d"),)).fetchone()[0]
+        total = sum(by_hazard.values())
+        return {'total': total, 'hazardous': total - by_hazard.get('Non-hazardous', 0),
+                'by_hazard': by_hazard, 'by_location': by_location, 'expired': expired}
+
+# Server-side files named in the UI (genomes, large tables) must live under this directory
+DATA_DIR = os.environ.get("LAB_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+
+def resolve_data_path(path: str) -> str:
+    """Real path of a file given relative to (or inside) DATA_DIR; raises ValueError outside it"""
+    root = os.path.realpath(DATA_DIR)
+    full = os.path.realpath(os.path.join(root, path.strip()))
+    if os.path.commonpath([root, full]) != root:
+        raise ValueError(f"Files must be inside the data directory {root}")
+    return full
 
 def add_to_history(calculation_type: str, inputs: Dict, results: Dict):
     """Add calculation to history"""
@@ -536,7 +4991,7 @@ def dashboard_page():
     with col1:
         st.metric("🧪 Calculations", len(st.session_state.calculation_history))
     with col2:
-        st.metric("📦 Inventory", len(st.session_state.inventory))
+        st.metric("📦 Inventory", InventoryStore().count())
     with col3:
         st.metric("📋 Protocols", len(st.session_state.protocols))
     with col4:
@@ -790,6 +5245,33 @@ def molarity_calculator():
         for tip in tips:
             st.markdown(f"• {tip}")
     
+    st.markdown("---")
+    st.markdown("### 📋 Batch Solution Sheet")
+    st.markdown("*Weigh-out masses for many solutions at once; rows with bad formulas or values are flagged, not fatal*")
+    
+    batch_sheet = st.data_editor(
+        pd.DataFrame({'formula': ["NaCl", "MgSO4", "C4H11NO3", "KCl"],
+                      'molarity_M': [1.0, 0.5, 1.0, 0.15],
+                      'volume_mL': [500.0, 100.0, 1000.0, 250.0],
+                      'purity_percent': [99.5, 98.0, 99.9, 100.0]}),
+        num_rows="dynamic", use_container_width=True, key="batch_solution_sheet"
+    )
+    
+    if st.button("🔬 Calculate Batch", key="calculate_batch_solutions"):
+        masses = AdvancedChemistryCalculators.batch_solution_masses(
+            batch_sheet['formula'], batch_sheet['molarity_M'], batch_sheet['volume_mL'] / 1000,
+            batch_sheet['purity_percent'])
+        valid = masses['valid'].to_numpy()
+        batch_result = batch_sheet.assign(mw=masses['mw'].to_numpy(), mass_g=masses['mass_g'].to_numpy(),
+                                          valid=valid, issue=masses['issue'].to_numpy())
+        st.dataframe(batch_result, use_container_width=True, hide_index=True)
+        if not valid.all():
+            st.warning(f"⚠️ {int((~valid).sum())} row(s) could not be calculated - see the issue column")
+        st.download_button("📥 Download Weigh-Out Sheet", batch_result.to_csv(index=False),
+                           file_name="solution_batch.csv", mime="text/csv")
+        add_to_history("Batch Solution Sheet", {'solutions': len(batch_sheet)},
+                       {'calculated': int(valid.sum()), 'flagged': int((~valid).sum())})
+    
     st.markdown('</div>', unsafe_allow_html=True)
 
 def dilution_calculator():
@@ -941,7 +5423,7 @@ def copy_number_calculator():
     st.header("🧬 Copy Number Calculator")
     st.markdown("*Real-time PCR copy number determination for all applications*")
     
-    tab1, tab2, tab3, tab4 = st.tabs(["📊 Absolute Quantification", "🔄 Relative Quantification", "📈 Efficiency Calculator", "🧬 Gene Copy Estimation"])
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["📊 Absolute Quantification", "🔄 Relative Quantification", "📈 Efficiency Calculator", "🧬 Gene Copy Estimation", "🔢 Digital PCR"])
     
     with tab1:
         st.markdown("### 📊 Absolute Copy Number Calculation")
@@ -1086,6 +5568,63 @@ def copy_number_calculator():
             • Check primer specificity
             • Validate with independent method
             """)
+        
+        st.markdown("### 📈 Standard-Curve Quantification")
+        st.markdown("*Fit a curve per plate, drop outlier replicates, and back-calculate all unknowns with prediction intervals*")
+        
+        with st.form("standard_curve_qc_form"):
+            col_sc1, col_sc2 = st.columns(2)
+            with col_sc1:
+                standards_text = st.text_area(
+                    "Standards CSV (plate, ct, copies - leave ct empty if undetected)",
+                    value="plate,ct,copies\n" + "\n".join(
+                        f"P1,{38 - 3.32 * level + offset:.2f},{10 ** level}"
+                        for level in range(2, 8) for offset in (-0.1, 0.0, 0.12)
+                    ),
+                    height=200
+                )
+            with col_sc2:
+                unknowns_text = st.text_area("Unknowns CSV (plate, sample, ct)",
+                                             value="plate,sample,ct\nP1,S1,24.3\nP1,S2,31.8\nP1,S3,36.9",
+                                             height=200)
+            
+            col_sc3, col_sc4, col_sc5 = st.columns(3)
+            with col_sc3:
+                sc_outlier_method = st.selectbox("Replicate Outlier Test", ["Grubbs", "MAD"])
+            with col_sc4:
+                sc_loq_cv = st.number_input("LOQ Max CV (%)", min_value=5.0, value=35.0, step=5.0)
+            with col_sc5:
+                sc_confidence = st.selectbox("Prediction Interval", [0.90, 0.95, 0.99], index=1)
+            
+            if st.form_submit_button("📈 Fit Curves and Quantify", use_container_width=True):
+                try:
+                    from io import StringIO
+                    standards_df = pd.read_csv(StringIO(standards_text))
+                    unknowns_df = pd.read_csv(StringIO(unknowns_text))
+                    
+                    curves = StandardCurveQC.fit_plates(standards_df, outlier_method=sc_outlier_method.lower(),
+                                                        loq_max_cv=sc_loq_cv)
+                    
+                    st.markdown("#### Standard Curves")
+                    st.dataframe(pd.DataFrame([{
+                        'Curve': plate_id, 'Equation': curve['equation'], 'R²': round(curve['r_squared'], 4),
+                        'Efficiency (%)': round(curve['efficiency_percent'], 1), 'Points Used': curve['n'],
+                        'Outliers Removed': curve['n_outliers'], 'LOD (copies)': curve['lod_copies'],
+                        'LOQ (copies)': curve['loq_copies'], 'QC': '✅ Pass' if curve['qc_pass'] else '⚠️ Review'
+                    } for plate_id, curve in curves.items()]), use_container_width=True, hide_index=True)
+                    
+                    results = StandardCurveQC.quantify(curves, unknowns_df, confidence=sc_confidence)
+                    st.markdown("#### Unknowns")
+                    st.dataframe(results, use_container_width=True, hide_index=True)
+                    
+                    add_to_history(
+                        "Standard Curve Quantification",
+                        {'plates': len(curves), 'unknowns': len(results), 'outlier_test': sc_outlier_method},
+                        {'quantified': int((results['qc_flag'] == "OK").sum()),
+                         'flagged': int((results['qc_flag'] != "OK").sum())}
+                    )
+                except Exception as e:
+                    st.error(f"Standard curve error: {str(e)}")
     
     with tab2:
         st.markdown("### 🔄 Relative Quantification (ΔΔCt Method)")
@@ -1182,6 +5721,66 @@ def copy_number_calculator():
                 except Exception as e:
                     st.error(f"Calculation error: {str(e)}")
     
+        st.markdown("### 🧪 Gene Panel Differential Expression")
+        st.markdown("*Per-gene ΔCt tests across biological replicates with Benjamini-Hochberg FDR*")
+        
+        panel_file = st.file_uploader("Long-format CSV (sample, group, gene, ct; optional batch)",
+                                      type=["csv"], key="de_panel_upload")
+        
+        if panel_file is not None:
+            try:
+                panel = pd.read_csv(panel_file)
+                missing_columns = {'sample', 'group', 'gene', 'ct'} - set(panel.columns)
+                if missing_columns:
+                    raise ValueError(f"Missing column(s): {', '.join(sorted(missing_columns))}")
+                
+                gene_names = sorted(panel['gene'].astype(str).unique())
+                group_names = sorted(panel['group'].astype(str).unique())
+                
+                col_de1, col_de2, col_de3 = st.columns(3)
+                with col_de1:
+                    de_references = st.multiselect("Reference Gene(s)", gene_names,
+                                                   default=[g for g in gene_names if g.upper() in ("GAPDH", "ACTB")])
+                    de_method = st.selectbox("Test", ["Welch t-test", "Student t-test", "Linear model (+ batch)"])
+                with col_de2:
+                    de_control = st.selectbox("Control Group", group_names)
+                    de_treatment = st.selectbox("Treatment Group", group_names, index=min(1, len(group_names) - 1))
+                with col_de3:
+                    de_alpha = st.number_input("FDR (q) Threshold", min_value=0.001, max_value=0.5, value=0.05)
+                    de_min_fc = st.number_input("Minimum Fold Change", min_value=1.0, value=2.0, step=0.5)
+                
+                if st.button("🧪 Run Differential Expression", use_container_width=True):
+                    de_results = DifferentialExpression.test_genes(
+                        panel, de_references, de_control, de_treatment,
+                        method={"Welch t-test": "welch", "Student t-test": "student",
+                                "Linear model (+ batch)": "lm"}[de_method],
+                        alpha=de_alpha, min_fold_change=de_min_fc
+                    )
+                    
+                    n_up = int((de_results['direction'] == "Up").sum())
+                    n_down = int((de_results['direction'] == "Down").sum())
+                    st.success(f"✅ {len(de_results)} genes tested: {n_up} up, {n_down} down "
+                               f"(q ≤ {de_alpha}, |FC| ≥ {de_min_fc})")
+                    
+                    st.markdown("**Volcano Plot:**")
+                    st.scatter_chart(de_results, x='log2_fold_change', y='neg_log10_p', color='direction')
+                    st.dataframe(de_results, use_container_width=True, hide_index=True)
+                    st.download_button(
+                        "⬇️ Download Volcano Table",
+                        de_results.to_csv(index=False),
+                        f"differential_expression_{datetime.now().strftime('%Y%m%d')}.csv",
+                        "text/csv"
+                    )
+                    
+                    add_to_history(
+                        "Differential Expression",
+                        {'genes': len(de_results), 'control': de_control, 'treatment': de_treatment,
+                         'method': de_method},
+                        {'up': n_up, 'down': n_down}
+                    )
+            except Exception as e:
+                st.error(f"Differential expression error: {str(e)}")
+    
     with tab3:
         st.markdown("### 📈 PCR Efficiency Calculator")
         st.markdown("*Calculate amplification efficiency from standard curve*")
@@ -1298,7 +5897,8 @@ def copy_number_calculator():
             col_g1, col_g2 = st.columns(2)
             
             with col_g1:
-                genome_size = st.number_input("Genome Size (bp)", min_value=1000, value=3000000, format="%d")
+                template_label = st.selectbox("Template", ["Genomic DNA", "Linear Amplicon", "Circular Plasmid"])
+                genome_size = st.number_input("Genome / Plasmid Size (bp)", min_value=1000, value=3000000, format="%d")
                 target_gene_length = st.number_input("Target Gene Length (bp)", min_value=50, value=1000, format="%d")
             
             with col_g2:
@@ -1322,18 +5922,28 @@ def copy_number_calculator():
                 else:
                     default_genome = genome_size
                 
-                if st.button("Use Default Genome Size"):
+                if st.checkbox("Use Default Genome Size"):
                     genome_size = default_genome
+                
+                reference_fasta = st.text_input("Reference FASTA in the data directory (overrides genome size)",
+                                                placeholder="genomes/ecoli_k12.fa.gz", help=f"Data directory: {DATA_DIR}")
             
             if st.form_submit_button("🧪 Calculate Gene Copies", use_container_width=True):
                 try:
+                    template_type = {"Genomic DNA": "genomic", "Linear Amplicon": "amplicon",
+                                     "Circular Plasmid": "plasmid"}[template_label]
+                    mass_per_bp = 650.0
+                    if reference_fasta.strip():
+                        reference = GenomeReference.summarize(resolve_data_path(reference_fasta))
+                        genome_size, mass_per_bp = reference['genome_size_bp'], reference['mass_per_bp']
+                    
                     result = PCRCalculators.calculate_gene_copy_number(
-                        genome_size, target_gene_length, dna_conc, volume
+                        genome_size, target_gene_length, dna_conc, volume,
+                        copies_per_genome=copies_per_genome, template_type=template_type, mass_per_bp=mass_per_bp
                     )
                     
-                    # Calculate additional metrics
-                    total_gene_copies = result['gene_copies'] * copies_per_genome
-                    copies_per_ng = total_gene_copies / result['total_dna_mass_ng']
+                    total_gene_copies = result['gene_copies']
+                    copies_per_ng = result['copies_per_ng']
                     
                     st.markdown(f"""
                     <div class="pcr-box">
@@ -1342,12 +5952,12 @@ def copy_number_calculator():
                             <div class="metric-card">
                                 <h5>DNA Parameters</h5>
                                 <p><strong>Total DNA:</strong> {result['total_dna_mass_ng']:.1f} ng</p>
-                                <p><strong>Genome Size:</strong> {genome_size:,} bp</p>
-                                <p><strong>Genome MW:</strong> {result['genome_molecular_weight']:.2e} Da</p>
+                                <p><strong>Template Size:</strong> {(target_gene_length if template_type == 'amplicon' else genome_size):,} bp</p>
+                                <p><strong>Template MW:</strong> {result['genome_molecular_weight']:.2e} Da</p>
                             </div>
                             <div class="metric-card">
                                 <h5>Copy Numbers</h5>
-                                <p><strong>Genome Copies:</strong> {result['genome_copies']:.2e}</p>
+                                <p><strong>Template Copies:</strong> {result['genome_copies']:.2e}</p>
                                 <p><strong>Gene Copies:</strong> {total_gene_copies:.2e}</p>
                                 <p><strong>Copies/μL:</strong> {result['copies_per_ul']:.2e}</p>
                             </div>
@@ -1355,7 +5965,7 @@ def copy_number_calculator():
                                 <h5>Concentrations</h5>
                                 <p><strong>Copies/ng DNA:</strong> {copies_per_ng:.2e}</p>
                                 <p><strong>Copies/mL:</strong> {result['copies_per_ul']*1000:.2e}</p>
-                                <p><strong>Molarity:</strong> {(result['gene_copies']/volume) / 6.022e23 * 1e6:.2e} μM</p>
+                                <p><strong>Molarity:</strong> {result['molarity_pm']:.2e} pM</p>
                             </div>
                         </div>
                     </div>
@@ -1389,12 +5999,226 @@ def copy_number_calculator():
                     
                     add_to_history(
                         "Gene Copy Estimation",
-                        {'genome_size': genome_size, 'dna_conc': dna_conc, 'volume': volume},
+                        {'template': template_type, 'genome_size': genome_size, 'copies_per_genome': copies_per_genome,
+                         'dna_conc': dna_conc, 'volume': volume},
                         {'gene_copies': total_gene_copies, 'copies_per_ul': result['copies_per_ul']}
                     )
                     
                 except Exception as e:
                     st.error(f"Calculation error: {str(e)}")
+        
+        st.markdown("#### 📐 Standard-Curve Dilution Tables")
+        st.markdown("*Serial dilutions for many amplicon or plasmid standards at once*")
+        
+        standards_file = st.file_uploader(
+            "Standards CSV (target, concentration_ng_ul, template_type, target_gene_length_bp, "
+            "genome_size_bp for plasmids, optional copies_per_genome)",
+            type=["csv"], key="standards_upload"
+        )
+        
+        col_sd1, col_sd2, col_sd3, col_sd4 = st.columns(4)
+        with col_sd1:
+            top_copies = st.number_input("Top Standard (copies/μL)", min_value=1.0, value=1e7, format="%.0e")
+        with col_sd2:
+            series_factor = st.number_input("Dilution Factor", min_value=1.5, value=10.0, step=0.5)
+        with col_sd3:
+            series_points = st.number_input("Points", min_value=1, max_value=12, value=6)
+        with col_sd4:
+            series_volume = st.number_input("Final Volume per Tube (μL)", min_value=10.0, value=100.0)
+        
+        if standards_file is not None and st.button("📐 Build Dilution Tables", use_container_width=True):
+            try:
+                dilution_table = PCRCalculators.calculate_standard_dilution_series(
+                    pd.read_csv(standards_file), top_copies_per_ul=top_copies, dilution_factor=series_factor,
+                    n_points=int(series_points), final_volume_ul=series_volume
+                )
+                st.success(f"✅ {dilution_table['target'].nunique()} standards, {len(dilution_table)} tubes")
+                st.dataframe(dilution_table, use_container_width=True, hide_index=True)
+                st.download_button(
+                    "⬇️ Download Dilution Tables",
+                    dilution_table.to_csv(index=False),
+                    f"standard_dilutions_{datetime.now().strftime('%Y%m%d')}.csv",
+                    "text/csv"
+                )
+            except Exception as e:
+                st.error(f"Dilution table error: {str(e)}")
+        
+        st.markdown("#### 📂 Batch Copy Numbers from Reference FASTA")
+        st.markdown("*Exact genome length and composition-based mass, read once per reference file*")
+        
+        reference_paths = st.text_area("Reference FASTA files in the data directory (one per line, .gz supported)",
+                                       placeholder="genomes/ecoli_k12.fa.gz", height=80, help=f"Data directory: {DATA_DIR}")
+        sample_sheet_file = st.file_uploader(
+            "Sample sheet CSV (columns: sample, concentration_ng_ul, optional volume_ul, reference, copies_per_genome)",
+            type=["csv"], key="copy_sample_sheet"
+        )
+        
+        if reference_paths.strip() and st.button("🧮 Calculate Batch Copy Numbers", use_container_width=True):
+            try:
+                references = {}
+                for path in [resolve_data_path(p) for p in reference_paths.splitlines() if p.strip()]:
+                    if not os.path.exists(path):
+                        raise ValueError(f"Reference not found: {path}")
+                    with st.spinner(f"Reading {os.path.basename(path)}..."):
+                        summary = GenomeReference.summarize(path)
+                    if summary['name'] in references:
+                        raise ValueError(f"References {references[summary['name']]['path']} and {path} share "
+                                         f"the name '{summary['name']}' - rename one file")
+                    references[summary['name']] = summary
+                
+                st.dataframe(pd.DataFrame([
+                    {'Reference': name, 'Contigs': ref['n_contigs'], 'Genome Size (bp)': ref['genome_size_bp'],
+                     'GC (%)': round(ref['gc_content'], 2), 'Mass per bp (Da)': round(ref['mass_per_bp'], 2),
+                     'Genome MW (Da)': f"{ref['genome_molecular_weight']:.4e}"}
+                    for name, ref in references.items()
+                ]), use_container_width=True, hide_index=True)
+                
+                if sample_sheet_file is not None:
+                    batch = GenomeReference.batch_copy_numbers(pd.read_csv(sample_sheet_file), references)
+                    st.success(f"✅ Calculated copy numbers for {len(batch)} samples")
+                    st.dataframe(batch, use_container_width=True, hide_index=True)
+                    st.download_button(
+                        "⬇️ Download Copy Numbers",
+                        batch.to_csv(index=False),
+                        f"copy_numbers_{datetime.now().strftime('%Y%m%d')}.csv",
+                        "text/csv"
+                    )
+            except Exception as e:
+                st.error(f"Batch calculation error: {str(e)}")
+    
+    with tab5:
+        st.markdown("### 🔢 Digital PCR Quantification")
+        st.markdown("*Poisson-corrected absolute quantification from partition counts*")
+        
+        col_dp1, col_dp2, col_dp3 = st.columns(3)
+        
+        with col_dp1:
+            dpcr_platform = st.selectbox("Platform / Partition Volume", [
+                "Droplet (0.85 nL)",
+                "Droplet (0.91 nL)",
+                "Nanoplate 26k (0.91 nL)",
+                "Nanoplate 8.5k (0.34 nL)",
+                "Custom"
+            ])
+            platform_volumes = {
+                "Droplet (0.85 nL)": 0.85,
+                "Droplet (0.91 nL)": 0.91,
+                "Nanoplate 26k (0.91 nL)": 0.91,
+                "Nanoplate 8.5k (0.34 nL)": 0.34
+            }
+            partition_volume = st.number_input("Partition Volume (nL)", min_value=0.001,
+                                               value=platform_volumes.get(dpcr_platform, 0.85), format="%.3f",
+                                               disabled=dpcr_platform != "Custom")
+        
+        with col_dp2:
+            dpcr_dilution = st.number_input("Sample Dilution Factor", min_value=1.0, value=1.0, key="dpcr_dilution")
+            dpcr_ci_method = st.selectbox("Confidence Interval", ["Wilson", "Exact (Clopper-Pearson)"])
+        
+        with col_dp3:
+            dpcr_confidence = st.selectbox("Confidence Level", [0.90, 0.95, 0.99], index=1)
+        
+        ci_method = "wilson" if dpcr_ci_method == "Wilson" else "exact"
+        
+        dpcr_mode = st.radio("Input", ["Partition Counts", "Partition Amplitude File"], horizontal=True)
+        
+        if dpcr_mode == "Partition Counts":
+            counts_text = st.text_area(
+                "Sample, positive partitions, total partitions (one sample per line)",
+                value="Sample A, 1520, 18500\nSample B, 312, 17950\nNTC, 0, 18210",
+                height=120
+            )
+            
+            if st.button("🔢 Calculate Concentrations", use_container_width=True):
+                try:
+                    rows = [line.split(',') for line in counts_text.strip().split('\n') if line.strip()]
+                    names = [r[0].strip() for r in rows]
+                    positives = [float(r[1]) for r in rows]
+                    totals = [float(r[2]) for r in rows]
+                    
+                    dpcr_results = PCRCalculators.calculate_dpcr_concentration(
+                        positives, totals, partition_volume, dpcr_dilution, ci_method, dpcr_confidence
+                    )
+                    dpcr_results.insert(0, 'sample', names)
+                    
+                    st.dataframe(dpcr_results, use_container_width=True, hide_index=True)
+                    
+                    if dpcr_results['saturated'].any():
+                        st.warning("⚠️ Saturated samples (all partitions positive) cannot be quantified - dilute and re-run")
+                    
+                    add_to_history(
+                        "Digital PCR Quantification",
+                        {'samples': len(names), 'partition_volume_nl': partition_volume, 'ci': dpcr_ci_method},
+                        {'copies_per_ul': dict(zip(names, dpcr_results['copies_per_ul'].round(2)))}
+                    )
+                except Exception as e:
+                    st.error(f"Calculation error: {str(e)}")
+        
+        else:
+            amplitude_file = st.file_uploader("Upload partition amplitudes (CSV, one row per partition)",
+                                              type=["csv", "txt"], key="dpcr_amplitude_upload")
+            
+            if amplitude_file is not None:
+                header = pd.read_csv(amplitude_file, nrows=5)
+                file_columns = list(header.columns)
+                
+                col_af1, col_af2 = st.columns(2)
+                
+                with col_af1:
+                    well_column = st.selectbox("Well/Sample Column", file_columns)
+                    amplitude_columns = st.multiselect(
+                        "Amplitude Channels (1 or 2)",
+                        [c for c in file_columns if c != well_column],
+                        default=[c for c in file_columns if c != well_column][:1]
+                    )
+                
+                with col_af2:
+                    auto_thresholds = st.checkbox("Automatic thresholds (Otsu)", value=True)
+                    manual_thresholds = {}
+                    for channel in amplitude_columns:
+                        manual_thresholds[channel] = st.number_input(
+                            f"{channel} Threshold", value=float(header[channel].median()),
+                            disabled=auto_thresholds, key=f"dpcr_threshold_{channel}"
+                        )
+                
+                if st.button("🔢 Classify Partitions", use_container_width=True):
+                    try:
+                        with st.spinner("Reading partitions in chunks..."):
+                            thresholds = (DigitalPCRImporter.estimate_thresholds(amplitude_file, amplitude_columns)
+                                          if auto_thresholds else manual_thresholds)
+                            counts = DigitalPCRImporter.count_partitions(
+                                amplitude_file, well_column, amplitude_columns, thresholds
+                            )
+                        
+                        st.markdown("**Thresholds:** " + ", ".join(f"{c} = {t:.1f}" for c, t in thresholds.items()))
+                        
+                        if len(amplitude_columns) == 1:
+                            dpcr_results = PCRCalculators.calculate_dpcr_concentration(
+                                counts['positive_partitions'], counts['total_partitions'],
+                                partition_volume, dpcr_dilution, ci_method, dpcr_confidence
+                            )
+                        else:
+                            dpcr_results = PCRCalculators.calculate_dpcr_multiplex(
+                                counts['double_negative'], counts['channel1_only'],
+                                counts['channel2_only'], counts['double_positive'],
+                                partition_volume, dpcr_dilution
+                            )
+                        dpcr_results.insert(0, 'well', counts['well'])
+                        
+                        st.dataframe(dpcr_results, use_container_width=True, hide_index=True)
+                        st.download_button(
+                            "⬇️ Download dPCR Results",
+                            dpcr_results.to_csv(index=False),
+                            f"dpcr_results_{datetime.now().strftime('%Y%m%d')}.csv",
+                            "text/csv"
+                        )
+                        
+                        add_to_history(
+                            "Digital PCR Partition Import",
+                            {'wells': len(counts), 'channels': amplitude_columns},
+                            {'partitions': int(counts['total_partitions'].sum())}
+                        )
+                    except Exception as e:
+                        st.error(f"Partition import error: {str(e)}")
     
     st.markdown('</div>', unsafe_allow_html=True)
 
@@ -1406,7 +6230,8 @@ def pcr_analysis_suite():
     st.header("📈 PCR Analysis Suite")
     st.markdown("*Comprehensive PCR data analysis and quality control tools*")
     
-    tab1, tab2, tab3 = st.tabs(["📊 Ct Analysis", "🎯 Primer Design", "📋 PCR Setup"])
+    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["📊 Ct Analysis", "🎯 Primer Design", "📋 PCR Setup",
+                                                  "📉 Amplification Curves", "🌡️ Melt Curves", "🔍 In-Silico PCR"])
     
     with tab1:
         st.markdown("### 📊 Ct Value Analysis")
@@ -1484,7 +6309,21 @@ def pcr_analysis_suite():
     
     with tab2:
         st.markdown("### 🎯 Primer Design Helper")
-        st.markdown("*Basic primer design parameters and checks*")
+        st.markdown("*Nearest-neighbor Tm (SantaLucia 1998) with Owczarzy salt and Mg²⁺ corrections*")
+        
+        with st.expander("🧪 Reaction Conditions", expanded=False):
+            col_cond1, col_cond2, col_cond3, col_cond4 = st.columns(4)
+            with col_cond1:
+                monovalent_mm = st.number_input("Na⁺/K⁺ (mM)", min_value=0.0, value=50.0, step=5.0)
+            with col_cond2:
+                mg_mm = st.number_input("Mg²⁺ (mM)", min_value=0.0, value=1.5, step=0.1)
+            with col_cond3:
+                dntp_mm = st.number_input("dNTPs (mM total)", min_value=0.0, value=0.2, step=0.05)
+            with col_cond4:
+                primer_nm = st.number_input("Primer (nM)", min_value=1.0, value=250.0, step=50.0)
+        
+        conditions = {'monovalent_mm': monovalent_mm, 'mg_mm': mg_mm,
+                      'dntp_mm': dntp_mm, 'primer_nm': primer_nm}
         
         with st.form("primer_design_form"):
             primer_forward = st.text_input("Forward Primer (5' → 3')", placeholder="ATGCGATCGATCGATCG")
@@ -1492,66 +6331,200 @@ def pcr_analysis_suite():
             
             if st.form_submit_button("Analyze Primers"):
                 if primer_forward and primer_reverse:
-                    # Basic primer analysis
-                    def analyze_primer(seq):
-                        seq = seq.upper().replace(' ', '')
-                        length = len(seq)
-                        gc_content = (seq.count('G') + seq.count('C')) / length * 100
-                        
-                        # Simple Tm estimation (not accurate for all conditions)
-                        if length < 14:
-                            tm = (seq.count('A') + seq.count('T')) * 2 + (seq.count('G') + seq.count('C')) * 4
-                        else:
-                            tm = 64.9 + 41 * (seq.count('G') + seq.count('C') - 16.4) / length
-                        
-                        return {'length': length, 'gc_content': gc_content, 'tm': tm}
-                    
-                    fwd_analysis = analyze_primer(primer_forward)
-                    rev_analysis = analyze_primer(primer_reverse)
+                    try:
+                        fwd_analysis = PrimerThermodynamics.analyze_primer(primer_forward, **conditions)
+                        rev_analysis = PrimerThermodynamics.analyze_primer(primer_reverse, **conditions)
+                    except Exception as e:
+                        st.error(f"Primer analysis error: {str(e)}")
+                        fwd_analysis = rev_analysis = None
                     
-                    st.markdown(f"""
-                    <div class="pcr-box">
-                        <h4>Primer Analysis Results</h4>
-                        <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 2rem;">
-                            <div>
-                                <h5>Forward Primer</h5>
-                                <p><strong>Length:</strong> {fwd_analysis['length']} bp</p>
-                                <p><strong>GC Content:</strong> {fwd_analysis['gc_content']:.1f}%</p>
-                                <p><strong>Est. Tm:</strong> {fwd_analysis['tm']:.1f}°C</p>
-                            </div>
-                            <div>
-                                <h5>Reverse Primer</h5>
-                                <p><strong>Length:</strong> {rev_analysis['length']} bp</p>
-                                <p><strong>GC Content:</strong> {rev_analysis['gc_content']:.1f}%</p>
-                                <p><strong>Est. Tm:</strong> {rev_analysis['tm']:.1f}°C</p>
+                    if fwd_analysis and rev_analysis:
+                        st.markdown(f"""
+                        <div class="pcr-box">
+                            <h4>Primer Analysis Results</h4>
+                            <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 2rem;">
+                                <div>
+                                    <h5>Forward Primer</h5>
+                                    <p><strong>Length:</strong> {fwd_analysis['length']} bp</p>
+                                    <p><strong>GC Content:</strong> {fwd_analysis['gc_content']:.1f}%</p>
+                                    <p><strong>NN Tm:</strong> {fwd_analysis['tm']:.1f}°C</p>
+                                    <p><strong>ΔG₃₇:</strong> {fwd_analysis['delta_g_37']:.1f} kcal/mol</p>
+                                </div>
+                                <div>
+                                    <h5>Reverse Primer</h5>
+                                    <p><strong>Length:</strong> {rev_analysis['length']} bp</p>
+                                    <p><strong>GC Content:</strong> {rev_analysis['gc_content']:.1f}%</p>
+                                    <p><strong>NN Tm:</strong> {rev_analysis['tm']:.1f}°C</p>
+                                    <p><strong>ΔG₃₇:</strong> {rev_analysis['delta_g_37']:.1f} kcal/mol</p>
+                                </div>
                             </div>
                         </div>
-                    </div>
-                    """, unsafe_allow_html=True)
+                        """, unsafe_allow_html=True)
+                        
+                        # Design recommendations
+                        st.markdown("### 📋 Design Recommendations")
+                        
+                        recommendations = []
+                        
+                        # Length check
+                        for name, analysis in [("Forward", fwd_analysis), ("Reverse", rev_analysis)]:
+                            if not (18 <= analysis['length'] <= 25):
+                                recommendations.append(f"⚠️ {name} primer length ({analysis['length']} bp) outside optimal range (18-25 bp)")
+                            
+                            if not (40 <= analysis['gc_content'] <= 60):
+                                recommendations.append(f"⚠️ {name} primer GC content ({analysis['gc_content']:.1f}%) outside optimal range (40-60%)")
+                        
+                        # Tm difference
+                        tm_diff = abs(fwd_analysis['tm'] - rev_analysis['tm'])
+                        if tm_diff > 5:
+                            recommendations.append(f"⚠️ Large Tm difference ({tm_diff:.1f}°C). Aim for <5°C difference")
+                        
+                        # Secondary structure
+                        dimer_conditions = {k: v for k, v in conditions.items() if k != 'primer_nm'}
+                        dimers = PrimerDimerAnalyzer.batch_dimer_dg(
+                            [primer_forward, primer_reverse, primer_forward],
+                            [primer_forward, primer_reverse, primer_reverse],
+                            **dimer_conditions
+                        )
+                        hairpins = PrimerDimerAnalyzer.batch_hairpin_dg([primer_forward, primer_reverse],
+                                                                        **dimer_conditions)
+                        
+                        structure_df = pd.DataFrame({
+                            'Check': ["Forward self-dimer", "Reverse self-dimer", "Cross-dimer",
+                                      "Forward hairpin", "Reverse hairpin"],
+                            'ΔG (kcal/mol)': list(dimers['dimer_dg']) + list(hairpins),
+                            "3'-End ΔG (kcal/mol)": list(dimers['three_prime_dimer_dg']) + [None, None]
+                        })
+                        st.markdown("**Secondary Structure (ΔG at 37°C):**")
+                        st.dataframe(structure_df, use_container_width=True, hide_index=True)
+                        
+                        for check, dg, dg_3 in structure_df.itertuples(index=False):
+                            if 'dimer' in check and dg_3 is not None and dg_3 <= -5:
+                                recommendations.append(f"⚠️ {check} with extendable 3' end (ΔG {dg_3:.1f} kcal/mol)")
+                            elif 'dimer' in check and dg <= -9:
+                                recommendations.append(f"⚠️ Stable {check.lower()} (ΔG {dg:.1f} kcal/mol)")
+                            elif 'hairpin' in check and dg <= -3:
+                                recommendations.append(f"⚠️ Stable {check.lower()} (ΔG {dg:.1f} kcal/mol)")
+                        
+                        if recommendations:
+                            for rec in recommendations:
+                                st.warning(rec)
+                        else:
+                            st.success("✅ Primers meet basic design criteria!")
+        
+        st.markdown("#### 📦 Batch Primer Analysis")
+        
+        primer_batch_file = st.file_uploader("Upload primers (FASTA or CSV with name/sequence columns)",
+                                             type=["fa", "fasta", "txt", "csv", "tsv"], key="primer_batch_upload")
+        
+        screen_dimers = st.checkbox("Screen all pairs for self-/cross-dimers and hairpins", value=True)
+        
+        if primer_batch_file is not None and st.button("🧮 Calculate Batch Tm", use_container_width=True):
+            try:
+                primers = PrimerThermodynamics.parse_primer_file(primer_batch_file.getvalue().decode('utf-8'))
+                batch = PrimerThermodynamics.batch_tm(primers['sequence'].tolist(), **conditions)
+                batch.insert(0, 'name', primers['name'].values)
+                
+                if screen_dimers:
+                    with st.spinner("Screening all primer pairs for dimers..."):
+                        screen = PrimerDimerAnalyzer.screen_pool(
+                            primers['name'].tolist(), primers['sequence'].tolist(),
+                            **{k: v for k, v in conditions.items() if k != 'primer_nm'}
+                        )
+                    batch = batch.merge(screen['hairpins'], left_on='name', right_on='primer', how='left') \
+                        .drop(columns='primer')
+                
+                st.success(f"✅ Analyzed {len(batch)} primers")
+                st.dataframe(batch, use_container_width=True, hide_index=True)
+                st.download_button(
+                    "⬇️ Download Results",
+                    batch.to_csv(index=False),
+                    f"primer_tm_{datetime.now().strftime('%Y%m%d')}.csv",
+                    "text/csv"
+                )
+                
+                if screen_dimers:
+                    dimers = screen['dimers']
+                    flagged = dimers[(dimers['three_prime_dimer_dg'] <= -5) | (dimers['dimer_dg'] <= -9)]
+                    st.markdown(f"**Dimer Screen:** {len(dimers):,} pairs checked, "
+                                f"{len(flagged):,} flagged (3'-end ΔG ≤ -5 or ΔG ≤ -9 kcal/mol)")
+                    st.dataframe(dimers.head(200), use_container_width=True, hide_index=True)
+                    st.download_button(
+                        "⬇️ Download Dimer Screen",
+                        dimers.to_csv(index=False),
+                        f"primer_dimers_{datetime.now().strftime('%Y%m%d')}.csv",
+                        "text/csv"
+                    )
+            except Exception as e:
+                st.error(f"Batch analysis error: {str(e)}")
+        
+        st.markdown("#### 🧬 Design Primers from Template")
+        
+        with st.form("primer_template_form"):
+            template_text = st.text_area("Template sequence (plain or FASTA)", height=120,
+                                         placeholder=">target\nATGC...")
+            template_file = st.file_uploader("...or upload a FASTA file", type=["fa", "fasta", "txt", "gz"],
+                                             key="primer_template_upload")
+            
+            col_pd1, col_pd2, col_pd3 = st.columns(3)
+            with col_pd1:
+                length_range = st.slider("Primer Length (bp)", 15, 35, (18, 25))
+                gc_range = st.slider("GC Content (%)", 20, 80, (40, 60))
+                max_run = st.number_input("Max Homopolymer Run", min_value=2, value=4)
+            with col_pd2:
+                tm_range = st.slider("Primer Tm (°C)", 45.0, 75.0, (57.0, 63.0), step=0.5)
+                tm_optimum = st.number_input("Optimal Tm (°C)", value=60.0, step=0.5)
+                max_tm_difference = st.number_input("Max Tm Difference (°C)", min_value=0.0, value=3.0, step=0.5)
+            with col_pd3:
+                amplicon_range = st.slider("Amplicon Size (bp)", 50, 3000, (80, 250))
+                num_pairs = st.number_input("Pairs to Return", min_value=1, max_value=500, value=10)
+                require_gc_clamp = st.checkbox("Require 3' GC clamp", value=True)
+            
+            target_text = st.text_input("Region the amplicon must span (start-end, 1-based, optional)",
+                                        placeholder="e.g. 500-560")
+            
+            if st.form_submit_button("🔎 Design Primer Pairs"):
+                try:
+                    if template_file is not None:
+                        import gzip
+                        raw = template_file.getvalue()
+                        template_text = (gzip.decompress(raw) if raw[:2] == b'\x1f\x8b' else raw).decode('utf-8')
                     
-                    # Design recommendations
-                    st.markdown("### 📋 Design Recommendations")
+                    # First FASTA record only; plain sequence is accepted as-is
+                    lines = [line.strip() for line in template_text.splitlines() if line.strip()]
+                    template_name = lines[0][1:].split()[0] if lines and lines[0].startswith('>') else 'template'
+                    if lines and lines[0].startswith('>'):
+                        lines = lines[1:]
+                        lines = lines[:next((i for i, line in enumerate(lines) if line.startswith('>')), len(lines))]
+                    template = "".join(lines)
                     
-                    recommendations = []
+                    target = None
+                    if target_text.strip():
+                        target_start, target_end = (int(v) for v in target_text.replace(' ', '').split('-'))
+                        target = (target_start - 1, target_end)
                     
-                    # Length check
-                    for name, analysis in [("Forward", fwd_analysis), ("Reverse", rev_analysis)]:
-                        if not (18 <= analysis['length'] <= 25):
-                            recommendations.append(f"⚠️ {name} primer length ({analysis['length']} bp) outside optimal range (18-25 bp)")
-                        
-                        if not (40 <= analysis['gc_content'] <= 60):
-                            recommendations.append(f"⚠️ {name} primer GC content ({analysis['gc_content']:.1f}%) outside optimal range (40-60%)")
+                    with st.spinner(f"Scoring every candidate window in {len(template):,} bp..."):
+                        pairs = PrimerDesigner.design(
+                            template, num_pairs=int(num_pairs), length_range=length_range,
+                            tm_range=tm_range, tm_optimum=tm_optimum, gc_range=gc_range,
+                            amplicon_range=amplicon_range, max_tm_difference=max_tm_difference,
+                            max_run=int(max_run), require_gc_clamp=require_gc_clamp, target=target,
+                            **conditions
+                        )
                     
-                    # Tm difference
-                    tm_diff = abs(fwd_analysis['tm'] - rev_analysis['tm'])
-                    if tm_diff > 5:
-                        recommendations.append(f"⚠️ Large Tm difference ({tm_diff:.1f}°C). Aim for <5°C difference")
+                    st.success(f"✅ {len(pairs)} primer pairs designed for {template_name} ({len(template):,} bp)")
+                    st.dataframe(pairs.round(2), use_container_width=True, hide_index=True)
                     
-                    if recommendations:
-                        for rec in recommendations:
-                            st.warning(rec)
-                    else:
-                        st.success("✅ Primers meet basic design criteria!")
+                    best = pairs.iloc[0]
+                    add_to_history("Primer Design", {
+                        "template": template_name, "template_length": len(template),
+                        "amplicon_range": f"{amplicon_range[0]}-{amplicon_range[1]} bp"
+                    }, {
+                        "forward": best['forward'], "reverse": best['reverse'],
+                        "amplicon": f"{best['amplicon_bp']} bp"
+                    })
+                except Exception as e:
+                    st.error(f"Primer design error: {str(e)}")
     
     with tab3:
         st.markdown("### 📋 PCR Reaction Setup Calculator")
@@ -1576,70 +6549,483 @@ def pcr_analysis_suite():
                 primer_stock = st.number_input("Primer Stock (μM)", value=10.0)
                 primer_final = st.number_input("Primer Final (μM)", value=0.5)
             
-            if st.form_submit_button("Calculate PCR Setup"):
-                # Calculate total volume needed
-                total_reactions = num_reactions * (1 + extra_percent/100)
-                total_volume = total_reactions * reaction_volume
-                
-                # Calculate component volumes
-                polymerase_vol = (polymerase_final / polymerase_stock) * total_volume
-                primer_fwd_vol = (primer_final / primer_stock) * total_volume
-                primer_rev_vol = (primer_final / primer_stock) * total_volume
+            if st.form_submit_button("Calculate PCR Setup"):
+                # Calculate total volume needed
+                total_reactions = num_reactions * (1 + extra_percent/100)
+                total_volume = total_reactions * reaction_volume
+                
+                # Calculate component volumes
+                polymerase_vol = (polymerase_final / polymerase_stock) * total_volume
+                primer_fwd_vol = (primer_final / primer_stock) * total_volume
+                primer_rev_vol = (primer_final / primer_stock) * total_volume
+                
+                # Assume standard components
+                buffer_vol = total_volume * 0.1  # 1x final from 10x stock
+                dntp_vol = total_volume * 0.02   # 200μM final from 10mM stock
+                template_vol_per_rxn = 1.0       # 1μL per reaction
+                water_vol = total_volume - (polymerase_vol + primer_fwd_vol + primer_rev_vol + buffer_vol + dntp_vol)
+                
+                st.markdown(f"""
+                <div class="pcr-box">
+                    <h4>PCR Master Mix Setup</h4>
+                    <p><strong>For {num_reactions} reactions + {extra_percent}% extra = {total_reactions:.1f} reactions</strong></p>
+                    
+                    <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 2rem;">
+                        <div>
+                            <h5>Master Mix Components</h5>
+                            <p><strong>10× Buffer:</strong> {buffer_vol:.1f} μL</p>
+                            <p><strong>dNTPs (10mM):</strong> {dntp_vol:.1f} μL</p>
+                            <p><strong>Forward Primer:</strong> {primer_fwd_vol:.1f} μL</p>
+                            <p><strong>Reverse Primer:</strong> {primer_rev_vol:.1f} μL</p>
+                            <p><strong>Polymerase:</strong> {polymerase_vol:.1f} μL</p>
+                            <p><strong>Water:</strong> {water_vol:.1f} μL</p>
+                        </div>
+                        <div>
+                            <h5>Per Reaction</h5>
+                            <p><strong>Master Mix:</strong> {reaction_volume - template_vol_per_rxn:.1f} μL</p>
+                            <p><strong>Template:</strong> {template_vol_per_rxn:.1f} μL</p>
+                            <p><strong>Total:</strong> {reaction_volume:.1f} μL</p>
+                            <br>
+                            <p><strong>Total Master Mix:</strong> {total_volume - (total_reactions * template_vol_per_rxn):.1f} μL</p>
+                        </div>
+                    </div>
+                </div>
+                """, unsafe_allow_html=True)
+                
+                # Protocol
+                st.markdown("### 📋 PCR Setup Protocol")
+                st.markdown(f"""
+**PCR Master Mix Preparation Protocol**
+
+1. **Prepare master mix** in the following order:
+   - Add water first: {water_vol:.1f} μL
+   - Add 10× Buffer: {buffer_vol:.1f} μL
+   - Add dNTPs: {dntp_vol:.1f} μL
+   - Add Forward primer: {primer_fwd_vol:.1f} μL
+   - Add Reverse primer: {primer_rev_vol:.1f} μL
+   - Add Polymerase last: {polymerase_vol:.1f} μL
+
+2. **Mix gently** by pipetting or brief vortex
+
+3. **Aliquot** {reaction_volume - template_vol_per_rxn:.1f} μL master mix per tube
+
+4. **Add** {template_vol_per_rxn:.1f} μL template to each tube
+
+5. **Mix and centrifuge** briefly before cycling
+                """)
+        
+        st.markdown("#### 🧫 Multi-Assay Plate Planner")
+        st.markdown("*Lay out assays × samples × replicates across plates, then get per-assay mixes and worklists*")
+        
+        with st.form("plate_planner_form"):
+            col_pp1, col_pp2 = st.columns(2)
+            with col_pp1:
+                planner_samples = st.text_area("Samples (one per line)", value="\n".join(f"S{i + 1}" for i in range(8)),
+                                               height=120)
+            with col_pp2:
+                planner_assays = st.text_area("Assays (one per line)", value="GAPDH\nACTB\nTarget1", height=120)
+            
+            col_pp3, col_pp4, col_pp5, col_pp6 = st.columns(4)
+            with col_pp3:
+                planner_format = st.selectbox("Plate Format", [96, 384])
+                planner_replicates = st.number_input("Replicates", min_value=1, max_value=12, value=3)
+            with col_pp4:
+                planner_reaction = st.number_input("Reaction Volume (μL)", min_value=5.0, value=20.0, key="pp_rxn")
+                planner_template = st.number_input("Template per Reaction (μL)", min_value=0.5, value=2.0)
+            with col_pp5:
+                planner_overage = st.number_input("Overage (%)", min_value=0.0, value=10.0)
+                planner_dead = st.number_input("Dead Volume per Mix (μL)", min_value=0.0, value=0.0)
+            with col_pp6:
+                planner_ntc = st.checkbox("Include NTC per assay", value=True)
+            
+            st.markdown("**Components** (assay `*` applies to all assays; add rows with an assay name to override)")
+            planner_components = st.data_editor(PCRPlatePlanner.DEFAULT_COMPONENTS, num_rows="dynamic",
+                                                use_container_width=True, key="pp_components")
+            
+            if st.form_submit_button("🧫 Plan Plates", use_container_width=True):
+                try:
+                    samples = [x.strip() for x in planner_samples.splitlines() if x.strip()]
+                    assays = [x.strip() for x in planner_assays.splitlines() if x.strip()]
+                    layout = PCRPlatePlanner.build_layout(samples, assays, int(planner_replicates),
+                                                          int(planner_format), planner_ntc)
+                    st.session_state.plate_plan = {
+                        'layout': layout,
+                        'mixes': PCRPlatePlanner.master_mixes(layout, planner_reaction, planner_template,
+                                                              planner_overage, planner_dead,
+                                                              planner_components.dropna(subset=['component'])),
+                        'worklist': PCRPlatePlanner.worklists(layout, planner_reaction, planner_template)
+                    }
+                except Exception as e:
+                    st.session_state.pop('plate_plan', None)
+                    st.error(f"Planning error: {str(e)}")
+        
+        if 'plate_plan' in st.session_state:
+            plan = st.session_state.plate_plan
+            layout = plan['layout']
+            
+            st.success(f"✅ {len(layout['plate'])} reactions across {layout['n_plates']} plate(s)")
+            
+            st.markdown("**Master Mixes** (add components in the listed order):")
+            st.dataframe(plan['mixes'].round(2), use_container_width=True, hide_index=True)
+            st.download_button("⬇️ Download Master Mixes", plan['mixes'].to_csv(index=False),
+                               f"master_mixes_{datetime.now().strftime('%Y%m%d')}.csv", "text/csv")
+            
+            plate_choice = st.selectbox("Plate", list(range(1, layout['n_plates'] + 1)), key="pp_plate_choice")
+            n_rows, n_cols = PCRPlatePlanner.PLATE_FORMATS[layout['plate_format']]
+            on_plate = layout['plate'] == plate_choice
+            
+            grid = np.full((n_rows, n_cols), "", dtype=object)
+            labels = np.char.add(np.char.add(np.array(layout['assays'])[layout['assay'][on_plate]], " / "),
+                                 np.array(layout['samples'] + ["NTC"])[layout['sample'][on_plate]])
+            grid[layout['row'][on_plate], layout['col'][on_plate]] = labels
+            st.dataframe(pd.DataFrame(grid, index=[chr(ord('A') + i) for i in range(n_rows)],
+                                      columns=[str(c + 1) for c in range(n_cols)]),
+                         use_container_width=True)
+            
+            plate_worklist = plan['worklist'][plan['worklist']['plate'] == plate_choice]
+            st.dataframe(plate_worklist, use_container_width=True, hide_index=True)
+            st.download_button(f"⬇️ Download Plate {plate_choice} Worklist", plate_worklist.to_csv(index=False),
+                               f"worklist_plate{plate_choice}_{datetime.now().strftime('%Y%m%d')}.csv", "text/csv")
+    
+    with tab4:
+        st.markdown("### 📉 Raw Amplification Curve Analysis")
+        st.markdown("*Baseline correction and Ct calling from raw fluorescence exports*")
+        
+        curve_file = st.file_uploader(
+            "Upload fluorescence data (CSV: well + one column per cycle, or well/cycle/fluorescence)",
+            type=["csv", "txt"],
+            key="amp_curve_upload"
+        )
+        
+        col_amp1, col_amp2, col_amp3 = st.columns(3)
+        
+        with col_amp1:
+            ct_method = st.selectbox("Ct Calling Method", ["Threshold", "Second Derivative Maximum"])
+            auto_threshold = st.checkbox("Automatic threshold (10× baseline noise)", value=True)
+            manual_threshold = st.number_input("Manual Threshold (ΔRn)", min_value=0.0, value=0.2, step=0.01,
+                                               disabled=auto_threshold)
+        
+        with col_amp2:
+            baseline_start = st.number_input("Baseline Start Cycle", min_value=1, value=3)
+            baseline_end = st.number_input("Baseline End Cycle", min_value=4, value=15)
+        
+        with col_amp3:
+            min_snr = st.number_input("Minimum Signal/Noise", min_value=1.0, value=10.0)
+            efficiency_window = st.number_input("Efficiency Window (cycles)", min_value=3, max_value=10, value=5,
+                                                help="Points in the log-linear window used for per-well efficiency")
+        
+        if curve_file is not None and st.button("📉 Process Curves", use_container_width=True):
+            try:
+                wells, cycles, fluorescence = AmplificationCurveAnalyzer.load_fluorescence_table(
+                    pd.read_csv(curve_file)
+                )
+                
+                analysis = AmplificationCurveAnalyzer.analyze_plate(
+                    wells, cycles, fluorescence,
+                    method="threshold" if ct_method == "Threshold" else "second_derivative",
+                    threshold=None if auto_threshold else manual_threshold,
+                    baseline_start=baseline_start, baseline_end=baseline_end,
+                    min_snr=min_snr, efficiency_window=efficiency_window
+                )
+                
+                st.session_state.amplification_analysis = {
+                    'wells': wells,
+                    'cycles': cycles,
+                    'fluorescence': fluorescence,
+                    **analysis
+                }
+                
+                add_to_history(
+                    "Amplification Curve Analysis",
+                    {'wells': len(wells), 'cycles': len(cycles), 'method': ct_method},
+                    {'threshold': analysis['threshold'],
+                     'wells_with_ct': int(analysis['results']['ct'].notna().sum())}
+                )
+            except Exception as e:
+                st.error(f"Curve processing error: {str(e)}")
+        
+        if 'amplification_analysis' in st.session_state:
+            analysis = st.session_state.amplification_analysis
+            results = analysis['results']
+            
+            n_called = int(results['ct'].notna().sum())
+            flag_counts = results['qc_flag'].value_counts()
+            
+            st.markdown(f"""
+            <div class="pcr-box">
+                <h4>✅ Plate Summary ({len(results)} wells × {len(analysis['cycles'])} cycles)</h4>
+                <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(150px, 1fr)); gap: 1rem;">
+                    <div class="metric-card">
+                        <h5>Ct Calling</h5>
+                        <p><strong>Method:</strong> {analysis['method'].replace('_', ' ').title()}</p>
+                        <p><strong>Threshold:</strong> {analysis['threshold']:.4f}</p>
+                        <p><strong>Wells with Ct:</strong> {n_called}</p>
+                    </div>
+                    <div class="metric-card">
+                        <h5>QC Flags</h5>
+                        <p><strong>OK:</strong> {flag_counts.get('OK', 0)}</p>
+                        <p><strong>No plateau:</strong> {flag_counts.get('No plateau', 0)}</p>
+                        <p><strong>Noisy:</strong> {flag_counts.get('Noisy', 0)}</p>
+                        <p><strong>No amplification:</strong> {flag_counts.get('No amplification', 0)}</p>
+                    </div>
+                </div>
+            </div>
+            """, unsafe_allow_html=True)
+            
+            st.dataframe(results, use_container_width=True, hide_index=True)
+            
+            st.download_button(
+                "⬇️ Download Ct Table",
+                results.to_csv(index=False),
+                f"ct_results_{datetime.now().strftime('%Y%m%d')}.csv",
+                "text/csv"
+            )
+            
+            plot_wells = st.multiselect("Plot corrected curves for wells", list(results['well']),
+                                        default=list(results['well'][:8]))
+            if plot_wells:
+                well_index = {w: i for i, w in enumerate(results['well'])}
+                curves_df = pd.DataFrame(
+                    analysis['corrected'][[well_index[w] for w in plot_wells]].T,
+                    index=analysis['cycles'], columns=plot_wells
+                )
+                st.line_chart(curves_df)
+            
+            # Hand the called Ct values to the existing quantification calculators
+            st.markdown("#### 🔄 Relative Quantification from Called Ct Values")
+            
+            called_wells = list(results.loc[results['ct'].notna(), 'well'])
+            
+            with st.form("curve_relative_quant_form"):
+                col_rq1, col_rq2 = st.columns(2)
+                
+                with col_rq1:
+                    target_wells = st.multiselect("Sample - Target Gene Wells", called_wells)
+                    reference_wells = st.multiselect("Sample - Reference Gene Wells", called_wells)
+                
+                with col_rq2:
+                    control_target_wells = st.multiselect("Control - Target Gene Wells", called_wells)
+                    control_reference_wells = st.multiselect("Control - Reference Gene Wells", called_wells)
+                
+                use_well_efficiency = st.checkbox(
+                    "Use per-gene mean efficiencies from the curves (Pfaffl Method)", value=True
+                )
+                
+                if st.form_submit_button("🧪 Calculate Relative Expression", use_container_width=True):
+                    try:
+                        if use_well_efficiency:
+                            eff_target = AmplificationCurveAnalyzer.mean_efficiency(
+                                results, target_wells + control_target_wells
+                            )
+                            eff_reference = AmplificationCurveAnalyzer.mean_efficiency(
+                                results, reference_wells + control_reference_wells
+                            )
+                        else:
+                            eff_target = eff_reference = 100.0
+                        
+                        rq = PCRCalculators.calculate_copy_number_relative(
+                            AmplificationCurveAnalyzer.mean_ct(results, target_wells),
+                            AmplificationCurveAnalyzer.mean_ct(results, reference_wells),
+                            AmplificationCurveAnalyzer.mean_ct(results, control_target_wells),
+                            AmplificationCurveAnalyzer.mean_ct(results, control_reference_wells),
+                            eff_target, eff_reference
+                        )
+                        
+                        st.success(f"Fold change: {rq['fold_change']:.2f}× "
+                                   f"(ΔΔCt = {rq['delta_delta_ct']:.2f}, log₂ = {rq['log2_fold_change']:.2f})")
+                        if use_well_efficiency:
+                            st.info(f"Efficiencies used - Target: {eff_target:.1f}%, Reference: {eff_reference:.1f}%")
+                    except Exception as e:
+                        st.error(f"Calculation error: {str(e)}")
+    
+    with tab5:
+        st.markdown("### 🌡️ Melt Curve Analysis")
+        st.markdown("*−dF/dT peak detection for product specificity*")
+        
+        melt_file = st.file_uploader(
+            "Upload melt data (CSV: well + one column per temperature, or well/temperature/fluorescence)",
+            type=["csv", "txt"],
+            key="melt_curve_upload"
+        )
+        
+        col_melt1, col_melt2, col_melt3 = st.columns(3)
+        
+        with col_melt1:
+            smoothing_c = st.number_input("Smoothing Width (°C)", min_value=0.0, max_value=5.0, value=0.5, step=0.1)
+            min_height_fraction = st.slider("Minimum Peak Height (% of main peak)", 5, 50, 10)
+        
+        with col_melt2:
+            dimer_tm_gap = st.number_input("Primer-Dimer Tm Gap (°C)", min_value=1.0, value=5.0, step=0.5,
+                                           help="Secondary peaks this far below the main Tm are called primer dimers")
+        
+        with col_melt3:
+            check_expected_tm = st.checkbox("Check against expected Tm")
+            expected_tm = st.number_input("Expected Product Tm (°C)", value=82.0, step=0.1,
+                                          disabled=not check_expected_tm)
+            tm_tolerance = st.number_input("Tm Tolerance (± °C)", min_value=0.1, value=1.5, step=0.1,
+                                           disabled=not check_expected_tm)
+        
+        if melt_file is not None and st.button("🌡️ Analyze Melt Curves", use_container_width=True):
+            try:
+                wells, temperatures, fluorescence = MeltCurveAnalyzer.load_melt_table(pd.read_csv(melt_file))
+                
+                melt = MeltCurveAnalyzer.analyze_plate(
+                    wells, temperatures, fluorescence,
+                    smoothing_c=smoothing_c,
+                    min_height_fraction=min_height_fraction / 100,
+                    dimer_tm_gap=dimer_tm_gap,
+                    expected_tm=expected_tm if check_expected_tm else None,
+                    tm_tolerance=tm_tolerance
+                )
+                
+                st.session_state.melt_analysis = {'temperatures': temperatures, **melt}
+                
+                add_to_history(
+                    "Melt Curve Analysis",
+                    {'wells': len(wells), 'temperature_points': len(temperatures)},
+                    {'single_product': int((melt['results']['melt_flag'] == "Single product").sum())}
+                )
+            except Exception as e:
+                st.error(f"Melt analysis error: {str(e)}")
+        
+        if 'melt_analysis' in st.session_state:
+            melt = st.session_state.melt_analysis
+            melt_results = melt['results']
+            
+            flag_counts = melt_results['melt_flag'].value_counts()
+            
+            st.markdown(f"""
+            <div class="pcr-box">
+                <h4>✅ Melt Summary ({len(melt_results)} wells)</h4>
+                <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(150px, 1fr)); gap: 1rem;">
+                    <div class="metric-card">
+                        <h5>Tm Distribution</h5>
+                        <p><strong>Median Tm:</strong> {melt_results['tm'].median():.2f}°C</p>
+                        <p><strong>Tm SD:</strong> {melt_results['tm'].std():.2f}°C</p>
+                    </div>
+                    <div class="metric-card">
+                        <h5>Specificity</h5>
+                        <p><strong>Single product:</strong> {flag_counts.get('Single product', 0)}</p>
+                        <p><strong>Primer dimer:</strong> {flag_counts.get('Primer dimer', 0)}</p>
+                        <p><strong>Multiple products:</strong> {flag_counts.get('Multiple products', 0)}</p>
+                        <p><strong>Unexpected Tm / No peak:</strong> {flag_counts.get('Unexpected Tm', 0) + flag_counts.get('No peak', 0)}</p>
+                    </div>
+                </div>
+            </div>
+            """, unsafe_allow_html=True)
+            
+            if 'amplification_analysis' in st.session_state:
+                st.markdown("#### 🔗 Ct Table with Melt Calls")
+                display_results = MeltCurveAnalyzer.join_with_ct(
+                    melt_results, st.session_state.amplification_analysis['results']
+                )
+            else:
+                st.info("Process amplification curves in the previous tab to join melt calls to Ct values")
+                display_results = melt_results
+            
+            st.dataframe(display_results, use_container_width=True, hide_index=True)
+            
+            st.download_button(
+                "⬇️ Download Melt Results",
+                display_results.to_csv(index=False),
+                f"melt_results_{datetime.now().strftime('%Y%m%d')}.csv",
+                "text/csv"
+            )
+            
+            plot_wells = st.multiselect("Plot −dF/dT for wells", list(melt_results['well']),
+                                        default=list(melt_results['well'][:8]), key="melt_plot_wells")
+            if plot_wells:
+                well_index = {w: i for i, w in enumerate(melt_results['well'])}
+                derivative_df = pd.DataFrame(
+                    melt['neg_derivative'][[well_index[w] for w in plot_wells]].T,
+                    index=melt['temperatures'], columns=plot_wells
+                )
+                st.line_chart(derivative_df)
+    
+    with tab6:
+        st.markdown("### 🔍 In-Silico PCR & Primer Specificity")
+        st.markdown("*Offline off-target search against a local genome FASTA*")
+        
+        col_is1, col_is2 = st.columns([2, 1])
+        
+        with col_is1:
+            genome_path = st.text_input("Genome FASTA in the data directory (.fa, .fasta, optionally .gz)",
+                                        placeholder="genomes/ecoli_k12.fa.gz", help=f"Data directory: {DATA_DIR}")
+        
+        with col_is2:
+            kmer_size = st.number_input("Index k-mer Size", min_value=8, max_value=12, value=11)
+        
+        if genome_path:
+            try:
+                genome_path = resolve_data_path(genome_path)
+            except ValueError as e:
+                st.error(str(e))
+                genome_path = None
+        
+        if genome_path:
+            index_dir = GenomeIndex.default_index_dir(genome_path)
+            
+            if not os.path.exists(genome_path):
+                st.error("Genome file not found")
+            else:
+                if GenomeIndex.is_current(genome_path, index_dir):
+                    st.success(f"✅ Index ready: {index_dir}")
+                else:
+                    st.info("No up-to-date index found. Building it reads the genome once; later runs map it from disk.")
                 
-                # Assume standard components
-                buffer_vol = total_volume * 0.1  # 1x final from 10x stock
-                dntp_vol = total_volume * 0.02   # 200μM final from 10mM stock
-                template_vol_per_rxn = 1.0       # 1μL per reaction
-                water_vol = total_volume - (polymerase_vol + primer_fwd_vol + primer_rev_vol + buffer_vol + dntp_vol)
+                if st.button("🗂️ Build / Rebuild Index"):
+                    try:
+                        with st.spinner("Indexing genome..."):
+                            meta = GenomeIndex.build(genome_path, index_dir, k=kmer_size)
+                        st.success(f"✅ Indexed {len(meta['contigs'])} contigs, {meta['total_length']:,} bp")
+                    except Exception as e:
+                        st.error(str(e))
                 
-                st.markdown(f"""
-                <div class="pcr-box">
-                    <h4>PCR Master Mix Setup</h4>
-                    <p><strong>For {num_reactions} reactions + {extra_percent}% extra = {total_reactions:.1f} reactions</strong></p>
+                with st.form("in_silico_pcr_form"):
+                    pairs_text = st.text_area(
+                        "Primer pairs: name, forward (5'→3'), reverse (5'→3') - one pair per line",
+                        height=120
+                    )
                     
-                    <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 2rem;">
-                        <div>
-                            <h5>Master Mix Components</h5>
-                            <p><strong>10× Buffer:</strong> {buffer_vol:.1f} μL</p>
-                            <p><strong>dNTPs (10mM):</strong> {dntp_vol:.1f} μL</p>
-                            <p><strong>Forward Primer:</strong> {primer_fwd_vol:.1f} μL</p>
-                            <p><strong>Reverse Primer:</strong> {primer_rev_vol:.1f} μL</p>
-                            <p><strong>Polymerase:</strong> {polymerase_vol:.1f} μL</p>
-                            <p><strong>Water:</strong> {water_vol:.1f} μL</p>
-                        </div>
-                        <div>
-                            <h5>Per Reaction</h5>
-                            <p><strong>Master Mix:</strong> {reaction_volume - template_vol_per_rxn:.1f} μL</p>
-                            <p><strong>Template:</strong> {template_vol_per_rxn:.1f} μL</p>
-                            <p><strong>Total:</strong> {reaction_volume:.1f} μL</p>
-                            <br>
-                            <p><strong>Total Master Mix:</strong> {total_volume - (total_reactions * template_vol_per_rxn):.1f} μL</p>
-                        </div>
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Protocol
-                st.markdown("### 📋 PCR Setup Protocol")
-                st.markdown(f"""
-**PCR Master Mix Preparation Protocol**
-
-1. **Prepare master mix** in the following order:
-   - Add water first: {water_vol:.1f} μL
-   - Add 10× Buffer: {buffer_vol:.1f} μL
-   - Add dNTPs: {dntp_vol:.1f} μL
-   - Add Forward primer: {primer_fwd_vol:.1f} μL
-   - Add Reverse primer: {primer_rev_vol:.1f} μL
-   - Add Polymerase last: {polymerase_vol:.1f} μL
-
-2. **Mix gently** by pipetting or brief vortex
-
-3. **Aliquot** {reaction_volume - template_vol_per_rxn:.1f} μL master mix per tube
-
-4. **Add** {template_vol_per_rxn:.1f} μL template to each tube
-
-5. **Mix and centrifuge** briefly before cycling
-                """)
+                    col_isp1, col_isp2, col_isp3 = st.columns(3)
+                    with col_isp1:
+                        max_mismatches = st.number_input("Max Mismatches per Primer", min_value=0, max_value=4, value=2)
+                    with col_isp2:
+                        min_amplicon = st.number_input("Min Amplicon (bp)", min_value=20, value=50)
+                    with col_isp3:
+                        max_amplicon = st.number_input("Max Amplicon (bp)", min_value=50, value=3000)
+                    
+                    if st.form_submit_button("🔍 Run In-Silico PCR", use_container_width=True):
+                        try:
+                            if not GenomeIndex.is_current(genome_path, index_dir):
+                                raise ValueError("Build the genome index first")
+                            
+                            rows = [[x.strip() for x in line.split(',')] for line in pairs_text.strip().split('\n')
+                                    if line.strip()]
+                            pairs = pd.DataFrame(rows, columns=['name', 'forward', 'reverse'])
+                            
+                            with st.spinner(f"Searching {len(pairs)} primer pairs..."):
+                                specificity = GenomeIndex.run_pairs(index_dir, pairs, max_mismatches,
+                                                                    min_amplicon, max_amplicon)
+                            
+                            st.markdown("#### Specificity Summary")
+                            st.dataframe(specificity['summary'], use_container_width=True, hide_index=True)
+                            
+                            st.markdown("#### Predicted Amplicons")
+                            st.dataframe(specificity['amplicons'], use_container_width=True, hide_index=True)
+                            
+                            non_specific = specificity['summary'][~specificity['summary']['specific']]
+                            for pair in non_specific['pair']:
+                                st.warning(f"⚠️ {pair}: does not give exactly one predicted product")
+                            
+                            add_to_history(
+                                "In-Silico PCR",
+                                {'genome': os.path.basename(genome_path), 'pairs': len(pairs),
+                                 'max_mismatches': max_mismatches},
+                                {'specific_pairs': int(specificity['summary']['specific'].sum())}
+                            )
+                        except Exception as e:
+                            st.error(f"In-silico PCR error: {str(e)}")
     
     st.markdown('</div>', unsafe_allow_html=True)
 
@@ -2457,7 +7843,8 @@ def data_analysis_suite():
     st.header("📊 Data Analysis Suite")
     st.markdown("*Statistical analysis and data visualization for laboratory results*")
     
-    tab1, tab2, tab3 = st.tabs(["📈 Basic Statistics", "🎯 Quality Control", "📊 Data Visualization"])
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["📈 Basic Statistics", "🎯 Quality Control", "📊 Data Visualization",
+                                            "🧪 Hypothesis Tests", "📉 Dose-Response (4PL/5PL)"])
     
     with tab1:
         st.markdown("### 📈 Basic Statistical Analysis")
@@ -2466,9 +7853,63 @@ def data_analysis_suite():
         
         with col1:
             # Data input
-            data_input_method = st.radio("Data Input Method", ["Manual Entry", "Paste Data"])
+            data_input_method = st.radio("Data Input Method", ["Manual Entry", "Paste Data", "Large File (CSV/Parquet)"])
+            
+            if data_input_method == "Large File (CSV/Parquet)":
+                file_source = st.radio("Source", ["Upload", "Local File Path"], horizontal=True)
+                if file_source == "Upload":
+                    stats_file = st.file_uploader("Data file", type=["csv", "parquet", "pq", "gz"],
+                                                  key="streaming_stats_upload")
+                else:
+                    stats_path = st.text_input("CSV/Parquet file in the data directory (read in chunks, never fully loaded)",
+                                               placeholder="instrument_dump.csv", help=f"Data directory: {DATA_DIR}")
+                    stats_file = None
+                    if stats_path.strip():
+                        try:
+                            stats_file = resolve_data_path(stats_path)
+                            if not os.path.exists(stats_file):
+                                st.error("File not found")
+                                stats_file = None
+                        except ValueError as e:
+                            st.error(str(e))
+                
+                col_ss1, col_ss2 = st.columns(2)
+                with col_ss1:
+                    stats_columns = st.text_input("Columns (comma separated, blank = all numeric)")
+                with col_ss2:
+                    stats_chunksize = st.number_input("Rows per Chunk", min_value=10_000, value=250_000, step=50_000)
+                
+                if stats_file is not None and st.button("📊 Analyze File", use_container_width=True):
+                    try:
+                        progress_text = st.empty()
+                        summary = StreamingStatistics.summarize(
+                            stats_file,
+                            columns=[c.strip() for c in stats_columns.split(',') if c.strip()] or None,
+                            chunksize=int(stats_chunksize),
+                            progress_callback=lambda rows: progress_text.text(f"Processed {rows:,} rows...")
+                        )
+                        progress_text.empty()
+                        
+                        st.success(f"✅ Summarized {len(summary)} columns over "
+                                   f"{int((summary['count'] + summary['missing']).max()):,} rows in one pass")
+                        st.dataframe(summary, use_container_width=True, hide_index=True)
+                        st.caption("Moments are exact; percentiles are t-digest approximations.")
+                        st.download_button(
+                            "⬇️ Download Summary",
+                            summary.to_csv(index=False),
+                            f"column_summary_{datetime.now().strftime('%Y%m%d')}.csv",
+                            "text/csv"
+                        )
+                        
+                        add_to_history(
+                            "Statistical Analysis",
+                            {'columns': len(summary), 'data_type': 'file'},
+                            {'rows': int((summary['count'] + summary['missing']).max())}
+                        )
+                    except Exception as e:
+                        st.error(str(e))
             
-            if data_input_method == "Manual Entry":
+            elif data_input_method == "Manual Entry":
                 data_input = st.text_area(
                     "Enter data (one value per line)",
                     value="0.245\n0.251\n0.248\n0.252\n0.247\n0.250\n0.249",
@@ -2481,7 +7922,11 @@ def data_analysis_suite():
                     height=150
                 )
             
-            if st.button("📊 Analyze Data", use_container_width=True):
+            if data_input_method != "Large File (CSV/Parquet)":
+                outlier_method = st.selectbox("Outlier Test", list(OutlierDetector.METHODS),
+                                              format_func=OutlierDetector.METHODS.get, index=3)
+            
+            if data_input_method != "Large File (CSV/Parquet)" and st.button("📊 Analyze Data", use_container_width=True):
                 try:
                     # Parse data
                     if data_input_method == "Manual Entry":
@@ -2576,16 +8021,16 @@ def data_analysis_suite():
                         
                         quality_metrics.append(["Sample Size", f"n = {n}", sample_size, size_color])
                         
-                        # Outlier detection (simple Z-score method)
-                        outliers = []
-                        for i, value in enumerate(data):
-                            z_score = abs(value - mean_val) / std_val
-                            if z_score > 2.5:  # Common threshold for outliers
-                                outliers.append((i+1, value, z_score))
+                        # Outlier detection
+                        screened = OutlierDetector.detect(pd.DataFrame({'value': data}), 'value',
+                                                          method=outlier_method)
+                        outliers = [(i + 1, value, score) for i, (value, score, flag) in enumerate(
+                            zip(data, screened['outlier_score'], screened['is_outlier'])) if flag]
                         
                         outlier_status = "None Detected" if not outliers else f"{len(outliers)} Detected"
                         outlier_color = "green" if not outliers else "orange"
-                        quality_metrics.append(["Outliers", outlier_status, f"Z > 2.5", outlier_color])
+                        quality_metrics.append(["Outliers", outlier_status, OutlierDetector.METHODS[outlier_method],
+                                                outlier_color])
                         
                         # Display quality metrics
                         for metric, value, status, color in quality_metrics:
@@ -2594,17 +8039,19 @@ def data_analysis_suite():
                         # Show outliers if any
                         if outliers:
                             st.markdown("**Potential Outliers:**")
-                            for position, value, z_score in outliers:
-                                st.warning(f"Position {position}: {value:.4f} (Z-score: {z_score:.2f})")
+                            for position, value, score in outliers:
+                                st.warning(f"Position {position}: {value:.4f} (test statistic: {score:.2f})")
                         
                         # Raw data display
                         st.markdown("### 📋 Data Summary")
                         
+                        values = np.asarray(data)
                         data_df = pd.DataFrame({
                             'Index': range(1, len(data) + 1),
-                            'Value': data,
-                            'Deviation from Mean': [x - mean_val for x in data],
-                            'Z-Score': [(x - mean_val) / std_val for x in data]
+                            'Value': values,
+                            'Deviation from Mean': values - mean_val,
+                            'Z-Score': (values - mean_val) / std_val,
+                            'Outlier': screened['is_outlier'].to_numpy()
                         })
                         
                         st.dataframe(data_df, use_container_width=True, hide_index=True)
@@ -2664,7 +8111,11 @@ def data_analysis_suite():
         qc_analysis_type = st.selectbox("QC Analysis Type", [
             "Control Chart Analysis",
             "Method Validation",
-            "Measurement Uncertainty"
+            "Measurement Uncertainty",
+            "Outlier Screening",
+            "Westgard QC Log",
+            "Drift Monitoring (CUSUM/EWMA)",
+            "Monte Carlo Uncertainty (GUM S1)"
         ])
         
         if qc_analysis_type == "Control Chart Analysis":
@@ -2742,11 +8193,15 @@ def data_analysis_suite():
                         """)
                         
                         # Data table with flags
+                        westgard, _ = WestgardRules.evaluate_series(
+                            data, WestgardRules.initial_state(target_value, std_val)
+                        )
                         chart_df = pd.DataFrame({
                             'Measurement': range(1, len(data) + 1),
                             'Value': data,
                             'Status': ['OOC' if (i+1, val) in out_of_control else 'Warning' if (i+1, val) in warnings else 'OK' 
-                                     for i, val in enumerate(data)]
+                                     for i, val in enumerate(data)],
+                            'Westgard': westgard['violations'].values
                         })
                         
                         st.dataframe(chart_df, use_container_width=True, hide_index=True)
@@ -2825,6 +8280,378 @@ def data_analysis_suite():
                         
                 except Exception as e:
                     st.error(f"Validation error: {str(e)}")
+            
+            st.markdown("---")
+            st.markdown("#### 📂 Validation Study (long-format data)")
+            st.markdown("*Nested-ANOVA repeatability/intermediate precision, linearity, recovery and LOD/LOQ*")
+            
+            study_file = st.file_uploader("CSV or Parquet with one row per measurement (e.g. level, instrument, analyst, day, value)",
+                                          type=["csv", "parquet"], key="validation_study_upload")
+            
+            if study_file is not None:
+                try:
+                    study = (pd.read_parquet(study_file) if study_file.name.lower().endswith(".parquet")
+                             else pd.read_csv(study_file))
+                    numeric_columns = list(study.select_dtypes(include='number').columns)
+                    
+                    col_vs1, col_vs2 = st.columns(2)
+                    with col_vs1:
+                        study_value = st.selectbox("Measured Value Column", numeric_columns,
+                                                   index=len(numeric_columns) - 1 if numeric_columns else 0)
+                        study_nominal = st.selectbox("Nominal / Spiked Concentration Column",
+                                                     ["(none)"] + [c for c in numeric_columns if c != study_value])
+                    with col_vs2:
+                        study_factors = st.multiselect(
+                            "Nested Factors (outermost first)",
+                            [c for c in study.columns if c not in (study_value, study_nominal)],
+                            default=[c for c in ("instrument", "analyst", "day") if c in study.columns]
+                        )
+                        study_confidence = st.selectbox("Confidence Level", [0.90, 0.95, 0.99], index=1,
+                                                        key="validation_confidence")
+                    
+                    if st.button("📊 Evaluate Validation Study", use_container_width=True):
+                        level_column = None if study_nominal == "(none)" else study_nominal
+                        
+                        if study_factors:
+                            precision_summary, precision_components = MethodValidation.precision(
+                                study, study_value, study_factors, level_column
+                            )
+                            st.markdown("**Precision (per level):**")
+                            st.dataframe(precision_summary, use_container_width=True, hide_index=True)
+                            st.markdown("**Variance Components:**")
+                            st.dataframe(precision_components, use_container_width=True, hide_index=True)
+                        
+                        if level_column:
+                            fit = MethodValidation.linearity(study[level_column], study[study_value], study_confidence)
+                            limits = MethodValidation.detection_limits(study[level_column], study[study_value])
+                            lof_text = (f"F = {fit['lack_of_fit_f']:.2f}, p = {fit['lack_of_fit_p']:.4f}"
+                                        if np.isfinite(fit['lack_of_fit_p']) else "n/a (no replicates)")
+                            st.markdown(f"""
+                            <div class="result-box">
+                                <h4>✅ Linearity & Detection Limits</h4>
+                                <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(180px, 1fr)); gap: 1rem;">
+                                    <div class="metric-card">
+                                        <h5>Linearity</h5>
+                                        <p><strong>{fit['equation']}</strong></p>
+                                        <p><strong>R²:</strong> {fit['r_squared']:.5f}</p>
+                                        <p><strong>Slope CI:</strong> {fit['slope_ci'][0]:.4f} – {fit['slope_ci'][1]:.4f}</p>
+                                        <p><strong>Lack of fit:</strong> {lof_text}</p>
+                                    </div>
+                                    <div class="metric-card">
+                                        <h5>LOD / LOQ (calibration)</h5>
+                                        <p><strong>LOD:</strong> {limits['lod']:.4g}</p>
+                                        <p><strong>LOQ:</strong> {limits['loq']:.4g}</p>
+                                        <p><strong>s(y/x):</strong> {limits['residual_sd']:.4g}</p>
+                                    </div>
+                                    <div class="metric-card">
+                                        <h5>LOD / LOQ (blanks)</h5>
+                                        <p><strong>LOD:</strong> {limits['lod_blank']:.4g}</p>
+                                        <p><strong>LOQ:</strong> {limits['loq_blank']:.4g}</p>
+                                        <p><strong>Blanks:</strong> {limits['n_blanks']}</p>
+                                    </div>
+                                </div>
+                            </div>
+                            """, unsafe_allow_html=True)
+                            
+                            st.markdown("**Calibration Levels:**")
+                            st.dataframe(fit['levels'], use_container_width=True, hide_index=True)
+                            st.markdown("**Accuracy / Recovery:**")
+                            st.dataframe(MethodValidation.recovery(study[level_column], study[study_value], study_confidence),
+                                         use_container_width=True, hide_index=True)
+                        
+                        add_to_history(
+                            "Method Validation Study",
+                            {'rows': len(study), 'factors': ", ".join(study_factors), 'nominal': study_nominal},
+                            {'levels': int(study[level_column].nunique()) if level_column else 1}
+                        )
+                except Exception as e:
+                    st.error(f"Validation study error: {str(e)}")
+        
+        elif qc_analysis_type == "Outlier Screening":
+            st.markdown("#### Grouped Outlier Screening")
+            st.markdown("*Run one outlier test within every group (e.g. per analyte, per plate)*")
+            
+            outlier_file = st.file_uploader("Data CSV", type=["csv"], key="outlier_screen_upload")
+            
+            if outlier_file is not None:
+                try:
+                    screen_data = pd.read_csv(outlier_file)
+                    numeric_columns = list(screen_data.select_dtypes(include='number').columns)
+                    
+                    col_os1, col_os2 = st.columns(2)
+                    with col_os1:
+                        screen_value = st.selectbox("Value Column", numeric_columns)
+                        screen_groups = st.multiselect("Group By", [c for c in screen_data.columns if c != screen_value])
+                    with col_os2:
+                        screen_method = st.selectbox("Test", list(OutlierDetector.METHODS),
+                                                     format_func=OutlierDetector.METHODS.get)
+                        screen_alpha = st.selectbox("Significance (α)", [0.10, 0.05, 0.01], index=1)
+                        screen_max = st.number_input("Max Outliers per Group (GESD, 0 = 10% of n)", min_value=0, value=0)
+                    
+                    if st.button("🔎 Screen for Outliers"):
+                        screened = OutlierDetector.detect(screen_data, screen_value, screen_groups,
+                                                          method=screen_method, alpha=screen_alpha,
+                                                          max_outliers=screen_max or None)
+                        n_flagged = int(screened['is_outlier'].sum())
+                        st.success(f"✅ {n_flagged:,} of {len(screened):,} values flagged")
+                        
+                        if screen_groups:
+                            st.dataframe(screened.groupby(screen_groups, dropna=False)
+                                         .agg(n=(screen_value, 'count'), outliers=('is_outlier', 'sum'))
+                                         .reset_index(), use_container_width=True, hide_index=True)
+                        st.dataframe(screened[screened['is_outlier']], use_container_width=True, hide_index=True)
+                        st.download_button(
+                            "⬇️ Download Flagged Data",
+                            screened.to_csv(index=False),
+                            f"outlier_screen_{datetime.now().strftime('%Y%m%d')}.csv",
+                            "text/csv"
+                        )
+                except Exception as e:
+                    st.error(str(e))
+        
+        elif qc_analysis_type == "Westgard QC Log":
+            st.markdown("#### Westgard Multi-Rule QC Log")
+            st.markdown("*Persistent per-analyte/level control series evaluated as each result arrives*")
+            
+            try:
+                qc_store = QCStore()
+                qc_series = qc_store.series()
+            except Exception as e:
+                st.error(f"QC store error: {str(e)}")
+                qc_store, qc_series = None, pd.DataFrame()
+            
+            if qc_store is not None:
+                with st.expander("➕ Define / Reset Control Series", expanded=qc_series.empty):
+                    with st.form("westgard_target_form"):
+                        col_wg1, col_wg2, col_wg3, col_wg4 = st.columns(4)
+                        with col_wg1:
+                            wg_analyte = st.text_input("Analyte", placeholder="Glucose")
+                        with col_wg2:
+                            wg_level = st.text_input("Control Level", value="Level 1")
+                        with col_wg3:
+                            wg_mean = st.number_input("Target Mean", value=100.0, format="%.4f")
+                        with col_wg4:
+                            wg_sd = st.number_input("Target SD", min_value=0.0001, value=2.0, format="%.4f")
+                        wg_rules = st.multiselect("Rules", list(WestgardRules.RULES),
+                                                  default=list(WestgardRules.DEFAULT_RULES))
+                        
+                        if st.form_submit_button("Save Series"):
+                            if wg_analyte.strip():
+                                qc_store.set_target(wg_analyte.strip(), wg_level.strip(), wg_mean, wg_sd, wg_rules)
+                                st.success(f"Saved {wg_analyte} / {wg_level}")
+                                qc_series = qc_store.series()
+                            else:
+                                st.error("Analyte name is required")
+                
+                if not qc_series.empty:
+                    st.dataframe(qc_series, use_container_width=True, hide_index=True)
+                    
+                    series_labels = [f"{a} / {l}" for a, l in zip(qc_series['analyte'], qc_series['level'])]
+                    wg_choice = st.selectbox("Control Series", series_labels)
+                    wg_analyte, wg_level = qc_series.iloc[series_labels.index(wg_choice)][['analyte', 'level']]
+                    
+                    with st.form("westgard_points_form"):
+                        wg_values = st.text_area("New results (one per line; optionally 'timestamp, value')", height=100)
+                        
+                        if st.form_submit_button("Evaluate and Save"):
+                            try:
+                                lines = [line.strip() for line in wg_values.splitlines() if line.strip()]
+                                parts = [line.rsplit(',', 1) for line in lines]
+                                values = [float(p[-1]) for p in parts]
+                                timestamps = [p[0].strip() if len(p) == 2 else datetime.now().isoformat() for p in parts]
+                                
+                                evaluated = qc_store.add_points(wg_analyte, wg_level, values, timestamps)
+                                st.dataframe(evaluated, use_container_width=True, hide_index=True)
+                                
+                                rejected = evaluated[evaluated['status'] == "Reject"]
+                                if not rejected.empty:
+                                    st.error(f"🔴 Run rejected: {'; '.join(rejected['violations'].unique())}")
+                                elif (evaluated['status'] == "Warning").any():
+                                    st.warning("🟡 1-2s warning - check the other rules before accepting the run")
+                                else:
+                                    st.success("🟢 In control")
+                            except Exception as e:
+                                st.error(f"Evaluation error: {str(e)}")
+                    
+                    wg_history = qc_store.history(wg_analyte, wg_level)
+                    if not wg_history.empty:
+                        st.markdown("**Levey-Jennings (z-score):**")
+                        st.line_chart(wg_history.set_index('measured_at')['z_score'])
+                        st.dataframe(wg_history[wg_history['violations'] != ""].tail(50),
+                                     use_container_width=True, hide_index=True)
+        
+        elif qc_analysis_type == "Drift Monitoring (CUSUM/EWMA)":
+            st.markdown("#### CUSUM & EWMA Drift Monitoring")
+            st.markdown("*Detect small sustained shifts (balance, pH meter drift) that ±3σ Shewhart limits miss*")
+            
+            drift_source = st.radio("Data Source", ["Paste Values", "CSV File"], horizontal=True)
+            drift_values = None
+            if drift_source == "Paste Values":
+                drift_text = st.text_area("Check-standard readings (one per line)", height=150,
+                                          value="\n".join(f"{10 + 0.01 * ((i * 7) % 5 - 2) + (0.012 * (i - 20) if i > 20 else 0):.3f}"
+                                                          for i in range(40)))
+                drift_values = np.array([float(x) for x in drift_text.split() if x.strip()])
+            else:
+                drift_file = st.file_uploader("CSV with a column of readings", type=["csv"], key="drift_upload")
+                if drift_file is not None:
+                    drift_frame = pd.read_csv(drift_file)
+                    drift_column = st.selectbox("Reading Column", list(drift_frame.select_dtypes(include='number').columns))
+                    drift_values = drift_frame[drift_column].to_numpy(dtype=float)
+            
+            col_dm1, col_dm2, col_dm3 = st.columns(3)
+            with col_dm1:
+                drift_target = st.number_input("Target (0 = mean of baseline)", value=0.0, format="%.4f")
+                drift_sigma = st.number_input("Sigma (0 = estimate from baseline)", min_value=0.0, value=0.0, format="%.4f")
+                drift_baseline = st.number_input("Baseline Points", min_value=2, value=20)
+            with col_dm2:
+                drift_k = st.number_input("CUSUM k (σ)", min_value=0.0, value=0.5, step=0.25)
+                drift_h = st.number_input("CUSUM h (σ)", min_value=0.5, value=5.0, step=0.5)
+            with col_dm3:
+                drift_lambda = st.number_input("EWMA λ", min_value=0.01, max_value=1.0, value=0.2, step=0.05)
+                drift_L = st.number_input("EWMA L (σ)", min_value=0.5, value=3.0, step=0.1)
+            
+            if drift_values is not None and st.button("📉 Run Drift Monitors"):
+                try:
+                    baseline = drift_values[:int(drift_baseline)]
+                    target = drift_target or float(np.nanmean(baseline))
+                    sigma = drift_sigma or DriftMonitor.estimate_sigma(baseline)
+                    drift_result, drift_state = DriftMonitor.evaluate(
+                        drift_values, DriftMonitor.initial_state(target, sigma),
+                        k=drift_k, h=drift_h, lam=drift_lambda, L=drift_L
+                    )
+                    st.session_state.drift_monitor = {
+                        'result': drift_result, 'state': drift_state,
+                        'params': {'k': drift_k, 'h': drift_h, 'lam': drift_lambda, 'L': drift_L}
+                    }
+                except Exception as e:
+                    st.session_state.pop('drift_monitor', None)
+                    st.error(str(e))
+            
+            if 'drift_monitor' in st.session_state:
+                monitor = st.session_state.drift_monitor
+                
+                with st.form("drift_append_form"):
+                    new_readings = st.text_area("Append new readings (online update)", height=80)
+                    if st.form_submit_button("➕ Add Readings"):
+                        try:
+                            new_values = [float(x) for x in new_readings.split() if x.strip()]
+                            added, monitor['state'] = DriftMonitor.evaluate(new_values, monitor['state'],
+                                                                            **monitor['params'])
+                            monitor['result'] = pd.concat([monitor['result'], added], ignore_index=True)
+                            if added['alert_onset'].any():
+                                st.error(f"🔴 New drift alert at point(s) "
+                                         f"{', '.join(map(str, added.loc[added['alert_onset'], 'point']))}")
+                        except Exception as e:
+                            st.error(str(e))
+                
+                drift_result, drift_state = monitor['result'], monitor['state']
+                n_alerts = int(drift_result['alert_onset'].sum())
+                
+                st.markdown(f"""
+                <div class="result-box">
+                    <h4>{'🔴 Drift Detected' if n_alerts else '🟢 No Drift Detected'}</h4>
+                    <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(150px, 1fr)); gap: 1rem;">
+                        <div class="metric-card">
+                            <h5>Monitor</h5>
+                            <p><strong>Target:</strong> {drift_state['target']:.4f}</p>
+                            <p><strong>Sigma:</strong> {drift_state['sigma']:.4f}</p>
+                            <p><strong>Points:</strong> {drift_state['n']:,}</p>
+                        </div>
+                        <div class="metric-card">
+                            <h5>Current State</h5>
+                            <p><strong>CUSUM+:</strong> {drift_state['cusum_pos']:.2f}</p>
+                            <p><strong>CUSUM−:</strong> {drift_state['cusum_neg']:.2f}</p>
+                            <p><strong>EWMA:</strong> {drift_state['ewma']:.4f}</p>
+                        </div>
+                        <div class="metric-card">
+                            <h5>Alerts</h5>
+                            <p><strong>Alert Episodes:</strong> {n_alerts}</p>
+                            <p><strong>CUSUM Points:</strong> {int(drift_result['cusum_alert'].sum()):,}</p>
+                            <p><strong>EWMA Points:</strong> {int(drift_result['ewma_alert'].sum()):,}</p>
+                        </div>
+                    </div>
+                </div>
+                """, unsafe_allow_html=True)
+                
+                # Charts are thinned to keep rendering fast on long histories
+                step = max(1, len(drift_result) // 5000)
+                chart_data = drift_result.iloc[::step].set_index('point')
+                st.markdown("**CUSUM:**")
+                st.line_chart(chart_data[['cusum_pos', 'cusum_neg']])
+                st.markdown("**EWMA with control limits:**")
+                st.line_chart(chart_data[['ewma', 'ewma_lcl', 'ewma_ucl']])
+                
+                onsets = DriftMonitor.drift_onset(drift_result)
+                if not onsets.empty:
+                    st.markdown("**CUSUM alarms and estimated change points:**")
+                    st.dataframe(onsets, use_container_width=True, hide_index=True)
+                st.dataframe(drift_result[drift_result['alert_onset']], use_container_width=True, hide_index=True)
+        
+        elif qc_analysis_type == "Monte Carlo Uncertainty (GUM S1)":
+            st.markdown("#### Monte Carlo Uncertainty Propagation")
+            st.markdown("*Propagates input distributions through the calculator itself - valid for non-linear models and non-Gaussian inputs*")
+            
+            mc_model_name = st.selectbox("Measurement Model", list(MonteCarloUncertainty.MODELS.keys()))
+            mc_model, mc_inputs = MonteCarloUncertainty.MODELS[mc_model_name]
+            
+            with st.form("monte_carlo_uncertainty"):
+                mc_spec = {}
+                for name, label, default_value, default_u in mc_inputs:
+                    col_mc1, col_mc2, col_mc3, col_mc4 = st.columns([2, 2, 2, 1])
+                    with col_mc1:
+                        value = st.number_input(label, value=default_value, format="%.6g", key=f"mc_value_{name}")
+                    with col_mc2:
+                        u = st.number_input(f"u({name})", min_value=0.0, value=default_u, format="%.6g", key=f"mc_u_{name}")
+                    with col_mc3:
+                        dist = st.selectbox(f"Distribution ({name})", MonteCarloUncertainty.DISTRIBUTIONS, key=f"mc_dist_{name}")
+                    with col_mc4:
+                        dof = st.number_input("ν (t only)", min_value=3, value=10, key=f"mc_dof_{name}")
+                    mc_spec[name] = {'value': value, 'uncertainty': u, 'distribution': dist, 'dof': float(dof)}
+                
+                col_mc5, col_mc6, col_mc7 = st.columns(3)
+                with col_mc5:
+                    mc_draws = st.selectbox("Monte Carlo Trials", [10_000, 100_000, 1_000_000, 2_000_000], index=2,
+                                            format_func=lambda n: f"{n:,}")
+                with col_mc6:
+                    mc_coverage = st.selectbox("Coverage Probability", [0.90, 0.95, 0.99], index=1)
+                with col_mc7:
+                    mc_seed = st.number_input("Random Seed (0 = random)", min_value=0, value=0)
+                
+                mc_submit = st.form_submit_button("Run Monte Carlo")
+            
+            if mc_submit:
+                try:
+                    with st.spinner(f"Evaluating {mc_draws:,} trials..."):
+                        mc_result = MonteCarloUncertainty.propagate(mc_model, mc_spec, n_draws=mc_draws,
+                                                                    coverage=mc_coverage, seed=mc_seed or None)
+                    
+                    low, high = mc_result['symmetric_interval']
+                    short_low, short_high = mc_result['shortest_interval']
+                    lpu_low, lpu_high = mc_result['lpu_interval']
+                    st.markdown(f"""
+                    <div class="result-box">
+                        <h4>✅ Monte Carlo Result ({mc_result['n_valid']:,} trials)</h4>
+                        <p><strong>Estimate y:</strong> {mc_result['mean']:.6g}</p>
+                        <p><strong>Standard Uncertainty u(y):</strong> {mc_result['standard_uncertainty']:.4g} ({mc_result['relative_uncertainty_percent']:.3f}%)</p>
+                        <p><strong>{mc_coverage:.0%} Coverage Interval (symmetric):</strong> [{low:.6g}, {high:.6g}]</p>
+                        <p><strong>{mc_coverage:.0%} Coverage Interval (shortest):</strong> [{short_low:.6g}, {short_high:.6g}]</p>
+                        <p><strong>GUM Linear Propagation:</strong> u = {mc_result['lpu_standard_uncertainty']:.4g}, interval [{lpu_low:.6g}, {lpu_high:.6g}]</p>
+                    </div>
+                    """, unsafe_allow_html=True)
+                    
+                    st.markdown("**Uncertainty Budget:**")
+                    st.dataframe(mc_result['budget'], use_container_width=True, hide_index=True)
+                    
+                    counts, edges = mc_result['histogram']
+                    st.markdown("**Output Distribution:**")
+                    st.bar_chart(pd.DataFrame({'trials': counts}, index=np.round((edges[:-1] + edges[1:]) / 2, 8)))
+                    
+                    add_to_history("Monte Carlo Uncertainty",
+                                   {'model': mc_model_name, 'trials': mc_draws},
+                                   {'y': f"{mc_result['mean']:.6g}", 'u(y)': f"{mc_result['standard_uncertainty']:.4g}",
+                                    'interval': f"[{low:.6g}, {high:.6g}]"})
+                except Exception as e:
+                    st.error(f"❌ Error: {str(e)}")
         
         else:  # Measurement Uncertainty
             st.markdown("#### Measurement Uncertainty Calculation")
@@ -2895,62 +8722,281 @@ def data_analysis_suite():
     
     with tab3:
         st.markdown("### 📊 Data Visualization")
+        st.markdown("*Histograms, density scatter and time series, binned/downsampled server-side for large datasets*")
+        
+        if 'chart_cache' not in st.session_state:
+            st.session_state.chart_cache = {}
+        chart_cache = st.session_state.chart_cache
+        
+        viz_source = st.radio("Data Source", ["Paste Values", "Upload CSV/Parquet"], horizontal=True,
+                              key="viz_source")
+        viz_frame = None
+        if viz_source == "Paste Values":
+            viz_data = st.text_area(
+                "Enter data for visualization (comma separated)",
+                value="1.2, 1.5, 1.3, 1.8, 1.1, 1.6, 1.4, 1.7, 1.2, 1.5",
+                height=100
+            )
+            try:
+                viz_frame = pd.DataFrame({'value': [float(x) for x in viz_data.replace('\n', ',').split(',') if x.strip()]})
+            except ValueError:
+                st.error("❌ Values must be numbers separated by commas")
+        else:
+            viz_file = st.file_uploader("Data file", type=["csv", "parquet"], key="visualization_upload")
+            if viz_file is not None:
+                # Parsed once per file; reruns (e.g. moving a slider) reuse the columns
+                file_key = ('file', viz_file.name, viz_file.size)
+                if file_key not in chart_cache:
+                    chart_cache[file_key] = (pd.read_parquet(viz_file) if viz_file.name.lower().endswith(".parquet")
+                                             else pd.read_csv(viz_file))
+                viz_frame = chart_cache[file_key]
+        
+        if viz_frame is not None and len(viz_frame):
+            numeric_columns = list(viz_frame.select_dtypes(include='number').columns)
+            chart_type = st.radio("Chart", ["Histogram", "Scatter (2-D density)", "Time Series (LTTB)"],
+                                  horizontal=True)
+            try:
+                if chart_type == "Histogram":
+                    col_viz1, col_viz2 = st.columns([1, 2])
+                    with col_viz1:
+                        hist_column = st.selectbox("Column", numeric_columns, key="hist_column")
+                        hist_bins = st.slider("Bins", min_value=5, max_value=500, value=30)
+                    prepared = ChartAggregator.prepare(viz_frame[hist_column].to_numpy(dtype=float), chart_cache)
+                    with col_viz1:
+                        q1, median, q3 = prepared['quartiles']
+                        st.markdown(f"""
+                        **Data Distribution:**
+                        - **Count:** {prepared['count']:,} ({prepared['missing']:,} missing)
+                        - **Mean:** {prepared['mean']:.4g}
+                        - **Std Dev:** {prepared['std']:.4g}
+                        - **Median (IQR):** {median:.4g} ({q1:.4g} – {q3:.4g})
+                        - **Range:** {prepared['min']:.4g} – {prepared['max']:.4g}
+                        """)
+                    with col_viz2:
+                        hist = ChartAggregator.histogram(prepared, hist_bins)
+                        st.bar_chart(hist.set_index(hist['bin_center'].round(6))['count'])
+                
+                elif chart_type == "Scatter (2-D density)":
+                    if len(numeric_columns) < 2:
+                        st.warning("⚠️ Scatter plots need at least two numeric columns")
+                    else:
+                        col_viz1, col_viz2, col_viz3 = st.columns(3)
+                        with col_viz1:
+                            scatter_x = st.selectbox("X Column", numeric_columns, key="scatter_x")
+                        with col_viz2:
+                            scatter_y = st.selectbox("Y Column", [c for c in numeric_columns if c != scatter_x],
+                                                     key="scatter_y")
+                        with col_viz3:
+                            scatter_bins = st.slider("Grid Cells per Axis", min_value=20, max_value=300, value=100)
+                        
+                        if len(viz_frame) <= 5000:
+                            st.scatter_chart(viz_frame, x=scatter_x, y=scatter_y)
+                        else:
+                            cells = ChartAggregator.histogram2d(viz_frame[scatter_x].to_numpy(dtype=float),
+                                                                viz_frame[scatter_y].to_numpy(dtype=float),
+                                                                scatter_bins, chart_cache)
+                            st.caption(f"{len(viz_frame):,} points aggregated into {len(cells):,} occupied cells")
+                            st.scatter_chart(cells, x='x', y='y', size='count')
+                
+                else:
+                    col_viz1, col_viz2, col_viz3 = st.columns(3)
+                    with col_viz1:
+                        series_x = st.selectbox("X / Time Column", ["(row order)"] + list(viz_frame.columns),
+                                                key="series_x")
+                    with col_viz2:
+                        series_y = st.selectbox("Y Column", [c for c in numeric_columns if c != series_x],
+                                                key="series_y")
+                    with col_viz3:
+                        series_points = st.slider("Points to Draw", min_value=200, max_value=10000, value=2000,
+                                                  step=100)
+                    
+                    if series_x == "(row order)":
+                        x_values = np.arange(len(viz_frame), dtype=float)
+                        x_labels = x_values
+                    else:
+                        x_labels = viz_frame[series_x]
+                        if pd.api.types.is_numeric_dtype(x_labels):
+                            x_values = x_labels.to_numpy(dtype=float)
+                        else:
+                            x_labels = pd.to_datetime(x_labels, errors='coerce')
+                            x_values = np.where(x_labels.isna(), np.nan,
+                                                x_labels.to_numpy('datetime64[ns]').astype('int64').astype(float))
+                    order = np.argsort(x_values, kind='stable')
+                    y_values = viz_frame[series_y].to_numpy(dtype=float)[order]
+                    keep = np.isfinite(x_values[order]) & np.isfinite(y_values)
+                    selected = order[keep][ChartAggregator.lttb(x_values[order][keep], y_values[keep],
+                                                                series_points, chart_cache)]
+                    st.caption(f"Showing {len(selected):,} of {int(keep.sum()):,} points (LTTB downsampling)")
+                    st.line_chart(pd.DataFrame({series_y: viz_frame[series_y].to_numpy()[selected]},
+                                               index=np.asarray(x_labels)[selected]))
+            except Exception as e:
+                st.error(f"Visualization error: {str(e)}")
+    
+    with tab4:
+        st.markdown("### 🧪 Batch Hypothesis Testing")
+        st.markdown("*One test per feature/analyte across all features at once, with multiple-testing correction*")
         
-        st.markdown("Create simple visualizations of your data")
-        
-        # For now, provide basic data display since we can't use external plotting libraries
-        viz_data = st.text_area(
-            "Enter data for visualization (comma separated)",
-            value="1.2, 1.5, 1.3, 1.8, 1.1, 1.6, 1.4, 1.7, 1.2, 1.5",
-            height=100
-        )
+        tests_file = st.file_uploader("CSV or Parquet (long: feature, group, value — or wide: group column + one column per feature)",
+                                      type=["csv", "parquet"], key="hypothesis_tests_upload")
         
-        if st.button("Create Basic Visualization"):
+        if tests_file is not None:
             try:
-                data = [float(x.strip()) for x in viz_data.split(',') if x.strip()]
+                tests_data = (pd.read_parquet(tests_file) if tests_file.name.lower().endswith(".parquet")
+                              else pd.read_csv(tests_file))
                 
-                if len(data) >= 3:
-                    # Create a simple data summary
-                    st.markdown("### 📈 Data Summary Visualization")
-                    
-                    # Basic statistics
-                    mean_val = np.mean(data)
-                    std_val = np.std(data)
-                    min_val = np.min(data)
-                    max_val = np.max(data)
-                    
-                    # Create frequency distribution
-                    bins = 5
-                    hist, bin_edges = np.histogram(data, bins=bins)
-                    
-                    st.markdown(f"""
-                    **Data Distribution:**
-                    - **Mean:** {mean_val:.3f}
-                    - **Std Dev:** {std_val:.3f}
-                    - **Range:** {min_val:.3f} - {max_val:.3f}
-                    - **Count:** {len(data)} points
-                    """)
+                tests_layout = st.radio("Layout", ["Long (one row per measurement)", "Wide (one column per feature)"],
+                                        horizontal=True)
+                col_ht1, col_ht2, col_ht3 = st.columns(3)
+                with col_ht1:
+                    tests_group = st.selectbox("Group Column", list(tests_data.columns))
+                    if tests_layout.startswith("Long"):
+                        tests_feature = st.selectbox("Feature / Analyte Column",
+                                                     [c for c in tests_data.columns if c != tests_group])
+                        tests_value = st.selectbox("Value Column",
+                                                   [c for c in tests_data.select_dtypes(include='number').columns
+                                                    if c not in (tests_group, tests_feature)])
+                    else:
+                        tests_data = tests_data.melt(
+                            id_vars=[tests_group],
+                            value_vars=[c for c in tests_data.select_dtypes(include='number').columns if c != tests_group],
+                            var_name='feature', value_name='value'
+                        )
+                        tests_feature, tests_value = 'feature', 'value'
+                with col_ht2:
+                    tests_method = st.selectbox("Test", ["Welch t-test", "Student t-test", "Mann-Whitney U",
+                                                         "One-way ANOVA", "Tukey HSD (all pairs)"])
+                    group_levels = sorted(tests_data[tests_group].astype(str).unique())
+                    if tests_method in ("Welch t-test", "Student t-test", "Mann-Whitney U"):
+                        tests_a = st.selectbox("Group A (reference)", group_levels)
+                        tests_b = st.selectbox("Group B", group_levels, index=min(1, len(group_levels) - 1))
+                with col_ht3:
+                    tests_correction = st.selectbox(
+                        "Multiple-Testing Correction", list(HypothesisTests.CORRECTIONS),
+                        index=3 if tests_method.startswith("Tukey") else 0,
+                        format_func=lambda c: {"bh": "Benjamini-Hochberg (FDR)", "holm": "Holm",
+                                               "bonferroni": "Bonferroni", "none": "None"}[c]
+                    )
+                    tests_alpha = st.number_input("Significance Level", min_value=0.001, max_value=0.2, value=0.05)
+                
+                if st.button("🧪 Run Tests", use_container_width=True):
+                    if tests_method.startswith("Tukey"):
+                        tests_results = HypothesisTests.tukey_hsd(tests_data, tests_feature, tests_group, tests_value,
+                                                                  confidence=1 - tests_alpha, correction=tests_correction)
+                    elif tests_method == "One-way ANOVA":
+                        tests_results = HypothesisTests.anova(tests_data, tests_feature, tests_group, tests_value,
+                                                              correction=tests_correction, alpha=tests_alpha)
+                    else:
+                        tests_results = HypothesisTests.two_group(
+                            tests_data, tests_feature, tests_group, tests_value, tests_a, tests_b,
+                            method={"Welch t-test": "welch", "Student t-test": "student",
+                                    "Mann-Whitney U": "mannwhitney"}[tests_method],
+                            correction=tests_correction, alpha=tests_alpha
+                        )
                     
-                    # Simple histogram display
-                    st.markdown("**Frequency Distribution:**")
-                    for i in range(len(hist)):
-                        bin_start = bin_edges[i]
-                        bin_end = bin_edges[i+1]
-                        count = hist[i]
-                        bar = "█" * int(count * 20 / max(hist))  # Simple text bar chart
-                        st.markdown(f"{bin_start:.2f}-{bin_end:.2f}: {bar} ({count})")
+                    n_significant = int(tests_results['significant'].sum())
+                    st.success(f"✅ {len(tests_results):,} comparisons, {n_significant:,} significant "
+                               f"(adjusted p ≤ {tests_alpha})")
+                    st.dataframe(tests_results.sort_values('p_adjusted'), use_container_width=True, hide_index=True)
+                    st.download_button(
+                        "⬇️ Download Results",
+                        tests_results.to_csv(index=False),
+                        f"hypothesis_tests_{datetime.now().strftime('%Y%m%d')}.csv",
+                        "text/csv"
+                    )
                     
-                    # Data table
-                    viz_df = pd.DataFrame({
-                        'Index': range(1, len(data) + 1),
-                        'Value': data,
-                        'Deviation': [x - mean_val for x in data]
-                    })
+                    add_to_history(
+                        "Batch Hypothesis Tests",
+                        {'test': tests_method, 'features': int(tests_data[tests_feature].nunique()),
+                         'correction': tests_correction},
+                        {'comparisons': len(tests_results), 'significant': n_significant}
+                    )
+            except Exception as e:
+                st.error(f"Hypothesis testing error: {str(e)}")
+    
+    with tab5:
+        st.markdown("### 📉 4PL/5PL Curve Fitting")
+        st.markdown("*ELISA standard curves and dose-response screens: EC50/IC50 with confidence intervals, back-calculation of unknowns*")
+        
+        curves_file = st.file_uploader("Long-format CSV or Parquet (curve/compound, dose, response)",
+                                       type=["csv", "parquet"], key="dose_response_upload")
+        
+        if curves_file is not None:
+            try:
+                curves_data = (pd.read_parquet(curves_file) if curves_file.name.lower().endswith(".parquet")
+                               else pd.read_csv(curves_file))
+                numeric_columns = list(curves_data.select_dtypes(include='number').columns)
+                
+                col_dr1, col_dr2, col_dr3 = st.columns(3)
+                with col_dr1:
+                    curve_column = st.selectbox("Curve / Compound Column", list(curves_data.columns))
+                    dose_column = st.selectbox("Dose / Concentration Column",
+                                               [c for c in numeric_columns if c != curve_column])
+                with col_dr2:
+                    response_column = st.selectbox("Response Column",
+                                                   [c for c in numeric_columns if c not in (curve_column, dose_column)])
+                    curve_model = st.selectbox("Model", list(DoseResponseFitter.MODELS.keys()))
+                with col_dr3:
+                    curve_confidence = st.selectbox("EC50 Confidence Level", [0.90, 0.95, 0.99], index=1,
+                                                    key="dose_response_confidence")
+                    curve_batch = st.number_input("Curves per Worker Batch", min_value=50, value=500, step=50)
+                
+                if st.button("📉 Fit Curves", use_container_width=True):
+                    n_curves = curves_data[curve_column].nunique()
+                    fit_progress = st.progress(0.0, text=f"Fitting {n_curves:,} curves...")
+                    st.session_state.dose_response_fits = DoseResponseFitter.fit_curves(
+                        curves_data, curve_column, dose_column, response_column, model=curve_model,
+                        confidence=curve_confidence, batch_size=int(curve_batch),
+                        progress_callback=lambda done, total: fit_progress.progress(
+                            done / total, text=f"Fitted {done:,} of {total:,} curves")
+                    )
+                    fit_progress.empty()
+                    add_to_history(
+                        "Dose-Response Fit",
+                        {'model': curve_model, 'curves': n_curves},
+                        {'converged': int(st.session_state.dose_response_fits['converged'].sum())}
+                    )
+                
+                fits = st.session_state.get('dose_response_fits')
+                if fits is not None:
+                    n_converged = int(fits['converged'].sum())
+                    st.success(f"✅ {n_converged:,} of {len(fits):,} curves converged")
+                    st.dataframe(fits, use_container_width=True, hide_index=True)
+                    st.download_button(
+                        "⬇️ Download Fit Parameters",
+                        fits.to_csv(index=False),
+                        f"dose_response_fits_{datetime.now().strftime('%Y%m%d')}.csv",
+                        "text/csv"
+                    )
                     
-                    st.dataframe(viz_df, use_container_width=True, hide_index=True)
+                    curve_choice = st.selectbox("Plot Curve", fits['curve'].astype(str).tolist())
+                    chosen = fits[fits['curve'].astype(str) == curve_choice].iloc[0]
+                    points = curves_data[curves_data[curve_column].astype(str) == curve_choice]
+                    positive = points[dose_column][points[dose_column] > 0]
+                    if len(positive):
+                        grid = np.logspace(np.log10(positive.min()), np.log10(positive.max()), 100)
+                        fitted = DoseResponseFitter.evaluate(
+                            np.array([[chosen['bottom_a'], chosen['hill_slope'], np.log(chosen['c']),
+                                       chosen['top_d'], chosen['asymmetry']]]),
+                            np.log(grid)[None, :]
+                        )[0]
+                        st.line_chart(pd.DataFrame({'fitted': fitted}, index=np.log10(grid)))
                     
+                    st.markdown("**Back-calculate Unknowns:**")
+                    unknowns_text = st.text_area("curve, response[, dilution] — one unknown per line",
+                                                 value=f"{curve_choice}, {(chosen['bottom_a'] + chosen['top_d']) / 2:.4f}, 1")
+                    if st.button("🔁 Back-calculate"):
+                        from io import StringIO
+                        unknowns = pd.read_csv(StringIO(unknowns_text), header=None, skipinitialspace=True)
+                        unknowns.columns = ['curve', 'response', 'dilution'][:unknowns.shape[1]]
+                        unknowns['curve'] = unknowns['curve'].astype(fits['curve'].dtype)
+                        back = DoseResponseFitter.back_calculate(
+                            fits, unknowns, dilution_column='dilution' if 'dilution' in unknowns.columns else None
+                        )
+                        st.dataframe(back, use_container_width=True, hide_index=True)
+                        if not back['in_range'].all():
+                            st.warning("⚠️ Some responses are outside the fitted asymptotes and cannot be quantified")
             except Exception as e:
-                st.error(f"Visualization error: {str(e)}")
+                st.error(f"Curve fitting error: {str(e)}")
     
     st.markdown('</div>', unsafe_allow_html=True)
 
@@ -2967,6 +9013,8 @@ def lab_management_page():
     with tab1:
         st.markdown("### 📦 Chemical Inventory Management")
         
+        inventory_store = InventoryStore()
+        
         col_inv1, col_inv2 = st.columns([2, 1])
         
         with col_inv1:
@@ -2979,6 +9027,7 @@ def lab_management_page():
                     chemical_name = st.text_input("Chemical Name*")
                     formula = st.text_input("Chemical Formula")
                     cas_number = st.text_input("CAS Number")
+                    synonyms = st.text_input("Synonyms", help="Other names, comma-separated (e.g. MeCN)")
                     supplier = st.text_input("Supplier")
                 
                 with col_chem2:
@@ -3009,6 +9058,7 @@ def lab_management_page():
                             'name': chemical_name,
                             'formula': formula,
                             'cas_number': cas_number,
+                            'synonyms': synonyms,
                             'supplier': supplier,
                             'quantity': quantity,
                             'unit': unit,
@@ -3022,7 +9072,7 @@ def lab_management_page():
                             'last_updated': datetime.now().strftime("%Y-%m-%d %H:%M")
                         }
                         
-                        st.session_state.inventory.append(new_chemical)
+                        inventory_store.add(new_chemical)
                         st.success(f"✅ Added {chemical_name} to inventory!")
                         
                         add_to_history(
@@ -3036,76 +9086,90 @@ def lab_management_page():
         with col_inv2:
             st.markdown("#### Inventory Summary")
             
-            if st.session_state.inventory:
-                total_chemicals = len(st.session_state.inventory)
-                hazardous_count = len([item for item in st.session_state.inventory 
-                                     if item['hazard_class'] != 'Non-hazardous'])
-                
-                # Count by hazard type
-                hazard_counts = {}
-                for item in st.session_state.inventory:
-                    hazard = item['hazard_class']
-                    hazard_counts[hazard] = hazard_counts.get(hazard, 0) + 1
-                
-                st.metric("Total Chemicals", total_chemicals)
-                st.metric("Hazardous Items", hazardous_count)
+            inventory_summary = inventory_store.summary()
+            if inventory_summary['total']:
+                st.metric("Total Chemicals", f"{inventory_summary['total']:,}")
+                st.metric("Hazardous Items", f"{inventory_summary['hazardous']:,}")
+                if inventory_summary['expired']:
+                    st.metric("Expired", f"{inventory_summary['expired']:,}")
                 
                 st.markdown("**By Hazard Class:**")
-                for hazard, count in hazard_counts.items():
-                    st.markdown(f"• {hazard}: {count}")
+                for hazard, count in inventory_summary['by_hazard'].items():
+                    st.markdown(f"• {hazard}: {count:,}")
                 
                 # Location summary
-                locations = set(item['location'] for item in st.session_state.inventory if item['location'])
-                if locations:
-                    st.markdown(f"**Storage Locations:** {len(locations)}")
-                    for loc in sorted(locations):
-                        st.markdown(f"• {loc}")
+                if inventory_summary['by_location']:
+                    st.markdown(f"**Storage Locations:** {len(inventory_summary['by_location'])}")
+                    for loc, count in list(inventory_summary['by_location'].items())[:20]:
+                        st.markdown(f"• {loc} ({count:,})")
             else:
                 st.info("No chemicals in inventory yet")
+            
+            with st.expander("📥 Import from CSV"):
+                import_file = st.file_uploader("CSV with a 'name' column (other inventory columns optional)",
+                                               type=["csv"], key="inventory_import")
+                if import_file is not None and st.button("Import Chemicals"):
+                    try:
+                        added = inventory_store.add_many(pd.read_csv(import_file))
+                        st.success(f"✅ Imported {added:,} chemicals")
+                        st.rerun()
+                    except Exception as e:
+                        st.error(f"Import error: {str(e)}")
         
         # Current inventory display
-        if st.session_state.inventory:
+        if inventory_summary['total']:
             st.markdown("### 📋 Current Inventory")
             
             # Search and filter options
-            col_filter1, col_filter2, col_filter3 = st.columns(3)
+            col_filter1, col_filter2, col_filter3, col_filter4 = st.columns(4)
             
             with col_filter1:
-                search_term = st.text_input("🔍 Search chemicals", "")
+                search_term = st.text_input("🔍 Search chemicals", "",
+                                            help="Matches name, formula, CAS, synonyms, supplier and lot")
             
             with col_filter2:
-                hazard_filter = st.selectbox("Filter by Hazard", 
-                    ["All"] + list(set(item['hazard_class'] for item in st.session_state.inventory)))
+                hazard_filter = st.selectbox("Filter by Hazard", ["All"] + inventory_store.distinct('hazard_class'))
             
             with col_filter3:
-                location_filter = st.selectbox("Filter by Location",
-                    ["All"] + list(set(item['location'] for item in st.session_state.inventory if item['location'])))
-            
-            # Filter inventory
-            filtered_inventory = st.session_state.inventory
-            
-            if search_term:
-                filtered_inventory = [item for item in filtered_inventory 
-                                    if search_term.lower() in item['name'].lower() or 
-                                       search_term.lower() in item['formula'].lower()]
-            
-            if hazard_filter != "All":
-                filtered_inventory = [item for item in filtered_inventory 
-                                    if item['hazard_class'] == hazard_filter]
-            
-            if location_filter != "All":
-                filtered_inventory = [item for item in filtered_inventory 
-                                    if item['location'] == location_filter]
+                location_filter = st.selectbox("Filter by Location", ["All"] + inventory_store.distinct('location'))
+            
+            with col_filter4:
+                expiry_filter = st.selectbox("Expiry", ["All", "Expired", "Within 30 days", "Within 90 days"])
+            
+            expiry_days = {"Expired": -1, "Within 30 days": 30, "Within 90 days": 90}.get(expiry_filter)
+            filters = {
+                'search': search_term.strip(),
+                'hazard_class': None if hazard_filter == "All" else hazard_filter,
+                'location': None if location_filter == "All" else location_filter,
+                'expiring_before': (None if expiry_days is None else
+                                    (datetime.now() + pd.Timedelta(days=expiry_days)).strftime("%Y-%m-%d"))
+            }
+            n_matching = inventory_store.count(**filters)
+            
+            col_page1, col_page2, col_page3 = st.columns(3)
+            with col_page1:
+                sort_options = (["relevance"] if filters['search'] else []) + list(InventoryStore.SORTABLE.keys())
+                sort_column = st.selectbox("Sort by", sort_options)
+            # Relevance ranking only covers the first SEARCH_HIT_LIMIT matches; column sorts cover all of them
+            ranked_limited = sort_column == "relevance" and n_matching > InventoryStore.SEARCH_HIT_LIMIT
+            n_listed = min(n_matching, InventoryStore.SEARCH_HIT_LIMIT) if ranked_limited else n_matching
+            with col_page2:
+                page_size = st.selectbox("Rows per Page", [25, 50, 100, 250], index=1)
+            with col_page3:
+                n_pages = max(1, -(-n_listed // page_size))
+                page_number = st.number_input("Page", min_value=1, max_value=n_pages, value=1)
             
             # Display filtered inventory
-            if filtered_inventory:
-                # Convert to DataFrame for better display
-                df_inventory = pd.DataFrame(filtered_inventory)
+            if n_matching:
+                df_inventory = inventory_store.page(offset=(page_number - 1) * page_size, limit=page_size,
+                                                    order_by=sort_column, **filters)
                 
                 # Select columns to display
-                display_columns = ['name', 'formula', 'quantity', 'unit', 'location', 'hazard_class', 'supplier']
+                display_columns = ['name', 'formula', 'quantity', 'unit', 'location', 'hazard_class', 'supplier',
+                                   'expiry_date']
                 df_display = df_inventory[display_columns]
-                df_display.columns = ['Chemical', 'Formula', 'Quantity', 'Unit', 'Location', 'Hazard', 'Supplier']
+                df_display.columns = ['Chemical', 'Formula', 'Quantity', 'Unit', 'Location', 'Hazard', 'Supplier',
+                                      'Expiry']
                 
                 st.dataframe(df_display, use_container_width=True, hide_index=True)
                 
@@ -3115,7 +9179,7 @@ def lab_management_page():
                 
                 with col_bulk1:
                     if st.button("📄 Export to CSV"):
-                        csv_data = df_display.to_csv(index=False)
+                        csv_data = inventory_store.export(**filters).drop(columns=['id']).to_csv(index=False)
                         st.download_button(
                             "⬇️ Download CSV",
                             csv_data,
@@ -3124,16 +9188,33 @@ def lab_management_page():
                         )
                 
                 with col_bulk2:
-                    if st.button("🗑️ Clear All"):
-                        if st.button("⚠️ Confirm Clear All"):
-                            st.session_state.inventory = []
-                            st.success("Inventory cleared!")
-                            st.rerun()
+                    confirm_clear = st.checkbox("Confirm clearing the whole inventory")
+                    if st.button("🗑️ Clear All", disabled=not confirm_clear):
+                        inventory_store.clear()
+                        st.success("Inventory cleared!")
+                        st.rerun()
                 
                 with col_bulk3:
-                    st.info(f"Showing {len(filtered_inventory)} of {len(st.session_state.inventory)} chemicals")
+                    first_row = (page_number - 1) * page_size + 1
+                    st.info(f"Showing {first_row:,}–{first_row + len(df_inventory) - 1:,} of {n_matching:,} matching "
+                            f"({inventory_summary['total']:,} chemicals)")
+                    if ranked_limited:
+                        st.caption(f"Relevance ranking covers the first {InventoryStore.SEARCH_HIT_LIMIT:,} "
+                                   f"matches — sort by a column or refine the search to page through all of them")
             else:
                 st.info("No chemicals match the current filters")
+            
+            # Typo-tolerant suggestions when the exact search finds little
+            if filters['search'] and n_matching < 10:
+                close_matches = inventory_store.fuzzy_search(
+                    filters['search'], limit=10, **{k: v for k, v in filters.items() if k != 'search'})
+                if not close_matches.empty:
+                    st.markdown("#### 🔎 Close Matches")
+                    df_close = close_matches[['name', 'formula', 'cas_number', 'synonyms', 'location',
+                                              'similarity']].copy()
+                    df_close.columns = ['Chemical', 'Formula', 'CAS', 'Synonyms', 'Location', 'Similarity']
+                    df_close['Similarity'] = df_close['Similarity'].map(lambda x: f"{x:.0%}")
+                    st.dataframe(df_close, use_container_width=True, hide_index=True)
     
     with tab2:
         st.markdown("### 📋 Protocol Manager")
@@ -4245,22 +10326,26 @@ def settings_help_page():
                     st.info("History is already empty")
         
         with col_data2:
-            if st.button("📦 Clear Inventory", use_container_width=True):
-                if len(st.session_state.inventory) > 0:
-                    st.session_state.inventory = []
+            # The inventory is stored on disk and shared by every session, so deleting it needs confirmation
+            confirm_inventory_clear = st.checkbox("Confirm deleting the saved inventory")
+            if st.button("📦 Clear Inventory", use_container_width=True, disabled=not confirm_inventory_clear):
+                if InventoryStore().count() > 0:
+                    InventoryStore().clear()
                     st.success("Inventory cleared!")
                 else:
                     st.info("Inventory is already empty")
         
         with col_data3:
-            if st.button("🔄 Reset All Data", use_container_width=True):
-                if st.button("⚠️ Confirm Reset"):
-                    st.session_state.calculation_history = []
-                    st.session_state.inventory = []
-                    st.session_state.protocols = []
-                    st.session_state.favorites = []
-                    st.success("All data reset!")
-                    st.rerun()
+            confirm_reset = st.checkbox("Confirm resetting session data")
+            include_inventory = st.checkbox("Also delete the saved inventory", disabled=not confirm_reset)
+            if st.button("🔄 Reset All Data", use_container_width=True, disabled=not confirm_reset):
+                st.session_state.calculation_history = []
+                st.session_state.protocols = []
+                st.session_state.favorites = []
+                if include_inventory:
+                    InventoryStore().clear()
+                st.success("All data reset!")
+                st.rerun()
         
         # Export/Import section
         st.markdown("### 📤 Export/Import Data")
@@ -4268,7 +10353,7 @@ def settings_help_page():
         if st.button("📄 Export All Data as JSON"):
             export_data = {
                 'calculation_history': st.session_state.calculation_history,
-                'inventory': st.session_state.inventory,
+                'inventory': InventoryStore().export().drop(columns=['id']).to_dict('records'),
                 'protocols': st.session_state.protocols,
                 'favorites': st.session_state.favorites,
                 'export_date': datetime.now().isoformat(),
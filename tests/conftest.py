@@ -0,0 +1,8 @@
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# chemistry_app configures Streamlit at import time; outside `streamlit run` that only logs warnings
+logging.getLogger("streamlit").setLevel(logging.ERROR)
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from chemistry_app import AmplificationCurveAnalyzer
+
+
+def logistic(cycles, midpoint, scale=1.5, amplitude=1000.0, slope=0.5, offset=100.0):
+    return offset + slope * cycles + amplitude / (1 + np.exp(-(cycles - midpoint) / scale))
+
+
+def test_baseline_correct_recovers_linear_drift():
+    cycles = np.arange(1, 41, dtype=float)
+    fluorescence = np.vstack([3.0 + 0.25 * (cycles - 1), -2.0 - 0.5 * (cycles - 1)])
+    result = AmplificationCurveAnalyzer.baseline_correct(fluorescence, 3, 15)
+    np.testing.assert_allclose(result['baseline_slope'], [0.25, -0.5])
+    np.testing.assert_allclose(result['corrected'], 0.0, atol=1e-9)
+
+
+def test_threshold_ct_matches_loop_reference():
+    rng = np.random.default_rng(0)
+    cycles = np.arange(1, 41, dtype=float)
+    curves = np.vstack([logistic(cycles, m) - 100 - 0.5 * cycles for m in rng.uniform(15, 32, 50)])
+    curves += rng.normal(0, 2, curves.shape)
+    threshold = 50.0
+
+    expected = []
+    for curve in curves:
+        above = curve >= threshold
+        idx = next((i for i in range(len(curve)) if above[i:].all()), None)
+        if idx is None or idx == 0:
+            expected.append(np.nan)
+            continue
+        frac = (threshold - curve[idx - 1]) / (curve[idx] - curve[idx - 1])
+        expected.append(cycles[idx - 1] + frac)
+
+    ct = AmplificationCurveAnalyzer.threshold_ct(curves, cycles, threshold)
+    np.testing.assert_allclose(ct, expected)
+
+
+def test_threshold_ct_ignores_baseline_spike():
+    cycles = np.arange(1, 41, dtype=float)
+    curve = logistic(cycles, 25) - 100 - 0.5 * cycles
+    curve[5] = 500.0
+    ct = AmplificationCurveAnalyzer.threshold_ct(curve[None, :], cycles, 50.0)
+    assert 19 < ct[0] < 22
+
+
+def test_second_derivative_max_matches_logistic_inflection():
+    # d²/dc² of a logistic peaks at midpoint - scale·ln(2 + √3); one-cycle sampling limits this to ~0.2 cycles
+    cycles = np.arange(1, 41, dtype=float)
+    midpoints = np.array([18.0, 22.3, 27.6])
+    curves = np.vstack([logistic(cycles, m, slope=0.0, offset=0.0) for m in midpoints])
+    ct = AmplificationCurveAnalyzer.second_derivative_max_ct(curves, cycles, smoothing=1)
+    np.testing.assert_allclose(ct, midpoints - 1.5 * np.log(2 + np.sqrt(3)), atol=0.25)
+
+
+def test_analyze_plate_flags_negative_wells():
+    rng = np.random.default_rng(1)
+    cycles = np.arange(1, 41, dtype=float)
+    fluorescence = np.vstack([logistic(cycles, 22), logistic(cycles, 30),
+                              100 + 0.5 * cycles + rng.normal(0, 1, 40)])
+    fluorescence[:2] += rng.normal(0, 1, (2, 40))
+    result = AmplificationCurveAnalyzer.analyze_plate(np.array(['A1', 'A2', 'A3']), cycles, fluorescence)
+    table = result['results']
+    assert table['ct'].iloc[0] < table['ct'].iloc[1]
+    assert np.isnan(table['ct'].iloc[2])
+    assert table['qc_flag'].tolist()[2] == "No amplification"
+
+
+def test_load_fluorescence_table_long_and_wide_agree():
+    cycles = np.arange(1, 13)
+    wide = pd.DataFrame({'Well': ['A1', 'B1'], **{f"Cycle {c}": [c * 1.0, c * 2.0] for c in cycles}})
+    long = pd.DataFrame({'well': np.repeat(['A1', 'B1'], 12), 'cycle': np.tile(cycles, 2),
+                         'fluorescence': np.concatenate([cycles * 1.0, cycles * 2.0])})
+    for frame in (wide, long):
+        wells, parsed_cycles, values = AmplificationCurveAnalyzer.load_fluorescence_table(frame)
+        assert wells.tolist() == ['A1', 'B1']
+        np.testing.assert_allclose(parsed_cycles, cycles)
+        np.testing.assert_allclose(values[1], cycles * 2.0)
+
+
+def test_load_fluorescence_table_rejects_short_runs():
+    with pytest.raises(ValueError, match="at least 10 cycles"):
+        AmplificationCurveAnalyzer.load_fluorescence_table(pd.DataFrame({'well': ['A1'], 'c1': [1.0]}))
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from chemistry_app import AdvancedChemistryCalculators as Chem, PCRCalculators
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(44)
+
+
+def test_molarity_batch_matches_scalar_and_formula(rng):
+    mass, mw, volume = rng.uniform(0.01, 5, 50), rng.uniform(10, 500, 50), rng.uniform(0.01, 2, 50)
+    batch = Chem.batch_molarity(mass, mw, volume)
+    np.testing.assert_allclose(batch['molarity'], mass / mw / volume)
+    assert [Chem.calculate_molarity(*row) for row in zip(mass, mw, volume)] == pytest.approx(batch['molarity'])
+    bad = Chem.batch_molarity([1, -1, 1, np.nan], [58.44, 58.44, 0, 58.44], 1)
+    assert bad['valid'].tolist() == [True, False, False, False]
+    assert bad['issue'].tolist()[1:] == ["Mass must be non-negative", "Molecular weight must be positive",
+                                         "Missing or non-numeric input"]
+    with pytest.raises(ValueError, match="Molarity calculation error: Volume must be positive"):
+        Chem.calculate_molarity(1, 58.44, 0)
+
+
+def test_dilution_solves_each_unknown(rng):
+    c1, v1, c2, v2 = rng.uniform(1, 10, 30), rng.uniform(0.1, 1, 30), rng.uniform(0.1, 1, 30), rng.uniform(5, 10, 30)
+    np.testing.assert_allclose(Chem.batch_dilution(c1, None, c2, v2)['v1'], c2 * v2 / c1)
+    np.testing.assert_allclose(Chem.batch_dilution(c1, v1, c2, None)['v2'], c1 * v1 / c2)
+    solved = Chem.batch_dilution(c1, v1, None, v2)
+    np.testing.assert_allclose(solved['c2'], c1 * v1 / v2)
+    np.testing.assert_allclose(solved['volume_water'], v2 - v1)
+    scalar = Chem.calculate_dilution(10.0, None, 1.0, 10.0)
+    assert scalar == pytest.approx({'c1': 10, 'v1': 1, 'c2': 1, 'v2': 10, 'dilution_factor': 10, 'volume_water': 9})
+
+
+def test_dilution_above_stock_is_flagged_not_rejected():
+    # The scalar calculator has always returned C1V1 = C2V2 here (a concentration, not a dilution)
+    scalar = Chem.calculate_dilution(1.0, 5.0, 2.0)
+    assert scalar['v2'] == pytest.approx(2.5)
+    assert scalar['dilution_factor'] == pytest.approx(0.5)
+    batch = Chem.batch_dilution([1.0, 1.0, 1.0], [5.0, 1.0, 1.0], [2.0, 0.5, -1.0], None)
+    assert batch['valid'].tolist() == [True, True, False]
+    assert batch['issue'].tolist() == ["Final concentration exceeds the stock", "",
+                                       "Final concentration must be positive"]
+    assert batch['v2'].tolist()[:2] == pytest.approx([2.5, 2.0])
+    with pytest.raises(ValueError, match="Dilution calculation error"):
+        Chem.calculate_dilution(0.0, None, 1.0, 10.0)
+
+
+def test_ph_buffer_and_beers_law(rng):
+    conc = 10 ** rng.uniform(-12, 0, 40)
+    np.testing.assert_allclose(Chem.batch_ph(conc)['ph'], -np.log10(conc))
+    np.testing.assert_allclose(Chem.batch_ph(conc, is_acid=False)['ph'], 14 + np.log10(conc))
+    assert Chem.ph_calculator(1e-3) == pytest.approx(3)
+    assert Chem.buffer_calculator(0.1, 0.2, 4.76) == pytest.approx(4.76 + np.log10(2))
+    beers = Chem.batch_beers_law(absorbance=[0.5, np.nan], concentration=[np.nan, 1e-4], extinction_coeff=6220)
+    assert beers['concentration'].tolist() == pytest.approx([0.5 / 6220, 1e-4])
+    assert beers['absorbance'].tolist() == pytest.approx([0.5, 0.622])
+    assert beers['solved_for'].tolist() == ["concentration", "absorbance"]
+    assert Chem.beers_law_calculator(concentration=1e-4, extinction_coeff=6220)['transmittance'] == \
+        pytest.approx(10 ** -0.622 * 100)
+
+
+def test_copy_numbers_match_scalar(rng):
+    ct, ct_std = rng.uniform(15, 35, 25), rng.uniform(15, 35, 25)
+    batch = PCRCalculators.batch_copy_number_absolute(ct, ct_std, 1e6, 95.0)
+    np.testing.assert_allclose(batch['copy_number'], 1e6 * 1.95 ** (ct_std - ct))
+    scalar = PCRCalculators.calculate_copy_number_absolute(ct[0], ct_std[0], 1e6, 95.0)
+    assert scalar['copy_number'] == pytest.approx(batch['copy_number'][0])
+
+    ct_t, ct_r = rng.uniform(20, 30, 25), rng.uniform(15, 20, 25)
+    relative = PCRCalculators.batch_copy_number_relative(ct_t, ct_r, 25.0, 17.0)
+    np.testing.assert_allclose(relative['relative_quantity'], 2.0 ** -((ct_t - ct_r) - (25 - 17)))
+    pfaffl = PCRCalculators.calculate_copy_number_relative(24, 18, 26, 18, 90, 100)
+    assert pfaffl['relative_quantity'] == pytest.approx(1.9 ** 2)
+
+
+def test_solution_masses_and_formulas():
+    table = Chem.batch_solution_masses(["NaCl", "NaCl", "Xx2", "C4H11NO3"], [0.1, 1, 1, 0.05], 0.5,
+                                       [100, 100, 100, 99.0])
+    nacl = Chem.compute_molecular_weight("NaCl")
+    assert table['mass_g'].tolist()[:2] == pytest.approx([nacl * 0.05, nacl * 0.5])
+    assert table['valid'].tolist() == [True, True, False, True]
+    assert table['mass_g'][3] == pytest.approx(121.14 * 0.025 / 0.99, rel=1e-3)
+    assert table['issue'][2] == "Unknown element 'Xx'"
+    weights = Chem.batch_molecular_weight(pd.Series(["H2O", None, "C6H12O6"]))
+    assert weights['mw'][0] == pytest.approx(18.015, abs=0.01)
+    assert weights['mw'][2] == pytest.approx(180.16, abs=0.01)
+    assert not weights['valid'][1]
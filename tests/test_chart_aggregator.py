@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from chemistry_app import ChartAggregator
+
+
+def reference_lttb(x, y, threshold):
+    """Steinarsson's reference Largest-Triangle-Three-Buckets loop"""
+    n = len(x)
+    every = (n - 2) / (threshold - 2)
+    selected = [0]
+    a = 0
+    for i in range(threshold - 2):
+        next_start = int(np.floor((i + 1) * every)) + 1
+        next_end = min(int(np.floor((i + 2) * every)) + 1, n)
+        avg_x, avg_y = x[next_start:next_end].mean(), y[next_start:next_end].mean()
+        start, end = int(np.floor(i * every)) + 1, int(np.floor((i + 1) * every)) + 1
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a])) * 0.5
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    selected.append(n - 1)
+    return np.array(selected)
+
+
+@pytest.fixture
+def values():
+    rng = np.random.default_rng(48)
+    values = np.r_[rng.normal(0, 1, 50_000), rng.exponential(3, 10_000)]
+    values[rng.random(len(values)) < 0.01] = np.nan
+    return values
+
+
+def test_prepare_summary(values):
+    prepared = ChartAggregator.prepare(values, cache={})
+    finite = values[np.isfinite(values)]
+    assert prepared['count'] == len(finite)
+    assert prepared['missing'] == np.isnan(values).sum()
+    assert prepared['mean'] == pytest.approx(finite.mean())
+    assert prepared['std'] == pytest.approx(finite.std(ddof=1))
+    np.testing.assert_allclose(prepared['quartiles'], np.quantile(finite, [0.25, 0.5, 0.75]))
+
+
+@pytest.mark.parametrize("bins, value_range", [(50, None), (7, None), (40, (-2.0, 5.0)), (10, (3.0, 100.0))])
+def test_histogram_matches_numpy(values, bins, value_range):
+    finite = values[np.isfinite(values)]
+    table = ChartAggregator.histogram(ChartAggregator.prepare(values, cache={}), bins, value_range)
+    counts, edges = np.histogram(finite, bins=bins, range=value_range)
+    np.testing.assert_array_equal(table['count'], counts)
+    np.testing.assert_allclose(table['bin_start'], edges[:-1])
+
+
+def test_histogram2d_matches_numpy():
+    rng = np.random.default_rng(49)
+    x, y = rng.normal(0, 1, 20_000), rng.normal(0, 2, 20_000)
+    cells = ChartAggregator.histogram2d(x, y, bins=30, cache={})
+    counts, _, _ = np.histogram2d(x, y, bins=30)
+    assert cells['count'].sum() == len(x)
+    assert sorted(cells['count']) == sorted(counts[counts > 0].astype(int))
+
+
+@pytest.mark.parametrize("n, threshold", [(1000, 100), (10_007, 501), (50, 49)])
+def test_lttb_matches_reference(n, threshold):
+    rng = np.random.default_rng(n)
+    x = np.sort(rng.uniform(0, 100, n))
+    y = np.cumsum(rng.normal(0, 1, n))
+    selected = ChartAggregator.lttb(x, y, threshold, cache={})
+    np.testing.assert_array_equal(selected, reference_lttb(x, y, threshold))
+
+
+def test_lttb_keeps_everything_below_threshold():
+    np.testing.assert_array_equal(ChartAggregator.lttb(np.arange(10.0), np.zeros(10), 20), np.arange(10))
+
+
+def test_cache_is_keyed_by_content_and_bounded(monkeypatch):
+    cache = {}
+    monkeypatch.setattr(ChartAggregator, "_CACHE_LIMIT", 3)
+    first = ChartAggregator.prepare(np.arange(5.0), cache=cache)
+    assert ChartAggregator.prepare(np.arange(5.0), cache=cache) is first
+    assert ChartAggregator.prepare(np.arange(6.0), cache=cache) is not first
+    for i in range(5):
+        ChartAggregator.prepare(np.arange(float(i + 10)), cache=cache)
+        assert len(cache) <= 3
+    assert ChartAggregator.dataset_key(np.arange(3.0)) != ChartAggregator.dataset_key(np.arange(3))
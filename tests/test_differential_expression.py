@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from chemistry_app import DifferentialExpression
+
+
+@pytest.fixture(scope="module")
+def panel():
+    rng = np.random.default_rng(13)
+    genes = [f"G{i}" for i in range(40)] + ["REF1", "REF2"]
+    shift = {g: (2.0 if i < 5 else 0.0) for i, g in enumerate(genes)}
+    rows = []
+    for s in range(10):
+        group = "ctrl" if s < 5 else "trt"
+        sample_offset = rng.normal(0, 0.5)
+        for gene in genes:
+            ct = 25 + sample_offset + rng.normal(0, 0.3) - (shift[gene] if group == "trt" else 0.0)
+            rows.append({'sample': f"S{s}", 'group': group, 'batch': f"B{s % 2}", 'gene': gene, 'ct': ct})
+    return pd.DataFrame(rows)
+
+
+def test_benjamini_hochberg_matches_scipy():
+    p = np.random.default_rng(14).uniform(0, 0.2, 200)
+    np.testing.assert_allclose(DifferentialExpression.benjamini_hochberg(p), stats.false_discovery_control(p))
+    with_nan = DifferentialExpression.benjamini_hochberg([0.01, np.nan, 0.04])
+    np.testing.assert_allclose(with_nan, [0.02, np.nan, 0.04])
+
+
+@pytest.mark.parametrize("method, equal_var", [("welch", False), ("student", True)])
+def test_t_tests_match_scipy(panel, method, equal_var):
+    result = DifferentialExpression.test_genes(panel, ["REF1", "REF2"], "ctrl", "trt", method=method)
+    delta_ct = DifferentialExpression.delta_ct_matrix(panel, ["REF1", "REF2"])
+    groups = panel.drop_duplicates('sample').set_index('sample')['group'].reindex(delta_ct.columns)
+    for row in result.itertuples():
+        values = delta_ct.loc[row.gene]
+        reference = stats.ttest_ind(values[groups == "ctrl"], values[groups == "trt"], equal_var=equal_var)
+        assert row.t_statistic == pytest.approx(reference.statistic)
+        assert row.p_value == pytest.approx(reference.pvalue)
+    assert set(result.loc[result['significant'], 'gene']) == {"G0", "G1", "G2", "G3", "G4"}
+    assert (result.loc[result['significant'], 'direction'] == "Up").all()
+
+
+def test_linear_model_matches_lstsq(panel):
+    result = DifferentialExpression.test_genes(panel, ["REF1", "REF2"], "ctrl", "trt", method="lm")
+    delta_ct = DifferentialExpression.delta_ct_matrix(panel, ["REF1", "REF2"])
+    info = panel.drop_duplicates('sample').set_index('sample').reindex(delta_ct.columns)
+    X = np.column_stack([np.ones(10), (info['group'] == "trt").astype(float), (info['batch'] == "B1").astype(float)])
+    for row in result.itertuples():
+        y = delta_ct.loc[row.gene].to_numpy()
+        beta, rss, _, _ = np.linalg.lstsq(X, y, rcond=None)
+        se = np.sqrt(rss[0] / 7 * np.linalg.inv(X.T @ X)[1, 1])
+        assert row.delta_delta_ct == pytest.approx(beta[1])
+        assert row.p_value == pytest.approx(2 * stats.t.sf(abs(beta[1] / se), 7))
+
+
+def test_requires_replicates(panel):
+    with pytest.raises(ValueError, match="at least 2 biological replicates"):
+        DifferentialExpression.test_genes(panel[panel['sample'].isin(["S0", "S5", "S6"])], ["REF1"], "ctrl", "trt")
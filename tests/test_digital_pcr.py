@@ -0,0 +1,73 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from chemistry_app import DigitalPCRImporter, PCRCalculators
+
+
+@pytest.mark.parametrize("method", ["wilson", "exact"])
+def test_dpcr_confidence_interval_matches_scipy(method):
+    k = np.array([0, 1, 250, 9000, 20000])
+    n = np.array([20000, 20000, 20000, 20000, 20000])
+    result = PCRCalculators.calculate_dpcr_concentration(k, n, partition_volume_nl=0.85, ci_method=method)
+    for row, (positive, total) in zip(result.itertuples(), zip(k, n)):
+        ci = stats.binomtest(int(positive), int(total)).proportion_ci(0.95, method=method)
+        to_conc = 1 / 0.85e-3
+        assert row.ci_low_copies_per_ul == pytest.approx(-np.log1p(-ci.low) * to_conc, rel=1e-9, abs=1e-9)
+        if positive < total:
+            assert row.ci_high_copies_per_ul == pytest.approx(-np.log1p(-ci.high) * to_conc, rel=1e-9)
+    assert result['saturated'].tolist()[-1]
+
+
+def test_dpcr_poisson_correction():
+    result = PCRCalculators.calculate_dpcr_concentration(8000, 20000, partition_volume_nl=1.0, dilution_factor=10)
+    lam = -np.log(1 - 0.4)
+    assert result['copies_per_partition'].iloc[0] == pytest.approx(lam)
+    assert result['copies_per_ul'].iloc[0] == pytest.approx(lam / 1e-3 * 10)
+    assert result['total_copies'].iloc[0] == pytest.approx(lam * 20000)
+
+
+def test_dpcr_rejects_more_positives_than_partitions():
+    with pytest.raises(ValueError):
+        PCRCalculators.calculate_dpcr_concentration(11, 10)
+
+
+def test_multiplex_recovers_independent_lambdas():
+    rng = np.random.default_rng(4)
+    n = 2_000_000
+    ch1 = rng.poisson(0.3, n) > 0
+    ch2 = rng.poisson(0.8, n) > 0
+    result = PCRCalculators.calculate_dpcr_multiplex((~ch1 & ~ch2).sum(), (ch1 & ~ch2).sum(),
+                                                     (~ch1 & ch2).sum(), (ch1 & ch2).sum())
+    assert result['ch1_copies_per_partition'].iloc[0] == pytest.approx(0.3, rel=0.01)
+    assert result['ch2_copies_per_partition'].iloc[0] == pytest.approx(0.8, rel=0.01)
+    assert result['linked_fraction_ch1'].iloc[0] < 0.02
+
+
+def test_otsu_threshold_splits_bimodal_histogram():
+    counts = np.zeros(100)
+    counts[10:20] = 50
+    counts[70:80] = 5
+    threshold = DigitalPCRImporter.otsu_threshold(counts, np.arange(101, dtype=float))
+    assert 20 <= threshold <= 70
+
+
+def test_thresholds_cover_positives_after_negative_first_chunk():
+    rng = np.random.default_rng(5)
+    negatives = rng.normal(1000, 50, 20_000)
+    positives = np.concatenate([rng.normal(1000, 50, 15_000), rng.normal(8000, 300, 5_000)])
+    frame = pd.DataFrame({'well': ['NTC'] * 20_000 + ['A1'] * 20_000,
+                          'amplitude': np.concatenate([negatives, positives])})
+    source = io.StringIO(frame.to_csv(index=False))
+
+    threshold = DigitalPCRImporter.estimate_thresholds(source, ['amplitude'], chunksize=10_000)['amplitude']
+    assert negatives.max() < threshold < positives[15_000:].min()
+
+    counts = DigitalPCRImporter.count_partitions(source, 'well', ['amplitude'], {'amplitude': threshold},
+                                                 chunksize=7_000).set_index('well')
+    assert counts.loc['NTC', 'positive_partitions'] == 0
+    assert counts.loc['A1', 'positive_partitions'] == 5_000
+    assert counts.loc['A1', 'total_partitions'] == 20_000
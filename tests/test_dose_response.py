@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.optimize import curve_fit
+
+from chemistry_app import DoseResponseFitter
+
+DOSES = np.array([0.0, 0.01, 0.03, 0.1, 0.3, 1.0, 3.0, 10.0, 30.0, 100.0])
+
+
+def logistic(x, a, b, c, d, e=1.0):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return d + (a - d) / (1 + (x / c) ** b) ** e
+
+
+def test_jacobian_matches_finite_differences():
+    params = np.array([[0.1, 1.3, np.log(2.0), 2.5, 0.7]])
+    log_x = np.log(DOSES[1:])[None, :]
+    _, jac = DoseResponseFitter.evaluate(params, log_x, jacobian=True)
+    for i in range(5):
+        step = np.zeros_like(params)
+        step[0, i] = 1e-6
+        numeric = (DoseResponseFitter.evaluate(params + step, log_x)
+                   - DoseResponseFitter.evaluate(params - step, log_x)) / 2e-6
+        np.testing.assert_allclose(jac[0, :, i], numeric[0], rtol=1e-5, atol=1e-8)
+
+
+def test_noise_free_curves_recover_parameters():
+    truth = [(0.05, 1.0, 0.5, 2.0), (3.0, 0.8, 5.0, 0.2), (0.1, 2.5, 0.1, 1.0)]
+    responses = np.array([logistic(DOSES, *p) for p in truth])
+    fits = DoseResponseFitter.fit_batch(np.tile(DOSES, (3, 1)), responses)
+    for (a, b, c, d), row in zip(truth, fits.itertuples()):
+        assert (row.bottom_a, row.hill_slope, row.ec50, row.top_d) == pytest.approx((a, b, c, d), rel=1e-4, abs=1e-6)
+        assert row.converged
+    assert fits['direction'].tolist() == ["increasing", "decreasing", "increasing"]
+
+
+@pytest.mark.parametrize("model", ["4PL", "5PL"])
+def test_matches_scipy_curve_fit(model):
+    rng = np.random.default_rng(47)
+    curves = 20
+    truth = np.column_stack([rng.uniform(0, 0.2, curves), rng.uniform(0.7, 2, curves),
+                             10 ** rng.uniform(-1, 1, curves), rng.uniform(1.5, 3, curves),
+                             rng.uniform(0.5, 2, curves) if model == "5PL" else np.ones(curves)])
+    x = np.tile(np.r_[DOSES, DOSES[1:]], (curves, 1))
+    y = np.array([logistic(row, *p) for row, p in zip(x, truth)]) + rng.normal(0, 0.03, x.shape)
+    fits = DoseResponseFitter.fit_batch(x, y, model=model, max_iter=500)
+    n_params = DoseResponseFitter.MODELS[model]
+    for i, row in enumerate(fits.itertuples()):
+        start = [row.bottom_a, row.hill_slope, row.c, row.top_d, row.asymmetry][:n_params]
+        reference, _ = curve_fit(logistic, x[i], y[i], p0=list(truth[i][:n_params]), maxfev=20000)
+        sse = np.sum((y[i] - logistic(x[i], *start)) ** 2)
+        reference_sse = np.sum((y[i] - logistic(x[i], *reference)) ** 2)
+        # Least-squares optimum at least as good as scipy's (5PL surfaces are flat in E)
+        assert sse <= reference_sse * (1 + 1e-6)
+        if model == "4PL":
+            assert row.ec50 == pytest.approx(reference[2], rel=1e-3)
+            assert row.ec50_ci_low < truth[i][2] * 1.5 and row.ec50_ci_high > truth[i][2] / 1.5
+
+
+def test_five_parameter_ec50_is_half_maximal_dose():
+    fits = DoseResponseFitter.fit_batch(DOSES[None, :], logistic(DOSES, 0.0, 1.5, 2.0, 1.0, 0.5)[None, :],
+                                        model="5PL", max_iter=1000)
+    ec50 = fits['ec50'][0]
+    assert logistic(ec50, 0.0, 1.5, 2.0, 1.0, 0.5) == pytest.approx(0.5, abs=1e-4)
+    assert ec50 == pytest.approx(2.0 * (2 ** (1 / 0.5) - 1) ** (1 / 1.5), rel=1e-3)
+
+
+def test_fit_curves_and_back_calculation():
+    rows = []
+    for curve, c in (("plate1", 1.0), ("plate2", 4.0), ("plate3", 0.25)):
+        rows += [(curve, x, logistic(x, 0.05, 1.2, c, 2.0)) for x in DOSES]
+    data = pd.DataFrame(rows, columns=['plate', 'dose', 'od'])
+    fits = DoseResponseFitter.fit_curves(data, 'plate', 'dose', 'od', batch_size=2, max_workers=2)
+    assert fits['curve'].tolist() == ["plate1", "plate2", "plate3"]
+    np.testing.assert_allclose(fits['ec50'], [1.0, 4.0, 0.25], rtol=1e-4)
+
+    unknowns = pd.DataFrame({'curve': ["plate1", "plate2", "plate1"],
+                             'response': [logistic(2.0, 0.05, 1.2, 1.0, 2.0), logistic(0.5, 0.05, 1.2, 4.0, 2.0), 2.5],
+                             'dilution': [10, 1, 1]})
+    result = DoseResponseFitter.back_calculate(fits, unknowns, dilution_column='dilution')
+    assert result['calculated_dose'][:2].tolist() == pytest.approx([2.0, 0.5], rel=1e-4)
+    assert result['final_concentration'][0] == pytest.approx(20.0, rel=1e-4)
+    assert result['in_range'].tolist() == [True, True, False]
+    with pytest.raises(ValueError, match="No fitted curve"):
+        DoseResponseFitter.back_calculate(fits, unknowns.assign(curve="plate9"))
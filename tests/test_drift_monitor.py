@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from chemistry_app import DriftMonitor
+
+
+def reference_monitor(values, target, sigma, k=0.5, h=5.0, lam=0.2, L=3.0):
+    """Montgomery's tabular CUSUM and EWMA recursions, one point at a time"""
+    c_pos = c_neg = 0.0
+    ewma = target
+    rows = []
+    for i, x in enumerate(values, start=1):
+        z = (x - target) / sigma
+        c_pos = max(0.0, c_pos + z - k)
+        c_neg = max(0.0, c_neg - z - k)
+        ewma = lam * x + (1 - lam) * ewma
+        half_width = L * sigma * np.sqrt(lam / (2 - lam) * (1 - (1 - lam) ** (2 * i)))
+        rows.append((c_pos, c_neg, ewma, half_width))
+    return np.array(rows)
+
+
+@pytest.fixture
+def drifting():
+    rng = np.random.default_rng(42)
+    return np.r_[rng.normal(50, 1, 50), rng.normal(51.5, 1, 40), rng.normal(48.5, 1, 40)]
+
+
+def test_matches_reference_recursions(drifting):
+    result, state = DriftMonitor.evaluate(drifting, DriftMonitor.initial_state(50, 1), k=0.5, h=4, lam=0.1, L=2.7)
+    expected = reference_monitor(drifting, 50, 1, k=0.5, h=4, lam=0.1, L=2.7)
+    np.testing.assert_allclose(result[['cusum_pos', 'cusum_neg', 'ewma']], expected[:, :3], atol=1e-9)
+    np.testing.assert_allclose(result['ewma_ucl'] - 50, expected[:, 3])
+    np.testing.assert_array_equal(result['cusum_alert'], (expected[:, 0] > 4) | (expected[:, 1] > 4))
+    assert state['n'] == len(drifting)
+    assert {"Upward", "Downward"} <= set(result['direction'])
+
+
+def test_split_batches_match_single_batch(drifting):
+    whole, whole_state = DriftMonitor.evaluate(drifting, DriftMonitor.initial_state(50, 1))
+    state = DriftMonitor.initial_state(50, 1)
+    parts = []
+    for chunk in np.array_split(drifting, [1, 17, 60, 61, 100]):
+        part, state = DriftMonitor.evaluate(chunk, state)
+        parts.append(part)
+    pd.testing.assert_frame_equal(pd.concat(parts, ignore_index=True), whole)
+    assert state == pytest.approx(whole_state)
+
+
+def test_drift_onset_finds_step():
+    values = np.r_[np.zeros(30), np.full(20, 2.0)]
+    result, _ = DriftMonitor.evaluate(values, DriftMonitor.initial_state(0, 1))
+    onset = DriftMonitor.drift_onset(result)
+    assert onset['side'].tolist() == ["Upward"]
+    assert onset.loc[0, 'estimated_change_point'] == 31
+    # C+ grows by 1.5 per point after the step and must exceed h = 5
+    assert onset.loc[0, 'alarm_point'] == 34
+
+
+def test_estimate_sigma_and_validation():
+    rng = np.random.default_rng(3)
+    values = rng.normal(0, 2, 20000) + np.linspace(0, 50, 20000)
+    assert DriftMonitor.estimate_sigma(values) == pytest.approx(2, rel=0.03)
+    with pytest.raises(ValueError):
+        DriftMonitor.estimate_sigma([1.0])
+    with pytest.raises(ValueError):
+        DriftMonitor.initial_state(0, 0)
+    with pytest.raises(ValueError, match="λ"):
+        DriftMonitor.evaluate([1.0], DriftMonitor.initial_state(0, 1), lam=0)
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from chemistry_app import PCRCalculators
+
+AVOGADRO = 6.022e23
+
+
+def test_ecoli_genome_copies_per_ng():
+    # 4.64 Mb genome at 650 Da/bp: 1 ng ≈ 2.0e5 genome copies (the usual textbook figure)
+    result = PCRCalculators.calculate_gene_copy_number(4_641_652, 1500, 1.0, 1.0)
+    assert result['genome_copies'] == pytest.approx(1e-9 / (4_641_652 * 650 + 36.04) * AVOGADRO)
+    assert result['genome_copies'] == pytest.approx(2.0e5, rel=0.01)
+
+
+def test_template_types():
+    genomic = PCRCalculators.calculate_gene_copy_number(5e6, 1000, 10.0, 2.0, copies_per_genome=3)
+    assert genomic['gene_copies'] == pytest.approx(3 * genomic['genome_copies'])
+    assert genomic['copies_per_ul'] == pytest.approx(genomic['gene_copies'] / 2.0)
+
+    amplicon = PCRCalculators.calculate_gene_copy_number(5e6, 200, 1.0, 1.0, copies_per_genome=3,
+                                                         template_type="amplicon")
+    assert amplicon['gene_copies'] == pytest.approx(1e-9 / (200 * 650 + 36.04) * AVOGADRO)
+
+    plasmid = PCRCalculators.calculate_gene_copy_number(5000, 900, 1.0, 1.0, copies_per_genome=2,
+                                                        template_type="plasmid")
+    assert plasmid['genome_molecular_weight'] == pytest.approx(5000 * 650)
+    assert plasmid['gene_copies'] == pytest.approx(2 * 1e-9 / (5000 * 650) * AVOGADRO)
+    assert plasmid['molarity_pm'] == pytest.approx(plasmid['gene_copies'] / AVOGADRO * 1e18)
+
+
+def test_array_inputs_match_scalar_calls():
+    sizes = np.array([4e6, 5e6, 3.2e9])
+    concentrations = np.array([1.0, 5.0, 20.0])
+    batch = PCRCalculators.calculate_gene_copy_number(sizes, 1000, concentrations, 1.0, mass_per_bp=617.9)
+    for i in range(3):
+        single = PCRCalculators.calculate_gene_copy_number(sizes[i], 1000, concentrations[i], 1.0, mass_per_bp=617.9)
+        assert batch['gene_copies'][i] == pytest.approx(single['gene_copies'])
+
+
+@pytest.mark.parametrize("kwargs", [dict(template_type="cdna"), dict(volume_ul=0.0),
+                                    dict(template_type="amplicon", target_gene_length_bp=0)])
+def test_invalid_inputs(kwargs):
+    args = dict(genome_size_bp=5e6, target_gene_length_bp=100, dna_concentration_ng_ul=1.0, volume_ul=1.0)
+    args.update(kwargs)
+    with pytest.raises(ValueError):
+        PCRCalculators.calculate_gene_copy_number(**args)
+
+
+def test_dilution_series_mass_balance():
+    targets = pd.DataFrame({'target': ['gBlock', 'plasmid'], 'concentration_ng_ul': [10.0, 50.0],
+                            'template_type': ['amplicon', 'plasmid'],
+                            'target_gene_length_bp': [500, 900], 'genome_size_bp': [np.nan, 4500]})
+    table = PCRCalculators.calculate_standard_dilution_series(targets, top_copies_per_ul=1e7, n_points=5,
+                                                              final_volume_ul=100.0)
+    for _, rows in table.groupby('target'):
+        rows = rows.sort_values('point')
+        source = np.r_[rows['stock_copies_per_ul'].iloc[0] / rows['stock_predilution'].iloc[0],
+                       rows['copies_per_ul'].to_numpy()[:-1]]
+        np.testing.assert_allclose(rows['transfer_ul'] * source / 100.0, rows['copies_per_ul'])
+        np.testing.assert_allclose(rows['copies_per_ul'], 1e7 / 10.0 ** np.arange(5))
+        assert (rows['transfer_ul'] >= 1.0).all()
+        np.testing.assert_allclose(rows['transfer_ul'] + rows['diluent_ul'], 100.0)
+
+
+def test_dilution_series_rejects_weak_stock():
+    targets = pd.DataFrame({'target': ['weak'], 'concentration_ng_ul': [1e-6], 'target_gene_length_bp': [500]})
+    with pytest.raises(ValueError, match="below the top standard"):
+        PCRCalculators.calculate_standard_dilution_series(targets)
@@ -0,0 +1,138 @@
+import gzip
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import chemistry_app
+from chemistry_app import GenomeIndex
+
+COMPLEMENT = str.maketrans("ACGT", "TGCA")
+
+
+def reverse_complement(seq):
+    return seq.translate(COMPLEMENT)[::-1]
+
+
+@pytest.fixture(scope="module")
+def genome(tmp_path_factory):
+    rng = np.random.default_rng(9)
+    contigs = {}
+    for name, length in [("chr1", 6000), ("chr2", 2500), ("plasmid", 900)]:
+        bases = rng.choice(list("ACGTN"), length, p=[0.245, 0.245, 0.245, 0.245, 0.02])
+        contigs[name] = "".join(bases)
+    # Plant a product: forward site on chr1, reverse-complemented reverse site 400 bp later
+    forward, reverse = "GATTACAGGCTCAAGTCCGATCA", "TTGCCGAAGCTACCGTTAGCATG"
+    chr1 = contigs["chr1"]
+    contigs["chr1"] = chr1[:1000] + forward + chr1[1023:1400] + reverse_complement(reverse) + chr1[1423:]
+    path = tmp_path_factory.mktemp("genome") / "toy.fa.gz"
+    with gzip.open(path, "wt") as handle:
+        for name, seq in contigs.items():
+            handle.write(f">{name} test contig\n")
+            handle.writelines(seq[i:i + 70] + "\n" for i in range(0, len(seq), 70))
+    GenomeIndex.build(str(path), str(path) + ".kidx", k=8, chunk_size=1000)
+    return {'path': path, 'contigs': contigs, 'index': GenomeIndex.load(str(path) + ".kidx"),
+            'forward': forward, 'reverse': reverse}
+
+
+def test_kmer_codes_match_naive_scan():
+    rng = np.random.default_rng(10)
+    codes = rng.choice(5, 3000, p=[0.24, 0.24, 0.24, 0.24, 0.04]).astype(np.uint8)
+    kmers, starts = GenomeIndex._kmer_codes(codes, 11)
+    expected = [(i, int("".join(map(str, codes[i:i + 11])), 4)) for i in range(len(codes) - 10)
+                if (codes[i:i + 11] < 4).all()]
+    assert starts.tolist() == [i for i, _ in expected]
+    assert kmers.tolist() == [code for _, code in expected]
+
+
+def test_iter_fasta_chunks_reassemble_records(genome):
+    records = {}
+    for name, chunk, is_new_record in GenomeIndex.iter_fasta(str(genome['path']), chunk_size=500):
+        if is_new_record:
+            records[name] = ""
+        else:
+            assert len(chunk) < 500 + 70
+            records[name] += chunk
+    assert records == genome['contigs']
+
+
+def test_index_lists_every_kmer_position(genome):
+    index = genome['index']
+    sequence = np.asarray(index['sequence'])
+    assert index['total_length'] == sum(map(len, genome['contigs'].values()))
+    expected = {}
+    for contig in index['contigs']:
+        kmers, starts = GenomeIndex._kmer_codes(sequence[contig['offset']:contig['offset'] + contig['length']], 8)
+        for code, start in zip(kmers.tolist(), starts.tolist()):
+            expected.setdefault(code, []).append(contig['offset'] + start)
+    offsets, positions = index['offsets'], index['positions']
+    for code in list(expected)[:2000]:
+        assert positions[offsets[code]:offsets[code + 1]].tolist() == expected[code]
+    assert offsets[-1] == sum(map(len, expected.values()))
+
+
+def brute_force_sites(contigs, primer, max_mismatches, three_prime_exact=3):
+    rows = []
+    for strand, probe in (('+', primer), ('-', reverse_complement(primer))):
+        for name, seq in contigs.items():
+            for start in range(len(seq) - len(probe) + 1):
+                window = seq[start:start + len(probe)]
+                mismatch = [a != b for a, b in zip(window, probe)]
+                tail = mismatch[-three_prime_exact:] if strand == '+' else mismatch[:three_prime_exact]
+                if sum(mismatch) <= max_mismatches and not any(tail):
+                    rows.append((strand, name, start + 1, sum(mismatch)))
+    return sorted(rows)
+
+
+@pytest.mark.parametrize("primer_length", [18, 24, 27])
+def test_find_sites_matches_brute_force(genome, primer_length):
+    chr1 = genome['contigs']['chr1']
+    primer = chr1[3000:3000 + primer_length].replace("N", "A")
+    primer = primer[:5] + ("C" if primer[5] != "C" else "G") + primer[6:]
+    sites = GenomeIndex.find_sites(genome['index'], primer, max_mismatches=2)
+    found = sorted(zip(sites['strand'], sites['contig'], sites['start'], sites['mismatches']))
+    assert found == brute_force_sites(genome['contigs'], primer, 2)
+    assert ('+', 'chr1', 3001) in {row[:3] for row in found}
+
+
+def test_in_silico_pcr_finds_planted_product(genome):
+    result = GenomeIndex.in_silico_pcr(genome['index'], genome['forward'], genome['reverse'], max_mismatches=0)
+    amplicons = result['amplicons']
+    assert len(amplicons) == 1
+    product = amplicons.iloc[0]
+    assert (product['contig'], product['start'], product['end'], product['size_bp']) == ('chr1', 1001, 1423, 423)
+
+
+def test_run_pairs_matches_single_pair(genome):
+    pairs = pd.DataFrame({'name': ['planted', 'swapped'],
+                          'forward': [genome['forward'], genome['reverse']],
+                          'reverse': [genome['reverse'], genome['forward']]})
+    result = GenomeIndex.run_pairs(genome['index']['index_dir'], pairs, max_mismatches=0)
+    assert result['summary']['specific'].tolist() == [True, True]
+
+
+def test_index_is_current_until_fasta_changes(genome):
+    assert GenomeIndex.is_current(str(genome['path']), str(genome['path']) + ".kidx")
+    stat = os.stat(genome['path'])
+    os.utime(genome['path'], (stat.st_atime, stat.st_mtime + 10))
+    assert not GenomeIndex.is_current(str(genome['path']), str(genome['path']) + ".kidx")
+
+
+def test_build_rejects_large_k(genome, tmp_path):
+    with pytest.raises(ValueError, match="k must be between 8 and 12"):
+        GenomeIndex.build(str(genome['path']), str(tmp_path / "idx"), k=13)
+
+
+def test_resolve_data_path_stays_inside_data_dir(tmp_path, monkeypatch):
+    data_dir = tmp_path / "data"
+    (data_dir / "genomes").mkdir(parents=True)
+    (tmp_path / "secret.txt").write_text("x")
+    os.symlink(tmp_path / "secret.txt", data_dir / "link.txt")
+    monkeypatch.setattr(chemistry_app, "DATA_DIR", str(data_dir))
+
+    assert chemistry_app.resolve_data_path("genomes/toy.fa") == str(data_dir / "genomes" / "toy.fa")
+    assert chemistry_app.resolve_data_path(str(data_dir / "genomes")) == str(data_dir / "genomes")
+    for path in ["../secret.txt", str(tmp_path / "secret.txt"), "link.txt", "/etc/passwd"]:
+        with pytest.raises(ValueError, match="data directory"):
+            chemistry_app.resolve_data_path(path)
@@ -0,0 +1,85 @@
+import gzip
+import os
+
+import pandas as pd
+import pytest
+
+from chemistry_app import GenomeReference
+
+MASS = GenomeReference.BASE_MASS
+
+
+def write_fasta(path, records, compress=False):
+    opener = gzip.open if compress else open
+    with opener(path, "wt") as handle:
+        for name, seq in records.items():
+            handle.write(f">{name} description\n")
+            handle.writelines(seq[i:i + 60] + "\n" for i in range(0, len(seq), 60))
+    return str(path)
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    GenomeReference._cache.clear()
+    yield
+    GenomeReference._cache.clear()
+
+
+@pytest.mark.parametrize("file_name, expected", [
+    ("hg38.p14.fa.gz", "hg38.p14"), ("ecoli.FASTA", "ecoli"), ("phage.fna.bgz", "phage"),
+    ("plasmid.v2.gb", "plasmid.v2.gb"), (".fa", ".fa"), ("/refs/chr1.fasta", "chr1"),
+])
+def test_reference_name(file_name, expected):
+    assert GenomeReference.reference_name(file_name) == expected
+
+
+def test_summarize_counts_and_mass(tmp_path):
+    records = {"chr1": "ACGT" * 300 + "NNNN", "chr2": "gggcccaatt" * 50}
+    summary = GenomeReference.summarize(write_fasta(tmp_path / "toy.fa.gz", records, compress=True))
+    contigs = summary['contigs'].set_index('contig')
+
+    assert summary['name'] == "toy"
+    assert summary['genome_size_bp'] == 1204 + 500
+    assert contigs.loc['chr1', 'N'] == 4
+    assert contigs.loc['chr2', 'G'] == 150
+    assert summary['gc_content'] == pytest.approx(100 * (600 + 300) / 1700)
+
+    at_pair, gc_pair = MASS['A'] + MASS['T'], MASS['C'] + MASS['G']
+    assert contigs.loc['chr2', 'molecular_weight'] == pytest.approx(
+        200 * at_pair + 300 * gc_pair + 2 * GenomeReference.STRAND_END_MASS)
+    mean_pair = (800 * at_pair + 900 * gc_pair) / 1700
+    assert contigs.loc['chr1', 'molecular_weight'] == pytest.approx(
+        600 * at_pair + 600 * gc_pair + 4 * mean_pair + 2 * GenomeReference.STRAND_END_MASS)
+
+
+def test_summarize_cache_follows_file_changes(tmp_path):
+    path = write_fasta(tmp_path / "ref.fa", {"c": "ACGT" * 10})
+    first = GenomeReference.summarize(path)
+    assert GenomeReference.summarize(path) is first
+    write_fasta(path, {"c": "ACGT" * 20})
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 5))
+    assert GenomeReference.summarize(path)['genome_size_bp'] == 80
+
+
+def test_batch_copy_numbers_match_avogadro(tmp_path):
+    references = {
+        name: GenomeReference.summarize(write_fasta(tmp_path / f"{name}.fa", {"c": seq}))
+        for name, seq in [("at", "AT" * 2000), ("gc", "GC" * 3000)]
+    }
+    sheet = pd.DataFrame({'sample': ['s1', 's2', 's3'], 'concentration_ng_ul': [1.0, 2.0, 0.5],
+                          'volume_ul': [1.0, 1.0, 4.0], 'reference': ['at', 'gc', '']})
+    result = GenomeReference.batch_copy_numbers(sheet, references)
+    for row in result.itertuples():
+        ref = references[row.reference]
+        molecular_weight = ref['genome_size_bp'] * ref['mass_per_bp'] + 36.04
+        expected = row.concentration_ng_ul * row.volume_ul * 1e-9 / molecular_weight * 6.022e23
+        assert row.genome_copies == pytest.approx(expected)
+    assert result['reference'].tolist() == ['at', 'gc', 'at']
+
+
+def test_batch_copy_numbers_rejects_unknown_reference(tmp_path):
+    references = {"ref": GenomeReference.summarize(write_fasta(tmp_path / "ref.fa", {"c": "ACGT" * 10}))}
+    with pytest.raises(ValueError, match="Unknown reference"):
+        GenomeReference.batch_copy_numbers(pd.DataFrame({'concentration_ng_ul': [1.0], 'reference': ['x']}),
+                                           references)
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from chemistry_app import HypothesisTests
+
+
+@pytest.fixture
+def study():
+    rng = np.random.default_rng(46)
+    rows = []
+    for f in range(12):
+        for g, shift in zip("ABCD", (0.0, 0.3 * (f % 3), 1.0 * (f % 2), -0.5)):
+            n = int(rng.integers(4, 12))
+            # Rounded values so Mann-Whitney has ties to correct for
+            rows += [(f"F{f:02d}", g, v) for v in np.round(rng.normal(10 + shift, 1 + f % 2, n), 1)]
+    return pd.DataFrame(rows, columns=['feature', 'group', 'value'])
+
+
+def groups_of(study, feature):
+    subset = study[study['feature'] == feature]
+    return {g: subset.loc[subset['group'] == g, 'value'].to_numpy() for g in "ABCD"}
+
+
+@pytest.mark.parametrize("method", ["student", "welch"])
+def test_t_tests_match_scipy(study, method):
+    result = HypothesisTests.two_group(study, 'feature', 'group', 'value', "A", "C", method=method)
+    for row in result.itertuples():
+        data = groups_of(study, row.feature)
+        reference = stats.ttest_ind(data["C"], data["A"], equal_var=method == "student")
+        assert row.statistic == pytest.approx(reference.statistic)
+        assert row.p_value == pytest.approx(reference.pvalue)
+
+
+def test_mann_whitney_matches_scipy(study):
+    result = HypothesisTests.two_group(study, 'feature', 'group', 'value', "B", "D", method="mannwhitney")
+    for row in result.itertuples():
+        data = groups_of(study, row.feature)
+        reference = stats.mannwhitneyu(data["B"], data["D"], method="asymptotic", use_continuity=True)
+        assert row.statistic == pytest.approx(reference.statistic)
+        assert row.p_value == pytest.approx(reference.pvalue)
+
+
+def test_anova_matches_f_oneway(study):
+    result = HypothesisTests.anova(study, 'feature', 'group', 'value')
+    for row in result.itertuples():
+        reference = stats.f_oneway(*groups_of(study, row.feature).values())
+        assert row.f_value == pytest.approx(reference.statistic)
+        assert row.p_value == pytest.approx(reference.pvalue)
+
+
+def test_studentized_range_matches_scipy():
+    q = np.array([0.5, 2.0, 3.5, 5.0, 8.0])
+    for k, df in ((2, 5), (4, 20), (8, 120)):
+        np.testing.assert_allclose(HypothesisTests._studentized_range_sf(q, k, df),
+                                   stats.studentized_range.sf(q, k, df), rtol=1e-4, atol=1e-9)
+
+
+def test_tukey_matches_scipy(study):
+    result = HypothesisTests.tukey_hsd(study, 'feature', 'group', 'value')
+    assert len(result) == 12 * 6
+    for feature in ("F00", "F05", "F11"):
+        data = groups_of(study, feature)
+        reference = stats.tukey_hsd(*data.values())
+        interval = reference.confidence_interval(0.95)
+        rows = result[result['feature'] == feature]
+        for row in rows.itertuples():
+            i, j = "ABCD".index(row.group_1), "ABCD".index(row.group_2)
+            # scipy reports mean_i - mean_j; the table reports group_2 - group_1
+            assert row.mean_difference == pytest.approx(-reference.statistic[i, j])
+            assert row.p_tukey == pytest.approx(reference.pvalue[i, j], rel=2e-3, abs=1e-6)
+            assert row.ci_high == pytest.approx(-interval.low[i, j], rel=1e-3)
+
+
+def test_adjust_p():
+    p = np.array([0.01, np.nan, 0.04, 0.03, 0.005, 0.5])
+    valid = np.isfinite(p)
+    np.testing.assert_allclose(HypothesisTests.adjust_p(p, "bonferroni")[valid], np.minimum(p[valid] * 5, 1))
+    np.testing.assert_allclose(HypothesisTests.adjust_p(p, "bh")[valid], stats.false_discovery_control(p[valid]))
+    # Holm step-down by hand: sorted p × (m - rank), running maximum
+    order = np.argsort(p[valid])
+    holm = np.empty(5)
+    holm[order] = np.minimum(np.maximum.accumulate(np.sort(p[valid]) * np.arange(5, 0, -1)), 1)
+    np.testing.assert_allclose(HypothesisTests.adjust_p(p, "holm")[valid], holm)
+    assert np.isnan(HypothesisTests.adjust_p(p, "holm")[1])
+    with pytest.raises(ValueError, match="Unknown correction"):
+        HypothesisTests.adjust_p(p, "sidak")
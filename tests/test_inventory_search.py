@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from chemistry_app import InventoryStore
+
+WORDS = ["sodium", "potassium", "chloride", "phosphate", "sulfate", "acetate", "buffer", "tris", "hepes", "glycine",
+         "ethanol", "methanol", "acid", "hydroxide", "nitrate", "magnesium", "calcium", "edta", "citrate", "borate"]
+
+
+def make_inventory(n, seed=50):
+    rng = np.random.default_rng(seed)
+    names = [" ".join(rng.choice(WORDS, int(rng.integers(1, 4))).tolist()).title() + f" {i}" for i in range(n)]
+    return pd.DataFrame({
+        'name': names,
+        'formula': rng.choice(["NaCl", "KCl", "Na2SO4", "C4H11NO3", "HCl", "MgCl2", ""], n),
+        'cas_number': [f"{rng.integers(50, 99999)}-{rng.integers(10, 99)}-{rng.integers(0, 9)}" for _ in range(n)],
+        'synonyms': rng.choice(["", "table salt", "THAM; trometamol", "muriatic acid", "spirit"], n),
+        'supplier': rng.choice(["Sigma", "Fisher", "VWR"], n),
+        'lot_number': [f"LOT{rng.integers(0, 10 ** 6):06d}" for _ in range(n)],
+        'location': rng.choice(["Shelf A", "Shelf B", "Cold room"], n),
+        'hazard_class': rng.choice(["Non-hazardous", "Corrosive", "Flammable"], n),
+    })
+
+
+def brute_force(frame, search, **filters):
+    """Rows whose searchable fields contain every term, case-insensitively"""
+    keep = pd.Series(True, index=frame.index)
+    for term in search.lower().split():
+        keep &= frame[InventoryStore.SEARCH_COLUMNS].apply(lambda col: col.str.lower().str.contains(term, regex=False)
+                                                           ).any(axis=1)
+    for column, value in filters.items():
+        keep &= frame[column] == value
+    return set(frame.loc[keep, 'name'])
+
+
+@pytest.fixture(scope="module")
+def inventory(tmp_path_factory):
+    frame = make_inventory(2000)
+    store = InventoryStore(str(tmp_path_factory.mktemp("search") / "inventory.sqlite"))
+    store.add_many(frame)
+    return store, frame
+
+
+@pytest.mark.parametrize("search", ["sodium", "SULF", "chloride sodium", "na", "NaCl", "trometamol", "lot00",
+                                    "acid cl", "50%", 'hep"es', "zzz"])
+def test_search_matches_substring_scan(inventory, search):
+    store, frame = inventory
+    if not store.fts:
+        pytest.skip("SQLite built without FTS5 trigram tokenizer")
+    expected = brute_force(frame, search)
+    assert store.count(search=search) == len(expected)
+    assert set(store.page(limit=-1, search=search)['name']) == expected
+    assert set(store.page(limit=-1, search=search, location="Cold room")['name']) == \
+        brute_force(frame, search, location="Cold room")
+
+
+def test_like_fallback_matches_index(inventory, tmp_path, monkeypatch):
+    store, frame = inventory
+    monkeypatch.setattr(InventoryStore, "_create_search_index", staticmethod(lambda conn: False))
+    plain = InventoryStore(str(tmp_path / "plain.sqlite"))
+    plain.add_many(frame)
+    for search in ("sodium", "acid cl", "na"):
+        assert set(plain.page(limit=-1, search=search)['name']) == brute_force(frame, search)
+    assert plain.fuzzy_search("sodiun").empty
+
+
+def test_relevance_order_and_cap(inventory, monkeypatch):
+    store, frame = inventory
+    monkeypatch.setattr(InventoryStore, "SEARCH_HIT_LIMIT", 100)
+    if not store.fts:
+        pytest.skip("SQLite built without FTS5 trigram tokenizer")
+    store.add({'name': "Chloride", 'synonyms': "chloride ion"})
+    try:
+        matches = len(brute_force(frame, "chloride")) + 1
+        assert matches > InventoryStore.SEARCH_HIT_LIMIT
+        ranked = store.page(limit=-1, search="chloride", order_by="relevance")
+        assert ranked['name'][0] == "Chloride"
+        assert ranked['name'][1].lower().startswith("chloride")
+        # Only relevance ranking is capped; counts and column sorts see every match
+        assert len(ranked) == InventoryStore.SEARCH_HIT_LIMIT
+        assert len(store.page(limit=-1, search="chloride", order_by="name")) == matches
+        assert store.count(search="chloride") == matches
+    finally:
+        store.delete(store.page(search="chloride ion")['id'].tolist())
+
+
+@pytest.mark.parametrize("typo", ["magnesiun", "magnsium", "magnessium", "magnesuim"])
+def test_fuzzy_search_finds_one_typo(inventory, typo):
+    store, frame = inventory
+    if not store.fts:
+        pytest.skip("SQLite built without FTS5 trigram tokenizer")
+    assert store.count(search=typo) == 0
+    hits = store.fuzzy_search(typo, limit=5)
+    assert len(hits) == 5
+    assert all("magnesium" in name.lower() for name in hits['name'])
+    assert hits['similarity'].is_monotonic_decreasing
+
+
+def test_fuzzy_search_excludes_exact_hits(inventory):
+    store, _ = inventory
+    if not store.fts:
+        pytest.skip("SQLite built without FTS5 trigram tokenizer")
+    store.add({'name': "Glycinr (mislabelled)"})
+    try:
+        # Hundreds of rows contain "glycine" exactly; only the misspelt one is a fuzzy hit
+        assert store.count(search="glycine") > 100
+        assert store.fuzzy_search("glycine", limit=50)['name'].tolist() == ["Glycinr (mislabelled)"]
+    finally:
+        store.delete(store.page(search="mislabelled")['id'].tolist())
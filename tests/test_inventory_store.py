@@ -0,0 +1,99 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+import chemistry_app
+from chemistry_app import InventoryStore
+
+ITEMS = [
+    {'name': "Sodium Chloride", 'formula': "NaCl", 'quantity': 500, 'unit': "g", 'location': "Shelf A",
+     'expiry_date': "2027-01-01"},
+    {'name': "Tris base", 'formula': "C4H11NO3", 'quantity': 1000, 'unit': "g", 'location': "Shelf B"},
+    {'name': "Hydrochloric Acid", 'formula': "HCl", 'quantity': 2.5, 'unit': "L", 'location': "Acid cabinet",
+     'hazard_class': "Corrosive", 'expiry_date': "2020-06-30"},
+    {'name': "acetone", 'formula': "C3H6O", 'quantity': 4, 'unit': "L", 'location': "Flammables",
+     'hazard_class': "Flammable", 'expiry_date': "2025-03-15 00:00:00"},
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = InventoryStore(str(tmp_path / "inventory.sqlite"))
+    store.add_many(pd.DataFrame(ITEMS))
+    return store
+
+
+def test_add_page_and_count(store):
+    assert store.count() == 4
+    page = store.page()
+    assert page['name'].tolist() == ["acetone", "Hydrochloric Acid", "Sodium Chloride", "Tris base"]
+    assert page.loc[page['name'] == "acetone", 'expiry_date'].item() == "2025-03-15"
+    assert page.loc[page['name'] == "Tris base", 'hazard_class'].item() == "Non-hazardous"
+    assert store.page(offset=1, limit=2)['name'].tolist() == ["Hydrochloric Acid", "Sodium Chloride"]
+    new_id = store.add({'name': "Ethanol", 'hazard_class': "Flammable"})
+    assert store.count(hazard_class="Flammable") == 2
+    assert store.page(hazard_class="Flammable", order_by="name")['id'].tolist()[1] == new_id
+    with pytest.raises(ValueError, match="name is required"):
+        store.add({'name': "  "})
+
+
+def test_filters_and_sorting(store):
+    assert store.page(location="Shelf B")['name'].tolist() == ["Tris base"]
+    assert store.count(expiring_before="2026-01-01") == 2
+    # Items without an expiry date sort after every dated item
+    assert store.page(order_by="expiry_date")['name'].tolist() == ["Hydrochloric Acid", "acetone",
+                                                                  "Sodium Chloride", "Tris base"]
+    assert store.page(order_by="quantity")['quantity'].tolist() == [2.5, 4, 500, 1000]
+    # Unknown sort keys fall back to name instead of reaching the SQL
+    assert store.page(order_by="name; DROP TABLE chemicals")['name'][0] == "acetone"
+    assert store.count(search="50%") == 0
+
+
+def test_update_delete_export_and_clear(store):
+    acid = store.page(search="HCl")['id'].item()
+    store.update(acid, {'quantity': 1.0, 'added_date': "1999-01-01", 'bogus': 1})
+    row = store.page(search="HCl").iloc[0]
+    assert row['quantity'] == 1.0 and row['added_date'] != "1999-01-01"
+    store.delete([acid])
+    assert store.count() == 3
+    exported = store.export(order_by="name")
+    assert len(exported) == 3 and list(exported.columns) == ['id'] + InventoryStore.COLUMNS
+    assert store.distinct('location') == ["Flammables", "Shelf A", "Shelf B"]
+    with pytest.raises(ValueError):
+        store.distinct('notes')
+    summary = store.summary()
+    assert summary['total'] == 3 and summary['hazardous'] == 1 and summary['expired'] == 1
+    store.clear()
+    assert store.count() == 0
+
+
+def test_reopening_keeps_data(store):
+    again = InventoryStore(store.path)
+    assert again.count() == 4
+
+
+def test_connections_are_closed(tmp_path, monkeypatch):
+    opened = []
+    connect = sqlite3.connect
+
+    def tracking_connect(*args, **kwargs):
+        opened.append(connect(*args, **kwargs))
+        return opened[-1]
+
+    monkeypatch.setattr(chemistry_app.sqlite3, "connect", tracking_connect)
+    store = InventoryStore(str(tmp_path / "inventory.sqlite"))
+    item = store.add(ITEMS[0])
+    store.add_many(ITEMS[1:])
+    store.update(item, {'quantity': 1})
+    store.page(search="sodium")
+    store.count()
+    store.fuzzy_search("sodiun")
+    store.distinct('unit')
+    store.summary()
+    store.delete([item])
+    store.clear()
+    assert len(opened) == 11
+    for conn in opened:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+from chemistry_app import MeltCurveAnalyzer
+
+TEMPERATURES = np.arange(65.0, 95.01, 0.2)
+
+
+def melt(*transitions, width=0.6):
+    # Each (Tm, amplitude) transition is a logistic drop whose −dF/dT peaks exactly at Tm
+    return sum(a / (1 + np.exp((TEMPERATURES - tm) / width)) for tm, a in transitions) + 50.0
+
+
+def test_smooth_matches_edge_padded_convolution():
+    values = np.random.default_rng(3).normal(size=(4, 30))
+    padded = np.pad(values, ((0, 0), (2, 2)), mode='edge')
+    expected = np.vstack([np.convolve(row, np.ones(5) / 5, mode='valid') for row in padded])
+    np.testing.assert_allclose(MeltCurveAnalyzer.smooth(values, 5), expected)
+
+
+def test_single_product_tm_is_recovered():
+    fluorescence = np.vstack([melt((84.3, 1000)), melt((81.17, 800))])
+    result = MeltCurveAnalyzer.analyze_plate(np.array(['A1', 'A2']), TEMPERATURES, fluorescence)['results']
+    np.testing.assert_allclose(result['tm'], [84.3, 81.17], atol=0.05)
+    assert result['melt_flag'].tolist() == ["Single product", "Single product"]
+    assert (result['n_peaks'] == 1).all()
+
+
+def test_primer_dimer_taller_than_product_is_flagged():
+    fluorescence = np.vstack([melt((84.0, 1000), (75.0, 300)), melt((84.0, 200), (75.0, 1000))])
+    result = MeltCurveAnalyzer.analyze_plate(np.array(['A1', 'A2']), TEMPERATURES, fluorescence)['results']
+    assert result['melt_flag'].tolist() == ["Primer dimer", "Primer dimer"]
+    np.testing.assert_allclose(result['tm'], 84.0, atol=0.1)
+    np.testing.assert_allclose(result['tm_secondary'], 75.0, atol=0.1)
+
+
+def test_close_peaks_are_multiple_products():
+    fluorescence = melt((84.0, 1000), (80.5, 700))[None, :]
+    result = MeltCurveAnalyzer.analyze_plate(np.array(['A1']), TEMPERATURES, fluorescence)['results']
+    assert result['melt_flag'].iloc[0] == "Multiple products"
+
+
+def test_flat_well_and_unexpected_tm():
+    fluorescence = np.vstack([np.full(len(TEMPERATURES), 50.0), melt((79.0, 1000))])
+    result = MeltCurveAnalyzer.analyze_plate(np.array(['A1', 'A2']), TEMPERATURES, fluorescence,
+                                             expected_tm=84.0)['results']
+    assert result['melt_flag'].tolist() == ["No peak", "Unexpected Tm"]
+
+
+def test_plateau_peak_counts_once():
+    derivative = np.zeros((1, 40))
+    derivative[0, 18:22] = 10.0
+    peaks = MeltCurveAnalyzer.detect_peaks(derivative, np.arange(40) * 0.5 + 70)
+    assert peaks['n_peaks'][0] == 1
+
+
+def test_join_with_ct_is_outer_on_well():
+    melt_results = pd.DataFrame({'well': ['A1', 'A2'], 'tm': [84.0, 83.9]})
+    ct_results = pd.DataFrame({'well': ['A1', 'A3'], 'ct': [20.0, 25.0]})
+    joined = MeltCurveAnalyzer.join_with_ct(melt_results, ct_results)
+    assert sorted(joined['well']) == ['A1', 'A2', 'A3']
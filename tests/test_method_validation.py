@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from chemistry_app import MethodValidation
+
+
+def nested_study(rng, sizes, sds, mean=100.0):
+    """Fully nested design; `sizes[i]` is a function giving the number of children of each group"""
+    rows = [((), mean)]
+    for size, sd in zip(sizes, sds):
+        rows = [(path + (j,), value + rng.normal(0, sd))
+                for path, value in rows for j in range(size(rng))]
+    frame = pd.DataFrame([path for path, _ in rows], columns=['instrument', 'analyst', 'day', 'rep'][:len(sizes)])
+    frame['value'] = [value for _, value in rows]
+    return frame
+
+
+def test_balanced_design_matches_textbook_expected_mean_squares():
+    rng = np.random.default_rng(45)
+    frame = nested_study(rng, [lambda r: 4, lambda r: 3, lambda r: 5], [2.0, 1.0, 0.5])
+    table, summary = MethodValidation.nested_anova(frame, 'value', ['instrument', 'analyst'])
+    a, b, n = 4, 3, 5
+    grand = frame['value'].mean()
+    inst = frame.groupby('instrument')['value'].mean()
+    cell = frame.groupby(['instrument', 'analyst'])['value'].transform('mean')
+    ss_a = b * n * np.sum((inst - grand) ** 2)
+    cells = frame.groupby(['instrument', 'analyst'])['value'].mean()
+    ss_b = n * np.sum((cells - inst[cells.index.get_level_values(0)].to_numpy()) ** 2)
+    ss_e = np.sum((frame['value'] - cell) ** 2)
+    np.testing.assert_allclose(table['sum_sq'], [ss_a, ss_b, ss_e])
+    np.testing.assert_allclose(table['df'], [a - 1, a * (b - 1), a * b * (n - 1)])
+    ms_a, ms_b, ms_e = table['mean_sq']
+    expected = [max((ms_a - ms_b) / (b * n), 0), max((ms_b - ms_e) / n, 0), ms_e]
+    np.testing.assert_allclose(table['variance_component'], expected)
+    assert table['f_value'][0] == pytest.approx(ms_a / ms_b)
+    assert table['p_value'][1] == pytest.approx(stats.f.sf(ms_b / ms_e, a * (b - 1), a * b * (n - 1)))
+    assert summary['intermediate_precision_sd'] == pytest.approx(np.sqrt(sum(expected)))
+    assert summary['repeatability_limit'] == pytest.approx(2.8 * np.sqrt(ms_e))
+
+
+def test_unbalanced_one_way_uses_n0():
+    rng = np.random.default_rng(46)
+    frame = nested_study(rng, [lambda r: 6, lambda r: int(r.integers(2, 9))], [3.0, 1.0])
+    table, _ = MethodValidation.nested_anova(frame, 'value', ['instrument'])
+    n_i = frame.groupby('instrument').size().to_numpy()
+    n0 = (n_i.sum() - np.sum(n_i ** 2) / n_i.sum()) / (len(n_i) - 1)
+    one_way = stats.f_oneway(*[g['value'] for _, g in frame.groupby('instrument')])
+    assert table['f_value'][0] == pytest.approx(one_way.statistic)
+    assert table['variance_component'][0] == pytest.approx((table['mean_sq'][0] - table['mean_sq'][1]) / n0)
+
+
+def test_unbalanced_nested_components_are_unbiased():
+    rng = np.random.default_rng(47)
+    sds = [3.0, 2.0, 1.0]
+    design = nested_study(rng, [lambda r: 5, lambda r: int(r.integers(2, 5)), lambda r: int(r.integers(2, 6))], sds)
+    ids = [design['instrument'].to_numpy(), design.groupby(['instrument', 'analyst']).ngroup().to_numpy()]
+    mean_squares = []
+    for _ in range(1500):
+        # Same unbalanced layout, fresh random effects
+        value = (rng.normal(0, sds[0], ids[0].max() + 1)[ids[0]] + rng.normal(0, sds[1], ids[1].max() + 1)[ids[1]]
+                 + rng.normal(0, sds[2], len(design)))
+        table, _ = MethodValidation.nested_anova(design.assign(value=value), 'value', ['instrument', 'analyst'])
+        mean_squares.append(table['mean_sq'].to_numpy())
+    ms = np.mean(mean_squares, axis=0)
+    n_i = design.groupby('instrument').size()
+    n_ij = design.groupby(['instrument', 'analyst']).size()
+    n = len(design)
+    # Averaged mean squares must match Searle's expected mean squares for the two-stage nested model
+    k_e_b = (n - np.sum((n_ij ** 2).groupby(level=0).sum() / n_i)) / (len(n_ij) - len(n_i))
+    k_b_a = (np.sum((n_ij ** 2).groupby(level=0).sum() / n_i) - np.sum(n_ij ** 2) / n) / (len(n_i) - 1)
+    k_a_a = (n - np.sum(n_i ** 2) / n) / (len(n_i) - 1)
+    assert ms[2] == pytest.approx(sds[2] ** 2, rel=0.03)
+    assert ms[1] == pytest.approx(sds[2] ** 2 + k_e_b * sds[1] ** 2, rel=0.05)
+    assert ms[0] == pytest.approx(sds[2] ** 2 + k_b_a * sds[1] ** 2 + k_a_a * sds[0] ** 2, rel=0.06)
+
+
+def test_precision_lists_unestimable_levels():
+    rng = np.random.default_rng(48)
+    study = pd.concat([nested_study(rng, [lambda r: 3, lambda r: 3], [1.0, 0.5]).assign(level=10.0),
+                       pd.DataFrame({'instrument': 0, 'value': rng.normal(0, 0.1, 5), 'level': 0.0})])
+    summary, components = MethodValidation.precision(study, 'value', ['instrument'], 'level')
+    assert summary['level'].tolist() == [0.0, 10.0]
+    assert "more than one level" in summary['note'][0]
+    assert summary['note'][1] == ""
+    assert set(components['level']) == {10.0}
+
+
+def test_linearity_recovery_and_detection_limits():
+    rng = np.random.default_rng(49)
+    nominal = np.repeat([0, 1, 2, 5, 10, 20], 3).astype(float)
+    measured = 0.2 + 1.02 * nominal + rng.normal(0, 0.1, len(nominal))
+    fit = MethodValidation.linearity(nominal, measured)
+    reference = stats.linregress(nominal, measured)
+    assert fit['slope'] == pytest.approx(reference.slope)
+    assert fit['intercept'] == pytest.approx(reference.intercept)
+    assert fit['r_squared'] == pytest.approx(reference.rvalue ** 2)
+    t = stats.t.ppf(0.975, len(nominal) - 2)
+    assert fit['slope_ci'][1] - fit['slope'] == pytest.approx(t * reference.stderr)
+    assert fit['intercept_ci'][1] - fit['intercept'] == pytest.approx(t * reference.intercept_stderr)
+
+    recovery = MethodValidation.recovery(nominal, measured)
+    spiked = nominal == 5
+    test = stats.ttest_1samp(measured[spiked] / 5 * 100, 100)
+    row = recovery.set_index('nominal').loc[5.0]
+    assert row['p_value_vs_100'] == pytest.approx(test.pvalue)
+    assert 0.0 not in recovery['nominal'].tolist()
+
+    limits = MethodValidation.detection_limits(nominal, measured)
+    assert limits['lod'] == pytest.approx(3.3 * fit['residual_sd'] / fit['slope'])
+    assert limits['loq_blank'] == pytest.approx(10 * np.std(measured[:3], ddof=1) / fit['slope'])
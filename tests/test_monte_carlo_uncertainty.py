@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from scipy import stats
+
+from chemistry_app import MonteCarloUncertainty
+
+
+def inputs_for(model_name):
+    _, specs = MonteCarloUncertainty.MODELS[model_name]
+    return {name: {'value': value, 'uncertainty': u} for name, _, value, u in specs}
+
+
+@pytest.mark.parametrize("distribution", MonteCarloUncertainty.DISTRIBUTIONS)
+def test_samples_have_stated_mean_and_uncertainty(distribution):
+    draws = MonteCarloUncertainty.sample(10.0, 0.5, distribution, 400_000, np.random.default_rng(1))
+    assert draws.mean() == pytest.approx(10.0, abs=0.005)
+    assert draws.std() == pytest.approx(0.5, rel=0.01)
+
+
+def test_molarity_matches_gum_law_of_propagation():
+    model, _ = MonteCarloUncertainty.MODELS["Molarity (mass / MW / volume)"]
+    inputs = inputs_for("Molarity (mass / MW / volume)")
+    result = MonteCarloUncertainty.propagate(model, inputs, n_draws=400_000, seed=7)
+    # c = m / (MW V): relative uncertainties add in quadrature
+    c = 0.5844 / 58.44 / 0.1
+    u = c * np.sqrt((0.0002 / 0.5844) ** 2 + (0.002 / 58.44) ** 2 + (0.00008 / 0.1) ** 2)
+    assert result['estimate'] == pytest.approx(c)
+    assert result['lpu_standard_uncertainty'] == pytest.approx(u, rel=1e-4)
+    assert result['standard_uncertainty'] == pytest.approx(u, rel=0.01)
+    assert result['budget']['variance_share_percent'].sum() == pytest.approx(100)
+    assert result['budget'].set_index('input')['sensitivity_coefficient']['mass_g'] == pytest.approx(c / 0.5844)
+
+
+def test_linear_model_interval_is_normal():
+    inputs = {'a': {'value': 1.0, 'uncertainty': 0.3}, 'b': {'value': 2.0, 'uncertainty': 0.4}}
+    result = MonteCarloUncertainty.propagate(lambda x: x['a'] + x['b'], inputs, n_draws=500_000, seed=3)
+    expected = stats.norm.interval(0.95, loc=3.0, scale=0.5)
+    np.testing.assert_allclose(result['symmetric_interval'], expected, atol=0.01)
+    np.testing.assert_allclose(result['shortest_interval'], expected, atol=0.01)
+    np.testing.assert_allclose(result['lpu_interval'], expected, atol=1e-9)
+
+
+def test_shortest_interval_for_skewed_output():
+    inputs = {'x': {'value': 1.0, 'uncertainty': 0.4}}
+    result = MonteCarloUncertainty.propagate(lambda x: np.exp(x['x']), inputs, n_draws=300_000, seed=5)
+    symmetric, shortest = result['symmetric_interval'], result['shortest_interval']
+    assert shortest[1] - shortest[0] < symmetric[1] - symmetric[0]
+    np.testing.assert_allclose(symmetric, np.exp(stats.norm.interval(0.95, 1.0, 0.4)), rtol=0.01)
+
+
+def test_invalid_draws_are_reported():
+    inputs = {'x': {'value': 0.0, 'uncertainty': 1.0}}
+    with pytest.raises(ValueError, match="invalid results"):
+        MonteCarloUncertainty.propagate(lambda x: np.where(x['x'] > 0, x['x'], np.nan), inputs,
+                                        n_draws=1000, seed=1)
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from chemistry_app import OutlierDetector
+
+# Rosner (1983) data used in the NIST/SEMATECH e-Handbook GESD example: 3 outliers at alpha = 0.05
+ROSNER = np.array([
+    -0.25, 0.68, 0.94, 1.15, 1.20, 1.26, 1.26, 1.34, 1.38, 1.43, 1.49, 1.49, 1.55, 1.56, 1.58, 1.65, 1.69, 1.70,
+    1.76, 1.77, 1.81, 1.91, 1.94, 1.96, 1.99, 2.06, 2.09, 2.10, 2.14, 2.15, 2.23, 2.24, 2.26, 2.35, 2.37, 2.40,
+    2.47, 2.54, 2.62, 2.64, 2.90, 2.92, 2.92, 2.93, 3.21, 3.26, 3.30, 3.59, 3.68, 4.30, 4.64, 5.34, 5.42, 6.01])
+
+
+def reference_gesd(values, max_outliers, alpha=0.05):
+    """Textbook GESD: recompute mean/SD after each removal"""
+    remaining = list(values)
+    removed, exceeded = [], []
+    for i in range(max_outliers):
+        x = np.array(remaining)
+        n = len(x)
+        deviation = np.abs(x - x.mean())
+        j = int(np.argmax(deviation))
+        t = stats.t.ppf(1 - alpha / (2 * n), n - 2)
+        critical = (n - 1) * t / np.sqrt((n - 2 + t ** 2) * n)
+        exceeded.append(deviation[j] / x.std(ddof=1) > critical)
+        removed.append(remaining.pop(j))
+    n_outliers = max([i + 1 for i, e in enumerate(exceeded) if e], default=0)
+    return set(removed[:n_outliers])
+
+
+def test_gesd_nist_example():
+    result = OutlierDetector.detect(pd.DataFrame({'x': ROSNER}), 'x', method="gesd", max_outliers=10)
+    assert sorted(result.loc[result['is_outlier'], 'x']) == [5.34, 5.42, 6.01]
+    scores = result.set_index('x')['outlier_score']
+    assert scores[6.01] == pytest.approx(3.118, abs=1e-3)
+    assert scores[5.34] == pytest.approx(3.179, abs=1e-3)
+
+
+def test_gesd_and_grubbs_match_reference_per_group():
+    rng = np.random.default_rng(18)
+    sizes = rng.integers(3, 300, 150)
+    groups = np.repeat(np.arange(len(sizes)), sizes)
+    values = rng.standard_t(3, len(groups))
+    frame = pd.DataFrame({'g': groups, 'x': values})
+    for method, limit in (("gesd", 5), ("grubbs", 1)):
+        result = OutlierDetector.detect(frame, 'x', ['g'], method=method, max_outliers=limit)
+        for g, size in enumerate(sizes):
+            group = frame['g'] == g
+            expected = reference_gesd(values[group], min(limit, size - 2))
+            assert set(values[group & result['is_outlier']]) == expected
+
+
+def test_mad_and_iqr_match_definitions():
+    rng = np.random.default_rng(19)
+    frame = pd.DataFrame({'g': np.repeat([0, 1], 200), 'x': np.r_[rng.normal(0, 1, 200), rng.normal(5, 3, 200)]})
+    mad = OutlierDetector.detect(frame, 'x', ['g'], method="mad")
+    iqr = OutlierDetector.detect(frame, 'x', ['g'], method="iqr", iqr_k=1.5)
+    for g in (0, 1):
+        x = frame.loc[frame['g'] == g, 'x'].to_numpy()
+        z = 0.6745 * (x - np.median(x)) / stats.median_abs_deviation(x)
+        np.testing.assert_allclose(mad.loc[frame['g'] == g, 'outlier_score'], z)
+        q1, q3 = np.percentile(x, [25, 75])
+        expected = (x < q1 - 1.5 * (q3 - q1)) | (x > q3 + 1.5 * (q3 - q1))
+        assert iqr.loc[frame['g'] == g, 'is_outlier'].tolist() == expected.tolist()
+
+
+def test_dixon_q():
+    # Q = gap / range; Q(0.189) = 0.36 < 0.710 and Q(0.220) = 0.74 > 0.710 at n = 5
+    frame = pd.DataFrame({'x': [0.167, 0.177, 0.181, 0.181, 0.189, 0.167, 0.177, 0.181, 0.181, 0.220],
+                          'g': [0] * 5 + [1] * 5})
+    result = OutlierDetector.detect(frame, 'x', ['g'], method="dixon", alpha=0.05)
+    assert result.loc[4, 'outlier_score'] == pytest.approx((0.189 - 0.181) / (0.189 - 0.167))
+    assert result['is_outlier'].tolist() == [False] * 9 + [True]
+    with pytest.raises(ValueError, match="alpha"):
+        OutlierDetector.detect(frame, 'x', ['g'], method="dixon", alpha=0.2)
+
+
+def test_bucketed_groups_match_separate_calls():
+    rng = np.random.default_rng(20)
+    sizes = np.r_[5000, rng.integers(1, 40, 300)]
+    frame = pd.DataFrame({'g': np.repeat(np.arange(len(sizes)), sizes)})
+    frame['x'] = rng.normal(0, 1, len(frame))
+    frame.loc[rng.random(len(frame)) < 0.01, 'x'] = np.nan
+    for method in OutlierDetector.METHODS:
+        together = OutlierDetector.detect(frame, 'x', ['g'], method=method)
+        for g in (0, 1, 2, 150):
+            alone = OutlierDetector.detect(frame[frame['g'] == g], 'x', method=method)
+            part = together[together['g'] == g]
+            assert part['is_outlier'].tolist() == alone['is_outlier'].tolist()
+            np.testing.assert_allclose(part['outlier_score'], alone['outlier_score'])
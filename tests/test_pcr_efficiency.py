@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from chemistry_app import AmplificationCurveAnalyzer
+
+
+def growth_curves(factors, cycles, start=1e-3, plateau=1000.0):
+    # Logistic growth whose early phase is exactly start · factor^cycle
+    return np.vstack([plateau / (1 + (plateau / start - 1) * f ** -cycles) for f in factors])
+
+
+def test_exponential_phase_recovers_amplification_factor():
+    cycles = np.arange(1, 46, dtype=float)
+    factors = np.array([1.8, 1.9, 2.0])
+    curves = growth_curves(factors, cycles)
+    result = AmplificationCurveAnalyzer.exponential_phase_efficiency(
+        curves, cycles, baseline_sd=np.full(3, 1e-3), plateau_fraction=0.05)
+    np.testing.assert_allclose(result['amplification_factor'], factors, rtol=0.01)
+    np.testing.assert_allclose(result['efficiency_percent'], (factors - 1) * 100, atol=1.5)
+    assert (result['efficiency_r_squared'] > 0.999).all()
+    assert (result['window_end_cycle'] - result['window_start_cycle'] == 4).all()
+
+
+def test_exponential_phase_matches_polyfit_on_chosen_window():
+    rng = np.random.default_rng(2)
+    cycles = np.arange(1, 41, dtype=float)
+    curves = growth_curves([1.93], cycles) * rng.lognormal(0, 0.01, (1, 40))
+    result = AmplificationCurveAnalyzer.exponential_phase_efficiency(
+        curves, cycles, baseline_sd=np.array([1e-3]), min_r_squared=0.9)
+    start = int(result['window_start_cycle'].iloc[0]) - 1
+    slope = np.polyfit(cycles[start:start + 5], np.log10(curves[0, start:start + 5]), 1)[0]
+    assert result['amplification_factor'].iloc[0] == pytest.approx(10 ** slope)
+
+
+def test_flat_well_has_no_efficiency():
+    cycles = np.arange(1, 41, dtype=float)
+    result = AmplificationCurveAnalyzer.exponential_phase_efficiency(
+        np.zeros((1, 40)), cycles, baseline_sd=np.array([1.0]))
+    assert np.isnan(result['efficiency_percent'].iloc[0])
+
+
+def test_mean_efficiency_skips_missing_wells():
+    results = pd.DataFrame({'well': ['A1', 'A2', 'A3'], 'efficiency_percent': [90.0, np.nan, 100.0]})
+    assert AmplificationCurveAnalyzer.mean_efficiency(results, ['A1', 'A2', 'A3']) == 95.0
+    with pytest.raises(ValueError):
+        AmplificationCurveAnalyzer.mean_efficiency(results, ['A2'])
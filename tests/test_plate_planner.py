@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from chemistry_app import PCRPlatePlanner
+
+
+@pytest.fixture
+def layout():
+    return PCRPlatePlanner.build_layout([f"S{i}" for i in range(30)], ["GAPDH", "ACTB", "IL6"],
+                                        replicates=[3, 2, 3], plate_format=96)
+
+
+def test_layout_counts_and_unique_wells(layout):
+    # (30 samples + NTC) × (3 + 2 + 3) replicates
+    assert len(layout['assay']) == 31 * 8
+    assert layout['n_plates'] == 3
+    wells = pd.DataFrame({k: layout[k] for k in ('plate', 'row', 'col')})
+    assert not wells.duplicated().any()
+    assert wells['row'].max() < 8 and wells['col'].max() < 12
+    counts = pd.Series(layout['assay']).value_counts().sort_index()
+    assert counts.tolist() == [93, 62, 93]
+    assert (layout['sample'] == -1).sum() == 8
+
+
+def test_master_mix_volumes(layout):
+    mixes = PCRPlatePlanner.master_mixes(layout, reaction_volume_ul=20.0, template_volume_ul=2.0,
+                                         overage_percent=10.0, dead_volume_ul=18.0)
+    for assay, reactions in zip(["GAPDH", "ACTB", "IL6"], [93, 62, 93]):
+        mix = mixes[mixes['assay'] == assay].set_index('component')
+        assert mix['per_reaction_ul'].sum() == pytest.approx(18.0)
+        assert mix.loc['Buffer', 'per_reaction_ul'] == pytest.approx(1.0 / 10.0 * 20.0)
+        planned = reactions * 1.1 + 18.0 / 18.0
+        np.testing.assert_allclose(mix['total_ul'], mix['per_reaction_ul'] * planned)
+        assert mix.index[0] == "Water" and mix.index[-1] == "Polymerase"
+
+
+def test_component_overrides_and_default_table_is_untouched(layout):
+    before = PCRPlatePlanner.DEFAULT_COMPONENTS.copy()
+    components = pd.concat([PCRPlatePlanner.DEFAULT_COMPONENTS, pd.DataFrame({
+        'assay': ["IL6", None], 'component': ["Forward Primer", "Probe"], 'stock': [10.0, 10.0],
+        'final': [0.9, 0.25], 'unit': ["μM", "μM"]})], ignore_index=True)
+    table = PCRPlatePlanner.component_matrix(layout['assays'], components)
+    primers = table[table['component'] == "Forward Primer"].set_index('assay')['final']
+    assert primers.to_dict() == {'IL6': 0.9, 'GAPDH': 0.5, 'ACTB': 0.5}
+    assert (table['component'] == "Probe").sum() == 3
+    PCRPlatePlanner.component_matrix(layout['assays'])
+    pd.testing.assert_frame_equal(PCRPlatePlanner.DEFAULT_COMPONENTS, before)
+
+
+def test_component_errors(layout):
+    bad = PCRPlatePlanner.DEFAULT_COMPONENTS.assign(final=lambda df: df['stock'] * 2)
+    with pytest.raises(ValueError, match="final ≤ stock"):
+        PCRPlatePlanner.component_matrix(layout['assays'], bad)
+    with pytest.raises(ValueError, match="unknown assay"):
+        PCRPlatePlanner.component_matrix(layout['assays'], PCRPlatePlanner.DEFAULT_COMPONENTS.assign(assay="TNF"))
+
+
+def test_worklist_covers_every_well_once_per_step(layout):
+    worklist = PCRPlatePlanner.worklists(layout)
+    for step in ("Master Mix", "Template"):
+        steps = worklist[worklist['step'] == step]
+        assert len(steps) == len(layout['assay'])
+        assert not steps.duplicated(['plate', 'well']).any()
+    ntc = worklist[(worklist['step'] == "Template") & (worklist['sample'] == "NTC")]
+    assert (ntc['source'] == "Water (NTC)").all()
+    # Master mix is dispensed before any template on each plate
+    for _, plate in worklist.groupby('plate'):
+        assert plate['step'].tolist() == sorted(plate['step'], key=lambda s: s == "Template")
+        assert plate['order'].tolist() == list(range(1, len(plate) + 1))
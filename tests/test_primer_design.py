@@ -0,0 +1,74 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from chemistry_app import PrimerDesigner, PrimerThermodynamics
+
+CONDITIONS = dict(monovalent_mm=50.0, mg_mm=1.5, dntp_mm=0.2, primer_nm=250.0)
+
+
+@pytest.fixture(scope="module")
+def template():
+    return "".join(np.random.default_rng(11).choice(list("ACGT"), 1200))
+
+
+def encode(seq):
+    return PrimerThermodynamics._ENCODE[np.frombuffer(seq.encode('ascii'), dtype=np.uint8)]
+
+
+def test_candidate_windows_match_batch_tm(template):
+    windows = PrimerDesigner.candidate_windows(encode(template[:300]), 20, **CONDITIONS)
+    reference = PrimerThermodynamics.batch_tm([template[s:s + 20] for s in windows['start']], **CONDITIONS)
+    np.testing.assert_allclose(windows['tm'], reference['tm'])
+    np.testing.assert_allclose(windows['gc_content'], reference['gc_content'])
+
+
+def test_candidate_windows_runs_and_ambiguity():
+    seq = "ACGTTTTTGCANNACGGGGGGTACG"
+    windows = PrimerDesigner.candidate_windows(encode(seq), 8, **CONDITIONS)
+    runs = [max(len(list(group)) for _, group in itertools.groupby(seq[s:s + 8])) for s in windows['start']]
+    assert windows['max_run'].tolist() == runs
+    assert windows['has_ambiguous'].tolist() == ['N' in seq[s:s + 8] for s in windows['start']]
+
+
+def brute_force_best(template, **constraints):
+    windows = [PrimerDesigner.candidate_windows(encode(template), length, **CONDITIONS) for length in range(18, 23)]
+    rows = [row for frame in windows for row in frame.itertuples()]
+    ok = [r for r in rows if not r.has_ambiguous and 57 <= r.tm <= 63 and 40 <= r.gc_content <= 60 and r.max_run <= 4]
+    penalty = lambda r: abs(r.tm - 60) + 0.5 * abs(r.length - 20)
+    forward = [r for r in ok if r.forward_gc_clamp and -r.forward_end_dg <= 9]
+    reverse = [r for r in ok if r.reverse_gc_clamp and -r.reverse_end_dg <= 9]
+    best = np.inf
+    for f, r in itertools.product(forward, reverse):
+        size = r.start + r.length - f.start
+        if 80 <= size <= 250 and r.start >= f.start + f.length and abs(f.tm - r.tm) <= 3:
+            best = min(best, penalty(f) + penalty(r) + abs(f.tm - r.tm) + 0.05 * abs(size - 165))
+    return best
+
+
+def test_design_finds_brute_force_optimum(template):
+    pairs = PrimerDesigner.design(template[:600], num_pairs=5, length_range=(18, 22), **CONDITIONS)
+    assert pairs['penalty'].iloc[0] == pytest.approx(brute_force_best(template[:600]))
+    assert pairs['penalty'].is_monotonic_increasing
+
+
+def test_design_pairs_satisfy_constraints(template):
+    pairs = PrimerDesigner.design(template, num_pairs=20, target=(600, 620), **CONDITIONS)
+    complement = str.maketrans("ACGT", "TGCA")
+    tm = PrimerThermodynamics.batch_tm(list(pairs['forward']) + list(pairs['reverse']), **CONDITIONS)['tm']
+    np.testing.assert_allclose(tm[:len(pairs)], pairs['forward_tm'])
+    np.testing.assert_allclose(tm[len(pairs):], pairs['reverse_tm'])
+    for row in pairs.itertuples():
+        start, end = row.forward_start - 1, row.reverse_start
+        assert template[start:start + len(row.forward)] == row.forward
+        assert template[end - len(row.reverse):end].translate(complement)[::-1] == row.reverse
+        assert row.amplicon_bp == end - start
+        assert 80 <= row.amplicon_bp <= 250
+        assert start + len(row.forward) <= 600 and end - len(row.reverse) >= 620
+        assert abs(row.forward_tm - row.reverse_tm) <= 3.0
+
+
+def test_design_rejects_short_template():
+    with pytest.raises(ValueError, match="shorter than the minimum amplicon"):
+        PrimerDesigner.design("ACGT" * 10)
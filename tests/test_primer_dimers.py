@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+from chemistry_app import PrimerDimerAnalyzer, PrimerThermodynamics
+
+COMPLEMENT = {'A': 'T', 'C': 'G', 'G': 'C', 'T': 'A'}
+
+
+def reverse_complement(seq):
+    return "".join(COMPLEMENT[base] for base in reversed(seq))
+
+
+def ungapped_dimer_dg(first, second, stack):
+    """Brute-force best antiparallel ungapped duplex over every start pair"""
+    code = {base: i for i, base in enumerate("ACGT")}
+    terminal = lambda base: PrimerDimerAnalyzer.TERMINAL_AT_DG if base in "AT" else 0.0
+    best = np.inf
+    for i0 in range(len(first)):
+        for j0 in range(len(second)):
+            total = terminal(first[i0])
+            i, j = i0, j0
+            while i < len(first) and j >= 0 and COMPLEMENT[first[i]] == second[j]:
+                if i > i0:
+                    total += stack[code[first[i - 1]], code[first[i]]]
+                best = min(best, total + terminal(first[i]))
+                i, j = i + 1, j - 1
+    return min(best + PrimerDimerAnalyzer.DUPLEX_INIT_DG, 0.0)
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    PrimerDimerAnalyzer._cache.clear()
+    yield
+    PrimerDimerAnalyzer._cache.clear()
+
+
+def test_ungapped_dp_matches_brute_force():
+    rng = np.random.default_rng(6)
+    first = ["".join(rng.choice(list("ACGT"), rng.integers(8, 25))) for _ in range(40)]
+    second = ["".join(rng.choice(list("ACGT"), rng.integers(8, 25))) for _ in range(40)]
+    stack = PrimerDimerAnalyzer.stack_dg()
+    result = PrimerDimerAnalyzer.batch_dimer_dg(first, second, max_loop=0)
+    expected = [ungapped_dimer_dg(a, b, stack) for a, b in zip(first, second)]
+    np.testing.assert_allclose(result['dimer_dg'], expected)
+
+
+def test_perfect_complement_matches_nearest_neighbor_sum():
+    seq = "GACCTGAGGCAATCGG"
+    stack = PrimerDimerAnalyzer.stack_dg()
+    code = ["ACGT".index(base) for base in seq]
+    expected = (sum(stack[a, b] for a, b in zip(code, code[1:])) + PrimerDimerAnalyzer.DUPLEX_INIT_DG
+                + PrimerDimerAnalyzer.TERMINAL_AT_DG * sum(base in "AT" for base in (seq[0], seq[-1])))
+    result = PrimerDimerAnalyzer.batch_dimer_dg([seq], [reverse_complement(seq)])
+    assert result['dimer_dg'].iloc[0] == pytest.approx(expected)
+    assert result['three_prime_dimer_dg'].iloc[0] == pytest.approx(expected)
+
+
+def test_dimer_dg_is_symmetric_and_gaps_only_help():
+    rng = np.random.default_rng(7)
+    first = ["".join(rng.choice(list("ACGT"), 20)) for _ in range(20)]
+    second = ["".join(rng.choice(list("ACGT"), 18)) for _ in range(20)]
+    forward = PrimerDimerAnalyzer.batch_dimer_dg(first, second)
+    backward = PrimerDimerAnalyzer.batch_dimer_dg(second, first)
+    np.testing.assert_allclose(forward['dimer_dg'], backward['dimer_dg'])
+    np.testing.assert_allclose(forward['three_prime_dimer_dg'], backward['three_prime_dimer_dg'])
+    ungapped = PrimerDimerAnalyzer.batch_dimer_dg(first, second, max_loop=0)
+    assert (forward['dimer_dg'] <= ungapped['dimer_dg'] + 1e-12).all()
+
+
+def test_hairpin_stem_loop():
+    stem = "GCGCGC"
+    hairpin = PrimerDimerAnalyzer.batch_hairpin_dg([stem + "TTTT" + reverse_complement(stem), "AAAAAAAAAA"])
+    stack = PrimerDimerAnalyzer.stack_dg()
+    code = ["ACGT".index(base) for base in stem]
+    expected = sum(stack[a, b] for a, b in zip(code, code[1:])) + PrimerDimerAnalyzer.HAIRPIN_DG[4]
+    assert hairpin[0] == pytest.approx(expected)
+    assert hairpin[1] == 0.0
+
+
+def test_invalid_primer_is_rejected():
+    with pytest.raises(ValueError, match="A, C, G, T"):
+        PrimerDimerAnalyzer.screen_pool(["a", "b"], ["ACGTACGT", "ACGNNACG"])
+
+
+def test_screen_pool_matches_direct_pairs_and_reuses_cache(monkeypatch):
+    rng = np.random.default_rng(8)
+    sequences = ["".join(rng.choice(list("ACGT"), 20)) for _ in range(8)]
+    names = [f"P{i}" for i in range(8)]
+    first = PrimerDimerAnalyzer.screen_pool(names, sequences, batch_size=10)
+    assert first['pairs_evaluated'] == 36
+
+    direct = PrimerDimerAnalyzer.batch_dimer_dg([sequences[int(a[1:])] for a in first['dimers']['primer_1']],
+                                                [sequences[int(b[1:])] for b in first['dimers']['primer_2']])
+    np.testing.assert_allclose(first['dimers']['dimer_dg'], direct['dimer_dg'])
+
+    # Adding two primers past a tiny cache limit must still return the previously cached pairs
+    monkeypatch.setattr(PrimerDimerAnalyzer, '_CACHE_LIMIT', 40)
+    more = sequences + ["".join(rng.choice(list("ACGT"), 20)) for _ in range(2)]
+    second = PrimerDimerAnalyzer.screen_pool(names + ["P8", "P9"], more)
+    assert second['pairs_evaluated'] == 55 - 36
+    assert len(second['dimers']) == 55
+    assert len(PrimerDimerAnalyzer._cache) <= 40
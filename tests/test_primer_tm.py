@@ -0,0 +1,111 @@
+import math
+
+import numpy as np
+import pytest
+
+from chemistry_app import PrimerThermodynamics
+
+# SantaLucia (1998) unified nearest-neighbor parameters, Table 1: ΔH kcal/mol, ΔS cal/(K·mol)
+PUBLISHED_NN = {
+    'AA': (-7.9, -22.2), 'TT': (-7.9, -22.2), 'AT': (-7.2, -20.4), 'TA': (-7.2, -21.3),
+    'CA': (-8.5, -22.7), 'TG': (-8.5, -22.7), 'GT': (-8.4, -22.4), 'AC': (-8.4, -22.4),
+    'CT': (-7.8, -21.0), 'AG': (-7.8, -21.0), 'GA': (-8.2, -22.2), 'TC': (-8.2, -22.2),
+    'CG': (-10.6, -27.2), 'GC': (-9.8, -24.4), 'GG': (-8.0, -19.9), 'CC': (-8.0, -19.9),
+}
+INIT = {'G': (0.1, -2.8), 'C': (0.1, -2.8), 'A': (2.3, 4.1), 'T': (2.3, 4.1)}
+R = 1.9872
+
+
+def reference_dh_ds(seq):
+    dh = sum(PUBLISHED_NN[seq[i:i + 2]][0] for i in range(len(seq) - 1)) + INIT[seq[0]][0] + INIT[seq[-1]][0]
+    ds = sum(PUBLISHED_NN[seq[i:i + 2]][1] for i in range(len(seq) - 1)) + INIT[seq[0]][1] + INIT[seq[-1]][1]
+    return dh, ds
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    PrimerThermodynamics._cache.clear()
+    yield
+    PrimerThermodynamics._cache.clear()
+
+
+def test_published_delta_g_example():
+    # SantaLucia (1998) worked example: ΔG°37(CGTTGA) = -5.35 kcal/mol from the tabulated ΔG values;
+    # ΔH - TΔS from the rounded ΔH/ΔS table gives -5.41
+    result = PrimerThermodynamics.batch_tm(["CGTTGA"])
+    assert result['delta_g_37'].iloc[0] == pytest.approx(-5.35, abs=0.1)
+
+
+def test_enthalpy_entropy_and_1m_tm_match_table():
+    sequences = ["AGCGGATAACAATTTCACACAGGA", "GTAAAACGACGGCCAGT", "TTGACAGCTAGCTCAGTCCTAGG"]
+    result = PrimerThermodynamics.batch_tm(sequences, primer_nm=250.0)
+    for row, seq in zip(result.itertuples(), sequences):
+        dh, ds = reference_dh_ds(seq)
+        assert row.delta_h == pytest.approx(dh)
+        assert row.delta_s == pytest.approx(ds)
+        tm_1m = dh * 1000 / (ds + R * math.log(250e-9 / 4)) - 273.15
+        assert row.tm_1m_na == pytest.approx(tm_1m)
+
+
+def test_self_complementary_uses_symmetry_and_full_strand_concentration():
+    result = PrimerThermodynamics.batch_tm(["CGCGAATTCGCG"], primer_nm=1000.0).iloc[0]
+    dh, ds = reference_dh_ds("CGCGAATTCGCG")
+    assert result['self_complementary']
+    assert result['delta_s'] == pytest.approx(ds - 1.4)
+    assert result['tm_1m_na'] == pytest.approx(dh * 1000 / (ds - 1.4 + R * math.log(1e-6)) - 273.15)
+
+
+def test_monovalent_correction_matches_owczarzy_2004():
+    seq = "AGCGGATAACAATTTCACACAGGA"
+    row = PrimerThermodynamics.batch_tm([seq], monovalent_mm=50.0, mg_mm=0.0, dntp_mm=0.0).iloc[0]
+    gc = sum(base in "GC" for base in seq) / len(seq)
+    ln_na = math.log(0.05)
+    inv_tm = 1 / (row['tm_1m_na'] + 273.15) + (4.29 * gc - 3.95) * 1e-5 * ln_na + 9.40e-6 * ln_na ** 2
+    assert row['tm'] == pytest.approx(1 / inv_tm - 273.15)
+    assert row['tm'] < row['tm_1m_na']
+
+
+def test_magnesium_dominated_correction_matches_owczarzy_2008():
+    seq = "GTAAAACGACGGCCAGT"
+    row = PrimerThermodynamics.batch_tm([seq], monovalent_mm=1.0, mg_mm=3.2, dntp_mm=0.2).iloc[0]
+    gc = sum(base in "GC" for base in seq) / len(seq)
+    ln_mg = math.log(3.0e-3)
+    correction = (3.92e-5 - 9.11e-6 * ln_mg + gc * (6.26e-5 + 1.42e-5 * ln_mg)
+                  + (-4.82e-4 + 5.25e-4 * ln_mg + 8.31e-5 * ln_mg ** 2) / (2 * (len(seq) - 1)))
+    assert row['tm'] == pytest.approx(1 / (1 / (row['tm_1m_na'] + 273.15) + correction) - 273.15)
+
+
+def test_rna_and_lowercase_input_match_dna():
+    result = PrimerThermodynamics.batch_tm(["acgu uagc", "ACGTTAGC"])
+    assert result['sequence'].tolist() == ["ACGTTAGC", "ACGTTAGC"]
+    assert result['tm'].iloc[0] == result['tm'].iloc[1]
+
+
+def test_invalid_bases_are_rejected():
+    with pytest.raises(ValueError, match="A, C, G, T"):
+        PrimerThermodynamics.batch_tm(["ACGTNACGT"])
+
+
+def test_cache_eviction_keeps_previously_cached_sequences(monkeypatch):
+    monkeypatch.setattr(PrimerThermodynamics, '_CACHE_LIMIT', 3)
+    first = PrimerThermodynamics.batch_tm(["ACGTACGTAC", "GGGCCCAAAT"])
+    second = PrimerThermodynamics.batch_tm(["ACGTACGTAC", "TTTTGGGGCC", "ATATGCGCAT"])
+    assert second['tm'].iloc[0] == first['tm'].iloc[0]
+    assert len(PrimerThermodynamics._cache) <= 3
+
+
+def test_cached_results_equal_fresh_results():
+    sequences = ["ACGTACGTAC", "GGGCCCAAAT", "ACGTACGTAC"]
+    fresh = PrimerThermodynamics.batch_tm(sequences)
+    cached = PrimerThermodynamics.batch_tm(sequences)
+    assert fresh.equals(cached)
+    assert len(PrimerThermodynamics._cache) == 2
+
+
+def test_parse_primer_file_formats():
+    fasta = PrimerThermodynamics.parse_primer_file(">fwd\nACGT\nACGT\n>rev\nTTTT")
+    assert fasta.to_dict('list') == {'name': ['fwd', 'rev'], 'sequence': ['ACGTACGT', 'TTTT']}
+    csv = PrimerThermodynamics.parse_primer_file("name,sequence\nfwd,ACGT\nrev,GGCC")
+    assert csv['sequence'].tolist() == ['ACGT', 'GGCC']
+    bare = PrimerThermodynamics.parse_primer_file("ACGT\nGGCC")
+    assert bare['name'].tolist() == ['Primer 1', 'Primer 2']
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from chemistry_app import StandardCurveQC
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    StandardCurveQC._cache.clear()
+    yield
+    StandardCurveQC._cache.clear()
+
+
+def standards(slope=-3.32, intercept=38.0, noise=0.1, seed=12, replicates=3):
+    rng = np.random.default_rng(seed)
+    copies = np.repeat(10.0 ** np.arange(1, 7), replicates)
+    ct = slope * np.log10(copies) + intercept + rng.normal(0, noise, len(copies))
+    return pd.DataFrame({'copies': copies, 'ct': ct})
+
+
+def test_fit_matches_linregress():
+    data = standards()
+    curve = StandardCurveQC.fit(data)
+    assert curve['n_outliers'] == 0
+    reference = stats.linregress(np.log10(data['copies']), data['ct'])
+    assert curve['slope'] == pytest.approx(reference.slope)
+    assert curve['intercept'] == pytest.approx(reference.intercept)
+    assert curve['r_squared'] == pytest.approx(reference.rvalue ** 2)
+    assert curve['efficiency_percent'] == pytest.approx((10 ** (-1 / reference.slope) - 1) * 100)
+    assert curve['qc_pass']
+
+
+def test_perfect_doubling_is_100_percent_efficient():
+    data = standards(slope=-1 / np.log10(2), noise=0.0)
+    curve = StandardCurveQC.fit(data)
+    assert curve['efficiency_percent'] == pytest.approx(100.0)
+
+
+def test_replicate_outlier_is_excluded_and_lod_uses_detection_rate():
+    data = standards(noise=0.05, replicates=4)
+    data.loc[5, 'ct'] += 3.0
+    data.loc[[0, 1], 'ct'] = np.nan
+    curve = StandardCurveQC.fit(data, outlier_method="grubbs")
+    assert curve['n_outliers'] == 1 and curve['outlier_mask'][5]
+    assert curve['n'] == 21
+    assert curve['lod_copies'] == 100.0
+    clean = stats.linregress(np.log10(data['copies'].drop([0, 1, 5])), data['ct'].drop([0, 1, 5]))
+    assert curve['slope'] == pytest.approx(clean.slope)
+
+
+def test_quantify_inverse_prediction_interval():
+    data = standards()
+    curve = StandardCurveQC.fit(data, "plate1")
+    unknowns = pd.DataFrame({'ct': [25.0, 15.0, 36.5, np.nan], 'plate': ['plate1'] * 4})
+    result = StandardCurveQC.quantify({'plate1': curve}, unknowns)
+
+    x = np.log10(data['copies']).to_numpy()
+    fit = stats.linregress(x, data['ct'])
+    sd = np.sqrt(np.sum((data['ct'] - fit.intercept - fit.slope * x) ** 2) / (len(x) - 2))
+    x0 = (25.0 - fit.intercept) / fit.slope
+    se = sd / abs(fit.slope) * np.sqrt(1 + 1 / len(x) + (25.0 - data['ct'].mean()) ** 2
+                                       / (fit.slope ** 2 * np.sum((x - x.mean()) ** 2)))
+    t = stats.t.ppf(0.975, len(x) - 2)
+    row = result.iloc[0]
+    assert row['log10_copies'] == pytest.approx(x0)
+    assert row['copies_lower'] == pytest.approx(10 ** (x0 - t * se))
+    assert row['copies_upper'] == pytest.approx(10 ** (x0 + t * se))
+    assert result['qc_flag'].tolist() == ["OK", "Outside standard range", "Below LOD", "Undetected"]
+
+
+def test_fit_plates_pools_and_falls_back():
+    data = pd.concat([standards(seed=1).assign(plate="P1"), standards(seed=2).assign(plate="P2")])
+    curves = StandardCurveQC.fit_plates(data)
+    assert set(curves) == {"P1", "P2", "pooled"}
+    assert curves['pooled']['n'] == 36
+    result = StandardCurveQC.quantify(curves, pd.DataFrame({'ct': [30.0, 30.0], 'plate': ["P1", "P9"]}))
+    assert result['curve'].tolist() == ["P1", "pooled"]
+
+
+def test_fit_rejects_non_positive_copies():
+    with pytest.raises(ValueError, match="must be positive"):
+        StandardCurveQC.fit(pd.DataFrame({'copies': [0, 10, 100], 'ct': [30, 27, 24]}))
@@ -0,0 +1,77 @@
+import gzip
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from chemistry_app import StreamingStatistics, TDigest
+
+
+@pytest.fixture(scope="module")
+def frame():
+    rng = np.random.default_rng(15)
+    return pd.DataFrame({'lognormal': rng.lognormal(1.0, 0.8, 50_000),
+                         'normal': rng.normal(100, 15, 50_000),
+                         'label': rng.choice(["a", "b"], 50_000)})
+
+
+def check_summary(summary, frame):
+    for column in ('lognormal', 'normal'):
+        values = frame[column].to_numpy()
+        row = summary.set_index('column').loc[column]
+        assert row['count'] == len(values)
+        assert row['mean'] == pytest.approx(values.mean())
+        assert row['std'] == pytest.approx(values.std(ddof=1))
+        assert row['skewness'] == pytest.approx(stats.skew(values))
+        assert row['excess_kurtosis'] == pytest.approx(stats.kurtosis(values))
+        assert (row['min'], row['max']) == (values.min(), values.max())
+        # t-digest accuracy is stated as rank error
+        ordered = np.sort(values)
+        for label, q in (('p1', 0.01), ('median', 0.5), ('p99', 0.99)):
+            assert abs(np.searchsorted(ordered, row[label]) / len(values) - q) < 1e-3
+
+
+def test_chunked_summary_matches_numpy(frame):
+    source = io.StringIO(frame.to_csv(index=False))
+    check_summary(StreamingStatistics.summarize(source, chunksize=7_000), frame)
+
+
+def test_gzip_upload_is_decompressed(frame):
+    source = io.BytesIO(gzip.compress(frame.to_csv(index=False).encode()))
+    source.name = "upload.csv.gz"
+    check_summary(StreamingStatistics.summarize(source, chunksize=20_000), frame)
+
+
+def test_merge_moments_equals_single_pass():
+    rng = np.random.default_rng(16)
+    X = rng.gamma(2.0, 3.0, (9_000, 3))
+    X[rng.random(X.shape) < 0.05] = np.nan
+    merged = None
+    for part in np.array_split(X, [10, 4000, 4001]):
+        current = StreamingStatistics.chunk_moments(part)
+        merged = current if merged is None else StreamingStatistics.merge_moments(merged, current)
+    whole = StreamingStatistics.chunk_moments(X)
+    for key in whole:
+        np.testing.assert_allclose(merged[key], whole[key], rtol=1e-9)
+
+
+def test_text_in_numeric_column_counts_as_missing():
+    source = io.StringIO("value\n1\n2\n" + "3\n" * 5 + "oops\n4\n")
+    summary = StreamingStatistics.summarize(source, chunksize=3)
+    assert summary['count'].iloc[0] == 8 and summary['missing'].iloc[0] == 1
+
+
+def test_tdigest_merge_keeps_quantiles():
+    rng = np.random.default_rng(17)
+    values = rng.exponential(2.0, 200_000)
+    digests = [TDigest(200) for _ in range(4)]
+    for digest, part in zip(digests, np.array_split(values, 4)):
+        digest.update(part)
+    for other in digests[1:]:
+        digests[0].merge(other)
+    assert len(digests[0].means) < 400
+    q = np.array([0.001, 0.1, 0.5, 0.9, 0.999])
+    rank = np.searchsorted(np.sort(values), digests[0].quantile(q)) / len(values)
+    np.testing.assert_allclose(rank, q, atol=1e-3)
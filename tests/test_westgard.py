@@ -0,0 +1,105 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import chemistry_app
+from chemistry_app import QCStore, WestgardRules
+
+ALL_RULES = tuple(WestgardRules.RULES)
+
+
+def reference_violations(z):
+    """Rules applied directly to the full z-score history, one point at a time"""
+    out = []
+    for i in range(len(z)):
+        last = lambda n: z[max(0, i - n + 1):i + 1]
+        same_side = lambda n, limit: i >= n - 1 and (np.all(last(n) > limit) or np.all(last(n) < -limit))
+        rising = np.diff(z[max(0, i - 6):i + 1])
+        hits = {
+            "1-2s": abs(z[i]) > 2,
+            "1-3s": abs(z[i]) > 3,
+            "2-2s": same_side(2, 2),
+            "R-4s": i >= 1 and ((z[i] > 2 and z[i - 1] < -2) or (z[i] < -2 and z[i - 1] > 2)),
+            "3-1s": same_side(3, 1),
+            "4-1s": same_side(4, 1),
+            "7-T": i >= 6 and (np.all(rising > 0) or np.all(rising < 0)),
+            "8-x": same_side(8, 0),
+            "10-x": same_side(10, 0),
+            "12-x": same_side(12, 0)
+        }
+        out.append(", ".join(rule for rule in ALL_RULES if hits[rule]))
+    return out
+
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(41)
+    # Mix of noise, a shift, a slow trend and a spike to exercise every rule
+    return np.r_[rng.normal(100, 2, 40), rng.normal(103, 1, 15), 100 + np.arange(9) * 0.5, 110, 92, 105.5, 105.5,
+                 rng.normal(100, 2, 30)]
+
+
+def test_batch_matches_reference(series):
+    result, state = WestgardRules.evaluate_series(series, WestgardRules.initial_state(100, 2), ALL_RULES)
+    assert result['violations'].tolist() == reference_violations((series - 100) / 2)
+    assert set(ALL_RULES) <= set(", ".join(result['violations']).split(", "))
+    assert state['n'] == len(series)
+
+
+def test_batch_matches_point_by_point_replay(series):
+    state = WestgardRules.initial_state(100, 2)
+    batch, batch_state = WestgardRules.evaluate_series(series, state, ALL_RULES)
+    parts = []
+    for split in np.array_split(series, [1, 2, 7, 30, 31, 60]):
+        part, state = WestgardRules.evaluate_series(split, state, ALL_RULES)
+        parts.append(part)
+    pd.testing.assert_frame_equal(pd.concat(parts, ignore_index=True), batch)
+    single = WestgardRules.initial_state(100, 2)
+    for value in series:
+        _, single = WestgardRules.evaluate_series([value], single, ALL_RULES)
+    assert single == state == batch_state
+
+
+def test_unknown_rule():
+    with pytest.raises(ValueError, match="Unknown Westgard rule"):
+        WestgardRules.evaluate_series([1.0], WestgardRules.initial_state(0, 1), ["9-9s"])
+
+
+def test_store_history_keeps_batch_order(tmp_path, series):
+    store = QCStore(str(tmp_path / "qc.sqlite"))
+    store.set_target("Glucose", "L1", 100, 2, ALL_RULES)
+    # Points sharing a timestamp must come back in insertion order
+    store.add_points("Glucose", "L1", series[:5], measured_at=["2024-01-01T09:00"] * 5)
+    store.add_points("Glucose", "L1", series[5:], measured_at=["2024-01-02T09:00"] * (len(series) - 5))
+    history = store.history("Glucose", "L1")
+    assert history.columns.tolist() == ['measured_at', 'value', 'z_score', 'violations', 'status']
+    np.testing.assert_allclose(history['value'], series)
+    assert history['violations'].tolist() == reference_violations((series - 100) / 2)
+    np.testing.assert_allclose(store.history("Glucose", "L1", limit=7)['value'], series[-7:])
+    assert store.series().loc[0, 'points'] == len(series)
+    with pytest.raises(ValueError, match="No target"):
+        store.add_points("Glucose", "L2", [1.0])
+
+
+def test_store_closes_connections(tmp_path, monkeypatch):
+    opened = []
+    connect = sqlite3.connect
+
+    def tracking_connect(*args, **kwargs):
+        opened.append(connect(*args, **kwargs))
+        return opened[-1]
+
+    monkeypatch.setattr(chemistry_app.sqlite3, "connect", tracking_connect)
+    store = QCStore(str(tmp_path / "qc.sqlite"))
+    store.set_target("Na", "L1", 140, 1.5)
+    store.add_points("Na", "L1", [140.5, 139.0])
+    store.series()
+    store.history("Na", "L1")
+    with pytest.raises(ValueError):
+        store.add_points("K", "L1", [4.0])
+    assert len(opened) == 6
+    for conn in opened:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")